@@ -0,0 +1 @@
+# Django管理命令模块
@@ -0,0 +1,209 @@
+"""
+JSON渲染器/解析器基准测试的管理命令
+
+    python manage.py benchmark_json_renderer
+    python manage.py benchmark_json_renderer --repeat 50 --json
+
+用接近实际接口的载荷（页面详情、页面列表、Cabinet图片列表、文件夹全量列表）
+对比 DRF 自带的 JSONRenderer/JSONParser 与 ORJSONRenderer/ORJSONParser。
+"""
+
+import json
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from pagemaker.renderers import ORJSONParser, ORJSONRenderer, orjson
+
+CUSTOM_HTML = (
+    '<table width="100%" border="0" cellspacing="0" cellpadding="0"><tr>'
+    '<td align="center"><a href="https://item.rakuten.co.jp/shop/item-{i}/">'
+    '<img src="https://image.rakuten.co.jp/shop/cabinet/item/{i}.jpg" width="100%">'
+    "</a></td></tr></table><p>送料無料・あす楽対応 {i}</p>"
+)
+
+
+def _module(i):
+    kind = i % 4
+    module_id = f"module-{1700000000000 + i}-{i:09d}"
+    if kind == 0:
+        return {
+            "id": module_id,
+            "type": "custom",
+            "customHTML": CUSTOM_HTML.format(i=i),
+        }
+    if kind == 1:
+        return {
+            "id": module_id,
+            "type": "text",
+            "content": f"商品説明 {i}：天然素材を使用した人気商品です。" * 3,
+            "fontSize": "4",
+            "fontFamily": "inherit",
+            "alignment": "left",
+            "textColor": "#000000",
+            "backgroundColor": "transparent",
+        }
+    if kind == 2:
+        return {
+            "id": module_id,
+            "type": "image",
+            "src": f"https://image.rakuten.co.jp/shop/cabinet/item/{i}.jpg",
+            "alt": f"商品画像 {i}",
+            "alignment": "center",
+            "size": {"type": "preset", "value": "full"},
+        }
+    return {
+        "id": module_id,
+        "type": "keyValue",
+        "rows": [{"key": f"項目{j}", "value": f"値{j}"} for j in range(6)],
+    }
+
+
+def _page(now, content):
+    return {
+        "id": uuid.uuid4(),
+        "name": "ベンチマーク用ページ",
+        "content": content,
+        "shop_id": uuid.uuid4(),
+        "shop_name": "テスト店舗",
+        "device_type": "pc",
+        "owner_id": "1",
+        "created_at": now - timedelta(days=30),
+        "updated_at": now,
+        "module_count": len(content),
+    }
+
+
+def build_payloads():
+    """代表性的接口响应载荷 {名称: 数据}"""
+    now = timezone.now()
+    page = _page(now, [_module(i) for i in range(400)])
+    rows = []
+    for i in range(100):
+        row = _page(now - timedelta(minutes=i), [])
+        row.pop("content")
+        row["owner_username"] = "editor"
+        rows.append(row)
+    images = [
+        {
+            "id": str(100000 + i),
+            "url": f"https://image.rakuten.co.jp/shop/cabinet/item/{i}.jpg",
+            "filename": f"商品画像_{i}.jpg",
+            "size": 123.45,
+            "width": 1200,
+            "height": 1200,
+            "mimeType": "image/jpeg",
+            "uploadedAt": "2026-10-01 12:00:00",
+        }
+        for i in range(2000)
+    ]
+    folders = [
+        {
+            "id": str(i),
+            "name": f"フォルダ{i}",
+            "path": f"parent{i // 20}/folder{i}",
+            "fileCount": i,
+            "fileSize": i * 100,
+            "updatedAt": "2026-10-01 12:00:00",
+            "node": 2,
+            "parentPath": f"parent{i // 20}",
+        }
+        for i in range(1000)
+    ]
+    return {
+        "page_detail": {"success": True, "data": page},
+        "page_list": {"success": True, "data": {"pages": rows, "pagination": {}}},
+        "cabinet_images": {"success": True, "data": {"images": images, "total": 2000}},
+        "cabinet_folders": {"success": True, "data": {"folders": folders}},
+    }
+
+
+def _timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+    }
+
+
+def benchmark(repeat=20):
+    """
+    Returns:
+        {载荷名称: {"bytes", "render": {"drf", "orjson", "speedup"},
+                   "parse": {"drf", "orjson", "speedup"}}}
+    """
+    results = {}
+    for name, data in build_payloads().items():
+        body, drf_render = _timed(lambda: JSONRenderer().render(data), repeat)
+        _, fast_render = _timed(lambda: ORJSONRenderer().render(data), repeat)
+
+        def parse(parser):
+            return lambda: parser.parse(_Stream(body), parser_context={})
+
+        _, drf_parse = _timed(parse(JSONParser()), repeat)
+        _, fast_parse = _timed(parse(ORJSONParser()), repeat)
+        results[name] = {
+            "bytes": len(body),
+            "render": _compare(drf_render, fast_render),
+            "parse": _compare(drf_parse, fast_parse),
+        }
+    return results
+
+
+def _compare(drf, fast):
+    return {
+        "drf": drf,
+        "orjson": fast,
+        "speedup": round(drf["median_ms"] / max(fast["median_ms"], 1e-6), 1),
+    }
+
+
+class _Stream:
+    """只读请求体（每次解析重新读取）"""
+
+    def __init__(self, body):
+        self.body = body
+        self.offset = 0
+
+    def read(self, size=-1):
+        end = len(self.body) if size is None or size < 0 else self.offset + size
+        chunk = self.body[self.offset : end]
+        self.offset += len(chunk)
+        return chunk
+
+
+class Command(BaseCommand):
+    help = "对比DRF自带JSON渲染器/解析器与orjson版本在代表性载荷上的耗时"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="每项重复次数")
+        parser.add_argument("--json", action="store_true", help="以JSON格式输出")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("⚠️ 未安装orjson，两种渲染器结果相同"))
+
+        results = benchmark(repeat=max(1, options["repeat"]))
+        if options["json"]:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
+            return
+
+        for name, item in results.items():
+            self.stdout.write(f"\n[{name}] {item['bytes']} 字节")
+            for key, label in (("render", "渲染"), ("parse", "解析")):
+                stats = item[key]
+                self.stdout.write(
+                    f"  {label}: DRF {stats['drf']['median_ms']} ms, "
+                    f"orjson {stats['orjson']['median_ms']} ms "
+                    f"(x{stats['speedup']})"
+                )
@@ -10,6 +10,8 @@ urlpatterns = [
     # Health check endpoints
     path("health/", views.health_check, name="health_check"),
     path("health/rakuten/", views.rakuten_health_check, name="rakuten_health_check"),
+    # Profiling endpoint (admin only)
+    path("profiling/", views.profiling_stats, name="profiling_stats"),
     # Dashboard endpoint
     path("dashboard/stats/", dashboard_views.dashboard_stats, name="dashboard_stats"),
     # Users API endpoints
@@ -3,10 +3,11 @@ API 视图
 """
 
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
 from django.db import connection
 from django.utils import timezone
 from pagemaker.integrations.cabinet_client import RCabinetClient
@@ -141,3 +142,104 @@ def rakuten_health_check(request):
             },
             status=status.HTTP_503_SERVICE_UNAVAILABLE,
         )
+
+
+@require_GET
+def metrics(request):
+    """
+    OpenMetrics格式的乐天API延迟指标（供Prometheus抓取）
+
+    Request:
+        GET /metrics
+        Authorization: Bearer <PAGEMAKER_METRICS_TOKEN>（配置了令牌时必需）
+
+    Response:
+        200: OpenMetrics文本，包含所有gunicorn worker合并后的延迟直方图
+        401: 令牌无效
+    """
+    from pagemaker.config import config
+    from pagemaker.integrations.metrics_export import (
+        OPENMETRICS_CONTENT_TYPE,
+        render_openmetrics,
+    )
+    from pagemaker.integrations.monitoring import get_global_metrics
+
+    token = config.METRICS_TOKEN
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=401)
+
+    histograms = get_global_metrics().histograms.collect()
+    return HttpResponse(
+        render_openmetrics(histograms), content_type=OPENMETRICS_CONTENT_TYPE
+    )
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAuthenticated])
+def profiling_stats(request):
+    """
+    请求级性能分析统计（仅admin可用，需启用 PAGEMAKER_PROFILING_ENABLED）
+
+    Request:
+        GET /api/v1/profiling/?profiles=1
+        DELETE /api/v1/profiling/  清空统计
+
+    Response:
+        200: {
+            "success": true,
+            "data": {
+                "enabled": true,
+                "routes": {
+                    "GET /api/v1/pages/": {
+                        "count": 120, "avg_ms": 85.3, "p95_ms": 210.0,
+                        "avg_db_queries": 4.0, "avg_cabinet_ms": 0.0,
+                        "cache_hit_rate": 92.5, ...
+                    }
+                },
+                "slow_profile_count": 3,
+                "slow_profiles": [...],  # 仅在 profiles=1 时返回
+                "refresh_scheduler": {  # 本worker的缓存后台刷新调度器
+                    "queue_depth": 0, "running": 1, "failed": 2,
+                    "latency_ms": {"avg": 1520.3, "p95": 2500.0, ...}, ...
+                },
+                "render_cache": {  # 本worker的页面/模块片段渲染缓存
+                    "hits": 12, "misses": 3,
+                    "fragments": {"hits": 580, "shared_hits": 40, "misses": 6, ...}, ...
+                },
+                "html_budget": {"hits": 320, "misses": 4, ...}  # 保存时的HTML预算分析
+            }
+        }
+        403: 非管理员
+    """
+    from django.conf import settings
+    from pagemaker.integrations.refresh_scheduler import get_refresh_scheduler
+    from pagemaker.profiling import get_profiling_registry
+    from pages.budget import get_budget_analyzer
+    from pages.render_cache import get_render_cache
+    from users.models import check_user_role
+
+    if not check_user_role(request.user, "admin"):
+        return Response(
+            {
+                "success": False,
+                "error": {
+                    "code": "PERMISSION_DENIED",
+                    "message": "只有管理员可以查看性能分析数据",
+                },
+            },
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    registry = get_profiling_registry()
+    if request.method == "DELETE":
+        registry.reset()
+        return Response({"success": True, "message": "性能分析数据已清空"})
+
+    data = registry.snapshot(
+        include_profiles=request.query_params.get("profiles") in ("1", "true")
+    )
+    data["enabled"] = settings.PAGEMAKER_PROFILING["ENABLED"]
+    data["refresh_scheduler"] = get_refresh_scheduler().stats()
+    data["render_cache"] = get_render_cache().stats()
+    data["html_budget"] = get_budget_analyzer().stats()
+    return Response({"success": True, "data": data})
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ShopConfiguration
+from .models import ShopConfiguration, SFTPManifestEntry
 
 
 @admin.register(ShopConfiguration)
@@ -38,3 +38,13 @@ class ShopConfigurationAdmin(admin.ModelAdmin):
         form = super().get_form(request, obj, **kwargs)
         # 在实际生产环境中，这里可以添加敏感字段的特殊处理
         return form
+
+
+@admin.register(SFTPManifestEntry)
+class SFTPManifestEntryAdmin(admin.ModelAdmin):
+    """SFTPManifestEntry模型的Django Admin配置（只读，由同步流程维护）"""
+
+    list_display = ("path", "shop", "size", "mtime", "synced_at")
+    list_filter = ("shop",)
+    search_fields = ("path",)
+    readonly_fields = ("shop", "path", "size", "mtime", "content_hash", "synced_at")
@@ -0,0 +1,195 @@
+"""
+API许可证到期日期批量刷新
+
+在请求线程之外（管理命令 / 定时任务）并发刷新所有店铺的
+api_license_expiry_date，并通过 bulk_update 一次性写回数据库。
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ShopConfiguration
+from pagemaker.integrations.cabinet_client import RCabinetClient
+
+logger = logging.getLogger(__name__)
+
+# 默认并发数（每个店铺使用独立的License Key，互不共享限速）
+DEFAULT_MAX_WORKERS = 4
+
+# 默认跳过最近N小时内已刷新过的店铺
+DEFAULT_MIN_AGE = timedelta(hours=12)
+
+# 默认到期预警天数
+DEFAULT_WARN_DAYS = 30
+
+
+def parse_expiry_date(expiry_date_str: str) -> datetime:
+    """
+    解析LicenseManagementAPI返回的到期日期
+
+    格式可能是 "2025-12-31" 或 "2025-12-31T00:00:00Z"
+    """
+    if "T" in expiry_date_str:
+        return datetime.fromisoformat(expiry_date_str.replace("Z", "+00:00"))
+    return datetime.strptime(expiry_date_str, "%Y-%m-%d")
+
+
+def fetch_license_expiry_date(shop: ShopConfiguration) -> Optional[datetime]:
+    """
+    调用乐天API获取单个店铺的许可证到期日期
+
+    Returns:
+        到期日期；API未返回日期时为None
+
+    Raises:
+        RakutenAPIError: API调用失败时
+    """
+    client = RCabinetClient(
+        service_secret=shop.api_service_secret,
+        license_key=shop.api_license_key,
+    )
+    result = client.get_license_expiry_date()
+
+    if result.get("success") and result.get("data"):
+        expiry_date_str = result["data"].get("expiryDate")
+        if expiry_date_str:
+            return parse_expiry_date(expiry_date_str)
+    return None
+
+
+def get_stale_shops(
+    min_age: timedelta = DEFAULT_MIN_AGE, shop_ids: Iterable[str] = None
+):
+    """获取需要刷新的店铺（从未刷新过或上次刷新早于min_age）"""
+    queryset = ShopConfiguration.objects.all()
+    if shop_ids:
+        queryset = queryset.filter(id__in=list(shop_ids))
+    if min_age:
+        threshold = timezone.now() - min_age
+        queryset = queryset.filter(
+            Q(api_license_checked_at__isnull=True)
+            | Q(api_license_checked_at__lt=threshold)
+        )
+    return queryset
+
+
+def get_expiring_shops(days: int = DEFAULT_WARN_DAYS) -> List[Dict[str, Any]]:
+    """
+    获取N天内到期（含已过期）的店铺许可证
+
+    Returns:
+        按到期日期升序排列的店铺信息列表
+    """
+    now = timezone.now()
+    deadline = now + timedelta(days=days)
+    shops = (
+        ShopConfiguration.objects.filter(
+            api_license_expiry_date__isnull=False,
+            api_license_expiry_date__lte=deadline,
+        )
+        .order_by("api_license_expiry_date")
+        .only("id", "shop_name", "target_area", "api_license_expiry_date")
+    )
+
+    return [
+        {
+            "shop_id": str(shop.id),
+            "shop_name": shop.shop_name,
+            "target_area": shop.target_area,
+            "expiry_date": shop.api_license_expiry_date.isoformat(),
+            "days_left": (shop.api_license_expiry_date - now).days,
+        }
+        for shop in shops
+    ]
+
+
+def refresh_license_expiry_dates(
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    min_age: timedelta = DEFAULT_MIN_AGE,
+    shop_ids: Iterable[str] = None,
+    warn_days: int = DEFAULT_WARN_DAYS,
+) -> Dict[str, Any]:
+    """
+    并发刷新所有店铺的许可证到期日期
+
+    数据库读写只发生在调用线程中，工作线程只负责调用乐天API，
+    结果统一通过 bulk_update 写回。
+
+    Args:
+        max_workers: 线程池大小
+        min_age: 跳过在此时间内已刷新过的店铺（None表示全部刷新）
+        shop_ids: 仅刷新指定店铺
+        warn_days: 到期预警天数
+
+    Returns:
+        刷新结果汇总
+    """
+    candidates = ShopConfiguration.objects.all()
+    if shop_ids:
+        candidates = candidates.filter(id__in=list(shop_ids))
+    total_shops = candidates.count()
+    shops = list(get_stale_shops(min_age=min_age, shop_ids=shop_ids))
+
+    refreshed: List[ShopConfiguration] = []
+    failed: List[Dict[str, Any]] = []
+
+    if shops:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(fetch_license_expiry_date, shop): shop for shop in shops
+            }
+            for future in as_completed(futures):
+                shop = futures[future]
+                try:
+                    expiry_date = future.result()
+                except Exception as e:
+                    logger.warning(
+                        f"店铺 {shop.shop_name} 刷新API到期日期失败: {str(e)}"
+                    )
+                    failed.append(
+                        {
+                            "shop_id": str(shop.id),
+                            "shop_name": shop.shop_name,
+                            "error": str(e),
+                        }
+                    )
+                    continue
+
+                if expiry_date is None:
+                    failed.append(
+                        {
+                            "shop_id": str(shop.id),
+                            "shop_name": shop.shop_name,
+                            "error": "API返回的数据中未包含到期日期",
+                        }
+                    )
+                    continue
+
+                shop.api_license_expiry_date = expiry_date
+                refreshed.append(shop)
+
+    if refreshed:
+        checked_at = timezone.now()
+        for shop in refreshed:
+            shop.api_license_checked_at = checked_at
+        ShopConfiguration.objects.bulk_update(
+            refreshed, ["api_license_expiry_date", "api_license_checked_at"]
+        )
+
+    logger.info(
+        f"API到期日期批量刷新完成: 刷新 {len(refreshed)} 个, "
+        f"失败 {len(failed)} 个, 跳过 {total_shops - len(shops)} 个"
+    )
+
+    return {
+        "total": total_shops,
+        "refreshed": len(refreshed),
+        "skipped": total_shops - len(shops),
+        "failed": failed,
+        "expiring": get_expiring_shops(warn_days),
+    }
@@ -0,0 +1,93 @@
+"""
+批量刷新店铺API许可证到期日期的管理命令
+
+适合由 cron / systemd timer 定时执行，不占用任何API请求线程：
+    python manage.py refresh_license_expiry --workers 4 --warn-days 30
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from configurations.license_refresh import (
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_WARN_DAYS,
+    refresh_license_expiry_dates,
+)
+
+
+class Command(BaseCommand):
+    help = "并发刷新所有店铺的API许可证到期日期，并报告即将到期的许可证"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_MAX_WORKERS,
+            help=f"并发线程数（默认 {DEFAULT_MAX_WORKERS}）",
+        )
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=12,
+            help="跳过最近N小时内已刷新过的店铺（默认 12）",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="忽略 --min-age-hours，刷新所有店铺",
+        )
+        parser.add_argument(
+            "--warn-days",
+            type=int,
+            default=DEFAULT_WARN_DAYS,
+            help=f"报告N天内到期的许可证（默认 {DEFAULT_WARN_DAYS}）",
+        )
+        parser.add_argument(
+            "--shop",
+            action="append",
+            dest="shop_ids",
+            help="仅刷新指定店铺ID（可重复指定）",
+        )
+
+    def handle(self, *args, **options):
+        min_age = (
+            None if options["force"] else timedelta(hours=options["min_age_hours"])
+        )
+
+        try:
+            summary = refresh_license_expiry_dates(
+                max_workers=options["workers"],
+                min_age=min_age,
+                shop_ids=options.get("shop_ids"),
+                warn_days=options["warn_days"],
+            )
+        except Exception as e:
+            raise CommandError(f"刷新API到期日期失败: {str(e)}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ 刷新完成: 共 {summary['total']} 个店铺, "
+                f"刷新 {summary['refreshed']} 个, 跳过 {summary['skipped']} 个"
+            )
+        )
+
+        for item in summary["failed"]:
+            self.stdout.write(
+                self.style.ERROR(f"❌ {item['shop_name']}: {item['error']}")
+            )
+
+        expiring = summary["expiring"]
+        if expiring:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"⚠️  {len(expiring)} 个许可证将在 {options['warn_days']} 天内到期:"
+                )
+            )
+            for item in expiring:
+                self.stdout.write(
+                    f"   - {item['shop_name']} ({item['target_area']}): "
+                    f"{item['expiry_date']} (剩余 {item['days_left']} 天)"
+                )
+        else:
+            self.stdout.write(f"{options['warn_days']} 天内没有即将到期的许可证")
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.11 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("configurations", "0004_alter_shopconfiguration_owner"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shopconfiguration",
+            name="api_license_checked_at",
+            field=models.DateTimeField(
+                blank=True, help_text="API许可证到期日期最后刷新时间", null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.11 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("configurations", "0005_shopconfiguration_api_license_checked_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SFTPManifestEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("path", models.CharField(help_text="远端文件路径", max_length=512)),
+                ("size", models.BigIntegerField(help_text="文件大小（字节）")),
+                (
+                    "mtime",
+                    models.BigIntegerField(
+                        blank=True, help_text="远端修改时间（Unix秒）", null=True
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="内容SHA-256；远端发现但未由本系统上传的文件为空",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "synced_at",
+                    models.DateTimeField(auto_now=True, help_text="最后同步时间"),
+                ),
+                (
+                    "shop",
+                    models.ForeignKey(
+                        help_text="所属店铺配置",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sftp_manifest_entries",
+                        to="configurations.shopconfiguration",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "SFTP文件清单",
+                "verbose_name_plural": "SFTP文件清单",
+                "db_table": "sftp_manifest_entries",
+                "ordering": ["shop", "path"],
+                "unique_together": {("shop", "path")},
+            },
+        ),
+    ]
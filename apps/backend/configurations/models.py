@@ -37,6 +37,9 @@ class ShopConfiguration(models.Model):
     api_license_expiry_date = models.DateTimeField(
         null=True, blank=True, help_text="API许可证密钥到期日期"
     )
+    api_license_checked_at = models.DateTimeField(
+        null=True, blank=True, help_text="API许可证到期日期最后刷新时间"
+    )
 
     # FTP配置 (MVP: 暂不加密)
     ftp_host = models.CharField(max_length=255, help_text="FTP服务器地址")
@@ -56,3 +59,39 @@ class ShopConfiguration(models.Model):
 
     def __str__(self):
         return f"{self.shop_name} ({self.target_area}) - {self.owner.username}"
+
+
+class SFTPManifestEntry(models.Model):
+    """
+    店铺FTP空间上已有文件的清单（路径 → 大小、修改时间、内容哈希）
+    用于发布时计算最小差异，只传输变化的文件
+    """
+
+    shop = models.ForeignKey(
+        ShopConfiguration,
+        on_delete=models.CASCADE,
+        related_name="sftp_manifest_entries",
+        help_text="所属店铺配置",
+    )
+    path = models.CharField(max_length=512, help_text="远端文件路径")
+    size = models.BigIntegerField(help_text="文件大小（字节）")
+    mtime = models.BigIntegerField(
+        null=True, blank=True, help_text="远端修改时间（Unix秒）"
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="内容SHA-256；远端发现但未由本系统上传的文件为空",
+    )
+    synced_at = models.DateTimeField(auto_now=True, help_text="最后同步时间")
+
+    class Meta:
+        db_table = "sftp_manifest_entries"
+        verbose_name = "SFTP文件清单"
+        verbose_name_plural = "SFTP文件清单"
+        unique_together = [("shop", "path")]
+        ordering = ["shop", "path"]
+
+    def __str__(self):
+        return f"{self.path} ({self.size} bytes)"
@@ -0,0 +1,208 @@
+"""
+店铺FTP空间差异同步
+
+以数据库中持久化的远端文件清单（SFTPManifestEntry）为基准，
+发布时只上传内容变化的文件、删除本地已移除的文件：
+
+1. 从数据库加载店铺清单，并用 listdir_attr 校正（可跳过）
+2. 按内容哈希计算最小差异
+3. 并发上传变化的文件，逐个删除多余的文件
+4. 把变化增量写回数据库
+"""
+
+import logging
+import time
+from typing import Any, Dict, Iterable
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SFTPManifestEntry, ShopConfiguration
+from pagemaker.integrations.constants import TEST_MODE
+from pagemaker.integrations.ftp_client import RakutenFTPClient
+from pagemaker.integrations.instrumentation import instrument_call
+from pagemaker.integrations.sftp_manifest import (
+    ManifestEntry,
+    RemoteManifest,
+    scan_remote,
+)
+from pagemaker.integrations.sftp_transfer import (
+    SFTPBulkUploader,
+    TransferItem,
+    build_directory_manifest,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def load_manifest(shop: ShopConfiguration) -> RemoteManifest:
+    """从数据库加载店铺的远端文件清单"""
+    rows = SFTPManifestEntry.objects.filter(shop=shop).values_list(
+        "path", "size", "mtime", "content_hash"
+    )
+    return RemoteManifest(ManifestEntry(*row) for row in rows)
+
+
+def save_manifest(shop: ShopConfiguration, manifest: RemoteManifest) -> None:
+    """把清单自加载以来的变化增量写回数据库"""
+    now = timezone.now()
+    with transaction.atomic():
+        if manifest.removed:
+            SFTPManifestEntry.objects.filter(
+                shop=shop, path__in=list(manifest.removed)
+            ).delete()
+
+        if manifest.changed:
+            existing = {
+                row.path: row
+                for row in SFTPManifestEntry.objects.filter(
+                    shop=shop, path__in=list(manifest.changed)
+                )
+            }
+            to_create = []
+            for path in manifest.changed:
+                entry = manifest.get(path)
+                row = existing.get(path)
+                if row is None:
+                    to_create.append(
+                        SFTPManifestEntry(
+                            shop=shop,
+                            path=path,
+                            size=entry.size,
+                            mtime=entry.mtime,
+                            content_hash=entry.content_hash,
+                            synced_at=now,
+                        )
+                    )
+                else:
+                    row.size = entry.size
+                    row.mtime = entry.mtime
+                    row.content_hash = entry.content_hash
+                    row.synced_at = now
+
+            SFTPManifestEntry.objects.bulk_create(to_create)
+            SFTPManifestEntry.objects.bulk_update(
+                list(existing.values()),
+                ["size", "mtime", "content_hash", "synced_at"],
+            )
+
+    manifest.changed.clear()
+    manifest.removed.clear()
+
+
+def sync_files(
+    shop: ShopConfiguration,
+    items: Iterable[TransferItem],
+    remote_dir: str,
+    client: RakutenFTPClient = None,
+    delete: bool = False,
+    verify: bool = True,
+    concurrency: int = None,
+) -> Dict[str, Any]:
+    """
+    把完整的文件清单差异同步到店铺FTP空间
+
+    Args:
+        shop: 店铺配置
+        items: 同步后远端目录应包含的全部文件
+        remote_dir: 远端同步根目录
+        client: RakutenFTPClient（默认按店铺配置创建）
+        delete: 是否删除远端目录中不在 items 里、由本系统上传过的文件
+        verify: 是否先用 listdir_attr 校正清单（发现带外修改）
+        concurrency: 并发上传通道数
+
+    Returns:
+        同步结果汇总
+    """
+    start = time.perf_counter()
+    client = client or RakutenFTPClient.from_shop_config(shop)
+    items = list(items)
+
+    # 内存数据没有修改时间时使用当前时间，上传后写入远端，便于下次校正比对
+    now = int(time.time())
+    for item in items:
+        if item.mtime is None:
+            item.mtime = now
+
+    manifest = load_manifest(shop)
+    is_mock = client.test_mode == TEST_MODE["MOCK"]
+    refreshed = None
+    if verify and not is_mock:
+        refreshed = manifest.refresh_from_remote(
+            scan_remote(client, remote_dir), remote_dir
+        )
+
+    to_upload, to_delete = manifest.diff(items, remote_dir)
+    if not delete:
+        to_delete = []
+
+    upload_result = None
+    failed = []
+    if to_upload:
+        uploader = SFTPBulkUploader(
+            client, concurrency=concurrency, skip_unchanged=False
+        )
+        upload_result = uploader.upload([item for item, _digest in to_upload])
+        failed_ids = {id(item) for item in uploader.failed_items}
+        failed = list(upload_result["errors"])
+        for item, digest in to_upload:
+            if id(item) not in failed_ids:
+                manifest.record_upload(item, digest)
+
+    deleted = []
+    if to_delete:
+        for path, error in _delete_remote(client, to_delete, is_mock):
+            if error is None:
+                manifest.record_delete(path)
+                deleted.append(path)
+            else:
+                failed.append({"remote_path": path, "error": str(error)})
+
+    save_manifest(shop, manifest)
+
+    result = {
+        "success": not failed,
+        "total": len(items),
+        "uploaded": len(to_upload) - (upload_result["failed"] if upload_result else 0),
+        "unchanged": len(items) - len(to_upload),
+        "deleted": len(deleted),
+        "failed": len(failed),
+        "bytes_uploaded": upload_result["bytes_uploaded"] if upload_result else 0,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        "verified": refreshed,
+        "errors": failed,
+    }
+    logger.info(
+        f"店铺 {shop.id} SFTP差异同步完成: 上传 {result['uploaded']}, "
+        f"未变化 {result['unchanged']}, 删除 {result['deleted']}, "
+        f"失败 {result['failed']}"
+    )
+    return result
+
+
+def sync_directory(
+    shop: ShopConfiguration, local_dir: str, remote_dir: str, **kwargs
+) -> Dict[str, Any]:
+    """把本地目录差异同步到店铺FTP空间，参数同 sync_files"""
+    return sync_files(
+        shop, build_directory_manifest(local_dir, remote_dir), remote_dir, **kwargs
+    )
+
+
+def _delete_remote(client: RakutenFTPClient, paths, is_mock: bool):
+    """逐个删除远端文件，返回 [(路径, 错误或None)]"""
+    if is_mock:
+        return [(path, None) for path in paths]
+
+    results = []
+    with client.borrow(reuse_current=False) as sftp:
+        for path in paths:
+            try:
+                with instrument_call("DELETE", client._endpoint, logger=logger):
+                    sftp.remove(path)
+                results.append((path, None))
+            except FileNotFoundError:
+                results.append((path, None))
+            except OSError as e:
+                results.append((path, e))
+    return results
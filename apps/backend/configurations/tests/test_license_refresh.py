@@ -0,0 +1,121 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from configurations.license_refresh import (
+    get_expiring_shops,
+    parse_expiry_date,
+    refresh_license_expiry_dates,
+)
+from configurations.models import ShopConfiguration
+from pagemaker.integrations.exceptions import RakutenAPIError
+
+User = get_user_model()
+
+
+def _fake_expiry(shop):
+    """按店铺返回不同的到期日期"""
+    if shop.target_area == "broken":
+        raise RakutenAPIError("LicenseManagementAPI error")
+    if shop.target_area == "soon":
+        return timezone.now() + timedelta(days=5)
+    return timezone.now() + timedelta(days=365)
+
+
+class LicenseRefreshTests(TestCase):
+    """API许可证到期日期批量刷新测试"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="owner", password="pass")
+        self.shops = {
+            area: ShopConfiguration.objects.create(
+                shop_name=f"店铺-{area}",
+                target_area=area,
+                owner=self.owner,
+                api_service_secret="secret",
+                api_license_key="license",
+                ftp_host="ftp.example.com",
+                ftp_user="user",
+                ftp_password="pass",
+            )
+            for area in ["normal", "soon", "broken"]
+        }
+
+    def test_parse_expiry_date_formats(self):
+        """测试两种到期日期格式的解析"""
+        self.assertEqual(parse_expiry_date("2025-12-31").year, 2025)
+        parsed = parse_expiry_date("2025-11-06T23:59:59Z")
+        self.assertIsNotNone(parsed.tzinfo)
+        self.assertEqual(parsed.hour, 23)
+
+    @patch(
+        "configurations.license_refresh.fetch_license_expiry_date",
+        side_effect=_fake_expiry,
+    )
+    def test_refresh_updates_and_reports(self, mock_fetch):
+        """测试并发刷新、失败记录和到期报告"""
+        summary = refresh_license_expiry_dates(max_workers=2, warn_days=30)
+
+        self.assertEqual(mock_fetch.call_count, 3)
+        self.assertEqual(summary["total"], 3)
+        self.assertEqual(summary["refreshed"], 2)
+        self.assertEqual(summary["skipped"], 0)
+        self.assertEqual(len(summary["failed"]), 1)
+        self.assertEqual(summary["failed"][0]["shop_name"], "店铺-broken")
+        self.assertEqual(
+            [item["target_area"] for item in summary["expiring"]], ["soon"]
+        )
+
+        normal = ShopConfiguration.objects.get(target_area="normal")
+        self.assertIsNotNone(normal.api_license_expiry_date)
+        self.assertIsNotNone(normal.api_license_checked_at)
+
+        broken = ShopConfiguration.objects.get(target_area="broken")
+        self.assertIsNone(broken.api_license_checked_at)
+
+    @patch(
+        "configurations.license_refresh.fetch_license_expiry_date",
+        side_effect=_fake_expiry,
+    )
+    def test_refresh_skips_recently_checked(self, mock_fetch):
+        """测试跳过最近刷新过的店铺"""
+        ShopConfiguration.objects.filter(target_area="normal").update(
+            api_license_checked_at=timezone.now() - timedelta(hours=1)
+        )
+
+        summary = refresh_license_expiry_dates(min_age=timedelta(hours=12))
+        self.assertEqual(summary["skipped"], 1)
+        self.assertEqual(mock_fetch.call_count, 2)
+
+        mock_fetch.reset_mock()
+        summary = refresh_license_expiry_dates(min_age=None)
+        self.assertEqual(summary["skipped"], 0)
+        self.assertEqual(mock_fetch.call_count, 3)
+
+    def test_get_expiring_shops_includes_expired(self):
+        """测试已过期的许可证也会被报告"""
+        ShopConfiguration.objects.filter(target_area="normal").update(
+            api_license_expiry_date=timezone.now() - timedelta(days=1)
+        )
+        expiring = get_expiring_shops(days=7)
+        self.assertEqual(len(expiring), 1)
+        self.assertLess(expiring[0]["days_left"], 0)
+
+    @patch(
+        "configurations.license_refresh.fetch_license_expiry_date",
+        side_effect=_fake_expiry,
+    )
+    def test_management_command(self, mock_fetch):
+        """测试管理命令输出"""
+        out = StringIO()
+        call_command("refresh_license_expiry", "--force", stdout=out)
+        output = out.getvalue()
+
+        self.assertIn("刷新 2 个", output)
+        self.assertIn("店铺-broken", output)
+        self.assertIn("店铺-soon", output)
@@ -0,0 +1,143 @@
+"""
+店铺FTP空间差异同步测试（使用本地paramiko SFTP服务器）
+"""
+
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from configurations.models import SFTPManifestEntry, ShopConfiguration
+from configurations.sftp_sync import load_manifest, sync_directory, sync_files
+from pagemaker.integrations.ftp_client import RakutenFTPClient
+from pagemaker.integrations.sftp_pool import close_all_pools
+from pagemaker.integrations.sftp_transfer import TransferItem
+from pagemaker.integrations.tests.sftp_server import LocalSFTPServer
+
+User = get_user_model()
+
+
+class SFTPSyncTests(TestCase):
+    """差异同步测试"""
+
+    def setUp(self):
+        self.addCleanup(close_all_pools)
+        owner = User.objects.create_user(username="owner", password="pass")
+        self.shop = ShopConfiguration.objects.create(
+            shop_name="店铺",
+            target_area="sync",
+            owner=owner,
+            api_service_secret="secret",
+            api_license_key="license",
+            ftp_host="127.0.0.1",
+            ftp_user="shop",
+            ftp_password="secret",
+        )
+        self.local_dir = tempfile.TemporaryDirectory()
+        self.remote_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.local_dir.cleanup)
+        self.addCleanup(self.remote_dir.cleanup)
+
+        os.makedirs(os.path.join(self.local_dir.name, "images"))
+        for i in range(10):
+            sub = "images" if i % 2 else ""
+            self._write(os.path.join(sub, f"page{i}.html"), os.urandom(2000 + i))
+
+    def _write(self, relative, data):
+        with open(os.path.join(self.local_dir.name, relative), "wb") as f:
+            f.write(data)
+
+    def _remote(self, *parts):
+        return os.path.join(self.remote_dir.name, *parts)
+
+    def _client(self, server):
+        return RakutenFTPClient(
+            host="127.0.0.1",
+            port=server.port,
+            username="shop",
+            password="secret",
+            test_mode="real",
+        )
+
+    def test_republish_sends_only_changed_file(self):
+        """测试修改一个文件后只上传该文件，删除的文件同步删除"""
+        with LocalSFTPServer(self.remote_dir.name) as server:
+            client = self._client(server)
+            first = sync_directory(
+                self.shop, self.local_dir.name, "/html", client=client
+            )
+            self.assertEqual((first["uploaded"], first["deleted"]), (10, 0))
+            self.assertEqual(
+                SFTPManifestEntry.objects.filter(shop=self.shop).count(), 10
+            )
+
+            self._write("page0.html", b"<html>changed</html>")
+            os.remove(os.path.join(self.local_dir.name, "images", "page1.html"))
+            second = sync_directory(
+                self.shop, self.local_dir.name, "/html", client=client, delete=True
+            )
+
+        self.assertTrue(second["success"])
+        self.assertEqual(
+            (second["uploaded"], second["unchanged"], second["deleted"]), (1, 8, 1)
+        )
+        self.assertFalse(os.path.exists(self._remote("html", "images", "page1.html")))
+        with open(self._remote("html", "page0.html"), "rb") as f:
+            self.assertEqual(f.read(), b"<html>changed</html>")
+        self.assertNotIn("/html/images/page1.html", load_manifest(self.shop))
+
+    def test_same_content_regenerated_is_not_resent(self):
+        """测试重新生成但内容相同的页面不会重复上传"""
+        with LocalSFTPServer(self.remote_dir.name) as server:
+            client = self._client(server)
+            items = [TransferItem("/html/index.html", data=b"<html>index</html>")]
+            first = sync_files(self.shop, items, "/html", client=client)
+            self.assertEqual(first["uploaded"], 1)
+
+            regenerated = [TransferItem("/html/index.html", data=b"<html>index</html>")]
+            result = sync_files(self.shop, regenerated, "/html", client=client)
+
+        self.assertEqual((result["uploaded"], result["unchanged"]), (0, 1))
+
+    def test_verify_detects_out_of_band_changes(self):
+        """测试校正清单时发现远端被直接修改或删除的文件"""
+        with LocalSFTPServer(self.remote_dir.name) as server:
+            client = self._client(server)
+            sync_directory(self.shop, self.local_dir.name, "/html", client=client)
+
+            with open(self._remote("html", "page2.html"), "wb") as f:
+                f.write(b"edited on server")
+            os.remove(self._remote("html", "page4.html"))
+            with open(self._remote("html", "stray.html"), "wb") as f:
+                f.write(b"stray")
+
+            result = sync_directory(
+                self.shop, self.local_dir.name, "/html", client=client, delete=True
+            )
+
+        self.assertEqual(result["verified"], {"added": 1, "modified": 1, "missing": 1})
+        self.assertEqual((result["uploaded"], result["deleted"]), (2, 0))
+        self.assertTrue(os.path.exists(self._remote("html", "stray.html")))
+        with open(self._remote("html", "page2.html"), "rb") as f:
+            with open(os.path.join(self.local_dir.name, "page2.html"), "rb") as src:
+                self.assertEqual(f.read(), src.read())
+
+    def test_remote_only_file_is_never_deleted(self):
+        """测试只存在于远端、非本系统上传的文件不会被同步删除"""
+        os.makedirs(self._remote("html"))
+        with open(self._remote("html", "shop_banner.jpg"), "wb") as f:
+            f.write(b"uploaded by shop")
+
+        with LocalSFTPServer(self.remote_dir.name) as server:
+            client = self._client(server)
+            items = [TransferItem("/html/index.html", data=b"<html>index</html>")]
+            first = sync_files(self.shop, items, "/html", client=client, delete=True)
+            second = sync_files(self.shop, [], "/html", client=client, delete=True)
+
+        self.assertEqual((first["uploaded"], first["deleted"]), (1, 0))
+        self.assertEqual(second["deleted"], 1)
+        self.assertFalse(os.path.exists(self._remote("html", "index.html")))
+        with open(self._remote("html", "shop_banner.jpg"), "rb") as f:
+            self.assertEqual(f.read(), b"uploaded by shop")
+        self.assertIn("/html/shop_banner.jpg", load_manifest(self.shop))
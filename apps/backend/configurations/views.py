@@ -4,9 +4,11 @@ from rest_framework.permissions import IsAuthenticated, BasePermission
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
+from django.utils import timezone
 from django.utils.dateparse import parse_date
 from datetime import datetime
 from .models import ShopConfiguration
+from .license_refresh import parse_expiry_date
 from .serializers import ShopConfigurationSerializer
 from users.models import check_user_role
 from pagemaker.integrations.cabinet_client import RCabinetClient
@@ -100,14 +102,9 @@ class ShopConfigurationListCreateView(generics.ListCreateAPIView):
                 
                 if expiry_date_str:
                     # 解析日期字符串并保存到数据库
-                    if "T" in expiry_date_str:
-                        expiry_date = datetime.fromisoformat(
-                            expiry_date_str.replace("Z", "+00:00")
-                        )
-                    else:
-                        expiry_date = datetime.strptime(expiry_date_str, "%Y-%m-%d")
-                    
+                    expiry_date = parse_expiry_date(expiry_date_str)
                     instance.api_license_expiry_date = expiry_date
+                    instance.api_license_checked_at = timezone.now()
                     instance.save()
                     
                     logger.info(
@@ -201,14 +198,9 @@ class ShopConfigurationDetailView(generics.RetrieveUpdateDestroyAPIView):
                     
                     if expiry_date_str:
                         # 解析日期字符串并保存到数据库
-                        if "T" in expiry_date_str:
-                            expiry_date = datetime.fromisoformat(
-                                expiry_date_str.replace("Z", "+00:00")
-                            )
-                        else:
-                            expiry_date = datetime.strptime(expiry_date_str, "%Y-%m-%d")
-                        
+                        expiry_date = parse_expiry_date(expiry_date_str)
                         instance.api_license_expiry_date = expiry_date
+                        instance.api_license_checked_at = timezone.now()
                         instance.save()
                         
                         logger.info(
@@ -298,15 +290,9 @@ def refresh_api_expiry(request, id):
                 
                 if expiry_date_str:
                     # 解析日期字符串并保存到数据库
-                    # 格式可能是 "2025-12-31" 或 "2025-12-31T00:00:00Z"
-                    if "T" in expiry_date_str:
-                        expiry_date = datetime.fromisoformat(
-                            expiry_date_str.replace("Z", "+00:00")
-                        )
-                    else:
-                        expiry_date = datetime.strptime(expiry_date_str, "%Y-%m-%d")
-                    
+                    expiry_date = parse_expiry_date(expiry_date_str)
                     config.api_license_expiry_date = expiry_date
+                    config.api_license_checked_at = timezone.now()
                     config.save()
                     
                     logger.info(
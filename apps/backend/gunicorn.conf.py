@@ -0,0 +1,53 @@
+"""
+Gunicorn 配置
+
+gunicorn 启动时自动加载工作目录下的本文件；命令行参数（见
+scripts/pagemaker-gunicorn.service）优先于这里的设置，本文件只放服务器钩子。
+"""
+
+import os
+import subprocess
+import sys
+
+
+def when_ready(server):
+    """主进程就绪后在独立进程中预热R-Cabinet图片选择器缓存，不阻塞启动"""
+    from pagemaker.config import config
+
+    if server.cfg.workers > 1 and config.FALLBACK_CACHE_BACKEND.endswith(
+        "FileBasedCache"
+    ):
+        server.log.warning(
+            "PAGEMAKER_FALLBACK_CACHE_BACKEND is file-based with multiple workers; "
+            "cross-worker locks and counters are not atomic, use RedisCache"
+        )
+    if not config.CABINET_PREWARM_ON_STARTUP:
+        return
+    try:
+        subprocess.Popen(
+            [sys.executable, "manage.py", "prewarm_cabinet_cache"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdin=subprocess.DEVNULL,
+        )
+        server.log.info("Started R-Cabinet cache prewarm")
+    except Exception as e:
+        server.log.warning(f"Failed to start R-Cabinet cache prewarm: {e}")
+
+
+def worker_exit(server, worker):
+    """worker退出（max-requests回收、重载、停止）时关闭后台刷新调度器，写入最终指标快照"""
+    from pagemaker.integrations.monitoring import shutdown_global_metrics
+    from pagemaker.integrations.refresh_scheduler import shutdown_refresh_scheduler
+
+    shutdown_refresh_scheduler()
+    shutdown_global_metrics()
+
+
+def child_exit(server, worker):
+    """主进程回收worker后把它的指标快照并入聚合文件"""
+    from pagemaker.integrations.metrics_export import mark_process_dead
+
+    try:
+        mark_process_dead(worker.pid)
+    except Exception as e:
+        server.log.warning(f"Failed to fold metrics of worker {worker.pid}: {e}")
@@ -0,0 +1,414 @@
+"""
+R-Cabinet 图片选择器列表的获取与缓存
+
+选择器视图、后台刷新和缓存预热命令共用：
+
+- 缓存键：文件夹树按店铺，图片列表按店铺 + 文件夹 + 排序模式
+- 全量分页拉取（限速）并写入两级列表缓存，降级的过期数据不写入
+- 缓存未命中时通过单飞锁合并并发拉取；超过 REVALIDATE_AFTER 的缓存交给刷新调度器
+- 列表响应的 ETag 由缓存头条目的版本号生成，每次写入缓存都会变化
+"""
+
+import hashlib
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+
+from pagemaker.integrations.exceptions import RakutenAPIError
+from pagemaker.integrations.listing_cache import get_listing_cache
+from pagemaker.integrations.refresh_scheduler import (
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    get_refresh_scheduler,
+)
+from pagemaker.integrations.single_flight import get_single_flight
+
+logger = logging.getLogger(__name__)
+
+# 列表缓存有效期（秒）
+LISTING_TIMEOUT = 1800
+
+# 缓存写入超过该时间（秒）后在后台刷新
+REVALIDATE_AFTER = 300
+
+# 全量拉取时每页条数
+FETCH_PAGE_LIMIT = 100
+
+SUPPORTED_IMAGE_EXTENSIONS = (
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".webp",
+    ".tiff",
+    ".tif",
+    ".bmp",
+)
+
+
+def folders_cache_key(shop_id) -> str:
+    """文件夹树缓存键（包含店铺ID，确保不同店铺的数据隔离）"""
+    return f"cabinet_folders_all_{shop_id}"
+
+
+def images_cache_key(shop_id, folder_id, sort_mode: str) -> str:
+    """图片列表缓存键（基于店铺、文件夹、排序模式）"""
+    return f"cabinet_images_{shop_id}_{folder_id or '0'}_{sort_mode}"
+
+
+def rate_limit_sleep():
+    """相邻两次R-Cabinet调用至少间隔1秒"""
+    last_ts = cache.get("rakuten_last_call_ts")
+    now = time.monotonic()
+    if last_ts is not None:
+        delta = now - last_ts
+        if delta < 1.0:
+            time.sleep(1.0 - delta)
+    cache.set("rakuten_last_call_ts", time.monotonic(), timeout=60)
+
+
+def normalize_folders(raw_list, with_has_children_from=None) -> List[Dict[str, Any]]:
+    """把R-Cabinet文件夹列表转换为选择器使用的格式"""
+    folders = []
+    for folder_info in raw_list:
+        folder_path = folder_info.get("folder_path", "")
+        parent_path = None
+        if "/" in folder_path:
+            parent_path = "/".join(folder_path.split("/")[:-1])
+        folders.append(
+            {
+                "id": str(folder_info.get("folder_id", "")),
+                "name": folder_info.get("folder_name", ""),
+                "path": folder_path,
+                "fileCount": folder_info.get("file_count", 0),
+                "fileSize": folder_info.get("file_size", 0),
+                "updatedAt": folder_info.get("timestamp", ""),
+                "node": folder_info.get("folder_node", 1),
+                "parentPath": parent_path,
+            }
+        )
+    if with_has_children_from is not None:
+        parent_set = set()
+        for f in with_has_children_from:
+            pp = f.get("parentPath")
+            if pp:
+                parent_set.add(pp)
+        for f in folders:
+            f["hasChildren"] = f.get("path") in parent_set
+    return folders
+
+
+def guess_mime_type_from_filename(filename: str) -> str:
+    """
+    根据文件名推断MIME类型
+
+    Args:
+        filename: 文件名
+
+    Returns:
+        MIME类型字符串
+    """
+    if not filename:
+        return "image/jpeg"
+
+    filename_lower = filename.lower()
+
+    if filename_lower.endswith(".jpg") or filename_lower.endswith(".jpeg"):
+        return "image/jpeg"
+    elif filename_lower.endswith(".png"):
+        return "image/png"
+    elif filename_lower.endswith(".gif"):
+        return "image/gif"
+    elif filename_lower.endswith(".webp"):
+        return "image/webp"
+    else:
+        return "image/jpeg"  # 默认值
+
+
+def files_to_images(files_data) -> List[Dict[str, Any]]:
+    """把R-Cabinet文件列表转换为图片选择器使用的格式（过滤非图片文件）"""
+    images = []
+    for file_info in files_data:
+        # 使用正确的字段名（API实际返回的是小写字段名）
+        file_name = file_info.get("file_name", "")  # 用户友好的图片名
+        file_path = file_info.get("file_path", "")  # 系统文件名（包含扩展名）
+        file_url = file_info.get("file_url", "")
+        file_id = file_info.get("file_id", "")
+        file_size = file_info.get("file_size", 0)
+        file_width = file_info.get("file_width", 0)
+        file_height = file_info.get("file_height", 0)
+        timestamp = file_info.get("timestamp", "")
+
+        # 使用file_path来判断文件类型，因为它总是包含正确的扩展名
+        is_image = file_path.lower().endswith(SUPPORTED_IMAGE_EXTENSIONS)
+
+        if is_image and file_url:  # 确保有URL才添加
+            # 显示名称优先使用file_name，如果为空则使用file_path
+            display_name = file_name if file_name.strip() else file_path
+
+            images.append(
+                {
+                    "id": str(file_id),
+                    "url": file_url,
+                    "filename": display_name,  # 使用友好的显示名称
+                    "size": float(file_size) if file_size else 0,
+                    "width": int(file_width) if file_width else 0,
+                    "height": int(file_height) if file_height else 0,
+                    "mimeType": guess_mime_type_from_filename(file_path),
+                    "uploadedAt": timestamp,
+                }
+            )
+
+    return images
+
+
+def sort_images(images_list, sort_mode):
+    """根据排序模式对图片进行排序"""
+    if sort_mode == "name-asc":
+        return sorted(images_list, key=lambda x: x["filename"].lower())
+    elif sort_mode == "name-desc":
+        return sorted(images_list, key=lambda x: x["filename"].lower(), reverse=True)
+    elif sort_mode == "date-desc":  # 最新的在前
+        return sorted(images_list, key=lambda x: x["uploadedAt"] or "", reverse=True)
+    elif sort_mode == "date-asc":  # 最旧的在前
+        return sorted(images_list, key=lambda x: x["uploadedAt"] or "")
+    elif sort_mode == "size-desc":  # 文件大小从大到小
+        return sorted(images_list, key=lambda x: x["size"], reverse=True)
+    elif sort_mode == "size-asc":  # 文件大小从小到大
+        return sorted(images_list, key=lambda x: x["size"])
+    else:
+        return images_list  # 默认不排序
+
+
+def fetch_all_folders(
+    cabinet_client, shop_id
+) -> Tuple[Optional[List], Optional[Dict], Optional[str]]:
+    """
+    全量拉取文件夹树（循环分页 + 限速）并缓存
+
+    Returns:
+        (文件夹列表, 降级结果, 错误信息)
+    """
+    all_raw = []
+    stale = None
+    current_page = 1
+    while True:
+        rate_limit_sleep()
+        result = cabinet_client.get_folders(offset=current_page, limit=FETCH_PAGE_LIMIT)
+        if result.get("stale") is True:
+            stale = result
+        if not result.get("success", True):
+            return None, stale, result.get("message", "获取文件夹列表失败")
+        page_folders = result.get("data", {}).get("folders", [])
+        all_raw.extend(page_folders)
+        folder_all_count = result.get("data", {}).get("folder_all_count")
+        if not page_folders or (
+            folder_all_count and len(all_raw) >= int(folder_all_count)
+        ):
+            break
+        current_page += 1
+
+    normalized = normalize_folders(all_raw)
+    # 基于全量补充 hasChildren
+    normalized = normalize_folders(all_raw, with_has_children_from=normalized)
+    # 过期的降级数据不写入，服务恢复后立即获取最新数据
+    if stale is None:
+        get_listing_cache().set(
+            folders_cache_key(shop_id), normalized, timeout=LISTING_TIMEOUT
+        )
+    return normalized, stale, None
+
+
+def fetch_all_images(
+    cabinet_client, shop_id, folder_id, sort_mode: str
+) -> Tuple[List, Optional[Dict]]:
+    """
+    获取指定文件夹的所有图片并缓存
+
+    Returns:
+        (图片列表, 降级结果)；中途某一页失败时降级结果为
+        ``stale_reason="incomplete"`` 的标记
+
+    Raises:
+        RakutenAPIError: 第一页就获取失败、没有任何数据时
+    """
+    target_folder_id = int(folder_id) if folder_id else 0
+    all_files_data = []
+    stale = None
+    current_page = 1
+
+    while True:
+        rate_limit_sleep()
+        result = cabinet_client.get_folder_files(
+            folder_id=target_folder_id, offset=current_page, limit=FETCH_PAGE_LIMIT
+        )
+        if result.get("stale") is True:
+            stale = result
+
+        if not result.get("success", True):
+            message = result.get("message", "获取图片列表失败")
+            if not all_files_data:
+                raise RakutenAPIError(message)
+            # 中途某一页失败时列表不完整：不写入缓存，标记为不完整的降级结果返回
+            stale = {
+                "success": False,
+                "stale": True,
+                "stale_reason": "incomplete",
+                "cached_at": None,
+                "message": message,
+            }
+            break
+
+        page_files = result.get("data", {}).get("files", [])
+        if not page_files:
+            break
+
+        all_files_data.extend(page_files)
+
+        # 如果返回的数量少于页面大小，说明已经是最后一页
+        if len(page_files) < FETCH_PAGE_LIMIT:
+            break
+
+        current_page += 1
+
+    images = sort_images(files_to_images(all_files_data), sort_mode)
+    if stale is None:
+        get_listing_cache().set(
+            images_cache_key(shop_id, folder_id, sort_mode),
+            images,
+            timeout=LISTING_TIMEOUT,
+        )
+    return images, stale
+
+
+def schedule_refresh(cache_key: str, fetch, priority: int) -> bool:
+    """
+    把选择器缓存的后台刷新交给刷新调度器
+
+    同一个键已在排队或刷新中（本进程），或其他worker正在获取时跳过。
+    """
+    try:
+        return get_refresh_scheduler().submit(
+            cache_key,
+            lambda: get_single_flight().run_if_idle(cache_key, fetch),
+            priority=priority,
+        )
+    except Exception as e:
+        logger.warning(f"提交缓存刷新失败 {cache_key}: {e}")
+        return False
+
+
+def _needs_revalidate(meta: Dict[str, Any]) -> bool:
+    return time.time() - meta["stored_at"] > REVALIDATE_AFTER
+
+
+def load_folders(
+    cabinet_client, shop_id, force_refresh: bool = False
+) -> Tuple[Optional[List], Optional[Dict], Optional[str]]:
+    """
+    读取文件夹树：缓存优先，未命中时合并并发拉取
+
+    Returns:
+        (文件夹列表, 降级结果, 错误信息)
+    """
+    cache_key = folders_cache_key(shop_id)
+    listing = get_listing_cache()
+
+    def fetch():
+        return fetch_all_folders(cabinet_client, shop_id)
+
+    if not force_refresh:
+        entry = listing.get_all(cache_key)
+        if entry is not None:
+            folders, meta = entry
+            if _needs_revalidate(meta):
+                # stale-while-revalidate: 后台刷新，不阻塞
+                schedule_refresh(cache_key, fetch, PRIORITY_HIGH)
+            return folders, None, None
+
+    def load_cached():
+        value = listing.get_all(cache_key)
+        return None if value is None else (value[0], None, None)
+
+    # 同一店铺同时只进行一次全量拉取，其他请求等待结果
+    return get_single_flight().do(
+        cache_key, fetch, load=None if force_refresh else load_cached
+    )
+
+
+def load_images_page(
+    cabinet_client, shop_id, folder_id, sort_mode: str, offset: int, limit: int
+) -> Optional[Tuple[List, int]]:
+    """
+    从缓存读取一页图片（只解码该页所在的分块）
+
+    Returns:
+        (当前页图片, 总数)；未缓存时为None
+    """
+    cache_key = images_cache_key(shop_id, folder_id, sort_mode)
+    cached = get_listing_cache().get_page(cache_key, offset, limit)
+    if cached is None:
+        return None
+
+    page_images, meta = cached
+    if _needs_revalidate(meta):
+        # stale-while-revalidate: 后台刷新，不阻塞
+        schedule_refresh(
+            cache_key,
+            lambda: fetch_all_images(cabinet_client, shop_id, folder_id, sort_mode),
+            PRIORITY_NORMAL,
+        )
+    return page_images, meta["total"]
+
+
+def load_images(
+    cabinet_client, shop_id, folder_id, sort_mode: str, force_refresh: bool = False
+) -> Tuple[List, Optional[Dict]]:
+    """
+    读取文件夹的全部图片，未命中时合并并发拉取
+
+    Returns:
+        (图片列表, 降级结果)
+    """
+    cache_key = images_cache_key(shop_id, folder_id, sort_mode)
+    listing = get_listing_cache()
+
+    def load_cached():
+        value = listing.get_all(cache_key)
+        return None if value is None else (value[0], None)
+
+    # 同一文件夹同时只进行一次全量拉取，其他请求等待结果
+    return get_single_flight().do(
+        cache_key,
+        lambda: fetch_all_images(cabinet_client, shop_id, folder_id, sort_mode),
+        load=None if force_refresh else load_cached,
+    )
+
+
+def is_fresh(cache_key: str) -> bool:
+    """缓存存在且未到后台刷新时间"""
+    meta = get_listing_cache().get_meta(cache_key)
+    return meta is not None and not _needs_revalidate(meta)
+
+
+def listing_etag(cache_key: str, *variant) -> Optional[str]:
+    """
+    列表缓存当前版本对应的弱ETag（未缓存时为None）
+
+    必须在读取列表之前获取：读取期间缓存被刷新时，ETag 只会比响应内容旧
+    （客户端下次请求得到完整响应），而不会让旧内容带上新版本的ETag。
+
+    Args:
+        cache_key: 列表缓存键
+        *variant: 影响响应内容的其他参数（过滤条件、分页等）
+    """
+    meta = get_listing_cache().get_meta(cache_key)
+    if meta is None:
+        return None
+    digest = hashlib.md5(
+        "|".join([cache_key, *map(str, variant)]).encode("utf-8"),
+        usedforsecurity=False,
+    ).hexdigest()[:12]
+    return f'W/"{meta["version"]}-{digest}"'
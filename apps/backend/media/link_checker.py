@@ -0,0 +1,361 @@
+"""
+页面图片失效链接检查
+
+Cabinet 中的文件被删除或改名后，引用它的页面会静默地显示破图。这里按店铺批量检查：
+
+- 引用的图片URL从页面图片引用索引（PageImageReference）一次读出，不加载页面内容
+- Cabinet URL 按文件夹分组，每个文件夹只解析一次：
+  选择器列表缓存中已有该文件夹的图片时直接使用（不调用API）；
+  否则比较 "全量列出文件夹"（每100个文件一次调用）和 "按文件名逐个搜索" 的调用次数，
+  选择较少的一种。全量列出的结果写入选择器缓存，与图片选择器共用
+- 只根据完整、最新的数据判定文件不存在：缓存的列表可能缺少最近上传的文件，
+  其中没有的文件名再逐个搜索确认；列出失败、条数少于文件夹的文件数或返回降级数据时，
+  该文件夹的结果为 unknown
+- 所有 R-Cabinet 调用都经过选择器的限速（相邻调用至少间隔1秒）
+
+数万条引用通常只需要几百次API调用，而不是每条引用一次。
+"""
+
+import logging
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.utils import timezone
+
+from .cabinet_cache import (
+    images_cache_key,
+    load_folders,
+    load_images,
+    rate_limit_sleep,
+)
+from configurations.models import ShopConfiguration
+from pagemaker.config import config
+from pagemaker.integrations.cabinet_client import RCabinetClient
+from pagemaker.integrations.listing_cache import get_listing_cache
+
+logger = logging.getLogger(__name__)
+
+# 选择器列表缓存的排序模式（任意一种已缓存即可用于检查）
+CACHED_SORT_MODES = (
+    "name-asc",
+    "name-desc",
+    "date-desc",
+    "date-asc",
+    "size-desc",
+    "size-asc",
+)
+
+# 全量列出文件夹时使用的排序模式（与选择器默认排序一致，结果可被选择器复用）
+LIST_SORT_MODE = "name-asc"
+
+# 每次列出文件夹返回的文件数
+LIST_PAGE_SIZE = 100
+
+# 数据库游标每批读取的引用数
+ITERATOR_CHUNK_SIZE = 2000
+
+_CABINET_URL_RE = re.compile(
+    r"^https?://image\.rakuten\.co\.jp/([^/?#]+)/cabinet/([^?#]+)(?:[?#].*)?$",
+    re.I,
+)
+
+
+def parse_cabinet_url(url: str) -> Optional[Tuple[str, str, str]]:
+    """
+    解析Cabinet图片URL
+
+    Returns:
+        (店铺URL代码, 文件夹路径, 文件名)；根目录的文件夹路径为空字符串，
+        不是Cabinet URL时为None
+    """
+    match = _CABINET_URL_RE.match((url or "").strip())
+    if not match:
+        return None
+    shop_code, path = match.groups()
+    folder_path, _, file_name = path.strip("/").rpartition("/")
+    if not file_name:
+        return None
+    return shop_code, folder_path, file_name
+
+
+def _file_key(url: str) -> Optional[Tuple[str, str]]:
+    """比较用的键（文件夹路径, 文件名），忽略协议、主机名大小写和查询参数"""
+    parsed = parse_cabinet_url(url)
+    return None if parsed is None else parsed[1:]
+
+
+def _cached_listing(shop_id, folder_id) -> Optional[List[Dict[str, Any]]]:
+    """选择器缓存中该文件夹的图片列表（任意排序模式）"""
+    listing = get_listing_cache()
+    for sort_mode in CACHED_SORT_MODES:
+        entry = listing.get_all(images_cache_key(shop_id, folder_id, sort_mode))
+        if entry is not None:
+            return entry[0]
+    return None
+
+
+def _search_existing(
+    client, folder: Optional[Dict[str, Any]], file_names: Set[str]
+) -> Tuple[Set[Tuple[str, str]], bool]:
+    """
+    按文件名逐个搜索（限定文件夹；folder 为None时不限定）
+
+    Returns:
+        (存在的文件键, 是否使用了降级数据)
+    """
+    existing = set()
+    stale = False
+    for file_name in sorted(file_names):
+        rate_limit_sleep()
+        folder_id = int(folder["id"]) if folder else None
+        result = client.search_files(file_path=file_name, folder_id=folder_id)
+        if not result.get("success", True):
+            raise RuntimeError(result.get("message", "搜索文件失败"))
+        stale = stale or result.get("stale") is True
+        for file_info in result.get("data", {}).get("files", []):
+            key = _file_key(file_info.get("file_url", ""))
+            if key is not None:
+                existing.add(key)
+    return existing, stale
+
+
+def _gather_references(shop) -> Tuple[Dict[str, List[Tuple[str, str, str]]], int]:
+    """
+    读取店铺页面引用的图片URL
+
+    Returns:
+        ({URL: [(页面ID, 页面名称, 模块ID)]}, 引用总数)
+    """
+    from pages.image_references import PageImageReference
+
+    by_url: Dict[str, List[Tuple[str, str, str]]] = defaultdict(list)
+    count = 0
+    rows = PageImageReference.objects.filter(page__shop=shop).values_list(
+        "url", "page_id", "page__name", "module_id"
+    )
+    for url, page_id, page_name, module_id in rows.iterator(
+        chunk_size=ITERATOR_CHUNK_SIZE
+    ):
+        by_url[url].append((str(page_id), page_name, module_id))
+        count += 1
+    return by_url, count
+
+
+def check_shop_images(
+    shop: ShopConfiguration, cabinet_client: RCabinetClient = None
+) -> Dict[str, Any]:
+    """
+    检查店铺页面引用的Cabinet图片是否存在
+
+    Args:
+        shop: 店铺配置
+        cabinet_client: R-Cabinet客户端（默认按店铺配置创建）
+
+    Returns:
+        店铺报告：
+        {"shop_id", "shop_name", "checked_at", "duration_ms", "references", "urls",
+         "cabinet_urls", "external_urls", "broken_count", "unknown_count",
+         "folders": {"cached", "listed", "searched"}, "searched_files", "stale",
+         "error", "broken": [{"url", "reason", "pages": [{"id", "name", "module_ids"}]}]}
+
+        reason: folder_missing（文件夹不存在）/ file_missing（文件不存在）/
+        unknown（该文件夹查询失败，无法判断）
+    """
+    start = time.perf_counter()
+    by_url, reference_count = _gather_references(shop)
+
+    # 按文件夹分组；引用最多的店铺URL代码视为本店铺，其他店铺的图片不检查
+    parsed = {url: parse_cabinet_url(url) for url in by_url}
+    codes = Counter(p[0] for p in parsed.values() if p is not None)
+    shop_code = codes.most_common(1)[0][0] if codes else None
+    folders_to_check: Dict[str, Dict[str, List[str]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    for url, p in parsed.items():
+        if p is not None and p[0] == shop_code:
+            folders_to_check[p[1]][p[2]].append(url)
+    cabinet_urls = sum(
+        len(urls) for files in folders_to_check.values() for urls in files.values()
+    )
+
+    report = {
+        "shop_id": str(shop.id),
+        "shop_name": shop.shop_name,
+        "checked_at": timezone.now().isoformat(),
+        "references": reference_count,
+        "urls": len(by_url),
+        "cabinet_urls": cabinet_urls,
+        "external_urls": len(by_url) - cabinet_urls,
+        "folders": {"cached": 0, "listed": 0, "searched": 0},
+        "searched_files": 0,
+        "stale": False,
+        "error": None,
+    }
+    broken: Dict[str, str] = {}
+
+    if folders_to_check:
+        client = cabinet_client or RCabinetClient.from_shop_config(shop)
+        folders, stale, error = load_folders(client, shop.id)
+        if folders is None:
+            report["error"] = error or "获取文件夹列表失败"
+            folders_to_check = {}
+        else:
+            report["stale"] = stale is not None
+        folders_stale = stale is not None
+        by_path = {f["path"].strip("/"): f for f in folders or []}
+
+        # 引用最多的文件夹先检查
+        for folder_path, files in sorted(
+            folders_to_check.items(), key=lambda item: -len(item[1])
+        ):
+            folder = by_path.get(folder_path)
+            if folder is None and folder_path:
+                # 降级的文件夹树可能缺少最近创建的文件夹
+                reason = "unknown" if folders_stale else "folder_missing"
+                for urls in files.values():
+                    broken.update((url, reason) for url in urls)
+                continue
+
+            try:
+                existing = _resolve_folder(
+                    client, shop, folder_path, folder, files, report
+                )
+            except Exception as e:
+                logger.warning(f"检查店铺 {shop.id} 文件夹 {folder_path} 失败: {e}")
+                for urls in files.values():
+                    broken.update((url, "unknown") for url in urls)
+                continue
+
+            for file_name, urls in files.items():
+                if (folder_path, file_name) not in existing:
+                    broken.update((url, "file_missing") for url in urls)
+
+    report["broken_count"] = sum(1 for r in broken.values() if r != "unknown")
+    report["unknown_count"] = len(broken) - report["broken_count"]
+    report["broken"] = [
+        {"url": url, "reason": reason, "pages": _page_entries(by_url[url])}
+        for url, reason in sorted(broken.items())
+    ]
+    report["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    logger.info(
+        f"店铺 {shop.id} 图片链接检查完成: {report['cabinet_urls']} 个Cabinet URL, "
+        f"失效 {report['broken_count']}, 无法判断 {report['unknown_count']}"
+    )
+    return report
+
+
+def _resolve_folder(
+    client,
+    shop,
+    folder_path: str,
+    folder: Optional[Dict[str, Any]],
+    files: Dict[str, List[str]],
+    report: Dict[str, Any],
+) -> Set[Tuple[str, str]]:
+    """
+    解析一个文件夹中存在的文件键（缓存 / 全量列出 / 逐个搜索 中调用最少的方式）
+
+    folder 为None表示文件夹树中没有的根目录，只能按文件名搜索。
+
+    Raises:
+        RuntimeError: 数据不完整或为降级数据，无法判断文件是否存在
+    """
+    images = _cached_listing(shop.id, folder["id"]) if folder else None
+    if images is not None:
+        report["folders"]["cached"] += 1
+    else:
+        file_count = (folder.get("fileCount") or 0) if folder else 0
+        list_calls = max(1, math.ceil(file_count / LIST_PAGE_SIZE))
+        if folder is None or len(files) < list_calls:
+            report["folders"]["searched"] += 1
+            return _search_confirmed(client, folder_path, folder, set(files), report)
+
+        # 跳过选择器缓存，保证是最新的完整列表
+        images, stale = load_images(
+            client, shop.id, folder["id"], LIST_SORT_MODE, force_refresh=True
+        )
+        report["folders"]["listed"] += 1
+        if stale is not None:
+            report["stale"] = True
+            raise RuntimeError("文件夹列表为降级数据或未完整获取")
+        if len(images) < file_count:
+            raise RuntimeError(f"文件夹列表不完整: {len(images)}/{file_count}")
+        return _image_keys(images)
+
+    # 缓存的列表可能缺少最近上传的文件：其中没有的文件名逐个搜索确认
+    existing = _image_keys(images)
+    missing = {name for name in files if (folder_path, name) not in existing}
+    if missing:
+        existing |= _search_confirmed(client, folder_path, folder, missing, report)
+    return existing
+
+
+def _image_keys(images: List[Dict[str, Any]]) -> Set[Tuple[str, str]]:
+    return {key for key in (_file_key(image.get("url", "")) for image in images) if key}
+
+
+def _search_confirmed(
+    client,
+    folder_path: str,
+    folder: Optional[Dict[str, Any]],
+    file_names: Set[str],
+    report: Dict[str, Any],
+) -> Set[Tuple[str, str]]:
+    """按文件名搜索；有文件未找到且搜索结果为降级数据时无法判断"""
+    existing, stale = _search_existing(client, folder, file_names)
+    report["searched_files"] += len(file_names)
+    if stale:
+        report["stale"] = True
+        if any((folder_path, name) not in existing for name in file_names):
+            raise RuntimeError("搜索结果为降级数据")
+    return existing
+
+
+def _page_entries(references: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+    """按页面合并引用"""
+    pages: Dict[str, Dict[str, Any]] = {}
+    for page_id, page_name, module_id in references:
+        entry = pages.setdefault(
+            page_id, {"id": page_id, "name": page_name, "module_ids": []}
+        )
+        entry["module_ids"].append(module_id)
+    return list(pages.values())
+
+
+def check_shops(shop_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    检查所有（或指定）店铺
+
+    店铺依次检查：R-Cabinet调用的限速在所有店铺之间共享，并发检查不会更快。
+
+    Returns:
+        {"total", "broken_count", "shops": [店铺报告], "duration_ms"}
+    """
+    start = time.perf_counter()
+    if not config.RCABINET_INTEGRATION_ENABLED:
+        logger.info("R-Cabinet集成已禁用，跳过图片链接检查")
+        return {"total": 0, "broken_count": 0, "shops": [], "duration_ms": 0}
+
+    shops = ShopConfiguration.objects.all()
+    if shop_ids:
+        shops = shops.filter(id__in=list(shop_ids))
+
+    reports = []
+    for shop in shops:
+        try:
+            reports.append(check_shop_images(shop))
+        except Exception as e:
+            logger.warning(f"检查店铺 {shop.shop_name} 的图片链接失败: {e}")
+            reports.append(
+                {"shop_id": str(shop.id), "shop_name": shop.shop_name, "error": str(e)}
+            )
+
+    return {
+        "total": len(reports),
+        "broken_count": sum(r.get("broken_count", 0) for r in reports),
+        "shops": reports,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
@@ -0,0 +1,64 @@
+"""
+检查页面引用的Cabinet图片是否失效的管理命令
+
+适合由 cron / systemd timer 定时执行：
+    python manage.py check_image_links
+    python manage.py check_image_links --shop <店铺ID> --output /tmp/broken-images.json
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from media.link_checker import check_shops
+
+
+class Command(BaseCommand):
+    help = "批量检查店铺页面引用的R-Cabinet图片，输出失效链接报告"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--shop",
+            action="append",
+            dest="shop_ids",
+            help="仅检查指定店铺ID（可重复指定）",
+        )
+        parser.add_argument(
+            "--output",
+            help="把完整报告（含失效URL和引用页面）写入JSON文件",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            summary = check_shops(shop_ids=options.get("shop_ids"))
+        except Exception as e:
+            raise CommandError(f"检查图片链接失败: {str(e)}")
+
+        for report in summary["shops"]:
+            if report.get("error"):
+                self.stdout.write(
+                    self.style.ERROR(f"❌ {report['shop_name']}: {report['error']}")
+                )
+                continue
+            style = self.style.WARNING if report["broken_count"] else self.style.SUCCESS
+            self.stdout.write(
+                style(
+                    f"{report['shop_name']}: {report['cabinet_urls']} 个Cabinet URL, "
+                    f"失效 {report['broken_count']}, 无法判断 {report['unknown_count']} "
+                    f"(缓存 {report['folders']['cached']} / 列出 "
+                    f"{report['folders']['listed']} / 搜索 "
+                    f"{report['folders']['searched']} 个文件夹, "
+                    f"{report['duration_ms']}ms)"
+                )
+            )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ 检查完成: {summary['total']} 个店铺, "
+                f"失效链接 {summary['broken_count']} 个, 耗时 {summary['duration_ms']}ms"
+            )
+        )
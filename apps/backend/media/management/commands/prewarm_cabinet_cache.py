@@ -0,0 +1,81 @@
+"""
+预热R-Cabinet图片选择器缓存的管理命令
+
+部署后由gunicorn启动钩子在后台执行，也适合由 cron / systemd timer 定时执行：
+    python manage.py prewarm_cabinet_cache --folders 5 --days 30
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from media.prewarm import (
+    DEFAULT_LOOKBACK_DAYS,
+    DEFAULT_MAX_FOLDERS,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_SORT_MODES,
+    prewarm_cabinet_caches,
+)
+
+
+class Command(BaseCommand):
+    help = "为每个店铺预热R-Cabinet文件夹树和最常用文件夹的图片列表"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--shop",
+            action="append",
+            dest="shop_ids",
+            help="仅预热指定店铺ID（可重复指定）",
+        )
+        parser.add_argument(
+            "--folders",
+            type=int,
+            default=DEFAULT_MAX_FOLDERS,
+            help=f"每个店铺预热的常用文件夹数，不含根目录（默认 {DEFAULT_MAX_FOLDERS}）",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=DEFAULT_LOOKBACK_DAYS,
+            help=f"按最近N天的使用情况选择常用文件夹（默认 {DEFAULT_LOOKBACK_DAYS}）",
+        )
+        parser.add_argument(
+            "--sort",
+            action="append",
+            dest="sort_modes",
+            help=f"预热的图片排序模式（可重复指定，默认 {', '.join(DEFAULT_SORT_MODES)}）",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_MAX_WORKERS,
+            help=f"并发预热的店铺数（默认 {DEFAULT_MAX_WORKERS}）",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="忽略缓存新鲜度，重新拉取所有列表",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            summary = prewarm_cabinet_caches(
+                shop_ids=options.get("shop_ids"),
+                max_workers=options["workers"],
+                max_folders=options["folders"],
+                lookback_days=options["days"],
+                sort_modes=options.get("sort_modes") or DEFAULT_SORT_MODES,
+                force=options["force"],
+            )
+        except Exception as e:
+            raise CommandError(f"预热Cabinet缓存失败: {str(e)}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ 预热完成: 共 {summary['total']} 个店铺, "
+                f"拉取 {summary['fetched']} 个列表, 耗时 {summary['duration_ms']}ms"
+            )
+        )
+        for item in summary["failed"]:
+            self.stdout.write(
+                self.style.ERROR(f"❌ {item['shop_name']}: {item['error']}")
+            )
@@ -0,0 +1,254 @@
+"""
+R-Cabinet 图片选择器缓存预热
+
+部署后（gunicorn 启动钩子）或定时任务执行：为每个店铺填充文件夹树，以及根目录和
+最常用文件夹的图片列表，重启后第一个打开图片选择器的用户直接命中缓存。
+
+常用文件夹按近期使用情况排序：
+
+- 最近有活动（PageActivity）的页面引用的Cabinet图片（页面图片引用索引），按活动次数加权
+- 店铺所有者最近上传完成的 MediaFile
+
+拉取复用选择器的限速全量拉取和单飞锁：其他进程正在拉取同一个键时直接跳过。
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from django.db.models import Count
+from django.utils import timezone
+
+from .cabinet_cache import (
+    fetch_all_folders,
+    fetch_all_images,
+    folders_cache_key,
+    images_cache_key,
+    is_fresh,
+    load_folders,
+)
+from .models import MediaFile
+from configurations.models import ShopConfiguration
+from pagemaker.config import config
+from pagemaker.integrations.cabinet_client import RCabinetClient
+from pagemaker.integrations.single_flight import get_single_flight
+
+logger = logging.getLogger(__name__)
+
+# 每个店铺预热图片列表的常用文件夹数（不含根目录）
+DEFAULT_MAX_FOLDERS = 5
+
+# 统计使用情况的时间范围（天）
+DEFAULT_LOOKBACK_DAYS = 30
+
+# 预热的图片排序模式（与前端默认排序一致）
+DEFAULT_SORT_MODES = ("name-asc",)
+
+# 并发预热的店铺数（每个店铺使用独立的License Key，互不共享限速）
+DEFAULT_MAX_WORKERS = 2
+
+_CABINET_URL_RE = re.compile(
+    r"https?://image\.rakuten\.co\.jp/[^/\s\"'\\]+/cabinet/([^\s\"'\\?#]+)/[^/\s\"'\\?#]+"
+)
+
+
+def extract_cabinet_folder_paths(text: str) -> List[str]:
+    """从文本中提取Cabinet图片URL所在的文件夹路径"""
+    return [match.strip("/") for match in _CABINET_URL_RE.findall(text or "")]
+
+
+def rank_folders(
+    shop: ShopConfiguration,
+    folders: Sequence[Dict[str, Any]],
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+    limit: int = DEFAULT_MAX_FOLDERS,
+) -> List[Dict[str, Any]]:
+    """
+    按近期使用情况排序店铺的文件夹
+
+    Args:
+        shop: 店铺配置
+        folders: 选择器格式的文件夹树
+        lookback_days: 统计最近N天的使用情况
+        limit: 返回的文件夹数
+
+    Returns:
+        使用最多的文件夹（选择器格式）
+    """
+    from pages.activity_logger import PageActivity
+    from pages.image_references import PageImageReference
+
+    by_path = {f["path"].strip("/"): f for f in folders if f.get("path")}
+    if not by_path or limit <= 0:
+        return []
+
+    since = timezone.now() - timedelta(days=lookback_days)
+    usage: Counter = Counter()
+
+    activity = dict(
+        PageActivity.objects.filter(created_at__gte=since)
+        .exclude(action="deleted")
+        .values("page_id")
+        .annotate(n=Count("id"))
+        .values_list("page_id", "n")
+    )
+    if activity:
+        references = PageImageReference.objects.filter(
+            page__shop=shop, page_id__in=list(activity)
+        ).values_list("page_id", "url")
+        for page_id, url in references.iterator():
+            for path in extract_cabinet_folder_paths(url):
+                usage[path] += activity[page_id]
+
+    # MediaFile不记录店铺，按店铺所有者的上传统计
+    media_urls = MediaFile.objects.filter(
+        user_id=shop.owner_id, upload_status="completed", created_at__gte=since
+    ).values_list("rcabinet_url", flat=True)
+    for url in media_urls.iterator():
+        for path in extract_cabinet_folder_paths(url):
+            usage[path] += 1
+
+    ranked = [by_path[path] for path, _n in usage.most_common() if path in by_path]
+    return ranked[:limit]
+
+
+def _warm(cache_key: str, fetch, force: bool) -> Optional[Any]:
+    """
+    缓存不新鲜时拉取
+
+    Returns:
+        拉取结果；缓存仍新鲜或其他进程正在拉取时为None
+    """
+    if not force and is_fresh(cache_key):
+        return None
+    result = {}
+
+    def run():
+        result["value"] = fetch()
+        return result["value"]
+
+    get_single_flight().run_if_idle(cache_key, run)
+    return result.get("value")
+
+
+def prewarm_shop(
+    shop: ShopConfiguration,
+    max_folders: int = DEFAULT_MAX_FOLDERS,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+    sort_modes: Iterable[str] = DEFAULT_SORT_MODES,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    预热单个店铺的选择器缓存
+
+    Returns:
+        {"shop_id", "shop_name", "fetched", "folder_ids", "error"}
+    """
+    client = RCabinetClient.from_shop_config(shop)
+    summary = {
+        "shop_id": str(shop.id),
+        "shop_name": shop.shop_name,
+        "fetched": 0,
+        "folder_ids": [],
+        "error": None,
+    }
+
+    fetched = _warm(
+        folders_cache_key(shop.id), lambda: fetch_all_folders(client, shop.id), force
+    )
+    if fetched is not None:
+        _folders, stale, error = fetched
+        if error or stale:
+            summary["error"] = error or "R-Cabinet暂时不可用"
+            return summary
+        summary["fetched"] += 1
+
+    folders, stale, error = load_folders(client, shop.id)
+    if error or stale:
+        summary["error"] = error or "R-Cabinet暂时不可用"
+        return summary
+
+    # 根目录（选择器默认打开）+ 最常用的文件夹
+    folder_ids = [None] + [
+        f["id"] for f in rank_folders(shop, folders, lookback_days, max_folders)
+    ]
+    for folder_id in folder_ids:
+        for sort_mode in sort_modes:
+            result = _warm(
+                images_cache_key(shop.id, folder_id, sort_mode),
+                lambda f=folder_id, s=sort_mode: fetch_all_images(
+                    client, shop.id, f, s
+                ),
+                force,
+            )
+            if result is not None and result[1] is None:
+                summary["fetched"] += 1
+    summary["folder_ids"] = [f or "0" for f in folder_ids]
+    return summary
+
+
+def prewarm_cabinet_caches(
+    shop_ids: Optional[Iterable[str]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    预热所有（或指定）店铺的选择器缓存
+
+    Args:
+        shop_ids: 仅预热指定店铺
+        max_workers: 并发预热的店铺数
+        **kwargs: 传给 prewarm_shop 的参数
+
+    Returns:
+        {"total", "fetched", "shops", "failed", "duration_ms"}
+    """
+    start = time.perf_counter()
+    if not config.RCABINET_INTEGRATION_ENABLED:
+        logger.info("R-Cabinet集成已禁用，跳过缓存预热")
+        return {"total": 0, "fetched": 0, "shops": [], "failed": [], "duration_ms": 0}
+
+    shops = ShopConfiguration.objects.all()
+    if shop_ids:
+        shops = shops.filter(id__in=list(shop_ids))
+    shops = list(shops)
+
+    results = []
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(prewarm_shop, shop, **kwargs): shop for shop in shops
+        }
+        for future in as_completed(futures):
+            shop = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning(f"预热店铺 {shop.shop_name} 的Cabinet缓存失败: {e}")
+                result = {
+                    "shop_id": str(shop.id),
+                    "shop_name": shop.shop_name,
+                    "fetched": 0,
+                    "folder_ids": [],
+                    "error": str(e),
+                }
+            results.append(result)
+            if result["error"]:
+                failed.append(result)
+
+    summary = {
+        "total": len(shops),
+        "fetched": sum(r["fetched"] for r in results),
+        "shops": results,
+        "failed": failed,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    logger.info(
+        f"Cabinet缓存预热完成: {summary['total']} 个店铺, "
+        f"拉取 {summary['fetched']} 个列表, 失败 {len(failed)} 个"
+    )
+    return summary
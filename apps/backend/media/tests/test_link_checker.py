@@ -0,0 +1,185 @@
+"""
+页面图片失效链接检查测试
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+
+from configurations.models import ShopConfiguration
+from media.cabinet_cache import images_cache_key
+from media.link_checker import check_shop_images, parse_cabinet_url
+from pages.models import PageTemplate
+from pagemaker.integrations.listing_cache import ListingCache
+
+CABINET = "https://image.rakuten.co.jp/testshop/cabinet"
+
+
+def _file(path, name):
+    url = f"{CABINET}/{path}/{name}" if path else f"{CABINET}/{name}"
+    return {"file_id": 1, "file_name": name, "file_path": name, "file_url": url}
+
+
+@pytest.mark.unit
+class ImageLinkCheckerTestCase(TestCase):
+    """失效链接检查测试"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.shop = ShopConfiguration.objects.create(
+            shop_name="测试店铺",
+            target_area="test_shop",
+            owner=self.user,
+            api_service_secret="secret",
+            api_license_key="key",
+            ftp_host="ftp.example.com",
+            ftp_user="user",
+            ftp_password="pass",
+        )
+        store = LocMemCache(f"links-{id(self)}", {"TIMEOUT": None})
+        self.addCleanup(store.clear)
+        self.listing = ListingCache(store=store)
+        for target in ("media.cabinet_cache", "media.link_checker"):
+            for name, value in (
+                ("get_listing_cache", MagicMock(return_value=self.listing)),
+                ("rate_limit_sleep", MagicMock()),
+            ):
+                patcher = patch(f"{target}.{name}", value)
+                patcher.start()
+                self.addCleanup(patcher.stop)
+
+        self.client = MagicMock()
+        self.client.get_folders.return_value = {
+            "success": True,
+            "data": {
+                "folder_all_count": 3,
+                "folders": [
+                    {"folder_id": 1, "folder_path": "banner", "file_count": 2},
+                    {"folder_id": 2, "folder_path": "items", "file_count": 1000},
+                    {"folder_id": 3, "folder_path": "small", "file_count": 2},
+                ],
+            },
+        }
+        self.client.get_folder_files.return_value = {
+            "success": True,
+            "data": {"files": [_file("small", "s1.jpg"), _file("small", "s2.jpg")]},
+        }
+
+        def search_files(file_path, folder_id=None):
+            found = {"i1.jpg": "items", "root.jpg": ""}
+            files = [_file(found[file_path], file_path)] if file_path in found else []
+            return {"success": True, "data": {"files": files}}
+
+        self.client.search_files.side_effect = search_files
+        # banner 文件夹的列表已在选择器缓存中
+        self.listing.set(
+            images_cache_key(self.shop.id, "1", "date-desc"),
+            [{"id": "1", "url": f"{CABINET}/banner/b1.jpg"}],
+        )
+
+    def test_report_resolves_folders_with_fewest_calls(self):
+        """测试按文件夹选择缓存/列出/搜索，并输出按页面合并的失效报告"""
+        urls = [
+            f"{CABINET}/banner/b1.jpg",
+            f"{CABINET}/banner/gone.jpg",
+            f"{CABINET}/items/i1.jpg",
+            f"{CABINET}/items/i2.jpg",
+            f"{CABINET}/small/s1.jpg",
+            f"{CABINET}/small/s3.jpg",
+            f"{CABINET}/deleted/x.jpg",
+            f"{CABINET}/root.jpg",
+            "https://example.com/logo.png",
+        ]
+        page = PageTemplate.objects.create(
+            name="页面",
+            content=[
+                {"id": f"m{i}", "type": "image", "src": url}
+                for i, url in enumerate(urls)
+            ],
+            owner=self.user,
+            shop=self.shop,
+        )
+        PageTemplate.objects.create(
+            name="另一个页面",
+            content=[{"id": "x", "type": "image", "src": urls[1]}],
+            owner=self.user,
+            shop=self.shop,
+        )
+
+        report = check_shop_images(self.shop, cabinet_client=self.client)
+
+        self.assertEqual((report["references"], report["urls"]), (10, 9))
+        self.assertEqual((report["cabinet_urls"], report["external_urls"]), (8, 1))
+        self.assertEqual(report["folders"], {"cached": 1, "listed": 1, "searched": 2})
+        # 缓存列表中没有的 gone.jpg 也搜索确认
+        self.assertEqual(report["searched_files"], 4)
+        self.assertEqual(self.client.search_files.call_count, 4)
+        self.assertEqual(self.client.get_folder_files.call_count, 1)
+
+        broken = {item["url"]: item for item in report["broken"]}
+        self.assertEqual(
+            {url: item["reason"] for url, item in broken.items()},
+            {
+                f"{CABINET}/banner/gone.jpg": "file_missing",
+                f"{CABINET}/items/i2.jpg": "file_missing",
+                f"{CABINET}/small/s3.jpg": "file_missing",
+                f"{CABINET}/deleted/x.jpg": "folder_missing",
+            },
+        )
+        self.assertEqual(report["broken_count"], 4)
+        self.assertEqual(len(broken[f"{CABINET}/banner/gone.jpg"]["pages"]), 2)
+        self.assertEqual(
+            broken[f"{CABINET}/items/i2.jpg"]["pages"],
+            [{"id": str(page.id), "name": "页面", "module_ids": ["m3"]}],
+        )
+
+    def test_failed_listing_is_reported_as_unknown(self):
+        """测试列出失败（返回空列表）时不判定为失效"""
+        self.client.get_folder_files.return_value = {"success": False}
+        PageTemplate.objects.create(
+            name="页面",
+            content=[{"id": "s", "type": "image", "src": f"{CABINET}/small/s1.jpg"}],
+            owner=self.user,
+            shop=self.shop,
+        )
+        report = check_shop_images(self.shop, cabinet_client=self.client)
+        self.assertEqual((report["broken_count"], report["unknown_count"]), (0, 1))
+        self.assertEqual(
+            parse_cabinet_url(f"{CABINET}/a/b/c.jpg?x=1"), ("testshop", "a/b", "c.jpg")
+        )
+        self.assertIsNone(parse_cabinet_url("https://example.com/cabinet/a.jpg"))
+
+    def test_incomplete_or_cached_listing_is_not_trusted(self):
+        """测试列表不完整时为unknown，缓存列表中没有的文件搜索确认后才判定"""
+        self.client.get_folder_files.return_value = {
+            "success": True,
+            "data": {"files": [_file("small", "s1.jpg")]},
+        }
+        self.listing.set(
+            images_cache_key(self.shop.id, "1", "name-asc"),
+            [{"id": "1", "url": f"{CABINET}/banner/b1.jpg"}],
+        )
+        self.client.search_files.side_effect = lambda file_path, folder_id=None: {
+            "success": True,
+            "data": {"files": [_file("banner", "new.jpg")]},
+        }
+        PageTemplate.objects.create(
+            name="页面",
+            content=[
+                {"id": "s", "type": "image", "src": f"{CABINET}/small/s1.jpg"},
+                {"id": "n", "type": "image", "src": f"{CABINET}/banner/new.jpg"},
+            ],
+            owner=self.user,
+            shop=self.shop,
+        )
+
+        report = check_shop_images(self.shop, cabinet_client=self.client)
+
+        self.assertEqual((report["broken_count"], report["unknown_count"]), (0, 1))
+        self.assertEqual(report["broken"][0]["url"], f"{CABINET}/small/s1.jpg")
+        self.client.search_files.assert_called_once_with(
+            file_path="new.jpg", folder_id=1
+        )
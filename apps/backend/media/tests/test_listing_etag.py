@@ -0,0 +1,149 @@
+"""
+Cabinet 选择器列表接口的 ETag / 304 / 压缩测试
+"""
+
+import gzip
+import json
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from configurations.models import ShopConfiguration
+from media.cabinet_cache import (
+    FETCH_PAGE_LIMIT,
+    folders_cache_key,
+    images_cache_key,
+)
+from pagemaker.integrations.listing_cache import ListingCache
+
+
+class CabinetListingETagTestCase(TestCase):
+    """列表接口条件请求测试"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.shop = ShopConfiguration.objects.create(
+            shop_name="测试店铺",
+            target_area="test_shop",
+            owner=self.user,
+            api_service_secret="secret",
+            api_license_key="key",
+            ftp_host="ftp.example.com",
+            ftp_user="user",
+            ftp_password="pass",
+        )
+        store = LocMemCache(f"etag-{id(self)}", {"TIMEOUT": None})
+        self.addCleanup(store.clear)
+        self.listing = ListingCache(store=store)
+        for target in ("media.cabinet_cache", "media.views"):
+            patcher = patch(f"{target}.get_listing_cache", return_value=self.listing)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch("media.views.RCabinetClient")
+        self.client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.folders = [
+            {
+                "id": str(i),
+                "name": f"folder{i}",
+                "path": f"parent/folder{i}" if i else "parent",
+                "parentPath": "parent" if i else None,
+            }
+            for i in range(50)
+        ]
+        self.listing.set(folders_cache_key(self.shop.id), self.folders)
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+    def test_folders_revalidate_and_compress(self):
+        """测试文件夹全量列表：ETag、304、gzip，缓存刷新后ETag变化"""
+        url = reverse("media:get_cabinet_folders")
+        response = self.api.get(url, {"all": "true"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        body = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(body["data"]["folders"]), 50)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+
+        response = self.api.get(url, {"all": "true"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+        # 同一缓存版本的不同过滤条件使用不同ETag
+        response = self.api.get(url, {"parentPath": ""}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]["folders"]), 1)
+        self.assertNotIn("Content-Encoding", response)
+
+        self.listing.set(folders_cache_key(self.shop.id), self.folders[:10])
+        response = self.api.get(url, {"all": "true"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.client_class.from_shop_config.return_value.get_folders.assert_not_called()
+
+    def test_cached_images_page(self):
+        """测试缓存的图片分页：ETag与页码相关，缓存未变化时返回304"""
+        images = [{"id": str(i), "filename": f"{i}.jpg"} for i in range(30)]
+        self.listing.set(images_cache_key(self.shop.id, "7", "name-asc"), images)
+        url = reverse("media:get_cabinet_images")
+        params = {"folderId": "7", "page": 1, "pageSize": 10}
+
+        response = self.api.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertEqual(
+            self.api.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+        response = self.api.get(url, {**params, "page": 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["images"][0]["id"], "10")
+
+        # 搜索结果不缓存，不带ETag
+        client = self.client_class.from_shop_config.return_value
+        client.search_files.return_value = {"success": True, "data": {"files": []}}
+        with patch("media.views.rate_limit_sleep"):
+            response = self.api.get(url, {"search": "a"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+
+    def test_partial_images_listing_is_marked_incomplete(self):
+        """测试中途某页失败时返回不完整标记且不缓存，第一页失败时返回503"""
+        client = self.client_class.from_shop_config.return_value
+        page = {
+            "success": True,
+            "data": {
+                "files": [
+                    {"file_id": i, "file_path": f"{i}.jpg", "file_url": f"/{i}.jpg"}
+                    for i in range(FETCH_PAGE_LIMIT)
+                ]
+            },
+        }
+        client.get_folder_files.side_effect = [page, {"success": False}]
+        url = reverse("media:get_cabinet_images")
+
+        with patch("media.cabinet_cache.rate_limit_sleep"):
+            response = self.api.get(url, {"folderId": "7"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(data["total"], FETCH_PAGE_LIMIT)
+        self.assertTrue(data["stale"])
+        self.assertEqual(data["staleReason"], "incomplete")
+        self.assertNotIn("ETag", response)
+        self.assertIsNone(
+            self.listing.get_all(images_cache_key(self.shop.id, "7", "name-asc"))
+        )
+
+        client.get_folder_files.side_effect = [{"success": False, "message": "x"}]
+        with patch("media.cabinet_cache.rate_limit_sleep"):
+            response = self.api.get(url, {"folderId": "7"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["error"]["code"], "CABINET_API_ERROR")
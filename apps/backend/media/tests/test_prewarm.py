@@ -0,0 +1,130 @@
+"""
+R-Cabinet 图片选择器缓存预热测试
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+
+from configurations.models import ShopConfiguration
+from media.cabinet_cache import folders_cache_key, images_cache_key
+from media.models import MediaFile
+from media.prewarm import prewarm_shop, rank_folders
+from pages.activity_logger import PageActivity
+from pages.models import PageTemplate
+from pagemaker.integrations.listing_cache import ListingCache
+
+FOLDERS = [
+    {"folder_id": 1, "folder_name": "banner", "folder_path": "banner"},
+    {"folder_id": 2, "folder_name": "items", "folder_path": "items"},
+    {"folder_id": 3, "folder_name": "2024", "folder_path": "items/2024"},
+]
+
+
+def _url(path, filename="a.jpg"):
+    return f"https://image.rakuten.co.jp/testshop/cabinet/{path}/{filename}"
+
+
+@pytest.mark.unit
+class CabinetPrewarmTestCase(TestCase):
+    """缓存预热测试"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.shop = ShopConfiguration.objects.create(
+            shop_name="测试店铺",
+            target_area="test_shop",
+            owner=self.user,
+            api_service_secret="secret",
+            api_license_key="key",
+            ftp_host="ftp.example.com",
+            ftp_user="user",
+            ftp_password="pass",
+        )
+        self.folders = [
+            {"id": "1", "path": "banner"},
+            {"id": "2", "path": "items"},
+            {"id": "3", "path": "items/2024"},
+        ]
+
+        store = LocMemCache(f"prewarm-{id(self)}", {"TIMEOUT": None})
+        self.addCleanup(store.clear)
+        self.listing = ListingCache(store=store)
+        patcher = patch(
+            "media.cabinet_cache.get_listing_cache", return_value=self.listing
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _page(self, urls, activity_count):
+        page = PageTemplate.objects.create(
+            name="页面",
+            content=[
+                {"id": f"m{i}", "type": "image", "src": url}
+                for i, url in enumerate(urls)
+            ],
+            owner=self.user,
+            shop=self.shop,
+            device_type="pc",
+        )
+        for _ in range(activity_count):
+            PageActivity.objects.create(
+                page_id=page.id, page_name=page.name, action="updated", user=self.user
+            )
+        return page
+
+    def test_rank_folders_by_recent_usage(self):
+        """测试按页面活动加权的引用次数和最近上传排序文件夹"""
+        self._page([_url("items/2024"), _url("banner")], activity_count=3)
+        self._page([_url("banner", "b.jpg")], activity_count=1)
+        MediaFile.objects.create(
+            user=self.user,
+            original_filename="c.jpg",
+            rcabinet_url=_url("items", "c.jpg"),
+            file_size=1,
+            content_type="image/jpeg",
+            upload_status="completed",
+        )
+
+        ranked = rank_folders(self.shop, self.folders, limit=2)
+        self.assertEqual([f["id"] for f in ranked], ["1", "3"])
+        self.assertEqual(
+            [f["id"] for f in rank_folders(self.shop, self.folders)], ["1", "3", "2"]
+        )
+
+    def test_prewarm_shop_fills_listing_cache(self):
+        """测试预热文件夹树、根目录和常用文件夹，新鲜的缓存不重复拉取"""
+        self._page([_url("items/2024")], activity_count=1)
+        client = MagicMock()
+        client.get_folders.return_value = {
+            "success": True,
+            "data": {"folders": FOLDERS, "folder_all_count": len(FOLDERS)},
+        }
+        client.get_folder_files.return_value = {
+            "success": True,
+            "data": {
+                "files": [{"file_id": 9, "file_path": "x.jpg", "file_url": _url("x")}]
+            },
+        }
+
+        with patch("media.prewarm.RCabinetClient") as mock_client_class:
+            mock_client_class.from_shop_config.return_value = client
+            summary = prewarm_shop(self.shop, max_folders=2)
+
+            self.assertIsNone(summary["error"])
+            self.assertEqual(summary["folder_ids"], ["0", "3"])
+            self.assertEqual(summary["fetched"], 3)
+            self.assertEqual(
+                len(self.listing.get_all(folders_cache_key(self.shop.id))[0]), 3
+            )
+            for folder_id in ("0", "3"):
+                images, _meta = self.listing.get_all(
+                    images_cache_key(self.shop.id, folder_id, "name-asc")
+                )
+                self.assertEqual(images[0]["id"], "9")
+
+            self.assertEqual(prewarm_shop(self.shop, max_folders=2)["fetched"], 0)
+        self.assertEqual(client.get_folder_files.call_count, 2)
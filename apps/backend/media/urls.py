@@ -18,6 +18,8 @@ urlpatterns = [
     ),
     # 用户文件列表
     path("files/", views.list_user_media_files, name="list_user_media_files"),
+    # 图片被哪些页面使用
+    path("usage/", views.get_image_usage, name="get_image_usage"),
     # R-Cabinet文件夹列表
     path("cabinet-folders/", views.get_cabinet_folders, name="get_cabinet_folders"),
     # R-Cabinet图片列表
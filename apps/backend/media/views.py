@@ -3,22 +3,71 @@
 """
 
 import logging
-import time
+from django.http import HttpResponseNotModified
 from django.shortcuts import get_object_or_404
-from django.core.cache import cache
+from django.utils.http import parse_etags
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from .cabinet_cache import (
+    files_to_images,
+    folders_cache_key,
+    images_cache_key,
+    listing_etag,
+    load_folders,
+    load_images,
+    load_images_page,
+    normalize_folders,
+    rate_limit_sleep,
+    sort_images,
+)
 from .models import MediaFile
 from .validators import validate_uploaded_file, get_file_format_info
 from pagemaker.integrations.cabinet_client import RCabinetClient
+from pages.image_references import (
+    PageImageReference,
+    pages_using_image,
+    unused_media_files,
+)
+from pages.permissions import get_user_role
 from pagemaker.integrations.exceptions import RakutenAPIError
+from pagemaker.integrations.listing_cache import get_listing_cache
+from pagemaker.compression import compress_large_responses
+from pagemaker.renderers import ORJSONRenderer
 
 logger = logging.getLogger(__name__)
 
 
+def _stale_fields(result) -> dict:
+    """R-Cabinet不可用时返回的过期缓存标记（正常结果为空字典）"""
+    if not result or result.get("stale") is not True:
+        return {}
+    return {
+        "stale": True,
+        "staleReason": result.get("stale_reason"),
+        "cachedAt": result.get("cached_at"),
+    }
+
+
+def _not_modified(request, etag) -> bool:
+    """请求的 If-None-Match 与 ETag 匹配（弱比较）"""
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not etag or not header:
+        return False
+    etags = {tag.removeprefix("W/") for tag in parse_etags(header)}
+    return "*" in etags or etag.removeprefix("W/") in etags
+
+
+def _with_etag(response, etag):
+    """设置ETag；浏览器每次使用前都要重新验证（If-None-Match）"""
+    if etag:
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+    return response
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def upload_media_file(request):
@@ -101,7 +150,7 @@ def upload_media_file(request):
                 # 从页面获取店铺配置
                 from pages.models import PageTemplate
                 try:
-                    page = PageTemplate.objects.select_related('shop').get(id=page_id)
+                    page = PageTemplate.objects.select_related('shop').defer('content').get(id=page_id)
                     if page.shop:
                         shop_config = page.shop
                         logger.info(f"上传文件：使用页面 {page_id} 关联的店铺 {page.shop.shop_name} ({page.shop.target_area}) 的配置")
@@ -292,6 +341,7 @@ def list_user_media_files(request):
         GET /api/v1/media/files/
         Query Parameters:
             status: 过滤状态 (pending/completed/failed)
+            unused: 为true时只返回没有被任何页面引用的已上传文件（清理候选）
             limit: 限制数量 (默认20)
             offset: 偏移量 (默认0)
 
@@ -310,6 +360,9 @@ def list_user_media_files(request):
         if status_filter:
             queryset = queryset.filter(upload_status=status_filter)
 
+        if request.GET.get("unused") in ("1", "true"):
+            queryset = unused_media_files(queryset)
+
         # 获取总数
         total_count = queryset.count()
 
@@ -357,6 +410,84 @@ def list_user_media_files(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+def get_image_usage(request):
+    """
+    查询图片被哪些页面使用（页面图片引用索引）
+
+    Request:
+        GET /api/v1/media/usage/
+        Query Parameters:
+            url: 图片URL
+            file_id: R-Cabinet文件ID（与url二选一）
+
+    Response:
+        200: 查询成功（编辑者只能看到自己的页面）
+        400: 缺少参数
+    """
+    url = request.GET.get("url", "").strip()
+    file_id = request.GET.get("file_id", "").strip()
+    if not url and not file_id:
+        return Response(
+            {
+                "success": False,
+                "error": {
+                    "code": "PARAMETER_REQUIRED",
+                    "message": "需要指定url或file_id参数",
+                },
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        user = None if get_user_role(request.user) == "admin" else request.user
+        pages = list(
+            pages_using_image(url=url, rcabinet_file_id=file_id, user=user)
+            .select_related("shop")
+            .only("id", "name", "device_type", "updated_at", "shop__shop_name")
+            .order_by("-updated_at")
+        )
+
+        refs = PageImageReference.objects.filter(page_id__in=[p.id for p in pages])
+        refs = refs.filter(url=url) if url else refs.filter(rcabinet_file_id=file_id)
+        module_ids = {}
+        for page_id, module_id in refs.values_list("page_id", "module_id"):
+            module_ids.setdefault(page_id, []).append(module_id)
+
+        return Response(
+            {
+                "success": True,
+                "data": {
+                    "url": url or None,
+                    "rcabinet_file_id": file_id or None,
+                    "pages": [
+                        {
+                            "id": str(page.id),
+                            "name": page.name,
+                            "device_type": page.device_type,
+                            "shop_name": page.shop.shop_name if page.shop else None,
+                            "module_ids": module_ids.get(page.id, []),
+                            "updated_at": page.updated_at.isoformat(),
+                        }
+                        for page in pages
+                    ],
+                    "total_count": len(pages),
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except Exception as e:
+        logger.error(f"查询图片使用情况异常: {e}")
+        return Response(
+            {"error": {"code": "INTERNAL_ERROR", "message": f"查询失败: {str(e)}"}},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@compress_large_responses
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@renderer_classes([ORJSONRenderer])
 def get_cabinet_folders(request):
     """
     获取R-Cabinet中的文件夹列表
@@ -366,9 +497,14 @@ def get_cabinet_folders(request):
         Query Parameters:
             page: 页码（默认1）
             pageSize: 每页数量（默认20，最大100）
+            all: 返回全部文件夹（可选）
+            parentPath: 只返回该路径的子文件夹（可选，空字符串表示根层）
+        Headers:
+            If-None-Match: 上次响应的ETag（all / parentPath 请求）
 
     Response:
-        200: 获取成功
+        200: 获取成功（缓存的列表带ETag，较大的响应按 Accept-Encoding 压缩）
+        304: 列表缓存未变化
         503: R-Cabinet服务不可用
         500: 内部错误
     """
@@ -413,7 +549,7 @@ def get_cabinet_folders(request):
             # 从页面获取店铺配置
             from pages.models import PageTemplate
             try:
-                page_obj = PageTemplate.objects.select_related('shop').get(id=page_id)
+                page_obj = PageTemplate.objects.select_related('shop').defer('content').get(id=page_id)
                 if page_obj.shop:
                     shop_config = page_obj.shop
                     logger.info(f"获取文件夹列表：使用页面 {page_id} 关联的店铺 {page_obj.shop.shop_name} ({page_obj.shop.target_area}) 的配置")
@@ -439,133 +575,35 @@ def get_cabinet_folders(request):
         
         cabinet_client = RCabinetClient.from_shop_config(shop_config)
 
-        def _rate_limit_sleep():
-            last_ts = cache.get("rakuten_last_call_ts")
-            now = time.monotonic()
-            if last_ts is not None:
-                delta = now - last_ts
-                if delta < 1.0:
-                    time.sleep(1.0 - delta)
-            cache.set("rakuten_last_call_ts", time.monotonic(), timeout=60)
-
-        def _normalize_folders(raw_list, with_has_children_from=None):
-            folders = []
-            for folder_info in raw_list:
-                folder_path = folder_info.get("folder_path", "")
-                parent_path = None
-                if "/" in folder_path:
-                    parent_path = "/".join(folder_path.split("/")[:-1])
-                folders.append(
-                    {
-                        "id": str(folder_info.get("folder_id", "")),
-                        "name": folder_info.get("folder_name", ""),
-                        "path": folder_path,
-                        "fileCount": folder_info.get("file_count", 0),
-                        "fileSize": folder_info.get("file_size", 0),
-                        "updatedAt": folder_info.get("timestamp", ""),
-                        "node": folder_info.get("folder_node", 1),
-                        "parentPath": parent_path,
-                    }
-                )
-            if with_has_children_from is not None:
-                parent_set = set()
-                for f in with_has_children_from:
-                    pp = f.get("parentPath")
-                    if pp:
-                        parent_set.add(pp)
-                for f in folders:
-                    f["hasChildren"] = f.get("path") in parent_set
-            return folders
-
         # 如果请求子节点或请求全量，使用缓存优先
-        # 缓存键需要包含店铺ID，确保不同店铺的数据隔离
-        cache_key_folders = f"cabinet_folders_all_{shop_config.id}"
-        cache_key_ts = f"cabinet_folders_all_ts_{shop_config.id}"
-        
+        # （两级列表缓存 + 单飞锁，超过5分钟的缓存在后台刷新）
         if parent_path_query is not None or want_all:
-            cached = None if force_refresh else cache.get(cache_key_folders)
-            cached_ts = None if force_refresh else cache.get(cache_key_ts)
-            if cached is None:
-                # 全量拉取并缓存（循环分页 + 限速）
-                all_raw = []
-                current_page = 1
-                page_limit = 100
-                while True:
-                    _rate_limit_sleep()
-                    result = cabinet_client.get_folders(
-                        offset=current_page, limit=page_limit
-                    )
-                    if not result.get("success", True):
-                        return Response(
-                            {
-                                "error": {
-                                    "code": "API_ERROR",
-                                    "message": result.get(
-                                        "message", "获取文件夹列表失败"
-                                    ),
-                                }
-                            },
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        )
-                    page_folders = result.get("data", {}).get("folders", [])
-                    all_raw.extend(page_folders)
-                    folder_all_count = result.get("data", {}).get("folder_all_count")
-                    if not page_folders or (
-                        folder_all_count and len(all_raw) >= int(folder_all_count)
-                    ):
-                        break
-                    current_page += 1
-                normalized = _normalize_folders(all_raw)
-                # 基于全量补充 hasChildren
-                normalized = _normalize_folders(
-                    all_raw, with_has_children_from=normalized
+            # ETag 在读取列表之前按缓存版本生成
+            etag = (
+                None
+                if force_refresh
+                else listing_etag(
+                    folders_cache_key(shop_config.id), parent_path_query, want_all
+                )
+            )
+            cached, stale_result, error_message = load_folders(
+                cabinet_client, shop_config.id, force_refresh=force_refresh
+            )
+            if error_message is not None:
+                return Response(
+                    {
+                        "error": {
+                            "code": "API_ERROR",
+                            "message": error_message,
+                        }
+                    },
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
-                # 缓存 30 分钟，使用店铺特定的缓存键
-                cache.set(cache_key_folders, normalized, timeout=1800)
-                cache.set(cache_key_ts, time.time(), timeout=1800)
-                cached = normalized
-                cached_ts = time.time()
-            else:
-                # stale-while-revalidate: 5分钟后后台刷新，不阻塞
-                try:
-                    if cached_ts is None or (time.time() - float(cached_ts)) > 300:
-
-                        def _refresh_async():
-                            try:
-                                # 使用已有的 cabinet_client 实例
-                                all_raw = []
-                                cp = 1
-                                limit = 100
-                                while True:
-                                    _rate_limit_sleep()
-                                    res = cabinet_client.get_folders(offset=cp, limit=limit)
-                                    if not res.get("success", True):
-                                        break
-                                    page_folders = res.get("data", {}).get(
-                                        "folders", []
-                                    )
-                                    all_raw.extend(page_folders)
-                                    fac = res.get("data", {}).get("folder_all_count")
-                                    if not page_folders or (
-                                        fac and len(all_raw) >= int(fac)
-                                    ):
-                                        break
-                                    cp += 1
-                                norm = _normalize_folders(all_raw)
-                                norm = _normalize_folders(
-                                    all_raw, with_has_children_from=norm
-                                )
-                                # 使用店铺特定的缓存键
-                                cache.set(cache_key_folders, norm, timeout=1800)
-                                cache.set(cache_key_ts, time.time(), timeout=1800)
-                            except Exception:
-                                pass
-
-                        import threading
-
-                        threading.Thread(target=_refresh_async, daemon=True).start()
-                except Exception:
-                    pass
+
+            if stale_result is not None:
+                etag = None
+            if _not_modified(request, etag):
+                return _with_etag(HttpResponseNotModified(), etag)
 
             # 过滤子节点
             folders = cached
@@ -579,40 +617,48 @@ def get_cabinet_folders(request):
                     ]
                 total = len(folders)
                 # 返回全部子节点（不分页），确保所有文件夹都能显示
-                return Response(
-                    {
-                        "success": True,
-                        "data": {
-                            "folders": folders,
-                            "total": total,
-                            "page": 1,
-                            "pageSize": total,
+                return _with_etag(
+                    Response(
+                        {
+                            "success": True,
+                            "data": {
+                                "folders": folders,
+                                "total": total,
+                                "page": 1,
+                                "pageSize": total,
+                                **_stale_fields(stale_result),
+                            },
                         },
-                    },
-                    status=status.HTTP_200_OK,
+                        status=status.HTTP_200_OK,
+                    ),
+                    etag,
                 )
             else:
                 # want_all=true 时返回全量（不分页）
                 total = len(folders)
-                return Response(
-                    {
-                        "success": True,
-                        "data": {
-                            "folders": folders,
-                            "total": total,
-                            "page": 1,
-                            "pageSize": total,
+                return _with_etag(
+                    Response(
+                        {
+                            "success": True,
+                            "data": {
+                                "folders": folders,
+                                "total": total,
+                                "page": 1,
+                                "pageSize": total,
+                                **_stale_fields(stale_result),
+                            },
                         },
-                    },
-                    status=status.HTTP_200_OK,
+                        status=status.HTTP_200_OK,
+                    ),
+                    etag,
                 )
 
         # 否则按原逻辑请求单页
-        _rate_limit_sleep()
+        rate_limit_sleep()
         result = cabinet_client.get_folders(offset=record_offset, limit=page_size)
         if result.get("success", True):
             folders_data = result.get("data", {}).get("folders", [])
-            folders = _normalize_folders(folders_data)
+            folders = normalize_folders(folders_data)
             total = result.get("data", {}).get("folder_all_count", len(folders))
             return Response(
                 {
@@ -622,6 +668,7 @@ def get_cabinet_folders(request):
                         "total": total,
                         "page": page,
                         "pageSize": page_size,
+                        **_stale_fields(result),
                     },
                 },
                 status=status.HTTP_200_OK,
@@ -637,6 +684,17 @@ def get_cabinet_folders(request):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    except RakutenAPIError as e:
+        logger.error(f"R-Cabinet API错误: {e}")
+        return Response(
+            {
+                "error": {
+                    "code": "CABINET_API_ERROR",
+                    "message": f"R-Cabinet服务异常: {str(e)}",
+                }
+            },
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
     except Exception as e:
         logger.error(f"获取R-Cabinet文件夹列表异常: {e}")
         return Response(
@@ -650,8 +708,10 @@ def get_cabinet_folders(request):
         )
 
 
+@compress_large_responses
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@renderer_classes([ORJSONRenderer])
 def get_cabinet_images(request):
     """
     获取R-Cabinet中的图片列表
@@ -670,9 +730,12 @@ def get_cabinet_images(request):
                 - date-desc: 按上传时间降序（最新在前）
                 - size-asc: 按文件大小升序
                 - size-desc: 按文件大小降序
+        Headers:
+            If-None-Match: 上次响应的ETag（非搜索请求）
 
     Response:
-        200: 获取成功
+        200: 获取成功（缓存的列表带ETag，较大的响应按 Accept-Encoding 压缩）
+        304: 列表缓存未变化
         503: R-Cabinet服务不可用
         500: 内部错误
     """
@@ -716,7 +779,7 @@ def get_cabinet_images(request):
             # 从页面获取店铺配置
             from pages.models import PageTemplate
             try:
-                page_obj = PageTemplate.objects.select_related('shop').get(id=page_id)
+                page_obj = PageTemplate.objects.select_related('shop').defer('content').get(id=page_id)
                 if page_obj.shop:
                     shop_config = page_obj.shop
                     logger.info(f"获取图片列表：使用页面 {page_id} 关联的店铺 {page_obj.shop.shop_name} ({page_obj.shop.target_area}) 的配置")
@@ -742,26 +805,15 @@ def get_cabinet_images(request):
         
         cabinet_client = RCabinetClient.from_shop_config(shop_config)
 
-        def _rate_limit_sleep():
-            last_ts = cache.get("rakuten_last_call_ts")
-            now = time.monotonic()
-            if last_ts is not None:
-                delta = now - last_ts
-                if delta < 1.0:
-                    time.sleep(1.0 - delta)
-            cache.set("rakuten_last_call_ts", time.monotonic(), timeout=60)
-
-        # 图片列表缓存键（基于店铺、文件夹、排序模式）
-        cache_key_images = f"cabinet_images_{shop_config.id}_{folder_id or '0'}_{sort_mode}"
-        
         # 如果强制刷新，先清除缓存
         if force_refresh:
-            cache.delete(cache_key_images)
+            cache_key_images = images_cache_key(shop_config.id, folder_id, sort_mode)
+            get_listing_cache().invalidate(cache_key_images)
             logger.info(f"强制刷新：已清除图片缓存 {cache_key_images}")
-        
-        # 初始化 files_data
-        files_data = []
-        
+
+        stale_result = None
+        etag = None
+
         # 根据参数选择API调用方式
         if search:
             # 搜索不使用缓存，直接调用API
@@ -772,161 +824,93 @@ def get_cabinet_images(request):
             }
             if folder_id:
                 search_params["folder_id"] = int(folder_id)
-            _rate_limit_sleep()
+            rate_limit_sleep()
             result = cabinet_client.search_files(**search_params)
+            if result.get("stale") is True:
+                stale_result = result
             # 从搜索结果中提取文件数据
+            # 无论是否有数据，都进入处理逻辑（空文件夹应返回空列表，而不是错误）
+            files_data = []
             if result.get("success", True):
                 files_data = result.get("data", {}).get("files", [])
+            images = sort_images(files_to_images(files_data), sort_mode)
         else:
-            # 尝试从缓存获取（如果不是强制刷新）
-            cached_images = cache.get(cache_key_images) if not force_refresh else None
-            if cached_images is not None:
-                # 从缓存返回分页数据
-                start_idx = (page - 1) * page_size
-                end_idx = start_idx + page_size
-                page_images = cached_images[start_idx:end_idx]
-                
-                return Response(
-                    {
-                        "success": True,
-                        "data": {
-                            "images": page_images,
-                            "total": len(cached_images),
-                            "page": page,
-                            "pageSize": page_size,
-                        },
-                    },
-                    status=status.HTTP_200_OK,
+            # ETag 在读取列表之前按缓存版本生成
+            if not force_refresh:
+                etag = listing_etag(
+                    images_cache_key(shop_config.id, folder_id, sort_mode),
+                    page,
+                    page_size,
                 )
-            
-            # 获取指定文件夹的所有文件列表并缓存
-            target_folder_id = int(folder_id) if folder_id else 0
-            all_files_data = []
-            current_page = 1
-            page_limit = 100
-            
-            # 循环获取所有图片
-            while True:
-                _rate_limit_sleep()
-                result = cabinet_client.get_folder_files(
-                    folder_id=target_folder_id, 
-                    offset=current_page, 
-                    limit=page_limit
+            # 尝试从缓存获取（如果不是强制刷新），只解码当前页所在的分块
+            cached_page = (
+                load_images_page(
+                    cabinet_client,
+                    shop_config.id,
+                    folder_id,
+                    sort_mode,
+                    (page - 1) * page_size,
+                    page_size,
                 )
-                
-                if not result.get("success", True):
-                    break
-                    
-                page_files = result.get("data", {}).get("files", [])
-                if not page_files:
-                    break
-                    
-                all_files_data.extend(page_files)
-                
-                # 如果返回的数量少于页面大小，说明已经是最后一页
-                if len(page_files) < page_limit:
-                    break
-                    
-                current_page += 1
-            
-            files_data = all_files_data
-
-        # 解析响应数据
-        # 无论是否有数据，都进入处理逻辑（空文件夹应返回空列表，而不是错误）
-        # files_data 已在上面定义
-
-        # 转换格式（使用正确的小写字段名）
-        images = []
-        for file_info in files_data:
-            # 使用正确的字段名（API实际返回的是小写字段名）
-            file_name = file_info.get("file_name", "")  # 用户友好的图片名
-            file_path = file_info.get("file_path", "")  # 系统文件名（包含扩展名）
-            file_url = file_info.get("file_url", "")
-            file_id = file_info.get("file_id", "")
-            file_size = file_info.get("file_size", 0)
-            file_width = file_info.get("file_width", 0)
-            file_height = file_info.get("file_height", 0)
-            timestamp = file_info.get("timestamp", "")
-
-            # 支持所有Rakuten Cabinet支持的图片格式
-            # 使用file_path来判断文件类型，因为它总是包含正确的扩展名
-            supported_extensions = [
-                ".jpg",
-                ".jpeg",
-                ".png",
-                ".gif",
-                ".webp",
-                ".tiff",
-                ".tif",
-                ".bmp",
-            ]
-            is_image = any(
-                file_path.lower().endswith(ext) for ext in supported_extensions
+                if not force_refresh
+                else None
             )
-
-            if is_image and file_url:  # 确保有URL才添加
-                # 显示名称优先使用file_name，如果为空则使用file_path
-                display_name = file_name if file_name.strip() else file_path
-
-                images.append(
-                    {
-                        "id": str(file_id),
-                        "url": file_url,
-                        "filename": display_name,  # 使用友好的显示名称
-                        "size": float(file_size) if file_size else 0,
-                        "width": int(file_width) if file_width else 0,
-                        "height": int(file_height) if file_height else 0,
-                        "mimeType": _guess_mime_type_from_filename(
-                            file_path
-                        ),  # 使用file_path判断MIME类型
-                        "uploadedAt": timestamp,
-                    }
+            if cached_page is not None:
+                page_images, total = cached_page
+                if _not_modified(request, etag):
+                    return _with_etag(HttpResponseNotModified(), etag)
+                # 从缓存返回分页数据
+                return _with_etag(
+                    Response(
+                        {
+                            "success": True,
+                            "data": {
+                                "images": page_images,
+                                "total": total,
+                                "page": page,
+                                "pageSize": page_size,
+                            },
+                        },
+                        status=status.HTTP_200_OK,
+                    ),
+                    etag,
                 )
 
-        # 根据排序模式对图片进行排序
-        def _sort_images(images_list, sort_mode):
-            if sort_mode == "name-asc":
-                return sorted(images_list, key=lambda x: x["filename"].lower())
-            elif sort_mode == "name-desc":
-                return sorted(
-                    images_list, key=lambda x: x["filename"].lower(), reverse=True
-                )
-            elif sort_mode == "date-desc":  # 最新的在前
-                return sorted(
-                    images_list, key=lambda x: x["uploadedAt"] or "", reverse=True
-                )
-            elif sort_mode == "date-asc":  # 最旧的在前
-                return sorted(images_list, key=lambda x: x["uploadedAt"] or "")
-            elif sort_mode == "size-desc":  # 文件大小从大到小
-                return sorted(images_list, key=lambda x: x["size"], reverse=True)
-            elif sort_mode == "size-asc":  # 文件大小从小到大
-                return sorted(images_list, key=lambda x: x["size"])
-            else:
-                return images_list  # 默认不排序
+            # 获取指定文件夹的所有图片并缓存
+            images, stale_result = load_images(
+                cabinet_client,
+                shop_config.id,
+                folder_id,
+                sort_mode,
+                force_refresh=force_refresh,
+            )
 
-        images = _sort_images(images, sort_mode)
+        if stale_result is not None:
+            etag = None
+        if _not_modified(request, etag):
+            return _with_etag(HttpResponseNotModified(), etag)
 
-        # 非搜索模式：缓存所有图片（30分钟）
-        if not search:
-            cache.set(cache_key_images, images, timeout=1800)
-        
         # 返回分页数据
         total = len(images)
         start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
         page_images = images[start_idx:end_idx]
 
-        return Response(
-            {
-                "success": True,
-                "data": {
-                    "images": page_images,
-                    "total": total,
-                    "page": page,
-                    "pageSize": page_size,
+        return _with_etag(
+            Response(
+                {
+                    "success": True,
+                    "data": {
+                        "images": page_images,
+                        "total": total,
+                        "page": page,
+                        "pageSize": page_size,
+                        **_stale_fields(stale_result),
+                    },
                 },
-            },
-            status=status.HTTP_200_OK,
+                status=status.HTTP_200_OK,
+            ),
+            etag,
         )
 
     except RakutenAPIError as e:
@@ -946,30 +930,3 @@ def get_cabinet_images(request):
             {"error": {"code": "INTERNAL_ERROR", "message": f"查询失败: {str(e)}"}},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
-
-
-def _guess_mime_type_from_filename(filename: str) -> str:
-    """
-    根据文件名推断MIME类型
-
-    Args:
-        filename: 文件名
-
-    Returns:
-        MIME类型字符串
-    """
-    if not filename:
-        return "image/jpeg"
-
-    filename_lower = filename.lower()
-
-    if filename_lower.endswith(".jpg") or filename_lower.endswith(".jpeg"):
-        return "image/jpeg"
-    elif filename_lower.endswith(".png"):
-        return "image/png"
-    elif filename_lower.endswith(".gif"):
-        return "image/gif"
-    elif filename_lower.endswith(".webp"):
-        return "image/webp"
-    else:
-        return "image/jpeg"  # 默认值
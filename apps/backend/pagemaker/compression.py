@@ -0,0 +1,83 @@
+"""
+大响应的按需压缩
+
+Cabinet 图片选择器的列表接口（文件夹全量列表、上千张图片的列表）响应可达几百KB。
+这里提供按视图启用的压缩（不作为全局中间件，避免影响流式导出等已自行压缩的接口）：
+
+- 客户端接受 br 且安装了 brotli 时使用 brotli，否则使用 gzip
+- 小于 COMPRESS_MIN_BYTES 的响应、流式响应和已设置 Content-Encoding 的响应不压缩
+- 压缩后强 ETag 改为弱 ETag（与 Django 的 GZipMiddleware 一致），并添加 Vary: Accept-Encoding
+
+用法：
+
+    @compress_large_responses
+    @api_view(["GET"])
+    def view(request): ...
+"""
+
+import re
+
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import decorator_from_middleware
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli 为可选依赖
+    brotli = None
+
+# 小于该字节数的响应不压缩（压缩收益小于额外的CPU开销）
+COMPRESS_MIN_BYTES = 1024
+
+# brotli 压缩质量（0-11；响应是动态生成的，使用中等质量）
+BROTLI_QUALITY = 5
+
+_ACCEPTS_BR = re.compile(r"\bbr\b")
+_ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+def choose_encoding(accept_encoding: str):
+    """按 Accept-Encoding 选择压缩方式（br / gzip / None）"""
+    if brotli is not None and _ACCEPTS_BR.search(accept_encoding):
+        return "br"
+    if _ACCEPTS_GZIP.search(accept_encoding):
+        return "gzip"
+    return None
+
+
+class ResponseCompressionMiddleware(MiddlewareMixin):
+    """压缩较大的响应（brotli 优先，gzip 兜底）"""
+
+    min_length = COMPRESS_MIN_BYTES
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < self.min_length
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if encoding == "br":
+            compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+        else:
+            compressed = compress_string(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+
+compress_large_responses = decorator_from_middleware(ResponseCompressionMiddleware)
@@ -15,6 +15,7 @@ Pagemaker项目统一配置管理模块
 """
 
 import os
+import tempfile
 from typing import Any, Optional, Union, List
 from decouple import config as decouple_config, Csv
 from pathlib import Path
@@ -291,6 +292,132 @@ class ConfigManager:
         """R-Cabinet集成功能是否启用"""
         return self.get_bool("RCABINET_INTEGRATION_ENABLED", default=True)
 
+    @property
+    def CABINET_PREWARM_ON_STARTUP(self) -> bool:
+        """gunicorn启动后是否在后台预热R-Cabinet图片选择器缓存"""
+        return self.get_bool("PAGEMAKER_CABINET_PREWARM_ON_STARTUP", default=True)
+
+    # ==========================================
+    # 监控指标配置
+    # ==========================================
+
+    @property
+    def METRICS_MULTIPROC_DIR(self) -> Optional[str]:
+        """gunicorn多worker指标快照目录（为空时只导出当前进程）"""
+        return decouple_config("PAGEMAKER_METRICS_DIR", default=None)
+
+    @property
+    def METRICS_TOKEN(self) -> Optional[str]:
+        """/metrics 端点的Bearer令牌（为空时不校验）"""
+        return decouple_config("PAGEMAKER_METRICS_TOKEN", default=None)
+
+    @property
+    def RAKUTEN_API_METRICS_ENABLED(self) -> bool:
+        """是否为乐天API/SFTP调用记录埋点指标"""
+        return self.get_bool("RAKUTEN_API_METRICS_ENABLED", default=True)
+
+    @property
+    def RAKUTEN_API_LOG_SAMPLE_RATE(self) -> float:
+        """完整请求/响应载荷写入日志的采样率 (0-1)"""
+        return decouple_config("RAKUTEN_API_LOG_SAMPLE_RATE", default=0.0, cast=float)
+
+    # ==========================================
+    # 性能分析配置
+    # ==========================================
+
+    @property
+    def PROFILING_ENABLED(self) -> bool:
+        """是否启用请求级性能分析中间件"""
+        return self.get_bool("PAGEMAKER_PROFILING_ENABLED", default=False)
+
+    @property
+    def PROFILING_SLOW_REQUEST_MS(self) -> int:
+        """慢请求阈值（毫秒），超过时保存cProfile结果"""
+        return self.get_int("PAGEMAKER_PROFILING_SLOW_MS", default=500)
+
+    @property
+    def PROFILING_SAMPLE_RATE(self) -> float:
+        """启用cProfile采集的请求采样率 (0-1)"""
+        return decouple_config(
+            "PAGEMAKER_PROFILING_SAMPLE_RATE", default=0.0, cast=float
+        )
+
+    # ==========================================
+    # 页面渲染配置
+    # ==========================================
+
+    @property
+    def RENDER_FRAGMENT_CACHE_SIZE(self) -> int:
+        """每个进程缓存的模块HTML片段数上限"""
+        return self.get_int("PAGEMAKER_RENDER_FRAGMENT_CACHE_SIZE", default=5000)
+
+    @property
+    def RENDER_FRAGMENT_SHARED_CACHE(self) -> bool:
+        """
+        模块HTML片段是否同时写入跨worker共享缓存
+
+        默认关闭：每次保存页面都会批量写入片段，文件缓存后端下写入和淘汰开销大，
+        且会挤占降级备份和列表缓存的容量。共享数据缓存使用Redis时可以开启。
+        """
+        return self.get_bool("PAGEMAKER_RENDER_FRAGMENT_SHARED_CACHE", default=False)
+
+    # ==========================================
+    # 页面内容存储配置
+    # ==========================================
+
+    @property
+    def PAGE_CONTENT_COMPRESSION(self) -> bool:
+        """页面内容（模块JSON）写入数据库时是否压缩（已压缩的内容始终可读）"""
+        return self.get_bool("PAGEMAKER_PAGE_CONTENT_COMPRESSION", default=True)
+
+    # ==========================================
+    # 降级策略共享存储配置
+    # ==========================================
+
+    @property
+    def FALLBACK_CACHE_BACKEND(self) -> str:
+        """
+        断路器状态、功能开关和跨worker锁使用的缓存后端（需跨进程共享）
+
+        默认的文件后端只适合单worker或开发环境（add/incr 不是原子操作），
+        多worker部署请使用 django.core.cache.backends.redis.RedisCache。
+        """
+        return decouple_config(
+            "PAGEMAKER_FALLBACK_CACHE_BACKEND",
+            default="django.core.cache.backends.filebased.FileBasedCache",
+        )
+
+    @property
+    def FALLBACK_CACHE_LOCATION(self) -> str:
+        """共享状态缓存位置（文件后端为目录，Redis后端为URL）"""
+        return decouple_config(
+            "PAGEMAKER_FALLBACK_CACHE_LOCATION",
+            default=os.path.join(tempfile.gettempdir(), "pagemaker-fallback-cache"),
+        )
+
+    @property
+    def FALLBACK_DATA_CACHE_BACKEND(self) -> str:
+        """降级响应备份、渲染结果和列表缓存使用的缓存后端（默认与状态缓存相同）"""
+        return decouple_config(
+            "PAGEMAKER_FALLBACK_DATA_CACHE_BACKEND",
+            default=self.FALLBACK_CACHE_BACKEND,
+        )
+
+    @property
+    def FALLBACK_DATA_CACHE_LOCATION(self) -> str:
+        """共享数据缓存位置（文件后端默认为状态缓存目录旁的 -data 目录，其他后端默认与状态缓存相同）"""
+        default = self.FALLBACK_CACHE_LOCATION
+        if self.FALLBACK_DATA_CACHE_BACKEND.endswith("FileBasedCache"):
+            default = f"{default.rstrip(os.sep)}-data"
+        return decouple_config(
+            "PAGEMAKER_FALLBACK_DATA_CACHE_LOCATION", default=default
+        )
+
+    @property
+    def FALLBACK_DATA_CACHE_MAX_ENTRIES(self) -> int:
+        """共享数据缓存的最大条目数（Redis后端按其自身的内存策略淘汰，忽略该值）"""
+        return self.get_int("PAGEMAKER_FALLBACK_DATA_CACHE_MAX_ENTRIES", default=5000)
+
     def validate_rakuten_config(self) -> bool:
         """
         验证乐天API配置是否完整
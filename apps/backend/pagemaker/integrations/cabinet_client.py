@@ -2,6 +2,8 @@
 R-Cabinet API客户端
 """
 
+import hashlib
+import json
 import os
 import time
 import requests
@@ -28,11 +30,27 @@ from .utils import (
     parse_cabinet_xml_response,
     map_http_status_to_exception,
     map_result_code_to_exception,
-    RateLimiter,
+    get_rate_limiter,
     retry_with_backoff,
-    log_api_call,
     validate_credentials,
 )
+from .instrumentation import instrument_call
+from .fallback_strategies import get_fallback_manager
+
+
+def _request_body_size(response) -> int:
+    """获取已发送请求体的字节数"""
+    request = getattr(response, "request", None)
+    body = getattr(request, "body", None)
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    try:
+        return len(body)
+    except TypeError:
+        # 流式请求体无法得知长度
+        return 0
 
 
 class RCabinetClient:
@@ -87,8 +105,13 @@ class RCabinetClient:
             if not valid:
                 raise RakutenConfigError(f"凭据验证失败: {error_msg}")
 
-        # 速率限制器
-        self.rate_limiter = RateLimiter(max_requests_per_second=1.0)
+        # 速率限制器（按许可证在进程内共享，Retry-After 对同一许可证的所有请求生效）
+        self._license_scope = hashlib.sha256(
+            (self.license_key or "").encode("utf-8")
+        ).hexdigest()[:16]
+        self.rate_limiter = get_rate_limiter(
+            f"cabinet:{self._license_scope}", max_requests_per_second=1.0
+        )
 
         self.logger.info(f"R-Cabinet客户端初始化完成 (模式: {self.test_mode})")
 
@@ -165,7 +188,7 @@ class RCabinetClient:
             return self._mock_api_response(endpoint, method, params, data, files)
 
         # 速率限制
-        self.rate_limiter.wait_if_needed()
+        rate_limit_wait = self.rate_limiter.wait_if_needed()
 
         url = urljoin(self.base_url, endpoint)
         headers = self._get_headers()
@@ -174,75 +197,73 @@ class RCabinetClient:
         if files:
             headers.pop("Content-Type", None)
 
-        start_time = time.time()
-        response = None
-        error = None
-
-        try:
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                params=params,
-                data=data,
-                files=files,
-                timeout=self.timeout,
-            )
+        with instrument_call(method, endpoint, logger=self.logger) as span:
+            span.rate_limit_wait_ms = rate_limit_wait * 1000
+            span.record_payload(request={"params": params, "data": data})
+
+            try:
+                response = requests.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    data=data,
+                    files=files,
+                    timeout=self.timeout,
+                )
+            except requests.exceptions.Timeout:
+                raise RakutenConnectionError("请求超时")
+            except requests.exceptions.ConnectionError:
+                raise RakutenConnectionError("连接失败")
+            except requests.exceptions.RequestException as e:
+                raise RakutenConnectionError(f"请求异常: {str(e)}")
 
-            duration = time.time() - start_time
+            span.status_code = response.status_code
+            span.bytes_in = len(response.content)
+            span.bytes_out = _request_body_size(response)
 
             # 检查HTTP状态码
             if response.status_code != HTTP_STATUS_CODES["OK"]:
-                error = map_http_status_to_exception(
-                    response.status_code, response.text
+                raise map_http_status_to_exception(
+                    response.status_code, response.text, response.headers
                 )
-                raise error
 
             # 解析XML响应
             result = parse_cabinet_xml_response(response.text)
+            span.record_payload(response=result)
 
             # 检查API结果码
             if result.get("data", {}).get("result_code") is not None:
                 result_code = result["data"]["result_code"]
+                span.result_code = result_code
                 api_error = map_result_code_to_exception(
                     result_code, result.get("interface_id")
                 )
                 if api_error:
-                    error = api_error
-                    raise error
-
-            # 记录成功日志
-            log_api_call(
-                self.logger,
-                endpoint,
-                method,
-                request_data={"params": params, "data": data},
-                response_data=result,
-                duration=duration,
-            )
+                    raise api_error
 
             return result
 
-        except requests.exceptions.Timeout:
-            error = RakutenConnectionError("请求超时")
-            raise error
-        except requests.exceptions.ConnectionError:
-            error = RakutenConnectionError("连接失败")
-            raise error
-        except requests.exceptions.RequestException as e:
-            error = RakutenConnectionError(f"请求异常: {str(e)}")
-            raise error
-        finally:
-            if error:
-                duration = time.time() - start_time
-                log_api_call(
-                    self.logger,
-                    endpoint,
-                    method,
-                    request_data={"params": params, "data": data},
-                    duration=duration,
-                    error=error,
-                )
+    def _read(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        执行只读请求（经过 cabinet_api 断路器）
+
+        上游维护、故障或断路器开启时返回带 ``stale`` 标记的最近一次成功结果，
+        不会阻塞在不可用的上游上。
+        """
+        if self.test_mode == TEST_MODE["MOCK"]:
+            return self._make_request("GET", endpoint, params=params)
+
+        query = json.dumps(params or {}, sort_keys=True)
+        cache_key = f"cabinet:{self._license_scope}:{endpoint}:{query}"
+        return get_fallback_manager().execute_with_stale_cache(
+            "cabinet_api",
+            cache_key,
+            self._make_request,
+            "GET",
+            endpoint,
+            params=params,
+        )
 
     def _get_interface_id_from_endpoint(self, endpoint: str) -> str:
         """从端点获取接口ID"""
@@ -259,6 +280,8 @@ class RCabinetClient:
         """
         测试与R-Cabinet API的连接
 
+        直接访问上游（不经过降级缓存），不会把过期的备份结果当作连接成功。
+
         Returns:
             连接测试结果
 
@@ -266,7 +289,7 @@ class RCabinetClient:
             RakutenAPIError: 连接测试失败时
         """
         try:
-            result = self.get_usage()
+            result = self._make_request("GET", CABINET_ENDPOINTS["USAGE_GET"])
             return {
                 "success": True,
                 "message": "R-Cabinet API连接测试成功",
@@ -292,7 +315,7 @@ class RCabinetClient:
         Returns:
             使用状况数据
         """
-        return self._make_request("GET", CABINET_ENDPOINTS["USAGE_GET"])
+        return self._read(CABINET_ENDPOINTS["USAGE_GET"])
 
     def get_folders(self, offset: int = 1, limit: int = 100) -> Dict[str, Any]:
         """
@@ -311,9 +334,7 @@ class RCabinetClient:
         if limit != 100:
             params["limit"] = min(limit, 100)
 
-        return self._make_request(
-            "GET", CABINET_ENDPOINTS["FOLDERS_GET"], params=params
-        )
+        return self._read(CABINET_ENDPOINTS["FOLDERS_GET"], params=params)
 
     def get_folder_files(
         self, folder_id: int, offset: int = 1, limit: int = 100
@@ -335,9 +356,7 @@ class RCabinetClient:
         if limit != 100:
             params["limit"] = min(limit, 100)
 
-        return self._make_request(
-            "GET", CABINET_ENDPOINTS["FOLDER_FILES_GET"], params=params
-        )
+        return self._read(CABINET_ENDPOINTS["FOLDER_FILES_GET"], params=params)
 
     def search_files(
         self,
@@ -388,9 +407,7 @@ class RCabinetClient:
         if limit != 100:
             params["limit"] = min(limit, 100)
 
-        return self._make_request(
-            "GET", CABINET_ENDPOINTS["FILES_SEARCH"], params=params
-        )
+        return self._read(CABINET_ENDPOINTS["FILES_SEARCH"], params=params)
 
     def get_license_expiry_date(self) -> Dict[str, Any]:
         """
@@ -409,12 +426,21 @@ class RCabinetClient:
         headers = self._get_headers()
         
         try:
-            response = requests.get(
-                url,
-                headers=headers,
-                params=params,
-                timeout=self.timeout,
-            )
+            with instrument_call(
+                "GET", LICENSE_ENDPOINTS["EXPIRY_DATE"], logger=self.logger
+            ) as span:
+                response = requests.get(
+                    url,
+                    headers=headers,
+                    params=params,
+                    timeout=self.timeout,
+                )
+                span.status_code = response.status_code
+                span.bytes_in = len(response.content)
+                if response.status_code != 200:
+                    span.error = map_http_status_to_exception(
+                        response.status_code, response.text
+                    )
             
             if response.status_code == 200:
                 # 解析JSON响应
@@ -440,12 +466,14 @@ class RCabinetClient:
         """
         健康检查
 
+        直接访问上游（不经过降级缓存），上游不可用时如实报告为 unhealthy。
+
         Returns:
             健康检查结果
         """
         try:
             start_time = time.time()
-            result = self.get_usage()
+            result = self._make_request("GET", CABINET_ENDPOINTS["USAGE_GET"])
             duration = time.time() - start_time
 
             return {
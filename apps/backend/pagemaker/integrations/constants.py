@@ -123,6 +123,70 @@ RETRY_CONFIG = {
     "BASE_DELAY": 1,
     "MAX_DELAY": 60,
     "BACKOFF_FACTOR": 2,
+    "BUDGET_CAPACITY": 20,  # 进程级重试预算的令牌上限
+    "BUDGET_DEPOSIT_RATIO": 0.2,  # 每次调用存入的令牌（重试量最多为调用量的20%）
+    "BUDGET_REFILL_PER_SECOND": 0.5,  # 按时间补充的令牌，低流量时也允许少量重试
+}
+
+# SFTP连接池配置
+SFTP_POOL_CONFIG = {
+    "MAX_SIZE": 4,  # 每个店铺（主机+用户）最多保持的连接数
+    "IDLE_TIMEOUT": 300,  # 空闲连接保留时间（秒）
+    "CHECKOUT_TIMEOUT": 30,  # 连接池耗尽时等待可用连接的时间（秒）
+    "LIVENESS_CHECK_INTERVAL": 30,  # 空闲超过该时间的连接借出前执行 stat('.') 探活（秒）
+    "KEEPALIVE_INTERVAL": 30,  # SSH传输层keepalive间隔（秒）
+}
+
+# SFTP批量传输配置
+SFTP_TRANSFER_CONFIG = {
+    "CONCURRENCY": 4,  # 并发SFTP通道数（受连接池 MAX_SIZE 限制）
+    "WINDOW_SIZE": 16 * 1024 * 1024,  # SSH通道窗口大小（字节），减少高延迟链路上的等待
+    "MAX_PACKET_SIZE": 32768,  # SSH最大包大小（字节）
+    "MAX_ATTEMPTS": 3,  # 单个文件的最大尝试次数
+    "TEMP_SUFFIX": ".part",  # 上传中的临时文件后缀，完成后原子重命名
+}
+
+# 降级策略配置
+FALLBACK_CONFIG = {
+    "CACHE_ALIAS": "fallback",  # 跨worker共享状态（断路器、开关、锁）使用的Django缓存别名（不存在时退化为进程内）
+    "DATA_CACHE_ALIAS": "fallback_data",  # 跨worker共享数据（降级备份、渲染结果、列表）使用的Django缓存别名
+    "KEY_PREFIX": "rakuten:fallback",  # 共享缓存键前缀
+    "FAILURE_THRESHOLD": 5,  # 断路器开启前允许的连续失败次数
+    "RECOVERY_TIMEOUT": 60,  # 断路器开启后进入半开状态前的等待时间（秒）
+    "FAILURE_WINDOW": 60,  # 失败计数的有效期（秒），过期后重新计数
+    "RESPONSE_CACHE_MAX_ENTRIES": 512,  # 进程内响应缓存的最大条目数（LRU淘汰）
+    "RESPONSE_CACHE_TTL": 300,  # 响应缓存默认有效期（秒）
+    "SWEEP_INTERVAL": 60,  # 后台清理过期缓存条目的间隔（秒）
+    "STALE_TTL": 24 * 60 * 60,  # 读操作结果作为过期备份保留的时间（秒）
+    "STALE_REWRITE_INTERVAL": 10
+    * 60,  # 过期备份的最短重写间隔（秒），避免每次读取都写共享存储
+    "DEGRADED_STATUS_TTL": 60,  # 检测到维护(1001)后标记服务降级的时间（秒）
+}
+
+# 单飞（请求合并）配置
+SINGLE_FLIGHT_CONFIG = {
+    "KEY_PREFIX": "rakuten:singleflight",  # 跨worker锁的缓存键前缀
+    "LOCK_TIMEOUT": 120,  # 锁有效期（秒），应大于一次全量拉取的耗时
+    "WAIT_TIMEOUT": 60,  # 等待其他worker完成获取的最长时间（秒）
+    "POLL_INTERVAL": 0.2,  # 等待其他worker时的轮询间隔（秒）
+}
+
+# 缓存后台刷新调度器配置
+REFRESH_SCHEDULER_CONFIG = {
+    "MAX_WORKERS": 2,  # 每个worker进程的刷新线程数（R-Cabinet限速1 req/s，无需更多）
+    "MAX_QUEUE": 100,  # 排队刷新任务上限
+    "MIN_INTERVAL": 30,  # 同一缓存键两次刷新的最小间隔（秒）
+    "HISTORY_SIZE": 500,  # 保留最近刷新记录的缓存键数量
+    "SHUTDOWN_TIMEOUT": 3,  # worker退出时等待正在进行的刷新的时间（秒）
+}
+
+# 两级列表缓存配置（R-Cabinet文件夹树、图片列表）
+LISTING_CACHE_CONFIG = {
+    "KEY_PREFIX": "rakuten:listing",  # 共享层缓存键前缀
+    "CHUNK_SIZE": 200,  # 每个分块的条目数（分页读取只解码覆盖的分块）
+    "LOCAL_MAX_CHUNKS": 256,  # 每个进程缓存的已解码分块上限
+    "COMPRESS_LEVEL": 6,  # zlib 压缩级别
+    "TIMEOUT": 1800,  # 默认有效期（秒）
 }
 
 # 日志配置
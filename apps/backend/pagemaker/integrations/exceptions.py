@@ -105,3 +105,10 @@ class RakutenConfigError(RakutenAPIError):
 
     def __init__(self, message: str = "乐天API配置错误", details: dict = None):
         super().__init__(message, "RAKUTEN_CONFIG_ERROR", details)
+
+
+class RakutenCircuitOpenError(RakutenAPIError):
+    """断路器开启，调用被直接拒绝（未访问上游）"""
+
+    def __init__(self, message: str = "断路器开启，服务不可用", details: dict = None):
+        super().__init__(message, "RAKUTEN_CIRCUIT_OPEN", details)
@@ -1,17 +1,47 @@
 """
 乐天API集成降级和备用方案模块
+
+断路器状态、功能开关和降级缓存保存在共享存储中，gunicorn的任意一个worker
+观察到上游故障，所有worker都会立即停止访问上游。共享存储分为两个Django缓存别名：
+
+- FALLBACK_CONFIG["CACHE_ALIAS"]：断路器、功能开关、服务状态、跨worker锁等
+  少量状态键
+- FALLBACK_CONFIG["DATA_CACHE_ALIAS"]：降级响应备份、渲染结果、列表缓存等数据，
+  有独立的容量上限，数据写满淘汰时不会删除状态键
+
+多worker部署应使用Redis后端：文件缓存后端的 add/incr 不是原子操作。
 """
 
+import hashlib
 import json
 import time
+import uuid
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from enum import Enum
-from threading import Lock
+from threading import Event, Lock, Thread
+
+from django.core.cache import InvalidCacheBackendError
+from django.core.exceptions import ImproperlyConfigured
 
 from .utils import setup_logger
-from .constants import CABINET_RESULT_CODES, HTTP_STATUS_CODES
-from .exceptions import RakutenAPIError, RakutenConnectionError
+from .constants import CABINET_RESULT_CODES, FALLBACK_CONFIG, HTTP_STATUS_CODES
+from .exceptions import (
+    RakutenAPIError,
+    RakutenCircuitOpenError,
+    RakutenConnectionError,
+    RakutenServerError,
+    RakutenServiceUnavailableError,
+)
+
+# 视为上游故障的异常：计入断路器失败次数，并允许返回过期缓存
+# （参数错误、认证错误等调用方问题不在此列）
+UPSTREAM_FAILURES = (
+    RakutenConnectionError,
+    RakutenServerError,
+    RakutenServiceUnavailableError,
+)
 
 
 class ServiceStatus(Enum):
@@ -41,14 +71,193 @@ class CircuitBreakerState(Enum):
     HALF_OPEN = "half_open"  # 半开状态
 
 
+_local_caches = {}
+
+
+def _get_cache(alias: str, max_entries: int):
+    """获取Django缓存别名；未配置该别名或不在Django环境中时退化为进程内缓存"""
+    try:
+        from django.core.cache import caches
+
+        return caches[alias]
+    except (InvalidCacheBackendError, ImproperlyConfigured):
+        if alias not in _local_caches:
+            from django.core.cache.backends.locmem import LocMemCache
+
+            _local_caches[alias] = LocMemCache(
+                f"rakuten-{alias}",
+                {"TIMEOUT": None, "OPTIONS": {"MAX_ENTRIES": max_entries}},
+            )
+        return _local_caches[alias]
+
+
+def get_shared_cache():
+    """
+    获取跨worker共享的状态存储（断路器、功能开关、锁）
+
+    使用 FALLBACK_CONFIG["CACHE_ALIAS"] 对应的Django缓存（文件、数据库或Redis后端
+    可在gunicorn各worker之间共享）。
+    """
+    return _get_cache(FALLBACK_CONFIG["CACHE_ALIAS"], 1000)
+
+
+def get_shared_data_cache():
+    """
+    获取跨worker共享的数据存储（降级响应备份、渲染结果、列表缓存）
+
+    使用 FALLBACK_CONFIG["DATA_CACHE_ALIAS"] 对应的Django缓存，与状态存储分开，
+    数据条目的淘汰不会影响断路器状态和锁。
+    """
+    return _get_cache(FALLBACK_CONFIG["DATA_CACHE_ALIAS"], 5000)
+
+
+def is_atomic_cache(store) -> bool:
+    """
+    缓存后端的 add 是否为原子操作（跨worker锁需要）
+
+    文件缓存先检查再写入，多个进程可能同时 add 成功；Redis、Memcached、
+    数据库和进程内缓存的 add 是原子的。
+    """
+    from django.core.cache.backends.dummy import DummyCache
+    from django.core.cache.backends.filebased import FileBasedCache
+
+    return not isinstance(store, (FileBasedCache, DummyCache))
+
+
+class LRUTTLCache:
+    """线程安全、有容量上限的LRU缓存，条目带有效期"""
+
+    def __init__(self, max_entries: int = None, default_ttl: int = None):
+        """
+        Args:
+            max_entries: 最大条目数，超出时淘汰最久未使用的条目
+            default_ttl: 默认有效期（秒）
+        """
+        self.max_entries = max_entries or FALLBACK_CONFIG["RESPONSE_CACHE_MAX_ENTRIES"]
+        self.default_ttl = default_ttl or FALLBACK_CONFIG["RESPONSE_CACHE_TTL"]
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        expires_at = time.time() + (ttl if ttl is not None else self.default_ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def sweep(self) -> int:
+        """删除所有过期条目，返回删除数量"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_v, exp) in self._data.items() if exp <= now]
+            for key in expired:
+                del self._data[key]
+            self.expirations += len(expired)
+        return len(expired)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._data.keys())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class CacheSweeper:
+    """定期清理过期缓存条目的后台线程"""
+
+    def __init__(self, cache: LRUTTLCache, interval: float = None):
+        self.cache = cache
+        self.interval = interval or FALLBACK_CONFIG["SWEEP_INTERVAL"]
+        self._stopped = Event()
+        self._thread = None
+        self.logger = setup_logger("rakuten.fallback")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stopped.clear()
+        self._thread = Thread(
+            target=self._run, name="fallback-cache-sweeper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                removed = self.cache.sweep()
+                if removed:
+                    self.logger.debug(f"清理过期降级缓存 {removed} 条")
+            except Exception as e:
+                self.logger.error(f"清理降级缓存失败: {e}")
+
+
 class CircuitBreaker:
-    """断路器实现"""
+    """
+    断路器实现
+
+    状态保存在共享存储中，任意一个worker观察到的连续失败都会让所有worker的
+    断路器开启；半开状态下全体worker只放行一个探测请求。
+    """
 
     def __init__(
         self,
-        failure_threshold: int = 5,
-        recovery_timeout: int = 60,
+        failure_threshold: int = None,
+        recovery_timeout: int = None,
         expected_exception: Exception = RakutenAPIError,
+        name: str = None,
+        store=None,
     ):
         """
         初始化断路器
@@ -57,22 +266,70 @@ class CircuitBreaker:
             failure_threshold: 失败阈值
             recovery_timeout: 恢复超时时间（秒）
             expected_exception: 预期的异常类型
+            name: 断路器名称（共享状态的键）；为空时状态只保存在本实例中
+            store: 共享存储（Django缓存接口），默认使用 get_shared_cache()
         """
-        self.failure_threshold = failure_threshold
-        self.recovery_timeout = recovery_timeout
+        self.failure_threshold = (
+            failure_threshold or FALLBACK_CONFIG["FAILURE_THRESHOLD"]
+        )
+        self.recovery_timeout = (
+            recovery_timeout
+            if recovery_timeout is not None
+            else FALLBACK_CONFIG["RECOVERY_TIMEOUT"]
+        )
         self.expected_exception = expected_exception
+        self.name = name
+
+        if store is None and name is None:
+            from django.core.cache.backends.locmem import LocMemCache
 
-        self.failure_count = 0
-        self.last_failure_time = None
-        self.state = CircuitBreakerState.CLOSED
+            store = LocMemCache(f"circuit-breaker-{uuid.uuid4().hex}", {})
+        self._store = store
+        self._key_prefix = f"{FALLBACK_CONFIG['KEY_PREFIX']}:cb:{name or 'local'}"
+        # 本进程记录过失败时，成功后需要清除共享失败计数
+        self._has_local_failures = False
         self.lock = Lock()
 
         self.logger = setup_logger("rakuten.circuit_breaker")
 
+    @property
+    def store(self):
+        return self._store if self._store is not None else get_shared_cache()
+
+    def _key(self, suffix: str) -> str:
+        return f"{self._key_prefix}:{suffix}"
+
+    @property
+    def state(self) -> CircuitBreakerState:
+        return self.state_for(self.store.get(self.opened_at_key))
+
+    @property
+    def opened_at_key(self) -> str:
+        """断路器开启时间的共享存储键（供调用方与其他键一起批量读取）"""
+        return self._key("opened_at")
+
+    def state_for(self, opened_at: Optional[float]) -> CircuitBreakerState:
+        """根据开启时间计算断路器状态"""
+        if opened_at is None:
+            return CircuitBreakerState.CLOSED
+        if time.time() - opened_at < self.recovery_timeout:
+            return CircuitBreakerState.OPEN
+        return CircuitBreakerState.HALF_OPEN
+
+    @property
+    def failure_count(self) -> int:
+        return self.store.get(self._key("failures"), 0)
+
+    @property
+    def last_failure_time(self) -> Optional[float]:
+        return self.store.get(self._key("last_failure"))
+
     def call(self, func, *args, **kwargs):
         """
         通过断路器调用函数
 
+        断路器开启时立即抛出异常，不会访问上游；被调用函数在锁外执行。
+
         Args:
             func: 要调用的函数
             *args: 位置参数
@@ -82,57 +339,111 @@ class CircuitBreaker:
             函数调用结果
 
         Raises:
-            RakutenAPIError: 当断路器开启时
+            RakutenCircuitOpenError: 当断路器开启时
         """
-        with self.lock:
-            if self.state == CircuitBreakerState.OPEN:
-                if self._should_attempt_reset():
-                    self.state = CircuitBreakerState.HALF_OPEN
-                    self.logger.info("断路器进入半开状态")
-                else:
-                    raise RakutenAPIError("断路器开启，服务不可用")
-
-            try:
-                result = func(*args, **kwargs)
-                self._on_success()
-                return result
-            except self.expected_exception:
-                self._on_failure()
-                raise
+        store = self.store
+        probing = False
+        opened_at = store.get(self._key("opened_at"))
+        if opened_at is not None:
+            elapsed = time.time() - opened_at
+            if elapsed < self.recovery_timeout:
+                raise RakutenCircuitOpenError(
+                    details={
+                        "circuit": self.name,
+                        "retry_after": round(self.recovery_timeout - elapsed, 1),
+                    }
+                )
+            # 半开：所有worker中只有抢到探测令牌的一个请求访问上游
+            # 探测令牌过期后（例如持有者进程退出）其他worker可以重新探测
+            probe_timeout = max(self.recovery_timeout, 1)
+            if not store.add(self._key("probe"), 1, timeout=probe_timeout):
+                raise RakutenCircuitOpenError(
+                    details={"circuit": self.name, "retry_after": 0}
+                )
+            probing = True
+            self.logger.info(f"断路器 {self.name} 进入半开状态")
+
+        try:
+            result = func(*args, **kwargs)
+        except self.expected_exception:
+            self._on_failure(store, probing)
+            raise
+        except BaseException:
+            if probing:
+                store.delete(self._key("probe"))
+            raise
+
+        self._on_success(store, probing)
+        return result
+
+    def _on_success(self, store, probing: bool):
+        """成功时的处理"""
+        if probing:
+            store.delete_many(
+                [self._key(k) for k in ("opened_at", "probe", "failures")]
+            )
+            self.logger.info(f"断路器 {self.name} 重置为关闭状态")
+        elif self._has_local_failures:
+            store.delete(self._key("failures"))
+        self._has_local_failures = False
 
-    def _should_attempt_reset(self) -> bool:
-        """检查是否应该尝试重置断路器"""
-        return (
-            self.last_failure_time
-            and time.time() - self.last_failure_time >= self.recovery_timeout
+    def _on_failure(self, store, probing: bool):
+        """失败时的处理"""
+        now = time.time()
+        window = FALLBACK_CONFIG["FAILURE_WINDOW"]
+        self._has_local_failures = True
+        store.set(self._key("last_failure"), now, timeout=None)
+
+        # add + incr 在Redis/数据库后端上是原子的；文件后端偶有竞争时只会少计数
+        store.add(self._key("failures"), 0, timeout=window)
+        try:
+            failure_count = store.incr(self._key("failures"))
+        except ValueError:
+            store.set(self._key("failures"), 1, timeout=window)
+            failure_count = 1
+
+        if probing or failure_count >= self.failure_threshold:
+            store.set(self._key("opened_at"), now, timeout=None)
+            store.delete(self._key("probe"))
+            self.logger.warning(f"断路器 {self.name} 开启，失败次数: {failure_count}")
+
+    def reset(self):
+        """重置为关闭状态（所有worker生效）"""
+        self.store.delete_many(
+            [self._key(k) for k in ("opened_at", "probe", "failures", "last_failure")]
         )
+        self._has_local_failures = False
 
-    def _on_success(self):
-        """成功时的处理"""
-        self.failure_count = 0
-        if self.state == CircuitBreakerState.HALF_OPEN:
-            self.state = CircuitBreakerState.CLOSED
-            self.logger.info("断路器重置为关闭状态")
 
-    def _on_failure(self):
-        """失败时的处理"""
-        self.failure_count += 1
-        self.last_failure_time = time.time()
+class FallbackManager:
+    """
+    降级管理器
 
-        if self.failure_count >= self.failure_threshold:
-            self.state = CircuitBreakerState.OPEN
-            self.logger.warning(f"断路器开启，失败次数: {self.failure_count}")
+    断路器状态、功能开关、服务状态写入共享状态存储，响应缓存写入共享数据存储，
+    对所有worker生效；响应缓存另有一份进程内LRU副本，命中时无需访问共享存储。
+    """
 
+    SERVICES = ["cabinet_api", "license_api", "ftp_service"]
 
-class FallbackManager:
-    """降级管理器"""
+    def __init__(self, store=None, start_sweeper: bool = True, data_store=None):
+        """
+        初始化降级管理器
 
-    def __init__(self):
-        """初始化降级管理器"""
+        Args:
+            store: 共享状态存储（Django缓存接口），默认使用 get_shared_cache()
+            start_sweeper: 首次写入响应缓存时是否启动后台清理线程
+            data_store: 响应缓存使用的共享数据存储，默认与 store 相同；
+                两者都未指定时使用 get_shared_data_cache()
+        """
         self.logger = setup_logger("rakuten.fallback")
-        self.service_status = {}
+        self._store = store
+        self._data_store = data_store if data_store is not None else store
+        self._key_prefix = FALLBACK_CONFIG["KEY_PREFIX"]
+        self._known_services = set(self.SERVICES)
         self.circuit_breakers = {}
-        self.cache = {}
+        self.cache = LRUTTLCache()
+        self.sweeper = CacheSweeper(self.cache)
+        self._start_sweeper = start_sweeper
         self.feature_flags = {}
         self.lock = Lock()
 
@@ -144,17 +455,25 @@ class FallbackManager:
 
         self.logger.info("降级管理器初始化完成")
 
+    @property
+    def store(self):
+        return self._store if self._store is not None else get_shared_cache()
+
+    @property
+    def data_store(self):
+        if self._data_store is not None:
+            return self._data_store
+        return get_shared_data_cache()
+
     def _init_circuit_breakers(self):
         """初始化断路器"""
-        services = ["cabinet_api", "license_api", "ftp_service"]
-
-        for service in services:
+        for service in self.SERVICES:
             self.circuit_breakers[service] = CircuitBreaker(
-                failure_threshold=5, recovery_timeout=60
+                name=service, store=self._store, expected_exception=UPSTREAM_FAILURES
             )
 
     def _init_feature_flags(self):
-        """初始化功能开关"""
+        """初始化功能开关（默认值；运行时修改保存在共享存储中）"""
         self.feature_flags = {
             "cabinet_api_enabled": True,
             "license_api_enabled": True,
@@ -163,6 +482,16 @@ class FallbackManager:
             "cache_fallback_enabled": True,
         }
 
+    def _flag_key(self, feature_name: str) -> str:
+        return f"{self._key_prefix}:flag:{feature_name}"
+
+    def _status_key(self, service_name: str) -> str:
+        return f"{self._key_prefix}:status:{service_name}"
+
+    def _response_key(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        return f"{self._key_prefix}:resp:{digest}"
+
     def execute_with_fallback(
         self, service_name: str, primary_func, fallback_func=None, *args, **kwargs
     ):
@@ -212,77 +541,240 @@ class FallbackManager:
                 else:
                     raise
 
-    def set_service_status(self, service_name: str, status: ServiceStatus):
-        """设置服务状态"""
-        with self.lock:
-            self.service_status[service_name] = {
-                "status": status,
-                "updated_at": time.time(),
+    def execute_with_stale_cache(
+        self, service_name: str, cache_key: str, primary_func, *args, **kwargs
+    ):
+        """
+        执行读操作，上游不可用时返回过期缓存
+
+        服务健康时总是访问上游，并把结果保存为备份；功能被禁用、服务处于降级/维护
+        状态或断路器开启时，直接返回备份（不访问上游，也不等待限速）。
+        返回的过期数据带有 ``stale``、``stale_reason`` 和 ``cached_at`` 标记。
+
+        Args:
+            service_name: 服务名称
+            cache_key: 备份缓存键（需包含店铺和请求参数）
+            primary_func: 读操作函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            最新结果或带过期标记的缓存结果
+
+        Raises:
+            RakutenAPIError: 上游不可用且没有可用的缓存时
+        """
+        reason = self._degraded_reason(service_name)
+        if reason is not None:
+            stale = self._stale_response(cache_key, reason)
+            if stale is not None:
+                return stale
+            if reason == "disabled":
+                raise RakutenAPIError(f"服务 {service_name} 已禁用且无缓存数据")
+
+        circuit_breaker = self.circuit_breakers.get(service_name)
+        try:
+            if circuit_breaker:
+                result = circuit_breaker.call(primary_func, *args, **kwargs)
+            else:
+                result = primary_func(*args, **kwargs)
+        except UPSTREAM_FAILURES + (RakutenCircuitOpenError,) as e:
+            if isinstance(e, RakutenServiceUnavailableError):
+                # 维护中：所有worker在一段时间内直接使用缓存
+                self.set_service_status(
+                    service_name,
+                    ServiceStatus.MAINTENANCE,
+                    ttl=FALLBACK_CONFIG["DEGRADED_STATUS_TTL"],
+                )
+            stale = self._stale_response(
+                cache_key,
+                (
+                    "circuit_open"
+                    if isinstance(e, RakutenCircuitOpenError)
+                    else "upstream_error"
+                ),
+            )
+            if stale is None:
+                raise
+            self.logger.warning(f"服务 {service_name} 不可用，返回过期缓存: {e}")
+            return stale
+
+        if reason is not None:
+            self.set_service_status(service_name, ServiceStatus.HEALTHY)
+        self._backup_response(cache_key, result)
+        return result
+
+    def _backup_response(self, cache_key: str, result: Any):
+        """
+        保存读操作结果作为过期备份
+
+        共享数据存储可能是文件缓存，每次写入都是一次文件写；备份在
+        STALE_REWRITE_INTERVAL 内写过时跳过（优先命中进程内LRU），
+        之后再重写以延长有效期并更新内容。
+        """
+        entry = self.get_cached_entry(cache_key)
+        if (
+            entry is not None
+            and time.time() - entry["stored_at"]
+            < FALLBACK_CONFIG["STALE_REWRITE_INTERVAL"]
+        ):
+            return
+        self.cache_response(cache_key, result, ttl=FALLBACK_CONFIG["STALE_TTL"])
+
+    def _degraded_reason(self, service_name: str) -> Optional[str]:
+        """服务当前不应访问上游的原因（正常时为None）"""
+        flag_key = self._flag_key(f"{service_name}_enabled")
+        status_key = self._status_key(service_name)
+        circuit_breaker = self.circuit_breakers.get(service_name)
+        keys = [flag_key, status_key]
+        if circuit_breaker is not None:
+            keys.append(circuit_breaker.opened_at_key)
+        # 开关、服务状态和断路器状态一次读取，避免每次读操作多次访问共享存储
+        values = self.store.get_many(keys)
+
+        enabled = values.get(flag_key)
+        if enabled is None:
+            enabled = self.feature_flags.get(f"{service_name}_enabled", False)
+        if not enabled:
+            return "disabled"
+        service_info = values.get(status_key)
+        if service_info and service_info["status"] != ServiceStatus.HEALTHY.value:
+            return service_info["status"]
+        if (
+            circuit_breaker is not None
+            and circuit_breaker.state_for(values.get(circuit_breaker.opened_at_key))
+            == CircuitBreakerState.OPEN
+        ):
+            return "circuit_open"
+        return None
+
+    def _stale_response(self, cache_key: str, reason: str) -> Optional[Any]:
+        """读取备份缓存并加上过期标记"""
+        if not self.is_feature_enabled("cache_fallback_enabled"):
+            return None
+        entry = self.get_cached_entry(cache_key)
+        if entry is None:
+            return None
+        data = entry["data"]
+        if isinstance(data, dict):
+            data = {
+                **data,
+                "stale": True,
+                "stale_reason": reason,
+                "cached_at": entry["stored_at"],
             }
-            self.logger.info(f"服务 {service_name} 状态更新为: {status.value}")
+        return data
+
+    def set_service_status(
+        self, service_name: str, status: ServiceStatus, ttl: int = None
+    ):
+        """
+        设置服务状态
+
+        Args:
+            service_name: 服务名称
+            status: 服务状态
+            ttl: 状态有效期（秒），过期后视为未知；为空时一直有效
+        """
+        with self.lock:
+            self._known_services.add(service_name)
+        self.store.set(
+            self._status_key(service_name),
+            {"status": status.value, "updated_at": time.time()},
+            timeout=ttl,
+        )
+        self.logger.info(f"服务 {service_name} 状态更新为: {status.value}")
 
     def get_service_status(self, service_name: str) -> Optional[ServiceStatus]:
         """获取服务状态"""
-        with self.lock:
-            service_info = self.service_status.get(service_name)
-            if service_info:
-                return service_info["status"]
-            return None
+        service_info = self.store.get(self._status_key(service_name))
+        if service_info:
+            return ServiceStatus(service_info["status"])
+        return None
 
     def is_feature_enabled(self, feature_name: str) -> bool:
         """检查功能是否启用"""
-        return self.feature_flags.get(feature_name, False)
+        enabled = self.store.get(self._flag_key(feature_name))
+        if enabled is None:
+            return self.feature_flags.get(feature_name, False)
+        return enabled
 
     def enable_feature(self, feature_name: str):
         """启用功能"""
-        with self.lock:
-            self.feature_flags[feature_name] = True
-            self.logger.info(f"功能 {feature_name} 已启用")
+        self.store.set(self._flag_key(feature_name), True, timeout=None)
+        self.logger.info(f"功能 {feature_name} 已启用")
 
     def disable_feature(self, feature_name: str):
         """禁用功能"""
-        with self.lock:
-            self.feature_flags[feature_name] = False
-            self.logger.warning(f"功能 {feature_name} 已禁用")
+        self.store.set(self._flag_key(feature_name), False, timeout=None)
+        self.logger.warning(f"功能 {feature_name} 已禁用")
 
-    def cache_response(self, key: str, response: Any, ttl: int = 300):
-        """缓存响应"""
-        with self.lock:
-            self.cache[key] = {"data": response, "expires_at": time.time() + ttl}
+    def cache_response(self, key: str, response: Any, ttl: int = None):
+        """缓存响应（写入进程内LRU和共享存储）"""
+        ttl = ttl or FALLBACK_CONFIG["RESPONSE_CACHE_TTL"]
+        now = time.time()
+        entry = {"data": response, "stored_at": now, "expires_at": now + ttl}
+        self.cache.set(key, entry, ttl)
+        self.data_store.set(self._response_key(key), entry, timeout=ttl)
+
+        if self._start_sweeper and not self.sweeper.running:
+            self.sweeper.start()
+
+    def get_cached_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        获取缓存条目（进程内未命中时读取其他worker写入的共享缓存）
+
+        Returns:
+            {"data", "stored_at", "expires_at"}，不存在或已过期时为None
+        """
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = self.data_store.get(self._response_key(key))
+            if entry is None:
+                return None
+            remaining = entry["expires_at"] - time.time()
+            if remaining <= 0:
+                return None
+            self.cache.set(key, entry, remaining)
+        return entry
 
     def get_cached_response(self, key: str) -> Optional[Any]:
         """获取缓存响应"""
-        with self.lock:
-            cached = self.cache.get(key)
-            if cached and cached["expires_at"] > time.time():
-                return cached["data"]
-            elif cached:
-                # 缓存过期，删除
-                del self.cache[key]
-            return None
+        entry = self.get_cached_entry(key)
+        return entry["data"] if entry is not None else None
+
+    def shutdown(self):
+        """停止后台清理线程"""
+        self.sweeper.stop()
 
     def get_fallback_status(self) -> Dict[str, Any]:
         """获取降级状态"""
         with self.lock:
-            return {
-                "service_status": {
-                    name: {
-                        "status": info["status"].value,
-                        "updated_at": info["updated_at"],
-                    }
-                    for name, info in self.service_status.items()
-                },
-                "circuit_breakers": {
-                    name: {
-                        "state": cb.state.value,
-                        "failure_count": cb.failure_count,
-                        "last_failure_time": cb.last_failure_time,
-                    }
-                    for name, cb in self.circuit_breakers.items()
-                },
-                "feature_flags": self.feature_flags.copy(),
-                "cache_keys": list(self.cache.keys()),
-            }
+            services = sorted(self._known_services)
+        statuses = self.store.get_many([self._status_key(s) for s in services])
+        flags = self.store.get_many([self._flag_key(f) for f in self.feature_flags])
+
+        return {
+            "service_status": {
+                name: statuses[self._status_key(name)]
+                for name in services
+                if self._status_key(name) in statuses
+            },
+            "circuit_breakers": {
+                name: {
+                    "state": cb.state.value,
+                    "failure_count": cb.failure_count,
+                    "last_failure_time": cb.last_failure_time,
+                }
+                for name, cb in self.circuit_breakers.items()
+            },
+            "feature_flags": {
+                name: flags.get(self._flag_key(name), default)
+                for name, default in self.feature_flags.items()
+            },
+            "cache_keys": self.cache.keys(),
+            "cache": self.cache.stats(),
+        }
 
 
 class EmergencyProcedures:
@@ -322,11 +814,7 @@ class EmergencyProcedures:
         self.logger.warning("重置所有断路器")
 
         for name, cb in self.fallback_manager.circuit_breakers.items():
-            with cb.lock:
-                cb.failure_count = 0
-                cb.last_failure_time = None
-                cb.state = CircuitBreakerState.CLOSED
-
+            cb.reset()
             self.logger.info(f"断路器 {name} 已重置")
 
     def generate_emergency_report(self) -> str:
@@ -2,15 +2,24 @@
 乐天SFTP连接客户端
 """
 
+import hashlib
 import os
 import time
 import paramiko
+from contextlib import contextmanager
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
-from .constants import TEST_MODE, RETRY_CONFIG
+from .constants import (
+    TEST_MODE,
+    RETRY_CONFIG,
+    SFTP_POOL_CONFIG,
+    SFTP_TRANSFER_CONFIG,
+)
 from .exceptions import RakutenFTPError, RakutenConnectionError, RakutenConfigError
-from .utils import setup_logger, retry_with_backoff, log_api_call
+from .utils import setup_logger, retry_with_backoff
+from .instrumentation import instrument_call
+from .sftp_pool import PooledSFTPConnection, SFTPConnectionPool, get_sftp_pool
 
 
 class RakutenFTPClient:
@@ -24,6 +33,7 @@ class RakutenFTPClient:
         password: str = None,
         timeout: int = 30,
         test_mode: str = None,
+        use_pool: bool = True,
     ):
         """
         初始化SFTP客户端
@@ -35,6 +45,7 @@ class RakutenFTPClient:
             password: SFTP密码
             timeout: 连接超时时间（秒）
             test_mode: 测试模式 ('mock' 或 'real')
+            use_pool: 是否从店铺连接池借用连接（False时每次都重新握手）
         """
         self.logger = setup_logger("rakuten.sftp")
 
@@ -62,9 +73,12 @@ class RakutenFTPClient:
                 self.password = "test_password"
 
         # SFTP连接对象
+        self.use_pool = use_pool
         self.ssh_client = None
         self.sftp_client = None
         self.connected = False
+        self._connection = None
+        self._connection_pool: Optional[SFTPConnectionPool] = None
 
         self.logger.info(
             f"SFTP客户端初始化完成 (模式: {self.test_mode}, 主机: {self.host}:{self.port})"
@@ -100,6 +114,11 @@ class RakutenFTPClient:
             **kwargs
         )
 
+    @property
+    def _endpoint(self) -> str:
+        """埋点使用的端点标识"""
+        return f"sftp://{self.host}:{self.port}"
+
     def _validate_config(self) -> None:
         """验证SFTP配置"""
         if self.test_mode == TEST_MODE["REAL"]:
@@ -110,11 +129,84 @@ class RakutenFTPClient:
             if not self.password:
                 raise RakutenConfigError("SFTP密码不能为空")
 
+    def _pool_key(self) -> tuple:
+        """连接池键：主机、端口、用户名，以及密码摘要（凭据变更后使用新的连接池）"""
+        password_digest = hashlib.sha256(
+            (self.password or "").encode("utf-8")
+        ).hexdigest()
+        return (self.host, self.port, self.username, password_digest[:16])
+
+    def _get_pool(self) -> SFTPConnectionPool:
+        """获取当前店铺的连接池"""
+        return get_sftp_pool(self._pool_key(), self._open_connection)
+
+    def _open_connection(self) -> PooledSFTPConnection:
+        """
+        建立新的SSH连接并打开SFTP通道
+
+        Raises:
+            RakutenFTPError: 认证或SSH错误
+            RakutenConnectionError: 网络错误（可重试）
+        """
+        ssh_client = None
+
+        with instrument_call("CONNECT", self._endpoint, logger=self.logger):
+            try:
+                self.logger.info(f"正在连接SFTP服务器: {self.host}:{self.port}")
+
+                # 创建SSH客户端
+                ssh_client = paramiko.SSHClient()
+
+                # 自动添加主机密钥（生产环境中应该验证主机密钥）
+                ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+                # 连接SSH
+                ssh_client.connect(
+                    hostname=self.host,
+                    port=self.port,
+                    username=self.username,
+                    password=self.password,
+                    timeout=self.timeout,
+                    allow_agent=False,
+                    look_for_keys=False,
+                )
+
+                # 保持空闲连接不被服务器或NAT断开，并为批量传输使用更大的通道窗口
+                transport = ssh_client.get_transport()
+                transport.set_keepalive(SFTP_POOL_CONFIG["KEEPALIVE_INTERVAL"])
+                transport.default_window_size = SFTP_TRANSFER_CONFIG["WINDOW_SIZE"]
+                transport.default_max_packet_size = SFTP_TRANSFER_CONFIG[
+                    "MAX_PACKET_SIZE"
+                ]
+
+                # 创建SFTP客户端
+                sftp_client = ssh_client.open_sftp()
+
+                return PooledSFTPConnection(ssh_client, sftp_client)
+
+            except paramiko.AuthenticationException as e:
+                error = RakutenFTPError(f"SFTP认证失败: {str(e)}")
+            except paramiko.SSHException as e:
+                error = RakutenFTPError(f"SSH连接错误: {str(e)}")
+            except (OSError, ConnectionError) as e:
+                error = RakutenConnectionError(f"SFTP连接错误: {str(e)}")
+            except Exception as e:
+                error = RakutenFTPError(f"SFTP未知错误: {str(e)}")
+
+            if ssh_client is not None:
+                try:
+                    ssh_client.close()
+                except Exception:
+                    pass
+            raise error
+
     @retry_with_backoff()
     def connect(self) -> Dict[str, Any]:
         """
         连接到SFTP服务器
 
+        启用连接池时从店铺连接池借用已握手的连接，disconnect() 时归还。
+
         Returns:
             连接结果
 
@@ -126,82 +218,35 @@ class RakutenFTPClient:
 
         self._validate_config()
 
-        start_time = time.time()
-        error = None
-
-        try:
-            self.logger.info(f"正在连接SFTP服务器: {self.host}:{self.port}")
-
-            # 创建SSH客户端
-            self.ssh_client = paramiko.SSHClient()
-
-            # 自动添加主机密钥（生产环境中应该验证主机密钥）
-            self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
-            # 连接SSH
-            self.ssh_client.connect(
-                hostname=self.host,
-                port=self.port,
-                username=self.username,
-                password=self.password,
-                timeout=self.timeout,
-                allow_agent=False,
-                look_for_keys=False,
-            )
-
-            # 创建SFTP客户端
-            self.sftp_client = self.ssh_client.open_sftp()
-
-            self.connected = True
-            duration = time.time() - start_time
-
-            # 获取服务器信息
-            server_version = self.ssh_client.get_transport().remote_version
-
-            result = {
-                "success": True,
-                "message": "SFTP连接成功",
-                "duration_ms": round(duration * 1000, 2),
-                "server_version": server_version,
-                "host": self.host,
-                "port": self.port,
-                "username": self.username,
-            }
+        if self.connected:
+            self.disconnect()
 
-            # 记录成功日志
-            log_api_call(
-                self.logger,
-                f"sftp://{self.host}:{self.port}",
-                "CONNECT",
-                duration=duration,
-            )
+        start_time = time.time()
 
-            return result
+        if self.use_pool:
+            pool = self._get_pool()
+            connection, reused = pool.acquire()
+        else:
+            pool = None
+            connection, reused = self._open_connection(), False
+
+        self._connection = connection
+        self._connection_pool = pool
+        self.ssh_client = connection.ssh_client
+        self.sftp_client = connection.sftp_client
+        self.connected = True
+        duration = time.time() - start_time
 
-        except paramiko.AuthenticationException as e:
-            error = RakutenFTPError(f"SFTP认证失败: {str(e)}")
-            raise error
-        except paramiko.SSHException as e:
-            error = RakutenFTPError(f"SSH连接错误: {str(e)}")
-            raise error
-        except (OSError, ConnectionError) as e:
-            error = RakutenConnectionError(f"SFTP连接错误: {str(e)}")
-            raise error
-        except Exception as e:
-            error = RakutenFTPError(f"SFTP未知错误: {str(e)}")
-            raise error
-        finally:
-            if error:
-                duration = time.time() - start_time
-                log_api_call(
-                    self.logger,
-                    f"sftp://{self.host}:{self.port}",
-                    "CONNECT",
-                    duration=duration,
-                    error=error,
-                )
-                self.connected = False
-                self._cleanup_connections()
+        return {
+            "success": True,
+            "message": "SFTP连接成功",
+            "duration_ms": round(duration * 1000, 2),
+            "server_version": connection.server_version,
+            "host": self.host,
+            "port": self.port,
+            "username": self.username,
+            "reused": reused,
+        }
 
     def _mock_connect(self) -> Dict[str, Any]:
         """模拟SFTP连接"""
@@ -220,26 +265,31 @@ class RakutenFTPClient:
             "host": self.host,
             "port": self.port,
             "username": self.username,
+            "reused": False,
         }
 
-    def _cleanup_connections(self) -> None:
-        """清理连接"""
-        if self.sftp_client:
-            try:
-                self.sftp_client.close()
-            except Exception:
-                pass
-            self.sftp_client = None
+    def _cleanup_connections(self, discard: bool = False) -> None:
+        """
+        释放当前连接
 
-        if self.ssh_client:
-            try:
-                self.ssh_client.close()
-            except Exception:
-                pass
-            self.ssh_client = None
+        Args:
+            discard: 是否关闭连接（否则启用连接池时归还到池中）
+        """
+        connection, pool = self._connection, self._connection_pool
+        self._connection = None
+        self._connection_pool = None
+        self.sftp_client = None
+        self.ssh_client = None
+
+        if connection is None:
+            return
+        if pool is not None:
+            pool.release(connection, discard=discard)
+        else:
+            connection.close()
 
     def disconnect(self) -> None:
-        """断开SFTP连接"""
+        """断开SFTP连接（启用连接池时把连接归还到池中）"""
         if self.connected:
             try:
                 self._cleanup_connections()
@@ -249,6 +299,35 @@ class RakutenFTPClient:
             finally:
                 self.connected = False
 
+    @contextmanager
+    def borrow(self, reuse_current: bool = True):
+        """
+        借用SFTP通道执行操作
+
+        已调用 connect() 时直接使用当前连接；否则从连接池临时借用，
+        操作出现SSH/IO错误时丢弃该连接。
+
+        Args:
+            reuse_current: 为False时总是借用独立的连接（用于多线程并发传输）
+
+        Yields:
+            paramiko.SFTPClient
+        """
+        if reuse_current and self.connected and self.sftp_client is not None:
+            yield self.sftp_client
+            return
+
+        self._validate_config()
+        if self.use_pool:
+            with self._get_pool().connection() as connection:
+                yield connection.sftp_client
+        else:
+            connection = self._open_connection()
+            try:
+                yield connection.sftp_client
+            finally:
+                connection.close()
+
     def test_connection(self) -> Dict[str, Any]:
         """
         测试SFTP连接
@@ -355,16 +434,50 @@ class RakutenFTPClient:
         Raises:
             RakutenFTPError: 操作失败时
         """
-        if not self.connected:
-            raise RakutenFTPError("SFTP未连接")
-
         if self.test_mode == TEST_MODE["MOCK"]:
+            if not self.connected:
+                raise RakutenFTPError("SFTP未连接")
             return ["test_file1.txt", "test_file2.jpg", "test_folder"]
 
-        try:
-            return self.sftp_client.listdir(path)
-        except Exception as e:
-            raise RakutenFTPError(f"列出文件失败: {str(e)}")
+        with self.borrow() as sftp_client:
+            with instrument_call("LIST", self._endpoint, logger=self.logger):
+                try:
+                    return sftp_client.listdir(path)
+                except (OSError, EOFError) as e:
+                    raise RakutenFTPError(f"列出文件失败: {str(e)}")
+
+    def upload_files(self, items, **kwargs) -> Dict[str, Any]:
+        """
+        通过多个并发SFTP通道批量上传文件
+
+        Args:
+            items: TransferItem 列表
+            **kwargs: 传给 SFTPBulkUploader 的参数（concurrency, skip_unchanged等）
+
+        Returns:
+            传输结果汇总
+        """
+        from .sftp_transfer import SFTPBulkUploader
+
+        return SFTPBulkUploader(self, **kwargs).upload(items)
+
+    def upload_directory(
+        self, local_dir: str, remote_dir: str, **kwargs
+    ) -> Dict[str, Any]:
+        """
+        把本地目录批量上传到远端目录
+
+        Args:
+            local_dir: 本地目录
+            remote_dir: 远端目标目录
+            **kwargs: 传给 SFTPBulkUploader 的参数
+
+        Returns:
+            传输结果汇总
+        """
+        from .sftp_transfer import SFTPBulkUploader
+
+        return SFTPBulkUploader(self, **kwargs).upload_directory(local_dir, remote_dir)
 
     def health_check(self) -> Dict[str, Any]:
         """
@@ -382,8 +495,13 @@ class RakutenFTPClient:
             if connect_result["success"]:
                 # 测试基本操作
                 operations = self._test_basic_operations()
+                operations_ok = all(
+                    op.get("success", False) for op in operations.values()
+                )
 
-                # 断开连接
+                # 断开连接（操作失败时不把连接归还到连接池）
+                if not operations_ok and self.test_mode == TEST_MODE["REAL"]:
+                    self._cleanup_connections(discard=True)
                 self.disconnect()
 
                 duration = time.time() - start_time
@@ -393,11 +511,8 @@ class RakutenFTPClient:
                     "response_time_ms": round(duration * 1000, 2),
                     "last_check": time.time(),
                     "connection_status": "ok",
-                    "operations_status": (
-                        "ok"
-                        if all(op.get("success", False) for op in operations.values())
-                        else "partial"
-                    ),
+                    "connection_reused": connect_result.get("reused", False),
+                    "operations_status": "ok" if operations_ok else "partial",
                 }
             else:
                 return {
@@ -424,5 +539,23 @@ class RakutenFTPClient:
         self.disconnect()
 
     def __del__(self):
-        """析构函数"""
-        self.disconnect()
+        """
+        析构函数
+
+        只把当前持有的连接归还到它所属的连接池：不在GC终结器中获取/创建连接池，
+        也不清扫空闲连接。
+        """
+        connection = getattr(self, "_connection", None)
+        pool = getattr(self, "_connection_pool", None)
+        self._connection = None
+        self._connection_pool = None
+        self.connected = False
+        if connection is None:
+            return
+        try:
+            if pool is not None:
+                pool.release(connection, evict=False)
+            else:
+                connection.close()
+        except Exception:
+            pass
@@ -0,0 +1,240 @@
+"""
+乐天API调用埋点
+
+为所有对外的 Cabinet / SFTP 调用提供 span 式埋点::
+
+    with instrument_call("GET", endpoint, logger=self.logger) as span:
+        response = requests.request(...)
+        span.status_code = response.status_code
+        span.bytes_in = len(response.content)
+
+span 结束时把延迟、收发字节数、重试次数、速率限制等待时间和结果码写入
+全局 APIMetrics。埋点关闭时返回共享的空 span，几乎没有额外开销；
+完整的请求/响应载荷只按采样率写入日志，且会屏蔽凭据字段。
+"""
+
+import random
+import time
+from typing import Any, Optional
+
+from pagemaker.profiling import record_external_call
+
+from .monitoring import get_global_metrics
+from .retry import current_retry_attempt
+
+# 采样日志中需要屏蔽的字段名（小写子串匹配）
+SENSITIVE_KEYS = ("key", "secret", "password", "authorization", "token")
+
+_settings = {"enabled": None, "payload_sample_rate": None}
+
+
+def configure(enabled: bool = None, payload_sample_rate: float = None):
+    """
+    覆盖埋点配置（默认从 pagemaker.config 读取一次并缓存）
+
+    Args:
+        enabled: 是否启用埋点
+        payload_sample_rate: 完整载荷写入日志的采样率 (0-1)
+    """
+    if enabled is not None:
+        _settings["enabled"] = enabled
+    if payload_sample_rate is not None:
+        _settings["payload_sample_rate"] = payload_sample_rate
+
+
+def reset_configuration():
+    """清除缓存的配置，下次使用时重新读取"""
+    _settings["enabled"] = None
+    _settings["payload_sample_rate"] = None
+
+
+def _load_settings():
+    from pagemaker.config import config as app_config
+
+    if _settings["enabled"] is None:
+        _settings["enabled"] = app_config.RAKUTEN_API_METRICS_ENABLED
+    if _settings["payload_sample_rate"] is None:
+        _settings["payload_sample_rate"] = app_config.RAKUTEN_API_LOG_SAMPLE_RATE
+
+
+def is_enabled() -> bool:
+    """埋点是否启用"""
+    if _settings["enabled"] is None:
+        _load_settings()
+    return _settings["enabled"]
+
+
+def _redact(payload: Any) -> Any:
+    """屏蔽载荷中的凭据字段"""
+    if isinstance(payload, dict):
+        return {
+            k: (
+                "***"
+                if any(s in str(k).lower() for s in SENSITIVE_KEYS)
+                else _redact(v)
+            )
+            for k, v in payload.items()
+        }
+    if isinstance(payload, (bytes, bytearray)):
+        return f"<{len(payload)} bytes>"
+    if isinstance(payload, (list, tuple)):
+        return [_redact(v) for v in payload]
+    return payload
+
+
+class APICallSpan:
+    """一次对外调用的埋点记录"""
+
+    __slots__ = (
+        "method",
+        "endpoint",
+        "logger",
+        "start",
+        "bytes_in",
+        "bytes_out",
+        "retries",
+        "rate_limit_wait_ms",
+        "result_code",
+        "status_code",
+        "error",
+        "request_payload",
+        "response_payload",
+    )
+
+    def __init__(self, method: str, endpoint: str, logger=None):
+        self.method = method
+        self.endpoint = endpoint
+        self.logger = logger
+        self.start = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = current_retry_attempt()
+        self.rate_limit_wait_ms = 0.0
+        self.result_code = None
+        self.status_code = None
+        self.error = None
+        self.request_payload = None
+        self.response_payload = None
+
+    def record_payload(self, request: Any = None, response: Any = None):
+        """
+        保存载荷引用（仅在被采样时才会格式化写入日志）
+
+        Args:
+            request: 请求载荷
+            response: 响应载荷
+        """
+        if request is not None:
+            self.request_payload = request
+        if response is not None:
+            self.response_payload = response
+
+    def __enter__(self) -> "APICallSpan":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        if exc_val is not None and self.error is None:
+            self.error = exc_val
+        success = self.error is None
+        error_type = type(self.error).__name__ if self.error is not None else None
+
+        record_external_call(duration_ms)
+        get_global_metrics().record_request(
+            endpoint=self.endpoint,
+            method=self.method,
+            response_time_ms=duration_ms,
+            success=success,
+            error_type=error_type,
+            status_code=self.status_code,
+            bytes_in=self.bytes_in,
+            bytes_out=self.bytes_out,
+            retries=self.retries,
+            rate_limit_wait_ms=self.rate_limit_wait_ms,
+            result_code=self.result_code,
+        )
+
+        if self.logger is not None:
+            self._log(duration_ms, error_type)
+        return False
+
+    def _log(self, duration_ms: float, error_type: Optional[str]):
+        """写入调用日志（参数延迟格式化，级别未启用时不产生开销）"""
+        if self.error is not None:
+            self.logger.error(
+                "API调用失败: %s %s %.2fms status=%s retries=%d error=%s: %s",
+                self.method,
+                self.endpoint,
+                duration_ms,
+                self.status_code,
+                self.retries,
+                error_type,
+                self.error,
+            )
+        else:
+            self.logger.info(
+                "API调用成功: %s %s %.2fms status=%s result_code=%s in=%dB out=%dB",
+                self.method,
+                self.endpoint,
+                duration_ms,
+                self.status_code,
+                self.result_code,
+                self.bytes_in,
+                self.bytes_out,
+            )
+
+        sample_rate = _settings["payload_sample_rate"]
+        if sample_rate is None:
+            _load_settings()
+            sample_rate = _settings["payload_sample_rate"]
+        if (
+            sample_rate > 0
+            and (self.request_payload is not None or self.response_payload is not None)
+            and random.random() < sample_rate
+        ):
+            self.logger.info(
+                "API调用载荷(采样): %s %s request=%r response=%r",
+                self.method,
+                self.endpoint,
+                _redact(self.request_payload),
+                _redact(self.response_payload),
+            )
+
+
+class _NoopSpan:
+    """埋点关闭时使用的空span，忽略所有写入"""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        pass
+
+    def record_payload(self, request: Any = None, response: Any = None):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def instrument_call(method: str, endpoint: str, logger=None):
+    """
+    创建一次对外调用的埋点span（上下文管理器）
+
+    Args:
+        method: HTTP方法或SFTP操作类型
+        endpoint: API端点或SFTP操作标识
+        logger: 调用日志记录器（可选）
+
+    Returns:
+        APICallSpan；埋点关闭时返回共享的 NOOP_SPAN
+    """
+    if not is_enabled():
+        return NOOP_SPAN
+    return APICallSpan(method, endpoint, logger)
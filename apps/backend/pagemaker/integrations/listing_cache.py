@@ -0,0 +1,231 @@
+"""
+两级列表缓存（R-Cabinet文件夹树、图片列表）
+
+- 共享层：跨worker共享的Django缓存。列表按固定条数分块，每块以压缩JSON
+  （zlib）单独存储，另有一个很小的头条目记录版本号、总数和写入时间
+- 进程层：有容量上限的LRU，缓存已解码的分块，键包含版本号；读取返回条目的
+  副本，调用方修改返回值不会影响缓存
+- 版本号：每次写入生成新版本，先写分块再切换头条目，旧版本分块随后删除；
+  进程层不需要显式失效，头条目版本变化后旧分块自然不再命中
+- 分页读取只取出并解码覆盖所需范围的分块，不解码整个列表
+
+共享层键：``{前缀}:{键}`` （头）和 ``{前缀}:{键}:{版本}:{序号}`` （分块）。
+"""
+
+import json
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from .constants import LISTING_CACHE_CONFIG
+from .fallback_strategies import LRUTTLCache, get_shared_data_cache
+from .utils import setup_logger
+
+
+def encode_chunk(items: List[Any], level: int = None) -> bytes:
+    """把一个分块编码为压缩JSON"""
+    raw = json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(
+        raw, level if level is not None else LISTING_CACHE_CONFIG["COMPRESS_LEVEL"]
+    )
+
+
+def decode_chunk(data: bytes) -> List[Any]:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def _copy_item(item: Any) -> Any:
+    """复制条目（列表条目是文件夹/图片的扁平字典，浅复制即可）"""
+    if isinstance(item, dict):
+        return dict(item)
+    if isinstance(item, list):
+        return list(item)
+    return item
+
+
+class ListingCache:
+    """进程内LRU + 共享缓存的两级列表缓存"""
+
+    def __init__(
+        self,
+        store=None,
+        chunk_size: int = None,
+        local_max_chunks: int = None,
+        timeout: int = None,
+    ):
+        """
+        Args:
+            store: 共享层Django缓存（默认使用跨worker共享数据存储）
+            chunk_size: 每个分块的条目数
+            local_max_chunks: 进程层最多缓存的已解码分块数
+            timeout: 默认有效期（秒）
+        """
+        self._store = store
+        self.chunk_size = chunk_size or LISTING_CACHE_CONFIG["CHUNK_SIZE"]
+        self.timeout = timeout or LISTING_CACHE_CONFIG["TIMEOUT"]
+        self.local = LRUTTLCache(
+            max_entries=local_max_chunks or LISTING_CACHE_CONFIG["LOCAL_MAX_CHUNKS"],
+            default_ttl=self.timeout,
+        )
+        self.logger = setup_logger("rakuten.listing_cache")
+        self.shared_chunk_reads = 0
+        self.shared_misses = 0
+
+    @property
+    def store(self):
+        return self._store if self._store is not None else get_shared_data_cache()
+
+    def _head_key(self, key: str) -> str:
+        return f"{LISTING_CACHE_CONFIG['KEY_PREFIX']}:{key}"
+
+    def _chunk_key(self, key: str, version: str, index: int) -> str:
+        return f"{LISTING_CACHE_CONFIG['KEY_PREFIX']}:{key}:{version}:{index}"
+
+    def set(self, key: str, items: List[Any], timeout: int = None) -> Dict[str, Any]:
+        """
+        写入完整列表
+
+        Returns:
+            新的头条目 {"version", "total", "chunk_size", "chunks", "stored_at"}
+        """
+        timeout = timeout or self.timeout
+        version = uuid.uuid4().hex[:12]
+        chunks = [
+            items[i : i + self.chunk_size]
+            for i in range(0, len(items), self.chunk_size)
+        ]
+        self.store.set_many(
+            {
+                self._chunk_key(key, version, i): encode_chunk(chunk)
+                for i, chunk in enumerate(chunks)
+            },
+            timeout=timeout,
+        )
+        head = {
+            "version": version,
+            "total": len(items),
+            "chunk_size": self.chunk_size,
+            "chunks": len(chunks),
+            "stored_at": time.time(),
+        }
+        previous = self.store.get(self._head_key(key))
+        self.store.set(self._head_key(key), head, timeout=timeout)
+
+        # 本进程刚编码过的分块直接放入进程层
+        for i, chunk in enumerate(chunks):
+            self.local.set(self._chunk_key(key, version, i), chunk, ttl=timeout)
+        if previous:
+            self._delete_chunks(key, previous)
+        return head
+
+    def _delete_chunks(self, key: str, head: Dict[str, Any]):
+        self.store.delete_many(
+            [
+                self._chunk_key(key, head["version"], i)
+                for i in range(head.get("chunks", 0))
+            ]
+        )
+
+    def invalidate(self, key: str):
+        """删除列表（所有worker立即失效）"""
+        head = self.store.get(self._head_key(key))
+        self.store.delete(self._head_key(key))
+        if head:
+            self._delete_chunks(key, head)
+
+    def get_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取头条目（版本号、总数、写入时间），不存在时为None"""
+        head = self.store.get(self._head_key(key))
+        if head is None:
+            self.shared_misses += 1
+        return head
+
+    def _load_chunks(
+        self, key: str, head: Dict[str, Any], indexes: range
+    ) -> Optional[List[List[Any]]]:
+        """按序号读取分块（优先进程层），有分块缺失时返回None"""
+        version = head["version"]
+        chunks: Dict[int, List[Any]] = {}
+        missing = []
+        for i in indexes:
+            chunk = self.local.get(self._chunk_key(key, version, i))
+            if chunk is None:
+                missing.append(i)
+            else:
+                chunks[i] = chunk
+
+        if missing:
+            found = self.store.get_many(
+                [self._chunk_key(key, version, i) for i in missing]
+            )
+            for i in missing:
+                chunk_key = self._chunk_key(key, version, i)
+                data = found.get(chunk_key)
+                if data is None:
+                    return None
+                chunks[i] = decode_chunk(data)
+                self.local.set(chunk_key, chunks[i])
+            self.shared_chunk_reads += len(missing)
+
+        return [chunks[i] for i in indexes]
+
+    def _read(self, key: str, offset: int, limit: Optional[int]):
+        # 读取期间其他worker可能写入新版本并删除旧分块，此时按新版本重读一次
+        for _attempt in range(2):
+            head = self.get_meta(key)
+            if head is None:
+                return None
+            chunk_size = head["chunk_size"]
+            start_chunk = offset // chunk_size
+            end_chunk = head["chunks"]
+            if limit is not None:
+                end_chunk = min(
+                    end_chunk, (offset + limit + chunk_size - 1) // chunk_size
+                )
+            chunks = self._load_chunks(key, head, range(start_chunk, end_chunk))
+            if chunks is not None:
+                items = [item for chunk in chunks for item in chunk]
+                begin = offset - start_chunk * chunk_size
+                end = None if limit is None else begin + limit
+                return [_copy_item(item) for item in items[begin:end]], head
+        self.shared_misses += 1
+        return None
+
+    def get_page(
+        self, key: str, offset: int, limit: int
+    ) -> Optional[Tuple[List[Any], Dict[str, Any]]]:
+        """
+        读取 [offset, offset + limit) 范围的条目
+
+        Returns:
+            (条目列表, 头条目)；未缓存时为None
+        """
+        return self._read(key, max(offset, 0), max(limit, 0))
+
+    def get_all(self, key: str) -> Optional[Tuple[List[Any], Dict[str, Any]]]:
+        """
+        读取完整列表
+
+        Returns:
+            (条目列表, 头条目)；未缓存时为None
+        """
+        return self._read(key, 0, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "local": self.local.stats(),
+            "shared_chunk_reads": self.shared_chunk_reads,
+            "shared_misses": self.shared_misses,
+        }
+
+
+_listing_cache: Optional[ListingCache] = None
+
+
+def get_listing_cache() -> ListingCache:
+    """获取全局列表缓存"""
+    global _listing_cache
+    if _listing_cache is None:
+        _listing_cache = ListingCache()
+    return _listing_cache
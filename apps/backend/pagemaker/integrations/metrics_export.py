@@ -0,0 +1,406 @@
+"""
+乐天API延迟直方图与OpenMetrics导出
+
+使用固定桶直方图按 (endpoint, method, error_type) 聚合请求延迟，
+内存占用与请求量无关。配置了多进程目录时：
+
+- 每个gunicorn worker由后台线程定期把自己的快照写入 ``metrics_<pid>.json``
+  （请求路径上不做文件I/O）
+- worker退出后由主进程调用 mark_process_dead，把它的快照并入
+  ``metrics_aggregate.json`` 并删除快照文件（与 prometheus_client 的做法相同），
+  目录不会随worker回收增长，PID被复用时计数也不会回退
+- 导出时合并聚合文件和所有存活worker的快照
+"""
+
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .utils import setup_logger
+
+# 延迟桶上界（秒），覆盖乐天API从几十毫秒到超时(30s)的范围
+DEFAULT_LATENCY_BUCKETS = (
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+METRIC_NAME = "rakuten_api_request_duration_seconds"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+LabelKey = Tuple[str, str, str]
+
+SNAPSHOT_PREFIX = "metrics_"
+AGGREGATE_NAME = "metrics_aggregate.json"
+AGGREGATE_LOCK_NAME = ".metrics_aggregate.lock"
+
+
+class LatencyHistogram:
+    """固定桶延迟直方图（非线程安全，由HistogramRegistry加锁）"""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # 最后一个槽位对应 +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """记录一次观测值（秒）"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: "LatencyHistogram"):
+        """合并另一个同桶直方图"""
+        if other.buckets != self.buckets:
+            raise ValueError("直方图桶定义不一致，无法合并")
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q: float) -> float:
+        """
+        估算分位数（桶内线性插值）
+
+        Args:
+            q: 分位数 (0-1)
+
+        Returns:
+            估算值（秒）；落入 +Inf 桶时返回最大有限桶上界
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        for i, c in enumerate(self.counts):
+            if c and cumulative + c >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * ((rank - cumulative) / c)
+            cumulative += c
+        return self.buckets[-1]
+
+    def to_dict(self) -> Dict:
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        histogram = cls(data["buckets"])
+        histogram.counts = list(data["counts"])
+        histogram.count = data["count"]
+        histogram.sum = data["sum"]
+        return histogram
+
+
+class HistogramRegistry:
+    """按标签分组的延迟直方图集合，支持多进程快照合并"""
+
+    def __init__(
+        self,
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+        multiprocess_dir: Optional[str] = None,
+        flush_interval: float = 1.0,
+    ):
+        """
+        初始化直方图集合
+
+        Args:
+            buckets: 桶上界（秒）
+            multiprocess_dir: 多进程快照目录；为空时只统计本进程
+            flush_interval: 快照写入的最小间隔（秒）
+        """
+        self.logger = setup_logger("rakuten.metrics_export")
+        self.buckets = tuple(buckets)
+        self.multiprocess_dir = multiprocess_dir
+        self.flush_interval = flush_interval
+        self.lock = Lock()
+        self.histograms: Dict[LabelKey, LatencyHistogram] = {}
+        self._dirty = False
+        self._stop = threading.Event()
+        self._flusher_pid = None
+        # 本进程快照的标识：区分复用了同一PID的不同worker
+        self._token_pid = None
+        self._token = None
+
+        if self.multiprocess_dir:
+            os.makedirs(self.multiprocess_dir, exist_ok=True)
+
+    def observe(
+        self,
+        endpoint: str,
+        method: str,
+        duration_seconds: float,
+        error_type: str = None,
+    ):
+        """记录一次请求延迟"""
+        key = (endpoint, method, error_type or "none")
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram(self.buckets)
+            histogram.observe(duration_seconds)
+            self._dirty = True
+
+        if self.multiprocess_dir and self._flusher_pid != os.getpid():
+            self._start_flusher()
+
+    def _start_flusher(self):
+        """启动本进程的后台快照线程（fork后的子进程需要重新启动）"""
+        with self.lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            self._stop = threading.Event()
+        threading.Thread(
+            target=self._flush_loop,
+            args=(self._stop,),
+            name="metrics-snapshot",
+            daemon=True,
+        ).start()
+
+    def _flush_loop(self, stop: threading.Event):
+        while not stop.wait(self.flush_interval):
+            if self._dirty:
+                self.flush()
+
+    def close(self):
+        """停止后台快照线程并写入最终快照（worker退出时调用）"""
+        self._stop.set()
+        self.flush()
+
+    def snapshot(self) -> Dict[LabelKey, LatencyHistogram]:
+        """获取本进程直方图的副本"""
+        with self.lock:
+            return {
+                key: LatencyHistogram.from_dict(h.to_dict())
+                for key, h in self.histograms.items()
+            }
+
+    def reset(self):
+        """清空本进程数据"""
+        with self.lock:
+            self.histograms.clear()
+
+    def _snapshot_path(self, pid: int = None) -> str:
+        return snapshot_path(self.multiprocess_dir, pid or os.getpid())
+
+    def _snapshot_token(self) -> str:
+        pid = os.getpid()
+        if self._token_pid != pid:
+            self._token_pid = pid
+            self._token = f"{pid}-{time.time_ns()}"
+        return self._token
+
+    def flush(self):
+        """把本进程快照原子写入多进程目录"""
+        if not self.multiprocess_dir:
+            return
+
+        with self.lock:
+            self._dirty = False
+        payload = {
+            "token": self._snapshot_token(),
+            "histograms": _encode_histograms(self.snapshot()),
+        }
+        try:
+            _write_json_atomic(self._snapshot_path(), payload)
+        except OSError as e:
+            self.logger.warning(f"写入指标快照失败: {str(e)}")
+
+    def collect(self) -> Dict[LabelKey, LatencyHistogram]:
+        """
+        收集所有进程的直方图
+
+        多进程模式下合并已退出worker的聚合数据和所有存活worker的快照
+        （保证计数单调递增）；否则只返回本进程数据。
+        """
+        if not self.multiprocess_dir:
+            return self.snapshot()
+
+        self.flush()
+        aggregate = _read_json(os.path.join(self.multiprocess_dir, AGGREGATE_NAME))
+        folded = set((aggregate or {}).get("folded", []))
+        merged: Dict[LabelKey, LatencyHistogram] = {}
+        if aggregate:
+            _merge_into(merged, aggregate.get("histograms", {}))
+
+        for name in os.listdir(self.multiprocess_dir):
+            if not _is_snapshot_name(name):
+                continue
+            payload = _read_json(os.path.join(self.multiprocess_dir, name))
+            # 已并入聚合文件、尚未删除的快照不重复计数
+            if payload is None or payload.get("token") in folded:
+                continue
+            _merge_into(merged, payload.get("histograms", {}))
+        return merged
+
+
+def snapshot_path(multiprocess_dir: str, pid: int) -> str:
+    return os.path.join(multiprocess_dir, f"{SNAPSHOT_PREFIX}{pid}.json")
+
+
+def _is_snapshot_name(name: str) -> bool:
+    return (
+        name.startswith(SNAPSHOT_PREFIX)
+        and name.endswith(".json")
+        and name != AGGREGATE_NAME
+    )
+
+
+def _encode_histograms(histograms: Dict[LabelKey, LatencyHistogram]) -> Dict:
+    return {"\t".join(key): h.to_dict() for key, h in histograms.items()}
+
+
+def _merge_into(merged: Dict[LabelKey, LatencyHistogram], payload: Dict):
+    for raw_key, data in payload.items():
+        key = tuple(raw_key.split("\t"))
+        histogram = LatencyHistogram.from_dict(data)
+        if key in merged:
+            merged[key].merge(histogram)
+        else:
+            merged[key] = histogram
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        setup_logger("rakuten.metrics_export").warning(
+            f"读取指标快照 {os.path.basename(path)} 失败: {str(e)}"
+        )
+        return None
+
+
+def _write_json_atomic(path: str, payload: Dict):
+    """写入唯一的临时文件后原子替换（并发写入互不影响）"""
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=".metrics_", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def mark_process_dead(pid: int, multiprocess_dir: str = None):
+    """
+    把已退出worker的快照并入聚合文件并删除快照
+
+    由gunicorn主进程在 child_exit 钩子中调用。先写聚合文件（记录已并入的快照标识），
+    再删除快照文件，导出过程中任何时刻都不会重复或遗漏计数。
+
+    Args:
+        pid: 已退出worker的PID
+        multiprocess_dir: 多进程快照目录（默认使用配置 PAGEMAKER_METRICS_DIR）
+    """
+    if multiprocess_dir is None:
+        from pagemaker.config import config
+
+        multiprocess_dir = config.METRICS_MULTIPROC_DIR
+    if not multiprocess_dir:
+        return
+
+    path = snapshot_path(multiprocess_dir, pid)
+    payload = _read_json(path)
+    if payload is None:
+        return
+
+    aggregate_path = os.path.join(multiprocess_dir, AGGREGATE_NAME)
+    with open(os.path.join(multiprocess_dir, AGGREGATE_LOCK_NAME), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        aggregate = _read_json(aggregate_path) or {}
+        merged: Dict[LabelKey, LatencyHistogram] = {}
+        _merge_into(merged, aggregate.get("histograms", {}))
+        _merge_into(merged, payload.get("histograms", {}))
+
+        # 只保留快照文件仍存在的标识（删除后不再需要）
+        live_tokens = {
+            (_read_json(os.path.join(multiprocess_dir, name)) or {}).get("token")
+            for name in os.listdir(multiprocess_dir)
+            if _is_snapshot_name(name)
+        }
+        folded = [t for t in aggregate.get("folded", []) if t in live_tokens]
+        folded.append(payload.get("token"))
+        _write_json_atomic(
+            aggregate_path,
+            {"folded": folded, "histograms": _encode_histograms(merged)},
+        )
+        os.unlink(path)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+def render_openmetrics(histograms: Dict[LabelKey, LatencyHistogram]) -> str:
+    """
+    按OpenMetrics文本格式渲染直方图
+
+    Args:
+        histograms: 标签 -> 直方图
+
+    Returns:
+        OpenMetrics文本（以 ``# EOF`` 结尾）
+    """
+    lines: List[str] = [
+        f"# TYPE {METRIC_NAME} histogram",
+        f"# UNIT {METRIC_NAME} seconds",
+        f"# HELP {METRIC_NAME} Rakuten API request latency.",
+    ]
+
+    for (endpoint, method, error_type), histogram in sorted(histograms.items()):
+        labels = (
+            f'endpoint="{_escape_label_value(endpoint)}",'
+            f'method="{_escape_label_value(method)}",'
+            f'error_type="{_escape_label_value(error_type)}"'
+        )
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(
+                f'{METRIC_NAME}_bucket{{{labels},le="{_format_float(bound)}"}} {cumulative}'
+            )
+        lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{METRIC_NAME}_count{{{labels}}} {histogram.count}")
+        lines.append(f"{METRIC_NAME}_sum{{{labels}}} {_format_float(histogram.sum)}")
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
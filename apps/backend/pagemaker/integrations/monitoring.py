@@ -2,6 +2,7 @@
 乐天API监控和指标收集模块
 """
 
+import math
 import time
 import json
 from typing import Dict, Any, List, Optional
@@ -10,17 +11,113 @@ from collections import defaultdict, deque
 from threading import Lock
 
 from .utils import setup_logger
+from .metrics_export import HistogramRegistry, LatencyHistogram
+
+
+class _EndpointAggregate:
+    """单个端点在一个时间桶内的聚合指标"""
+
+    __slots__ = (
+        "total",
+        "success",
+        "sum_ms",
+        "min_ms",
+        "max_ms",
+        "errors",
+        "histogram",
+        "bytes_in",
+        "bytes_out",
+        "retries",
+        "rate_limit_wait_ms",
+    )
+
+    def __init__(self):
+        self.total = 0
+        self.success = 0
+        self.sum_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+        self.errors = {}
+        self.histogram = LatencyHistogram()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+        self.rate_limit_wait_ms = 0.0
+
+    def add(
+        self,
+        response_time_ms: float,
+        success: bool,
+        error_type: str = None,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+        retries: int = 0,
+        rate_limit_wait_ms: float = 0.0,
+    ):
+        self.total += 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.retries += retries
+        self.rate_limit_wait_ms += rate_limit_wait_ms
+        self.sum_ms += response_time_ms
+        if self.min_ms is None or response_time_ms < self.min_ms:
+            self.min_ms = response_time_ms
+        if self.max_ms is None or response_time_ms > self.max_ms:
+            self.max_ms = response_time_ms
+        if success:
+            self.success += 1
+        else:
+            error_key = error_type or "unknown"
+            self.errors[error_key] = self.errors.get(error_key, 0) + 1
+        self.histogram.observe(response_time_ms / 1000.0)
+
+    def merge(self, other: "_EndpointAggregate"):
+        self.total += other.total
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.retries += other.retries
+        self.rate_limit_wait_ms += other.rate_limit_wait_ms
+        self.success += other.success
+        self.sum_ms += other.sum_ms
+        if other.min_ms is not None and (
+            self.min_ms is None or other.min_ms < self.min_ms
+        ):
+            self.min_ms = other.min_ms
+        if other.max_ms is not None and (
+            self.max_ms is None or other.max_ms > self.max_ms
+        ):
+            self.max_ms = other.max_ms
+        for error_key, count in other.errors.items():
+            self.errors[error_key] = self.errors.get(error_key, 0) + count
+        self.histogram.merge(other.histogram)
+
+
+class _TimeBucket:
+    """环形缓冲区中的一个时间桶"""
+
+    __slots__ = ("epoch", "endpoints")
+
+    def __init__(self):
+        self.epoch = -1
+        self.endpoints = {}
 
 
 class APIMetrics:
     """API指标收集器"""
 
-    def __init__(self, max_history: int = 1000):
+    def __init__(
+        self,
+        max_history: int = 1000,
+        multiprocess_dir: str = None,
+        bucket_seconds: int = 5,
+    ):
         """
         初始化指标收集器
 
         Args:
             max_history: 保留的历史记录数量
+            multiprocess_dir: 延迟直方图的多进程快照目录（可选）
+            bucket_seconds: 滚动窗口时间桶的粒度（秒）
         """
         self.logger = setup_logger("rakuten.monitoring")
         self.max_history = max_history
@@ -29,13 +126,24 @@ class APIMetrics:
         # 指标存储
         self.request_history = deque(maxlen=max_history)
         self.error_counts = defaultdict(int)
-        self.response_times = defaultdict(list)
+        self.response_times = defaultdict(lambda: deque(maxlen=100))
         self.success_counts = defaultdict(int)
         self.total_counts = defaultdict(int)
 
+        # 固定桶延迟直方图（常量内存，可跨worker合并）
+        self.histograms = HistogramRegistry(multiprocess_dir=multiprocess_dir)
+
         # 统计周期
         self.stats_window = timedelta(minutes=5)
 
+        # 滚动窗口：按时间分桶的环形缓冲区，记录时更新、读取时合并，
+        # 查询成本只与桶数和端点数有关，与历史请求量无关
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(
+            1, math.ceil(self.stats_window.total_seconds() / bucket_seconds)
+        )
+        self.buckets = [_TimeBucket() for _ in range(self.num_buckets)]
+
         self.logger.info("API指标收集器初始化完成")
 
     def record_request(
@@ -46,6 +154,11 @@ class APIMetrics:
         success: bool,
         error_type: str = None,
         status_code: int = None,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+        retries: int = 0,
+        rate_limit_wait_ms: float = 0.0,
+        result_code: int = None,
     ):
         """
         记录API请求指标
@@ -57,6 +170,11 @@ class APIMetrics:
             success: 是否成功
             error_type: 错误类型
             status_code: HTTP状态码
+            bytes_in: 接收字节数
+            bytes_out: 发送字节数
+            retries: 本次调用前已重试的次数
+            rate_limit_wait_ms: 速率限制等待时间（毫秒）
+            result_code: 乐天API结果码
         """
         with self.lock:
             timestamp = time.time()
@@ -70,6 +188,11 @@ class APIMetrics:
                 "success": success,
                 "error_type": error_type,
                 "status_code": status_code,
+                "result_code": result_code,
+                "bytes_in": bytes_in,
+                "bytes_out": bytes_out,
+                "retries": retries,
+                "rate_limit_wait_ms": rate_limit_wait_ms,
             }
             self.request_history.append(request_record)
 
@@ -82,11 +205,77 @@ class APIMetrics:
             else:
                 self.error_counts[f"{key}:{error_type or 'unknown'}"] += 1
 
-            # 记录响应时间
-            if len(self.response_times[key]) >= 100:  # 保留最近100次记录
-                self.response_times[key].pop(0)
+            # 记录响应时间（保留最近100次记录）
             self.response_times[key].append(response_time_ms)
 
+            # 更新当前时间桶
+            epoch = int(timestamp // self.bucket_seconds)
+            bucket = self.buckets[epoch % self.num_buckets]
+            if bucket.epoch != epoch:
+                bucket.epoch = epoch
+                bucket.endpoints = {}
+            aggregate = bucket.endpoints.get(key)
+            if aggregate is None:
+                aggregate = bucket.endpoints[key] = _EndpointAggregate()
+            aggregate.add(
+                response_time_ms,
+                success,
+                error_type,
+                bytes_in,
+                bytes_out,
+                retries,
+                rate_limit_wait_ms,
+            )
+
+        self.histograms.observe(
+            endpoint,
+            method,
+            response_time_ms / 1000.0,
+            error_type=None if success else (error_type or "unknown"),
+        )
+
+    def _merge_window(self) -> Dict[str, _EndpointAggregate]:
+        """合并时间窗口内所有时间桶（调用方需持有锁）"""
+        oldest_epoch = int(time.time() // self.bucket_seconds) - self.num_buckets + 1
+        merged = {}
+        for bucket in self.buckets:
+            if bucket.epoch < oldest_epoch:
+                continue
+            for key, aggregate in bucket.endpoints.items():
+                if key not in merged:
+                    merged[key] = _EndpointAggregate()
+                merged[key].merge(aggregate)
+        return merged
+
+    def get_latency_percentiles(
+        self, quantiles: List[float] = (0.5, 0.95, 0.99)
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        获取各端点的延迟分位数（基于所有worker合并后的直方图）
+
+        Args:
+            quantiles: 要计算的分位数列表
+
+        Returns:
+            {"METHOD endpoint": {"p50_ms": ..., "p95_ms": ..., "p99_ms": ...}}
+        """
+        merged = {}
+        for label_key, histogram in self.histograms.collect().items():
+            endpoint, method, _error_type = label_key
+            key = f"{method} {endpoint}"
+            if key in merged:
+                merged[key].merge(histogram)
+            else:
+                merged[key] = histogram
+
+        return {
+            key: {
+                f"p{int(q * 100)}_ms": round(histogram.quantile(q) * 1000, 2)
+                for q in quantiles
+            }
+            for key, histogram in merged.items()
+        }
+
     def get_current_stats(self) -> Dict[str, Any]:
         """
         获取当前统计信息
@@ -95,92 +284,74 @@ class APIMetrics:
             当前统计数据
         """
         with self.lock:
-            now = time.time()
-            window_start = now - self.stats_window.total_seconds()
-
-            # 过滤时间窗口内的请求
-            recent_requests = [
-                req for req in self.request_history if req["timestamp"] >= window_start
-            ]
-
-            if not recent_requests:
-                return {
-                    "window_minutes": self.stats_window.total_seconds() / 60,
-                    "total_requests": 0,
-                    "success_rate": 0,
-                    "avg_response_time_ms": 0,
-                    "endpoints": {},
-                }
+            endpoint_aggregates = self._merge_window()
 
-            # 计算总体统计
-            total_requests = len(recent_requests)
-            successful_requests = sum(1 for req in recent_requests if req["success"])
-            success_rate = (successful_requests / total_requests) * 100
-
-            response_times = [req["response_time_ms"] for req in recent_requests]
-            avg_response_time = sum(response_times) / len(response_times)
-
-            # 按端点统计
-            endpoint_stats = defaultdict(
-                lambda: {
-                    "total": 0,
-                    "success": 0,
-                    "errors": defaultdict(int),
-                    "response_times": [],
-                }
-            )
-
-            for req in recent_requests:
-                key = f"{req['method']} {req['endpoint']}"
-                stats = endpoint_stats[key]
-                stats["total"] += 1
-
-                if req["success"]:
-                    stats["success"] += 1
-                else:
-                    stats["errors"][req["error_type"] or "unknown"] += 1
-
-                stats["response_times"].append(req["response_time_ms"])
-
-            # 计算每个端点的详细统计
-            endpoints = {}
-            for key, stats in endpoint_stats.items():
-                if stats["response_times"]:
-                    avg_time = sum(stats["response_times"]) / len(
-                        stats["response_times"]
-                    )
-                    max_time = max(stats["response_times"])
-                    min_time = min(stats["response_times"])
-                else:
-                    avg_time = max_time = min_time = 0
-
-                endpoints[key] = {
-                    "total_requests": stats["total"],
-                    "successful_requests": stats["success"],
-                    "success_rate": (stats["success"] / stats["total"]) * 100,
-                    "avg_response_time_ms": round(avg_time, 2),
-                    "max_response_time_ms": round(max_time, 2),
-                    "min_response_time_ms": round(min_time, 2),
-                    "errors": dict(stats["errors"]),
-                }
+        window_minutes = self.stats_window.total_seconds() / 60
 
+        if not endpoint_aggregates:
             return {
-                "window_minutes": self.stats_window.total_seconds() / 60,
-                "total_requests": total_requests,
-                "successful_requests": successful_requests,
-                "success_rate": round(success_rate, 2),
-                "avg_response_time_ms": round(avg_response_time, 2),
-                "endpoints": endpoints,
+                "window_minutes": window_minutes,
+                "total_requests": 0,
+                "successful_requests": 0,
+                "success_rate": 0,
+                "avg_response_time_ms": 0,
+                "endpoints": {},
+            }
+
+        # 计算每个端点的详细统计
+        total_requests = 0
+        successful_requests = 0
+        total_time_ms = 0.0
+        endpoints = {}
+        for key, aggregate in endpoint_aggregates.items():
+            total_requests += aggregate.total
+            successful_requests += aggregate.success
+            total_time_ms += aggregate.sum_ms
+
+            endpoints[key] = {
+                "total_requests": aggregate.total,
+                "successful_requests": aggregate.success,
+                "success_rate": (aggregate.success / aggregate.total) * 100,
+                "avg_response_time_ms": round(aggregate.sum_ms / aggregate.total, 2),
+                "max_response_time_ms": round(aggregate.max_ms, 2),
+                "min_response_time_ms": round(aggregate.min_ms, 2),
+                "p95_response_time_ms": round(
+                    aggregate.histogram.quantile(0.95) * 1000, 2
+                ),
+                "p99_response_time_ms": round(
+                    aggregate.histogram.quantile(0.99) * 1000, 2
+                ),
+                "errors": dict(aggregate.errors),
+                "bytes_in": aggregate.bytes_in,
+                "bytes_out": aggregate.bytes_out,
+                "retries": aggregate.retries,
+                "rate_limit_wait_ms": round(aggregate.rate_limit_wait_ms, 2),
             }
 
-    def get_health_status(self) -> Dict[str, Any]:
+        # 计算总体统计
+        success_rate = (successful_requests / total_requests) * 100
+        avg_response_time = total_time_ms / total_requests
+
+        return {
+            "window_minutes": window_minutes,
+            "total_requests": total_requests,
+            "successful_requests": successful_requests,
+            "success_rate": round(success_rate, 2),
+            "avg_response_time_ms": round(avg_response_time, 2),
+            "endpoints": endpoints,
+        }
+
+    def get_health_status(self, stats: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         获取健康状态
 
+        Args:
+            stats: 已计算好的统计数据（可选，避免重复计算）
+
         Returns:
             健康状态信息
         """
-        stats = self.get_current_stats()
+        stats = stats or self.get_current_stats()
 
         # 健康状态判断阈值
         HEALTHY_SUCCESS_RATE = 95.0  # 95%
@@ -212,11 +383,12 @@ class APIMetrics:
         Returns:
             完整的指标数据
         """
+        current_stats = self.get_current_stats()
         with self.lock:
             return {
                 "export_time": time.time(),
                 "total_history_count": len(self.request_history),
-                "current_stats": self.get_current_stats(),
+                "current_stats": current_stats,
                 "error_summary": dict(self.error_counts),
                 "endpoint_summary": {
                     key: {
@@ -240,6 +412,8 @@ class APIMetrics:
             self.response_times.clear()
             self.success_counts.clear()
             self.total_counts.clear()
+            self.buckets = [_TimeBucket() for _ in range(self.num_buckets)]
+            self.histograms.reset()
             self.logger.info("指标数据已重置")
 
 
@@ -271,15 +445,18 @@ class AlertManager:
 
         self.logger.info("告警管理器初始化完成")
 
-    def check_alerts(self) -> List[Dict[str, Any]]:
+    def check_alerts(self, stats: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
         检查告警条件
 
+        Args:
+            stats: 已计算好的统计数据（可选，避免重复计算）
+
         Returns:
             触发的告警列表
         """
         alerts = []
-        stats = self.metrics.get_current_stats()
+        stats = stats or self.metrics.get_current_stats()
 
         if stats["total_requests"] == 0:
             return alerts
@@ -379,8 +556,8 @@ class MonitoringDashboard:
             完整的面板数据
         """
         current_stats = self.metrics.get_current_stats()
-        health_status = self.metrics.get_health_status()
-        active_alerts = self.alert_manager.check_alerts()
+        health_status = self.metrics.get_health_status(current_stats)
+        active_alerts = self.alert_manager.check_alerts(current_stats)
 
         return {
             "timestamp": time.time(),
@@ -471,10 +648,20 @@ def get_global_metrics() -> APIMetrics:
     """获取全局指标收集器"""
     global _global_metrics
     if _global_metrics is None:
-        _global_metrics = APIMetrics()
+        from pagemaker.config import config as app_config
+
+        _global_metrics = APIMetrics(
+            multiprocess_dir=app_config.METRICS_MULTIPROC_DIR or None
+        )
     return _global_metrics
 
 
+def shutdown_global_metrics():
+    """worker退出时停止指标快照线程并写入最终快照"""
+    if _global_metrics is not None:
+        _global_metrics.histograms.close()
+
+
 def get_global_alert_manager() -> AlertManager:
     """获取全局告警管理器"""
     global _global_alert_manager
@@ -500,6 +687,7 @@ def record_api_call(
     success: bool,
     error_type: str = None,
     status_code: int = None,
+    **extra,
 ):
     """
     记录API调用（便捷函数）
@@ -511,6 +699,7 @@ def record_api_call(
         success: 是否成功
         error_type: 错误类型
         status_code: HTTP状态码
+        **extra: 其他指标（bytes_in, bytes_out, retries, rate_limit_wait_ms, result_code）
     """
     metrics = get_global_metrics()
     metrics.record_request(
@@ -520,4 +709,5 @@ def record_api_call(
         success=success,
         error_type=error_type,
         status_code=status_code,
+        **extra,
     )
@@ -0,0 +1,301 @@
+"""
+缓存后台刷新调度器
+
+stale-while-revalidate 的后台刷新统一交给进程内调度器执行，而不是每次请求
+各自启动守护线程：
+
+- 固定数量的工作线程 + 按优先级排序的队列，队列有容量上限
+- 以缓存键去重：同一个键已在排队或刷新中时不再重复提交（排队中的任务可提升优先级）
+- 记录每个键最近一次刷新的时间、耗时和结果，最小间隔内不重复刷新
+  （上游持续失败时不会每个请求都触发一次刷新）
+- ``stats()`` 提供队列深度、刷新延迟和失败计数
+- worker退出（gunicorn回收、atexit）时 ``shutdown()`` 丢弃排队任务并等待正在进行的刷新
+"""
+
+import atexit
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from .constants import REFRESH_SCHEDULER_CONFIG
+from .metrics_export import LatencyHistogram
+from .utils import setup_logger
+
+# 数值越小越先执行
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+
+class _Job:
+    """排队中的刷新任务"""
+
+    __slots__ = ("func", "priority", "submitted_at")
+
+    def __init__(self, func: Callable[[], Any], priority: int):
+        self.func = func
+        self.priority = priority
+        self.submitted_at = time.monotonic()
+
+
+class RefreshScheduler:
+    """有界线程池 + 优先级队列的后台刷新调度器"""
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        max_queue: int = None,
+        min_interval: float = None,
+        history_size: int = None,
+    ):
+        """
+        Args:
+            max_workers: 工作线程数
+            max_queue: 排队任务上限，超出时拒绝提交
+            min_interval: 同一个键两次刷新之间的最小间隔（秒）
+            history_size: 保留最近刷新记录的键数量
+        """
+        self.max_workers = max_workers or REFRESH_SCHEDULER_CONFIG["MAX_WORKERS"]
+        self.max_queue = max_queue or REFRESH_SCHEDULER_CONFIG["MAX_QUEUE"]
+        self.min_interval = (
+            min_interval
+            if min_interval is not None
+            else REFRESH_SCHEDULER_CONFIG["MIN_INTERVAL"]
+        )
+        self.history_size = history_size or REFRESH_SCHEDULER_CONFIG["HISTORY_SIZE"]
+        self.logger = setup_logger("rakuten.refresh_scheduler")
+        self._cond = threading.Condition()
+        self._reset_state()
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._heap: List = []
+        self._seq = itertools.count()
+        self._pending: Dict[str, _Job] = {}
+        self._running: Dict[str, float] = {}
+        self._workers: List[threading.Thread] = []
+        self._shutdown = False
+        self.last_refresh: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.latency = LatencyHistogram()
+        self.counters = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "throttled": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+        }
+
+    def submit(
+        self, key: str, func: Callable[[], Any], priority: int = PRIORITY_NORMAL
+    ) -> bool:
+        """
+        提交刷新任务
+
+        Args:
+            key: 缓存键（去重依据）
+            func: 刷新函数
+            priority: 优先级，数值越小越先执行
+
+        Returns:
+            是否新加入了队列
+        """
+        with self._cond:
+            if self._pid != os.getpid():
+                # fork 之后线程不会被继承，重新初始化
+                self._reset_state()
+            if self._shutdown:
+                return False
+
+            if key in self._running:
+                self.counters["deduplicated"] += 1
+                return False
+
+            job = self._pending.get(key)
+            if job is not None:
+                self.counters["deduplicated"] += 1
+                if priority < job.priority:
+                    job.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._seq), key))
+                    self._cond.notify()
+                return False
+
+            last = self.last_refresh.get(key)
+            if last and time.monotonic() - last["finished_at"] < self.min_interval:
+                self.counters["throttled"] += 1
+                return False
+
+            if len(self._pending) >= self.max_queue:
+                self.counters["rejected"] += 1
+                self.logger.warning(f"刷新队列已满，丢弃刷新任务: {key}")
+                return False
+
+            self._pending[key] = _Job(func, priority)
+            heapq.heappush(self._heap, (priority, next(self._seq), key))
+            self.counters["submitted"] += 1
+            self._ensure_workers()
+            self._cond.notify()
+            return True
+
+    def _ensure_workers(self):
+        self._workers = [t for t in self._workers if t.is_alive()]
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._work,
+                name=f"cache-refresh-{len(self._workers)}",
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _next_job(self):
+        """取出下一个任务；调度器关闭时返回None"""
+        with self._cond:
+            while True:
+                if self._shutdown:
+                    return None
+                while self._heap:
+                    priority, _seq, key = heapq.heappop(self._heap)
+                    job = self._pending.get(key)
+                    # 优先级提升后旧的堆条目作废
+                    if job is None or job.priority != priority:
+                        continue
+                    del self._pending[key]
+                    self._running[key] = time.monotonic()
+                    return key, job
+                self._cond.wait()
+
+    def _work(self):
+        while True:
+            item = self._next_job()
+            if item is None:
+                return
+            key, job = item
+
+            queued = time.monotonic() - job.submitted_at
+            start = time.perf_counter()
+            error = None
+            try:
+                job.func()
+            except Exception as e:
+                error = e
+                self.logger.warning(f"后台刷新 {key} 失败: {e}")
+            duration = time.perf_counter() - start
+
+            with self._cond:
+                self._running.pop(key, None)
+                self.latency.observe(duration)
+                self.counters["failed" if error else "completed"] += 1
+                self.last_refresh[key] = {
+                    "finished_at": time.monotonic(),
+                    "finished_ts": time.time(),
+                    "duration_ms": round(duration * 1000, 2),
+                    "queued_ms": round(queued * 1000, 2),
+                    "success": error is None,
+                    "error": str(error) if error else None,
+                }
+                self.last_refresh.move_to_end(key)
+                while len(self.last_refresh) > self.history_size:
+                    self.last_refresh.popitem(last=False)
+                self._cond.notify_all()
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """等待队列清空且没有正在进行的刷新"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def shutdown(self, wait: bool = True, timeout: float = None):
+        """
+        关闭调度器：丢弃排队任务，等待正在进行的刷新结束
+
+        Args:
+            wait: 是否等待工作线程退出
+            timeout: 最长等待时间（秒），默认 SHUTDOWN_TIMEOUT
+        """
+        with self._cond:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self.counters["cancelled"] += len(self._pending)
+            self._pending.clear()
+            self._heap.clear()
+            self._cond.notify_all()
+            workers = list(self._workers)
+
+        if not wait:
+            return
+        timeout = (
+            timeout
+            if timeout is not None
+            else REFRESH_SCHEDULER_CONFIG["SHUTDOWN_TIMEOUT"]
+        )
+        deadline = time.monotonic() + timeout
+        for worker in workers:
+            worker.join(max(deadline - time.monotonic(), 0))
+        alive = sum(1 for worker in workers if worker.is_alive())
+        if alive:
+            self.logger.warning(f"关闭刷新调度器时仍有 {alive} 个刷新未完成")
+
+    def stats(self) -> Dict[str, Any]:
+        """队列深度、刷新延迟和计数"""
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "workers": len([t for t in self._workers if t.is_alive()]),
+                "max_workers": self.max_workers,
+                "queue_depth": len(self._pending),
+                "running": len(self._running),
+                "oldest_running_ms": (
+                    round((now - min(self._running.values())) * 1000, 2)
+                    if self._running
+                    else 0
+                ),
+                "shutdown": self._shutdown,
+                **self.counters,
+                "latency_ms": {
+                    "count": self.latency.count,
+                    "avg": (
+                        round(self.latency.sum / self.latency.count * 1000, 2)
+                        if self.latency.count
+                        else 0
+                    ),
+                    "p50": round(self.latency.quantile(0.5) * 1000, 2),
+                    "p95": round(self.latency.quantile(0.95) * 1000, 2),
+                },
+            }
+
+
+_refresh_scheduler: Optional[RefreshScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_refresh_scheduler() -> RefreshScheduler:
+    """获取全局刷新调度器"""
+    global _refresh_scheduler
+    with _scheduler_lock:
+        if _refresh_scheduler is None:
+            _refresh_scheduler = RefreshScheduler()
+        return _refresh_scheduler
+
+
+def shutdown_refresh_scheduler(timeout: float = None):
+    """关闭全局刷新调度器（worker退出时调用）"""
+    global _refresh_scheduler
+    with _scheduler_lock:
+        scheduler, _refresh_scheduler = _refresh_scheduler, None
+    if scheduler is not None:
+        scheduler.shutdown(timeout=timeout)
+
+
+atexit.register(shutdown_refresh_scheduler)
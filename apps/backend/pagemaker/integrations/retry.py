@@ -0,0 +1,360 @@
+"""
+乐天API重试策略引擎
+
+- 按异常类型配置重试策略（次数、退避、是否遵循 Retry-After）
+- 退避使用 full jitter：``uniform(0, min(上限, 基础延迟 * 因子^n))``
+- 响应带 ``Retry-After`` 时至少等待该时间；超过策略上限则不再重试
+- 进程级令牌桶重试预算：每次调用存入少量令牌，每次重试消耗一个令牌，
+  上游大面积故障时重试量不会超过正常流量的固定比例，避免重试风暴
+- 遵循 Retry-After 时同步推迟共享速率限制器，同一许可证的其他请求也会让行
+- ``call_async`` / ``async_retry_with_backoff`` 使用 ``asyncio.sleep``，不阻塞工作线程
+"""
+
+import asyncio
+import inspect
+import random
+import time
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from functools import wraps
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Type
+
+from .constants import RETRY_CONFIG
+from .exceptions import (
+    RakutenAPIError,
+    RakutenConnectionError,
+    RakutenRateLimitError,
+    RakutenServerError,
+    RakutenServiceUnavailableError,
+)
+
+# 当前调用链中的重试序号，供调用埋点读取（线程和asyncio任务各自独立）
+_retry_attempt: ContextVar[int] = ContextVar("rakuten_retry_attempt", default=0)
+
+
+def current_retry_attempt() -> int:
+    """获取当前正在进行的重试序号（首次调用为0）"""
+    return _retry_attempt.get()
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """
+    解析 Retry-After 头
+
+    Args:
+        value: 秒数或HTTP日期
+
+    Returns:
+        需要等待的秒数；无法解析时为None
+    """
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class RetryPolicy:
+    """单类异常的重试策略"""
+
+    def __init__(
+        self,
+        max_retries: int = None,
+        base_delay: float = None,
+        max_delay: float = None,
+        backoff_factor: float = None,
+        respect_retry_after: bool = True,
+    ):
+        """
+        Args:
+            max_retries: 最大重试次数
+            base_delay: 基础延迟（秒）
+            max_delay: 单次等待上限（秒）；Retry-After 超过该值时放弃重试
+            backoff_factor: 退避因子
+            respect_retry_after: 是否遵循异常携带的 Retry-After
+        """
+        self.max_retries = (
+            max_retries if max_retries is not None else RETRY_CONFIG["MAX_RETRIES"]
+        )
+        self.base_delay = (
+            base_delay if base_delay is not None else RETRY_CONFIG["BASE_DELAY"]
+        )
+        self.max_delay = (
+            max_delay if max_delay is not None else RETRY_CONFIG["MAX_DELAY"]
+        )
+        self.backoff_factor = backoff_factor or RETRY_CONFIG["BACKOFF_FACTOR"]
+        self.respect_retry_after = respect_retry_after
+
+    def replace(self, **overrides) -> "RetryPolicy":
+        """返回覆盖了部分参数的新策略（值为None的参数保持不变）"""
+        params = {
+            "max_retries": self.max_retries,
+            "base_delay": self.base_delay,
+            "max_delay": self.max_delay,
+            "backoff_factor": self.backoff_factor,
+            "respect_retry_after": self.respect_retry_after,
+        }
+        params.update({k: v for k, v in overrides.items() if v is not None})
+        return RetryPolicy(**params)
+
+    def compute_delay(self, attempt: int, retry_after: float = None) -> Optional[float]:
+        """
+        计算第 attempt 次重试前的等待时间
+
+        Returns:
+            等待秒数；Retry-After 超过上限时为None（不应重试）
+        """
+        cap = min(self.max_delay, self.base_delay * (self.backoff_factor**attempt))
+        delay = random.uniform(0, cap)
+        if retry_after is not None and self.respect_retry_after:
+            if retry_after > self.max_delay:
+                return None
+            delay = max(delay, retry_after)
+        return delay
+
+
+class RetryBudget:
+    """进程级重试预算（令牌桶）"""
+
+    def __init__(
+        self,
+        capacity: float = None,
+        deposit_ratio: float = None,
+        refill_per_second: float = None,
+    ):
+        """
+        Args:
+            capacity: 令牌上限
+            deposit_ratio: 每次调用存入的令牌数（即允许的重试/调用比例）
+            refill_per_second: 按时间补充的令牌数，保证低流量时也能重试
+        """
+        self.capacity = capacity or RETRY_CONFIG["BUDGET_CAPACITY"]
+        self.deposit_ratio = (
+            deposit_ratio
+            if deposit_ratio is not None
+            else RETRY_CONFIG["BUDGET_DEPOSIT_RATIO"]
+        )
+        self.refill_per_second = (
+            refill_per_second
+            if refill_per_second is not None
+            else RETRY_CONFIG["BUDGET_REFILL_PER_SECOND"]
+        )
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._tokens = float(self.capacity)
+            self._updated_at = time.monotonic()
+            self.rejected = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated_at) * self.refill_per_second,
+        )
+        self._updated_at = now
+
+    def deposit(self):
+        """记录一次调用（首次尝试）"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + self.deposit_ratio)
+
+    def try_withdraw(self) -> bool:
+        """尝试为一次重试取出令牌"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.rejected += 1
+            return False
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+def _default_policies() -> Dict[Type[Exception], RetryPolicy]:
+    return {
+        RakutenConnectionError: RetryPolicy(),
+        RakutenServerError: RetryPolicy(),
+        # 403：等待 Retry-After（或退避）后重试，不再视为致命错误
+        RakutenRateLimitError: RetryPolicy(max_retries=2, base_delay=2),
+        # 维护(1001)/503：只在 Retry-After 很短时重试一次，其余交给断路器和降级缓存
+        RakutenServiceUnavailableError: RetryPolicy(
+            max_retries=1, base_delay=5, max_delay=30
+        ),
+    }
+
+
+class RetryEngine:
+    """按异常类型选择策略的重试执行器"""
+
+    def __init__(
+        self,
+        policies: Dict[Type[Exception], RetryPolicy] = None,
+        budget: RetryBudget = None,
+    ):
+        self.policies = policies if policies is not None else _default_policies()
+        self.budget = budget or RetryBudget()
+        self._logger = None
+
+    @property
+    def logger(self):
+        if self._logger is None:
+            from .utils import setup_logger
+
+            self._logger = setup_logger("rakuten.retry")
+        return self._logger
+
+    def with_overrides(self, **overrides) -> "RetryEngine":
+        """返回共享同一预算、但覆盖了策略参数的引擎"""
+        if not any(v is not None for v in overrides.values()):
+            return self
+        return RetryEngine(
+            {exc: policy.replace(**overrides) for exc, policy in self.policies.items()},
+            self.budget,
+        )
+
+    def policy_for(self, error: BaseException) -> Optional[RetryPolicy]:
+        for cls in type(error).__mro__:
+            policy = self.policies.get(cls)
+            if policy is not None:
+                return policy
+        return None
+
+    def _next_delay(
+        self, error: BaseException, attempt: int, rate_limiter
+    ) -> Optional[float]:
+        """判断是否重试并计算等待时间；不重试时返回None"""
+        policy = self.policy_for(error)
+        if policy is None or attempt >= policy.max_retries:
+            return None
+
+        retry_after = None
+        if isinstance(error, RakutenAPIError):
+            retry_after = error.details.get("retry_after")
+        delay = policy.compute_delay(attempt, retry_after)
+        if delay is None:
+            self.logger.warning(
+                f"Retry-After {retry_after}s 超过重试上限，放弃重试: {error}"
+            )
+            return None
+
+        if not self.budget.try_withdraw():
+            self.logger.warning(f"重试预算耗尽，放弃重试: {error}")
+            return None
+
+        if retry_after is not None and rate_limiter is not None:
+            # 让共享同一限速器的其他请求也推迟到 Retry-After 之后
+            rate_limiter.defer(retry_after)
+        return delay
+
+    def call(self, func: Callable, *args, rate_limiter=None, **kwargs) -> Any:
+        """
+        同步执行并按策略重试
+
+        Args:
+            func: 被调用的函数
+            rate_limiter: 共享速率限制器（收到 Retry-After 时推迟）
+        """
+        outer_attempt = current_retry_attempt()
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            # 嵌套的重试累加外层的重试序号
+            token = _retry_attempt.set(outer_attempt + attempt)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                delay = self._next_delay(e, attempt, rate_limiter)
+                if delay is None:
+                    raise
+            finally:
+                _retry_attempt.reset(token)
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(
+        self, func: Callable, *args, rate_limiter=None, **kwargs
+    ) -> Any:
+        """
+        异步执行并按策略重试（等待期间不占用工作线程）
+
+        协程函数直接await；普通函数在线程池中执行，避免阻塞事件循环。
+        """
+        outer_attempt = current_retry_attempt()
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            token = _retry_attempt.set(outer_attempt + attempt)
+            try:
+                if inspect.iscoroutinefunction(func):
+                    return await func(*args, **kwargs)
+                return await asyncio.to_thread(func, *args, **kwargs)
+            except Exception as e:
+                delay = self._next_delay(e, attempt, rate_limiter)
+                if delay is None:
+                    raise
+            finally:
+                _retry_attempt.reset(token)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+_retry_engine: Optional[RetryEngine] = None
+
+
+def get_retry_engine() -> RetryEngine:
+    """获取全局重试引擎（进程内共享同一重试预算）"""
+    global _retry_engine
+    if _retry_engine is None:
+        _retry_engine = RetryEngine()
+    return _retry_engine
+
+
+def _rate_limiter_of(args):
+    """方法调用时取实例上的 rate_limiter 属性"""
+    if args:
+        limiter = getattr(args[0], "rate_limiter", None)
+        if hasattr(limiter, "defer"):
+            return limiter
+    return None
+
+
+def async_retry_with_backoff(
+    max_retries: int = None,
+    base_delay: float = None,
+    max_delay: float = None,
+    backoff_factor: float = None,
+):
+    """retry_with_backoff 的异步版本，参数相同"""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            engine = get_retry_engine().with_overrides(
+                max_retries=max_retries,
+                base_delay=base_delay,
+                max_delay=max_delay,
+                backoff_factor=backoff_factor,
+            )
+            return await engine.call_async(
+                func, *args, rate_limiter=_rate_limiter_of(args), **kwargs
+            )
+
+        return wrapper
+
+    return decorator
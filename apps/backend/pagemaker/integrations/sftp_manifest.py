@@ -0,0 +1,216 @@
+"""
+SFTP远端文件清单
+
+记录店铺FTP空间上已有文件的 路径 → (大小, 修改时间, 内容哈希)，
+用于计算发布时的最小差异：只上传内容变化的文件，删除本地已移除的文件。
+
+- 清单本身不依赖数据库，持久化由调用方负责（见 configurations.sftp_sync）
+- ``refresh_from_remote`` 用 ``listdir_attr`` 校正清单，发现带外修改时
+  清除对应条目的哈希，确保这些文件会被重新上传
+- 内容哈希使用 SHA-256，远端发现但未由本系统上传的文件没有哈希，
+  此时退化为按大小和修改时间比较
+- 只有带内容哈希（即经 ``record_upload`` 记录）的条目才会被计划删除，
+  店铺在FTP空间上自行放置的文件不受同步影响
+"""
+
+import hashlib
+import posixpath
+import stat
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .instrumentation import instrument_call
+from .sftp_transfer import TransferItem
+from .utils import setup_logger
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(item: TransferItem) -> str:
+    """计算待上传文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with item.open() as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_under(path: str, remote_dir: str) -> bool:
+    remote_dir = remote_dir.rstrip("/")
+    if not remote_dir:
+        return True
+    return path == remote_dir or path.startswith(remote_dir + "/")
+
+
+class ManifestEntry:
+    """远端文件清单中的一条记录"""
+
+    __slots__ = ("path", "size", "mtime", "content_hash")
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        mtime: Optional[int] = None,
+        content_hash: str = "",
+    ):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.content_hash = content_hash
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ManifestEntry):
+            return NotImplemented
+        return (self.path, self.size, self.mtime, self.content_hash) == (
+            other.path,
+            other.size,
+            other.mtime,
+            other.content_hash,
+        )
+
+    def __repr__(self) -> str:
+        return f"ManifestEntry({self.path!r}, size={self.size}, mtime={self.mtime})"
+
+
+class RemoteManifest:
+    """单个店铺的远端文件清单"""
+
+    def __init__(self, entries: Iterable[ManifestEntry] = ()):
+        self.entries: Dict[str, ManifestEntry] = {
+            entry.path: entry for entry in entries
+        }
+        # 自加载以来新增/修改和删除的路径，供持久化时增量写回
+        self.changed: Set[str] = set()
+        self.removed: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.entries
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        return self.entries.get(path)
+
+    def _put(self, entry: ManifestEntry):
+        self.entries[entry.path] = entry
+        self.changed.add(entry.path)
+        self.removed.discard(entry.path)
+
+    def _drop(self, path: str):
+        if self.entries.pop(path, None) is not None:
+            self.removed.add(path)
+        self.changed.discard(path)
+
+    def refresh_from_remote(
+        self, remote_attrs: Dict[str, Tuple[int, Optional[int]]], remote_dir: str
+    ) -> Dict[str, int]:
+        """
+        用远端实际状态校正清单
+
+        Args:
+            remote_attrs: scan_remote() 返回的 {路径: (大小, 修改时间)}
+            remote_dir: 被扫描的远端目录（只校正该目录下的条目）
+
+        Returns:
+            校正统计 {"added", "modified", "missing"}
+        """
+        counts = {"added": 0, "modified": 0, "missing": 0}
+
+        for path in [p for p in self.entries if _is_under(p, remote_dir)]:
+            if path not in remote_attrs:
+                self._drop(path)
+                counts["missing"] += 1
+
+        for path, (size, mtime) in remote_attrs.items():
+            entry = self.entries.get(path)
+            if entry is None:
+                self._put(ManifestEntry(path, size, mtime))
+                counts["added"] += 1
+            elif entry.size != size or entry.mtime != mtime:
+                # 带外修改：哈希已不可信
+                self._put(ManifestEntry(path, size, mtime))
+                counts["modified"] += 1
+
+        return counts
+
+    def is_unchanged(self, item: TransferItem, digest: str) -> bool:
+        """判断本地文件与清单记录是否一致"""
+        entry = self.entries.get(item.remote_path)
+        if entry is None or entry.size != item.size:
+            return False
+        if entry.content_hash:
+            return entry.content_hash == digest
+        return item.mtime is not None and entry.mtime == item.mtime
+
+    def diff(
+        self, items: Iterable[TransferItem], remote_dir: str
+    ) -> Tuple[List[Tuple[TransferItem, str]], List[str]]:
+        """
+        计算同步所需的最小差异
+
+        Args:
+            items: 本地完整文件清单
+            remote_dir: 远端同步根目录（只删除该目录下由本系统上传的多余文件）
+
+        Returns:
+            (需要上传的 [(TransferItem, 内容哈希)], 需要删除的远端路径列表)
+        """
+        to_upload = []
+        wanted = set()
+        for item in items:
+            wanted.add(item.remote_path)
+            digest = content_hash(item)
+            if not self.is_unchanged(item, digest):
+                to_upload.append((item, digest))
+
+        # 没有内容哈希的条目来自远端扫描，不是本系统上传的文件，不能删除
+        to_delete = sorted(
+            path
+            for path, entry in self.entries.items()
+            if entry.content_hash and _is_under(path, remote_dir) and path not in wanted
+        )
+        return to_upload, to_delete
+
+    def record_upload(self, item: TransferItem, digest: str):
+        """记录上传成功的文件"""
+        self._put(ManifestEntry(item.remote_path, item.size, item.mtime, digest))
+
+    def record_delete(self, path: str):
+        """记录已删除的远端文件"""
+        self._drop(path)
+
+
+def scan_remote(client, remote_dir: str) -> Dict[str, Tuple[int, Optional[int]]]:
+    """
+    递归列出远端目录下的所有文件属性
+
+    每个目录一次 ``listdir_attr`` 往返；目录不存在时返回空结果。
+
+    Args:
+        client: RakutenFTPClient 实例
+        remote_dir: 远端目录
+
+    Returns:
+        {路径: (大小, 修改时间)}
+    """
+    logger = setup_logger("rakuten.sftp_manifest")
+    remote_attrs = {}
+    pending = [remote_dir]
+
+    with client.borrow(reuse_current=False) as sftp:
+        while pending:
+            directory = pending.pop()
+            try:
+                with instrument_call("LIST", client._endpoint, logger=logger):
+                    entries = sftp.listdir_attr(directory or ".")
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                path = posixpath.join(directory, entry.filename)
+                if entry.st_mode is not None and stat.S_ISDIR(entry.st_mode):
+                    pending.append(path)
+                else:
+                    remote_attrs[path] = (entry.st_size, entry.st_mtime)
+
+    return remote_attrs
@@ -0,0 +1,303 @@
+"""
+乐天SFTP连接池
+
+按店铺（主机、端口、用户名、凭据摘要）复用已完成SSH握手的SFTP连接，避免每次
+部署或健康检查都重新进行密钥交换。连接池线程安全、大小有上限；空闲较久的
+连接借出前会执行 ``stat('.')`` 探活。
+
+空闲超时的连接在借出、归还以及每次 get_sftp_pool 时（清扫所有连接池）关闭，
+不再使用的店铺不会一直占用SSH会话；凭据变更后旧凭据的连接池会被关闭。
+"""
+
+import atexit
+import time
+from collections import deque
+from contextlib import contextmanager
+from threading import Condition, Lock
+from typing import Callable, Dict, Optional, Tuple
+
+from .constants import SFTP_POOL_CONFIG
+from .exceptions import RakutenFTPError
+from .utils import setup_logger
+
+# (主机, 端口, 用户名, 密码摘要)
+PoolKey = Tuple[str, int, str, str]
+
+
+class PooledSFTPConnection:
+    """连接池中的一条SFTP连接"""
+
+    def __init__(self, ssh_client, sftp_client):
+        self.ssh_client = ssh_client
+        self.sftp_client = sftp_client
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.use_count = 0
+
+    @property
+    def server_version(self) -> Optional[str]:
+        transport = self.ssh_client.get_transport()
+        return transport.remote_version if transport else None
+
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_used
+
+    def is_alive(self, probe: bool = False) -> bool:
+        """
+        检查连接是否可用
+
+        Args:
+            probe: 是否执行一次 stat('.') 往返探测
+        """
+        transport = self.ssh_client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        if probe:
+            try:
+                self.sftp_client.stat(".")
+            except Exception:
+                return False
+        return True
+
+    def close(self):
+        for client in (self.sftp_client, self.ssh_client):
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+class SFTPConnectionPool:
+    """单个店铺的SFTP连接池"""
+
+    def __init__(
+        self,
+        factory: Callable[[], PooledSFTPConnection],
+        max_size: int = None,
+        idle_timeout: float = None,
+        checkout_timeout: float = None,
+        liveness_check_interval: float = None,
+        name: str = "",
+    ):
+        """
+        初始化连接池
+
+        Args:
+            factory: 创建新连接的函数（完成SSH握手并打开SFTP通道）
+            max_size: 最大连接数（空闲 + 借出）
+            idle_timeout: 空闲连接保留时间（秒）
+            checkout_timeout: 连接池耗尽时的等待时间（秒）
+            liveness_check_interval: 空闲超过该时间的连接借出前执行探活（秒）
+            name: 连接池名称（用于日志）
+        """
+        self.logger = setup_logger("rakuten.sftp_pool")
+        self.factory = factory
+        self.max_size = max_size or SFTP_POOL_CONFIG["MAX_SIZE"]
+        self.idle_timeout = idle_timeout or SFTP_POOL_CONFIG["IDLE_TIMEOUT"]
+        self.checkout_timeout = checkout_timeout or SFTP_POOL_CONFIG["CHECKOUT_TIMEOUT"]
+        self.liveness_check_interval = (
+            liveness_check_interval
+            if liveness_check_interval is not None
+            else SFTP_POOL_CONFIG["LIVENESS_CHECK_INTERVAL"]
+        )
+        self.name = name
+
+        self._condition = Condition(Lock())
+        self._idle = deque()
+        self._size = 0  # 空闲 + 借出 + 正在创建的连接数
+        self._closed = False
+
+    def _evict_expired(self):
+        """关闭空闲超时的连接（调用方需持有锁）"""
+        expired = []
+        while self._idle and self._idle[0].idle_seconds() > self.idle_timeout:
+            expired.append(self._idle.popleft())
+            self._size -= 1
+        return expired
+
+    def evict_idle(self) -> int:
+        """
+        关闭空闲超时的连接
+
+        Returns:
+            关闭的连接数
+        """
+        with self._condition:
+            expired = self._evict_expired()
+            if expired:
+                self._condition.notify(len(expired))
+        for conn in expired:
+            conn.close()
+        return len(expired)
+
+    def acquire(self) -> Tuple[PooledSFTPConnection, bool]:
+        """
+        借出一条连接
+
+        Returns:
+            (连接, 是否为复用的连接)
+
+        Raises:
+            RakutenFTPError: 连接池已关闭或等待超时
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+
+        while True:
+            candidate = None
+            with self._condition:
+                if self._closed:
+                    raise RakutenFTPError(f"SFTP连接池已关闭: {self.name}")
+
+                expired = self._evict_expired()
+                if self._idle:
+                    # 后进先出，优先复用最近使用过的连接
+                    candidate = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RakutenFTPError(
+                            f"SFTP连接池已耗尽: {self.name}",
+                            details={"max_size": self.max_size},
+                        )
+                    self._condition.wait(remaining)
+                    continue
+
+            for conn in expired:
+                conn.close()
+
+            if candidate is None:
+                return self._create(), False
+
+            probe = candidate.idle_seconds() >= self.liveness_check_interval
+            if candidate.is_alive(probe=probe):
+                return candidate, True
+
+            self.logger.info(f"丢弃失效的SFTP连接: {self.name}")
+            self._discard(candidate)
+
+    def _create(self) -> PooledSFTPConnection:
+        """在锁外创建新连接，失败时归还占用的名额"""
+        try:
+            return self.factory()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _discard(self, conn: PooledSFTPConnection):
+        conn.close()
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def release(
+        self, conn: PooledSFTPConnection, discard: bool = False, evict: bool = True
+    ):
+        """
+        归还连接
+
+        Args:
+            conn: 借出的连接
+            discard: 是否关闭该连接（操作出错后连接状态不确定时使用）
+            evict: 归还后是否关闭空闲超时的其他连接（GC终结器中归还时为False）
+        """
+        if discard or self._closed:
+            self._discard(conn)
+            return
+
+        conn.last_used = time.monotonic()
+        conn.use_count += 1
+        with self._condition:
+            self._idle.append(conn)
+            self._condition.notify()
+        if evict:
+            self.evict_idle()
+
+    @contextmanager
+    def connection(self):
+        """借出连接的上下文管理器，出现SSH/IO错误时丢弃连接"""
+        conn, _reused = self.acquire()
+        try:
+            yield conn
+        except (OSError, EOFError, RakutenFTPError):
+            self.release(conn, discard=True)
+            raise
+        except BaseException:
+            self.release(conn, discard=not conn.is_alive())
+            raise
+        else:
+            self.release(conn)
+
+    def close(self):
+        """关闭连接池及所有空闲连接"""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+
+_pools: Dict[PoolKey, SFTPConnectionPool] = {}
+_pools_lock = Lock()
+
+
+def get_sftp_pool(
+    key: PoolKey, factory: Callable[[], PooledSFTPConnection], **kwargs
+) -> SFTPConnectionPool:
+    """
+    获取（或创建）指定店铺的连接池
+
+    同一主机、端口、用户名的凭据变更时关闭旧凭据的连接池；每次调用都会清扫
+    所有连接池中空闲超时的连接。
+
+    Args:
+        key: (主机, 端口, 用户名, 密码摘要)
+        factory: 创建新连接的函数
+        **kwargs: 传给 SFTPConnectionPool 的参数
+
+    Returns:
+        SFTPConnectionPool 实例
+    """
+    replaced = []
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            for old_key in [k for k in _pools if k[:3] == key[:3] and k != key]:
+                replaced.append(_pools.pop(old_key))
+            pool = _pools[key] = SFTPConnectionPool(
+                factory, name=f"{key[2]}@{key[0]}:{key[1]}", **kwargs
+            )
+        pools = list(_pools.values())
+
+    for old_pool in replaced:
+        old_pool.close()
+    for other in pools:
+        other.evict_idle()
+    return pool
+
+
+def close_all_pools():
+    """关闭所有连接池（进程退出时调用）"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
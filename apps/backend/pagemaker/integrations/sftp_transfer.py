@@ -0,0 +1,282 @@
+"""
+SFTP批量传输
+
+把本地目录或文件清单通过多个并发SFTP通道上传到店铺FTP空间：
+
+- 每个工作线程从店铺连接池借用独立连接，多通道并行上传
+- 使用 paramiko ``putfo`` 的流水线写入，连接建立时放大SSH通道窗口
+- 先写入临时文件再原子重命名，远端不会出现写了一半的文件
+- 按大小和修改时间跳过未变化的文件；失败的文件记录在结果中，
+  调用 ``resume()`` 或重新执行即可续传
+"""
+
+import io
+import os
+import posixpath
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .constants import SFTP_TRANSFER_CONFIG, TEST_MODE
+from .instrumentation import instrument_call
+from .utils import setup_logger
+
+
+class TransferItem:
+    """一个待上传的文件（本地文件或内存数据）"""
+
+    __slots__ = ("remote_path", "local_path", "data", "size", "mtime")
+
+    def __init__(
+        self,
+        remote_path: str,
+        local_path: str = None,
+        data: bytes = None,
+        mtime: int = None,
+    ):
+        """
+        Args:
+            remote_path: 远端路径
+            local_path: 本地文件路径（与 data 二选一）
+            data: 文件内容（用于生成的HTML等）
+            mtime: 修改时间（秒）；本地文件默认取文件的mtime
+        """
+        if (local_path is None) == (data is None):
+            raise ValueError("local_path 和 data 必须且只能指定一个")
+
+        self.remote_path = remote_path
+        self.local_path = local_path
+        self.data = data
+
+        if local_path is not None:
+            stat = os.stat(local_path)
+            self.size = stat.st_size
+            self.mtime = int(mtime if mtime is not None else stat.st_mtime)
+        else:
+            self.size = len(data)
+            self.mtime = int(mtime) if mtime is not None else None
+
+    def open(self):
+        if self.local_path is not None:
+            return open(self.local_path, "rb")
+        return io.BytesIO(self.data)
+
+    def __repr__(self) -> str:
+        return f"TransferItem({self.remote_path!r}, size={self.size})"
+
+
+def build_directory_manifest(local_dir: str, remote_dir: str) -> List[TransferItem]:
+    """
+    为本地目录生成上传清单
+
+    Args:
+        local_dir: 本地目录
+        remote_dir: 远端目标目录
+
+    Returns:
+        TransferItem 列表（按路径排序）
+    """
+    items = []
+    for root, dirs, files in os.walk(local_dir):
+        dirs.sort()
+        relative_root = os.path.relpath(root, local_dir)
+        for name in sorted(files):
+            relative = (
+                name if relative_root == "." else os.path.join(relative_root, name)
+            )
+            remote_path = posixpath.join(remote_dir, *relative.split(os.sep))
+            items.append(TransferItem(remote_path, local_path=os.path.join(root, name)))
+    return items
+
+
+class SFTPBulkUploader:
+    """多通道SFTP批量上传器"""
+
+    def __init__(
+        self,
+        client,
+        concurrency: int = None,
+        skip_unchanged: bool = True,
+        max_attempts: int = None,
+    ):
+        """
+        初始化批量上传器
+
+        Args:
+            client: RakutenFTPClient 实例
+            concurrency: 并发通道数（超过连接池上限的部分会排队等待）
+            skip_unchanged: 是否跳过大小和修改时间都相同的远端文件
+            max_attempts: 单个文件的最大尝试次数
+        """
+        self.logger = setup_logger("rakuten.sftp_transfer")
+        self.client = client
+        self.concurrency = max(1, concurrency or SFTP_TRANSFER_CONFIG["CONCURRENCY"])
+        self.skip_unchanged = skip_unchanged
+        self.max_attempts = max_attempts or SFTP_TRANSFER_CONFIG["MAX_ATTEMPTS"]
+        self.failed_items: List[TransferItem] = []
+
+    def upload_directory(self, local_dir: str, remote_dir: str) -> Dict[str, Any]:
+        """上传整个本地目录"""
+        return self.upload(build_directory_manifest(local_dir, remote_dir))
+
+    def resume(self) -> Dict[str, Any]:
+        """重新上传上一次失败的文件"""
+        return self.upload(self.failed_items)
+
+    def upload(self, items: Iterable[TransferItem]) -> Dict[str, Any]:
+        """
+        上传文件清单
+
+        Args:
+            items: TransferItem 列表
+
+        Returns:
+            传输结果汇总
+        """
+        items = list(items)
+        start = time.perf_counter()
+
+        if self.client.test_mode == TEST_MODE["MOCK"]:
+            self.failed_items = []
+            return self._summary(items, items, [], [], start)
+
+        remote_attrs = self._scan_remote(items)
+        pending = []
+        skipped = []
+        for item in items:
+            if self.skip_unchanged and self._is_unchanged(item, remote_attrs):
+                skipped.append(item)
+            else:
+                pending.append(item)
+
+        uploaded = []
+        failed = []
+        if pending:
+            with ThreadPoolExecutor(
+                max_workers=min(self.concurrency, len(pending)),
+                thread_name_prefix="sftp-upload",
+            ) as executor:
+                for item, error in executor.map(self._upload_one, pending):
+                    if error is None:
+                        uploaded.append(item)
+                    else:
+                        failed.append((item, error))
+
+        self.failed_items = [item for item, _error in failed]
+        result = self._summary(items, uploaded, skipped, failed, start)
+        self.logger.info(
+            f"SFTP批量上传完成: 上传 {result['uploaded']}, 跳过 {result['skipped']}, "
+            f"失败 {result['failed']}, {result['throughput_bytes_per_sec']} B/s"
+        )
+        return result
+
+    def _summary(self, items, uploaded, skipped, failed, start) -> Dict[str, Any]:
+        duration = time.perf_counter() - start
+        bytes_uploaded = sum(item.size for item in uploaded)
+        return {
+            "success": not failed,
+            "total": len(items),
+            "uploaded": len(uploaded),
+            "skipped": len(skipped),
+            "failed": len(failed),
+            "bytes_uploaded": bytes_uploaded,
+            "duration_ms": round(duration * 1000, 2),
+            "throughput_bytes_per_sec": (
+                round(bytes_uploaded / duration) if duration > 0 else 0
+            ),
+            "concurrency": self.concurrency,
+            "errors": [
+                {"remote_path": item.remote_path, "error": str(error)}
+                for item, error in failed
+            ],
+        }
+
+    @staticmethod
+    def _is_unchanged(
+        item: TransferItem, remote_attrs: Dict[str, Tuple[int, Optional[int]]]
+    ) -> bool:
+        remote = remote_attrs.get(item.remote_path)
+        if remote is None or item.mtime is None:
+            return False
+        size, mtime = remote
+        return size == item.size and mtime == item.mtime
+
+    def _scan_remote(self, items: List[TransferItem]) -> Dict[str, Tuple[int, int]]:
+        """
+        列出目标目录的远端文件属性，并创建缺失的目录
+
+        每个目录只需要一次 listdir_attr 往返，而不是每个文件一次 stat。
+        """
+        directories = sorted({posixpath.dirname(item.remote_path) for item in items})
+        remote_attrs = {}
+        if not directories:
+            return remote_attrs
+
+        with self.client.borrow(reuse_current=False) as sftp:
+            for directory in directories:
+                try:
+                    with instrument_call(
+                        "LIST", self.client._endpoint, logger=self.logger
+                    ):
+                        entries = sftp.listdir_attr(directory or ".")
+                except FileNotFoundError:
+                    self._makedirs(sftp, directory)
+                    continue
+                for entry in entries:
+                    remote_attrs[posixpath.join(directory, entry.filename)] = (
+                        entry.st_size,
+                        entry.st_mtime,
+                    )
+        return remote_attrs
+
+    @staticmethod
+    def _makedirs(sftp, directory: str):
+        """逐级创建远端目录（类似 mkdir -p）"""
+        current = "/" if directory.startswith("/") else ""
+        for part in directory.strip("/").split("/"):
+            current = posixpath.join(current, part) if current else part
+            try:
+                sftp.stat(current)
+            except FileNotFoundError:
+                sftp.mkdir(current)
+
+    def _upload_one(
+        self, item: TransferItem
+    ) -> Tuple[TransferItem, Optional[Exception]]:
+        """上传单个文件，失败时借用新连接重试"""
+        last_error = None
+        for attempt in range(self.max_attempts):
+            try:
+                with instrument_call(
+                    "PUT", self.client._endpoint, logger=self.logger
+                ) as span:
+                    span.retries = attempt
+                    span.bytes_out = item.size
+                    with self.client.borrow(reuse_current=False) as sftp:
+                        self._put(sftp, item)
+                return item, None
+            except Exception as e:
+                last_error = e
+                self.logger.warning(
+                    f"上传失败 ({attempt + 1}/{self.max_attempts}) "
+                    f"{item.remote_path}: {str(e)}"
+                )
+        return item, last_error
+
+    @staticmethod
+    def _put(sftp, item: TransferItem):
+        """流水线写入临时文件，设置修改时间后原子替换目标文件"""
+        temp_path = item.remote_path + SFTP_TRANSFER_CONFIG["TEMP_SUFFIX"]
+        with item.open() as fl:
+            sftp.putfo(fl, temp_path, file_size=item.size, confirm=True)
+        if item.mtime is not None:
+            sftp.utime(temp_path, (item.mtime, item.mtime))
+        try:
+            sftp.posix_rename(temp_path, item.remote_path)
+        except IOError:
+            # 服务器不支持 posix-rename 扩展时退化为 删除 + 重命名
+            try:
+                sftp.remove(item.remote_path)
+            except FileNotFoundError:
+                pass
+            sftp.rename(temp_path, item.remote_path)
@@ -0,0 +1,211 @@
+"""
+单飞（single-flight）请求合并
+
+同一个键同一时刻只允许一次昂贵的获取（例如R-Cabinet全量分页拉取）：
+
+- 进程内：第一个调用者成为执行者，其余线程等待并共享它的结果或异常
+- 跨worker：执行者先在共享缓存中 ``add`` 一个带有效期的锁，拿不到锁说明
+  其他worker正在获取，此时轮询调用方提供的 ``load``（通常是读取结果缓存），
+  拿到结果即返回；锁被释放或等待超时后再自行获取。共享缓存的 ``add`` 不是原子
+  操作（文件缓存后端）时不使用跨worker锁，只做进程内合并
+- ``run_if_idle`` 用于后台刷新：同一个键已有获取在进行时直接跳过
+"""
+
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from .constants import SINGLE_FLIGHT_CONFIG
+from .utils import setup_logger
+
+
+class _Flight:
+    """进程内一次进行中的获取"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """按键合并并发获取"""
+
+    def __init__(
+        self,
+        store=None,
+        lock_timeout: float = None,
+        wait_timeout: float = None,
+        poll_interval: float = None,
+    ):
+        """
+        Args:
+            store: 跨worker锁使用的Django缓存（默认使用共享状态存储）
+            lock_timeout: 锁的有效期（秒），执行者异常退出时锁会自动过期
+            wait_timeout: 等待其他worker的最长时间（秒），超时后自行获取
+            poll_interval: 等待其他worker时的轮询间隔（秒）
+        """
+        self._store = store
+        self.lock_timeout = lock_timeout or SINGLE_FLIGHT_CONFIG["LOCK_TIMEOUT"]
+        self.wait_timeout = wait_timeout or SINGLE_FLIGHT_CONFIG["WAIT_TIMEOUT"]
+        self.poll_interval = poll_interval or SINGLE_FLIGHT_CONFIG["POLL_INTERVAL"]
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._local_store = None
+        self.logger = setup_logger("rakuten.single_flight")
+
+    @property
+    def store(self):
+        from .fallback_strategies import get_shared_cache, is_atomic_cache
+
+        store = self._store if self._store is not None else get_shared_cache()
+        if is_atomic_cache(store):
+            return store
+        if self._local_store is None:
+            from django.core.cache.backends.locmem import LocMemCache
+
+            self.logger.warning(
+                f"{type(store).__name__} 的 add 不是原子操作，单飞锁只在进程内生效"
+            )
+            self._local_store = LocMemCache(
+                f"single-flight-{uuid.uuid4().hex}", {"TIMEOUT": None}
+            )
+        return self._local_store
+
+    def _lock_key(self, key: str) -> str:
+        return f"{SINGLE_FLIGHT_CONFIG['KEY_PREFIX']}:{key}"
+
+    def _acquire(self, key: str) -> Optional[str]:
+        """尝试获取跨worker锁，成功时返回锁令牌"""
+        token = uuid.uuid4().hex
+        if self.store.add(self._lock_key(key), token, timeout=self.lock_timeout):
+            return token
+        return None
+
+    def _release(self, key: str, token: str):
+        # 只释放自己持有的锁（锁过期后可能已被其他worker重新获取）
+        lock_key = self._lock_key(key)
+        if self.store.get(lock_key) == token:
+            self.store.delete(lock_key)
+
+    def is_running(self, key: str) -> bool:
+        """判断该键是否有获取正在进行（本进程或其他worker）"""
+        with self._lock:
+            if key in self._flights:
+                return True
+        return self.store.get(self._lock_key(key)) is not None
+
+    def do(
+        self,
+        key: str,
+        func: Callable[[], Any],
+        load: Callable[[], Any] = None,
+    ) -> Any:
+        """
+        执行获取，同一个键的并发调用只执行一次
+
+        Args:
+            key: 合并键（通常就是结果缓存键）
+            func: 获取函数
+            load: 读取其他worker获取结果的函数，未获取到时返回None
+
+        Returns:
+            func 或 load 的结果
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if not flight.done.wait(self.lock_timeout):
+                self.logger.warning(f"等待 {key} 的获取结果超时，自行获取")
+                return func()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._run_exclusive(key, func, load)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _run_exclusive(self, key: str, func: Callable, load: Optional[Callable]):
+        deadline = time.monotonic() + self.wait_timeout
+        waited = False
+        while True:
+            token = self._acquire(key)
+            if token is not None:
+                try:
+                    # 拿到锁前其他worker可能刚好完成获取
+                    if waited and load is not None:
+                        value = load()
+                        if value is not None:
+                            return value
+                    return func()
+                finally:
+                    self._release(key, token)
+
+            if load is not None:
+                value = load()
+                if value is not None:
+                    return value
+            if time.monotonic() >= deadline:
+                self.logger.warning(f"等待其他worker获取 {key} 超时，自行获取")
+                return func()
+            waited = True
+            time.sleep(self.poll_interval)
+
+    def run_if_idle(self, key: str, func: Callable[[], Any]) -> bool:
+        """
+        该键没有获取在进行时立即执行，否则直接返回（用于后台刷新）
+
+        执行期间同一个键的 ``do`` 调用会等待本次结果。
+
+        Returns:
+            是否执行了获取
+        """
+        with self._lock:
+            if key in self._flights:
+                return False
+        token = self._acquire(key)
+        if token is None:
+            return False
+        with self._lock:
+            if key in self._flights:
+                self._release(key, token)
+                return False
+            flight = self._flights[key] = _Flight()
+
+        try:
+            flight.result = func()
+            return True
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._release(key, token)
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """获取全局单飞实例"""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,190 @@
+"""
+测试用本地SFTP服务器（基于paramiko，文件保存在临时目录中）
+"""
+
+import os
+import socket
+import threading
+import time
+
+import paramiko
+from paramiko import SFTPAttributes, SFTPHandle, SFTPServer, SFTPServerInterface
+from paramiko.sftp import SFTP_OK
+
+_HOST_KEY = None
+
+
+def _host_key():
+    global _HOST_KEY
+    if _HOST_KEY is None:
+        _HOST_KEY = paramiko.RSAKey.generate(2048)
+    return _HOST_KEY
+
+
+class _Server(paramiko.ServerInterface):
+    def __init__(self, username, password):
+        self.username = username
+        self.password = password
+
+    def check_auth_password(self, username, password):
+        if (username, password) == (self.username, self.password):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+
+class _Handle(SFTPHandle):
+    def stat(self):
+        try:
+            return SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+
+    def chattr(self, attr):
+        return SFTP_OK
+
+
+class _FileSystemSFTP(SFTPServerInterface):
+    """把SFTP路径映射到本地根目录"""
+
+    root = None
+    write_delay = 0.0
+
+    def _local(self, path):
+        return os.path.join(self.root, self.canonicalize(path).lstrip("/"))
+
+    def list_folder(self, path):
+        local = self._local(path)
+        try:
+            return [
+                SFTPAttributes.from_stat(os.stat(os.path.join(local, name)), name)
+                for name in os.listdir(local)
+            ]
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+
+    def stat(self, path):
+        try:
+            return SFTPAttributes.from_stat(os.stat(self._local(path)))
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+
+    lstat = stat
+
+    def open(self, path, flags, attr):
+        local = self._local(path)
+        if flags & os.O_WRONLY or flags & os.O_RDWR:
+            # 模拟广域网下每个文件的往返延迟
+            if self.write_delay:
+                time.sleep(self.write_delay)
+            mode = "wb"
+        else:
+            mode = "rb"
+        try:
+            f = open(local, mode)
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+        handle = _Handle(flags)
+        handle.filename = local
+        handle.readfile = f
+        handle.writefile = f if mode == "wb" else None
+        return handle
+
+    def remove(self, path):
+        try:
+            os.remove(self._local(path))
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+        return SFTP_OK
+
+    def rename(self, oldpath, newpath):
+        if os.path.exists(self._local(newpath)):
+            return SFTPServer.convert_errno(17)
+        os.rename(self._local(oldpath), self._local(newpath))
+        return SFTP_OK
+
+    def posix_rename(self, oldpath, newpath):
+        os.replace(self._local(oldpath), self._local(newpath))
+        return SFTP_OK
+
+    def mkdir(self, path, attr):
+        try:
+            os.mkdir(self._local(path))
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+        return SFTP_OK
+
+    def chattr(self, path, attr):
+        if attr.st_mtime is not None:
+            os.utime(self._local(path), (attr.st_atime, attr.st_mtime))
+        return SFTP_OK
+
+
+class LocalSFTPServer:
+    """
+    在后台线程中运行的本地SFTP服务器
+
+    用法::
+
+        with LocalSFTPServer(root_dir) as server:
+            client = RakutenFTPClient(host="127.0.0.1", port=server.port, ...)
+    """
+
+    def __init__(self, root, username="shop", password="secret", write_delay=0.0):
+        self.root = root
+        self.username = username
+        self.password = password
+        self.write_delay = write_delay
+        self.connections = 0
+        self._socket = None
+        self._transports = []
+        self._stopped = threading.Event()
+
+    @property
+    def port(self):
+        return self._socket.getsockname()[1]
+
+    def __enter__(self):
+        handler = type(
+            "_RootedSFTP",
+            (_FileSystemSFTP,),
+            {"root": self.root, "write_delay": self.write_delay},
+        )
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen(16)
+        self._socket.settimeout(0.2)
+
+        def serve():
+            while not self._stopped.is_set():
+                try:
+                    conn, _addr = self._socket.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    return
+                self.connections += 1
+                transport = paramiko.Transport(conn)
+                transport.add_server_key(_host_key())
+                transport.set_subsystem_handler("sftp", SFTPServer, handler)
+                transport.start_server(server=_Server(self.username, self.password))
+                self._transports.append(transport)
+
+        self._thread = threading.Thread(target=serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stopped.set()
+        self._thread.join()
+        self._socket.close()
+        for transport in self._transports:
+            transport.close()
@@ -0,0 +1,93 @@
+"""
+R-Cabinet读操作降级测试（断路器 + 过期缓存）
+"""
+
+import uuid
+from unittest.mock import MagicMock, patch
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from pagemaker.integrations.cabinet_client import RCabinetClient
+from pagemaker.integrations.exceptions import (
+    RakutenCircuitOpenError,
+    RakutenParameterError,
+    RakutenServiceUnavailableError,
+)
+from pagemaker.integrations.fallback_strategies import (
+    FallbackManager,
+    ServiceStatus,
+)
+
+FOLDERS = {"success": True, "data": {"result_code": 0, "folders": [{"folder_id": 1}]}}
+
+
+class CabinetFallbackTestCase(SimpleTestCase):
+    """Cabinet读操作经过断路器并在上游不可用时返回过期缓存"""
+
+    def setUp(self):
+        store = LocMemCache(f"cabinet-fallback-{uuid.uuid4().hex}", {})
+        self.manager = FallbackManager(store=store, start_sweeper=False)
+        patcher = patch(
+            "pagemaker.integrations.cabinet_client.get_fallback_manager",
+            return_value=self.manager,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = RCabinetClient(
+            service_secret="secret", license_key="license", test_mode="real"
+        )
+        self.client._make_request = MagicMock(return_value=FOLDERS)
+
+    def test_maintenance_serves_stale_without_calling_upstream(self):
+        """测试维护(1001)期间返回带标记的过期数据，且不再访问上游"""
+        self.assertEqual(self.client.get_folders(), FOLDERS)
+
+        self.client._make_request.side_effect = RakutenServiceUnavailableError()
+        stale = self.client.get_folders()
+
+        self.assertTrue(stale["stale"])
+        self.assertEqual(stale["stale_reason"], "upstream_error")
+        self.assertEqual(stale["data"], FOLDERS["data"])
+        self.assertEqual(
+            self.manager.get_service_status("cabinet_api"), ServiceStatus.MAINTENANCE
+        )
+
+        calls = self.client._make_request.call_count
+        again = self.client.get_folders()
+        self.assertEqual(again["stale_reason"], "maintenance")
+        self.assertEqual(self.client._make_request.call_count, calls)
+
+    def test_health_checks_ignore_stale_cache(self):
+        """测试有过期备份时健康检查和连接测试仍报告上游故障"""
+        self.client.get_usage()
+        self.client._make_request.side_effect = RakutenServiceUnavailableError()
+        self.assertTrue(self.client.get_usage()["stale"])
+
+        self.assertEqual(self.client.health_check()["status"], "unhealthy")
+        self.assertFalse(self.client.test_connection()["success"])
+
+    def test_open_circuit_fails_fast_without_cache(self):
+        """测试断路器开启且无缓存时立即失败"""
+        self.client._make_request.side_effect = RakutenServiceUnavailableError()
+        breaker = self.manager.circuit_breakers["cabinet_api"]
+        for _ in range(breaker.failure_threshold):
+            with self.assertRaises(RakutenServiceUnavailableError):
+                self.client.get_folder_files(folder_id=7)
+        # 维护状态过期后仍由断路器拦截
+        self.manager.set_service_status("cabinet_api", ServiceStatus.HEALTHY)
+
+        calls = self.client._make_request.call_count
+        with self.assertRaises(RakutenCircuitOpenError):
+            self.client.get_folder_files(folder_id=8)
+        self.assertEqual(self.client._make_request.call_count, calls)
+
+    def test_parameter_error_is_not_masked(self):
+        """测试参数错误不计入断路器，也不返回缓存"""
+        self.client.get_folders()
+        self.client._make_request.side_effect = RakutenParameterError()
+
+        with self.assertRaises(RakutenParameterError):
+            self.client.get_folders()
+        self.assertEqual(self.manager.circuit_breakers["cabinet_api"].failure_count, 0)
@@ -0,0 +1,160 @@
+"""
+降级管理器共享状态测试（两个管理器共用文件缓存，模拟两个gunicorn worker）
+"""
+
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import SimpleTestCase
+
+from pagemaker.integrations.constants import FALLBACK_CONFIG
+from pagemaker.integrations.exceptions import (
+    RakutenCircuitOpenError,
+    RakutenServiceUnavailableError,
+)
+from pagemaker.integrations.fallback_strategies import (
+    CacheSweeper,
+    CircuitBreaker,
+    CircuitBreakerState,
+    FallbackManager,
+    LRUTTLCache,
+)
+
+
+class LRUTTLCacheTestCase(SimpleTestCase):
+    """有界LRU缓存测试"""
+
+    def test_evicts_least_recently_used(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        cache = LRUTTLCache(max_entries=2, default_ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.keys(), ["a", "c"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expired_entries_are_swept(self):
+        """测试后台清理线程删除过期条目"""
+        cache = LRUTTLCache(max_entries=10)
+        cache.set("old", 1, ttl=0.01)
+        cache.set("fresh", 2, ttl=60)
+
+        sweeper = CacheSweeper(cache, interval=0.01)
+        sweeper.start()
+        self.addCleanup(sweeper.stop)
+        deadline = time.time() + 2
+        while len(cache) > 1 and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(cache.keys(), ["fresh"])
+
+
+class SharedFallbackStateTestCase(SimpleTestCase):
+    """跨worker共享状态测试"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = FileBasedCache(directory.name, {"TIMEOUT": None})
+        self.worker_a = FallbackManager(store=self.store, start_sweeper=False)
+        self.worker_b = FallbackManager(store=self.store, start_sweeper=False)
+
+    def test_breaker_opened_by_one_worker_protects_others(self):
+        """测试一个worker触发断路器后其他worker不再访问上游"""
+        failing = MagicMock(side_effect=RakutenServiceUnavailableError())
+        breaker_a = self.worker_a.circuit_breakers["cabinet_api"]
+        for _ in range(breaker_a.failure_threshold):
+            with self.assertRaises(RakutenServiceUnavailableError):
+                breaker_a.call(failing)
+
+        upstream = MagicMock(return_value="ok")
+        breaker_b = self.worker_b.circuit_breakers["cabinet_api"]
+        with self.assertRaises(RakutenCircuitOpenError):
+            breaker_b.call(upstream)
+
+        upstream.assert_not_called()
+        self.assertEqual(breaker_b.state, CircuitBreakerState.OPEN)
+        self.assertEqual(
+            self.worker_b.get_fallback_status()["circuit_breakers"]["cabinet_api"][
+                "state"
+            ],
+            "open",
+        )
+
+    def test_half_open_allows_single_probe(self):
+        """测试半开状态下只有一个worker的探测请求访问上游"""
+        breaker_a = CircuitBreaker(name="probe", recovery_timeout=0, store=self.store)
+        breaker_b = CircuitBreaker(name="probe", recovery_timeout=0, store=self.store)
+        self.store.set(breaker_a._key("opened_at"), time.time(), timeout=None)
+
+        def probe():
+            # 探测进行中，其他worker被拒绝
+            with self.assertRaises(RakutenCircuitOpenError):
+                breaker_b.call(lambda: "should not run")
+            return "recovered"
+
+        self.assertEqual(breaker_a.call(probe), "recovered")
+        self.assertEqual(breaker_b.state, CircuitBreakerState.CLOSED)
+        self.assertEqual(breaker_b.call(lambda: "ok"), "ok")
+
+    def test_flags_and_cached_responses_are_shared(self):
+        """测试功能开关和降级缓存在worker之间共享"""
+        self.worker_a.disable_feature("cabinet_api_enabled")
+        self.worker_a.cache_response("folders:shop-1", {"folders": [1, 2]}, ttl=60)
+
+        self.assertFalse(self.worker_b.is_feature_enabled("cabinet_api_enabled"))
+        self.assertEqual(
+            self.worker_b.get_cached_response("folders:shop-1"), {"folders": [1, 2]}
+        )
+        self.assertEqual(
+            self.worker_b.execute_with_fallback(
+                "cabinet_api", MagicMock(), lambda: "fallback"
+            ),
+            "fallback",
+        )
+
+    def test_data_store_is_separate_from_state(self):
+        """测试响应缓存写入独立的数据存储，数据被清空时断路器状态保留"""
+        data_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(data_dir.cleanup)
+        data_store = FileBasedCache(data_dir.name, {"TIMEOUT": None})
+        manager = FallbackManager(
+            store=self.store, data_store=data_store, start_sweeper=False
+        )
+        manager.disable_feature("cabinet_api_enabled")
+        manager.cache_response("folders:shop-1", {"folders": [1]}, ttl=60)
+
+        data_store.clear()
+        other = FallbackManager(
+            store=self.store, data_store=data_store, start_sweeper=False
+        )
+        self.assertFalse(other.is_feature_enabled("cabinet_api_enabled"))
+        self.assertIsNone(other.get_cached_response("folders:shop-1"))
+
+    def test_stale_backup_is_not_rewritten_on_every_read(self):
+        """测试健康时的读操作不会每次都写共享数据存储，降级状态一次批量读取"""
+        self.worker_a.data_store.set = MagicMock(wraps=self.worker_a.data_store.set)
+        self.worker_a.store.get_many = MagicMock(wraps=self.worker_a.store.get_many)
+
+        for _ in range(3):
+            self.worker_a.execute_with_stale_cache(
+                "cabinet_api", "folders:shop-1", lambda: {"folders": [1]}
+            )
+
+        self.assertEqual(self.worker_a.data_store.set.call_count, 1)
+        self.assertEqual(self.worker_a.store.get_many.call_count, 3)
+
+        # 超过重写间隔后刷新备份
+        entry = self.worker_a.cache.get("folders:shop-1")
+        entry["stored_at"] -= FALLBACK_CONFIG["STALE_REWRITE_INTERVAL"]
+        self.worker_a.execute_with_stale_cache(
+            "cabinet_api", "folders:shop-1", lambda: {"folders": [2]}
+        )
+        self.assertEqual(self.worker_a.data_store.set.call_count, 2)
+        self.assertEqual(
+            self.worker_b.get_cached_response("folders:shop-1"), {"folders": [2]}
+        )
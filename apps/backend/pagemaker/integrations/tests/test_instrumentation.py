@@ -0,0 +1,142 @@
+"""
+Cabinet/SFTP调用埋点测试
+"""
+
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.test import SimpleTestCase
+
+from pagemaker.integrations import instrumentation
+from pagemaker.integrations.cabinet_client import RCabinetClient
+from pagemaker.integrations.constants import CABINET_ENDPOINTS
+from pagemaker.integrations.exceptions import RakutenConnectionError
+from pagemaker.integrations.instrumentation import NOOP_SPAN, instrument_call
+from pagemaker.integrations.monitoring import get_global_metrics
+from pagemaker.integrations.retry import get_retry_engine
+from pagemaker.integrations.utils import retry_with_backoff
+
+USAGE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<result>
+  <status>
+    <interfaceId>cabinet.usage.get</interfaceId>
+    <systemStatus>OK</systemStatus>
+    <message>OK</message>
+    <requestId>req-1</requestId>
+  </status>
+  <cabinetUsageGetResult>
+    <resultCode>0</resultCode>
+    <MaxSpace>100</MaxSpace>
+  </cabinetUsageGetResult>
+</result>"""
+
+
+def _fake_response(status_code=200, text=USAGE_XML, body=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.content = text.encode("utf-8")
+    response.request.body = body
+    return response
+
+
+class InstrumentationTestCase(SimpleTestCase):
+    """埋点span测试"""
+
+    def setUp(self):
+        instrumentation.configure(enabled=True, payload_sample_rate=0.0)
+        self.addCleanup(instrumentation.reset_configuration)
+        self.metrics = get_global_metrics()
+        self.metrics.reset_metrics()
+        self.addCleanup(self.metrics.reset_metrics)
+        get_retry_engine().budget.reset()
+
+    def _client(self):
+        client = RCabinetClient(
+            service_secret="secret", license_key="license", test_mode="real"
+        )
+        client.rate_limiter.wait_if_needed = MagicMock(return_value=0.25)
+        return client
+
+    def test_cabinet_request_records_metrics(self):
+        """测试Cabinet请求写入延迟、字节数、等待时间和结果码"""
+        with patch(
+            "pagemaker.integrations.cabinet_client.requests.request",
+            return_value=_fake_response(body="a=1"),
+        ):
+            self._client().get_usage()
+
+        stats = self.metrics.get_current_stats()
+        endpoint = stats["endpoints"][f"GET {CABINET_ENDPOINTS['USAGE_GET']}"]
+        self.assertEqual(endpoint["total_requests"], 1)
+        self.assertEqual(endpoint["bytes_in"], len(USAGE_XML.encode("utf-8")))
+        self.assertEqual(endpoint["bytes_out"], 3)
+        self.assertEqual(endpoint["rate_limit_wait_ms"], 250.0)
+        self.assertEqual(self.metrics.request_history[-1]["result_code"], 0)
+        self.assertEqual(self.metrics.request_history[-1]["status_code"], 200)
+
+    def test_failed_request_records_error_and_retries(self):
+        """测试失败请求记录错误类型和重试次数"""
+        with (
+            patch(
+                "pagemaker.integrations.cabinet_client.requests.request",
+                side_effect=requests.exceptions.ConnectionError(),
+            ),
+            patch("pagemaker.integrations.utils.time.sleep"),
+        ):
+            with self.assertRaises(RakutenConnectionError):
+                self._client().upload_file(b"data", "a.jpg")
+
+        endpoint = self.metrics.get_current_stats()["endpoints"][
+            f"POST {CABINET_ENDPOINTS['FILE_INSERT']}"
+        ]
+        # 首次调用 + 3次重试
+        self.assertEqual(endpoint["total_requests"], 4)
+        self.assertEqual(endpoint["retries"], 0 + 1 + 2 + 3)
+        self.assertEqual(endpoint["errors"], {"RakutenConnectionError": 4})
+
+    def test_retry_context_is_restored(self):
+        """测试重试序号在调用结束后恢复"""
+        attempts = []
+
+        @retry_with_backoff(max_retries=1, base_delay=0.01)
+        def flaky():
+            with instrument_call("GET", "/flaky") as span:
+                attempts.append(span.retries)
+                if len(attempts) == 1:
+                    raise RakutenConnectionError("boom")
+
+        with patch("pagemaker.integrations.utils.time.sleep"):
+            flaky()
+
+        self.assertEqual(attempts, [0, 1])
+        with instrument_call("GET", "/after") as span:
+            self.assertEqual(span.retries, 0)
+
+    def test_disabled_returns_noop_span(self):
+        """测试关闭埋点时不记录指标"""
+        instrumentation.configure(enabled=False)
+
+        with instrument_call("GET", "/disabled") as span:
+            span.bytes_in = 100
+            span.record_payload(request={"a": 1})
+
+        self.assertIs(span, NOOP_SPAN)
+        self.assertEqual(self.metrics.get_current_stats()["total_requests"], 0)
+
+    def test_sampled_payload_is_redacted(self):
+        """测试采样日志屏蔽凭据字段"""
+        instrumentation.configure(payload_sample_rate=1.0)
+        logger = MagicMock()
+
+        with instrument_call("GET", "/license", logger=logger) as span:
+            span.record_payload(
+                request={"params": {"licenseKey": "abc", "offset": 1}},
+                response={"ok": True},
+            )
+
+        payload_call = logger.info.call_args_list[-1]
+        self.assertIn("采样", payload_call.args[0])
+        self.assertEqual(
+            payload_call.args[3], {"params": {"licenseKey": "***", "offset": 1}}
+        )
@@ -0,0 +1,96 @@
+"""
+两级列表缓存测试
+"""
+
+from unittest.mock import patch
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from pagemaker.integrations import listing_cache
+from pagemaker.integrations.listing_cache import ListingCache
+
+
+def _images(count, prefix="img"):
+    return [
+        {"id": str(i), "filename": f"{prefix}{i:04d}.jpg", "size": i * 10.0}
+        for i in range(count)
+    ]
+
+
+class ListingCacheTestCase(SimpleTestCase):
+    """两级列表缓存测试"""
+
+    def setUp(self):
+        self.store = LocMemCache(f"listing-{id(self)}", {"TIMEOUT": None})
+        self.addCleanup(self.store.clear)
+
+    def _worker(self, **kwargs):
+        """模拟一个worker：独立的进程层LRU，共享同一个共享层"""
+        kwargs.setdefault("chunk_size", 50)
+        return ListingCache(store=self.store, **kwargs)
+
+    def test_round_trip_and_paging(self):
+        """测试完整读取和跨分块分页"""
+        items = _images(120)
+        writer = self._worker()
+        head = writer.set("cabinet_images_1", items)
+        self.assertEqual((head["total"], head["chunks"]), (120, 3))
+
+        reader = self._worker()
+        all_items, meta = reader.get_all("cabinet_images_1")
+        self.assertEqual(all_items, items)
+        self.assertEqual(meta["version"], head["version"])
+
+        page, meta = reader.get_page("cabinet_images_1", 40, 20)
+        self.assertEqual(page, items[40:60])
+        self.assertEqual(meta["total"], 120)
+        self.assertEqual(reader.get_page("cabinet_images_1", 200, 20)[0], [])
+
+        self.assertIsNone(reader.get_all("missing"))
+
+        # 修改返回的条目不影响进程层缓存
+        page[0]["filename"] = "changed.jpg"
+        page.clear()
+        self.assertEqual(reader.get_page("cabinet_images_1", 40, 20)[0], items[40:60])
+
+    def test_paging_decodes_only_needed_chunks(self):
+        """测试分页只解码覆盖的分块，且解码结果留在进程层"""
+        self._worker().set("key", _images(500))
+        reader = self._worker()
+
+        with patch.object(
+            listing_cache, "decode_chunk", wraps=listing_cache.decode_chunk
+        ) as decode:
+            page, _meta = reader.get_page("key", 260, 20)
+            self.assertEqual(page[0]["id"], "260")
+            self.assertEqual(decode.call_count, 1)
+
+            reader.get_page("key", 270, 20)
+            self.assertEqual(decode.call_count, 1)
+
+    def test_new_version_invalidates_other_workers(self):
+        """测试写入新版本后其他worker读到新数据，旧分块被删除"""
+        writer = self._worker()
+        reader = self._worker()
+        old_head = writer.set("key", _images(60, "old"))
+        self.assertEqual(reader.get_all("key")[0][0]["filename"], "old0000.jpg")
+
+        writer.set("key", _images(10, "new"))
+        items, meta = reader.get_all("key")
+        self.assertEqual(len(items), 10)
+        self.assertEqual(items[0]["filename"], "new0000.jpg")
+        self.assertIsNone(
+            self.store.get(writer._chunk_key("key", old_head["version"], 0))
+        )
+
+        writer.invalidate("key")
+        self.assertIsNone(reader.get_page("key", 0, 20))
+
+    def test_shared_entries_are_compressed(self):
+        """测试共享层存储压缩后的字节"""
+        writer = self._worker(chunk_size=200)
+        head = writer.set("key", _images(200))
+        raw = self.store.get(writer._chunk_key("key", head["version"], 0))
+        self.assertIsInstance(raw, bytes)
+        self.assertLess(len(raw), len(repr(_images(200))) / 3)
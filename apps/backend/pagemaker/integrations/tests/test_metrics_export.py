@@ -0,0 +1,173 @@
+"""
+延迟直方图与OpenMetrics导出测试
+"""
+
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase, SimpleTestCase
+
+from pagemaker.integrations.metrics_export import (
+    HistogramRegistry,
+    LatencyHistogram,
+    OPENMETRICS_CONTENT_TYPE,
+    mark_process_dead,
+    render_openmetrics,
+)
+from pagemaker.integrations.monitoring import APIMetrics
+
+
+class LatencyHistogramTestCase(SimpleTestCase):
+    """固定桶直方图测试"""
+
+    def test_observe_and_quantile(self):
+        """测试观测值落桶和分位数估算"""
+        histogram = LatencyHistogram(buckets=(0.1, 0.5, 1.0))
+        for _ in range(90):
+            histogram.observe(0.05)
+        for _ in range(10):
+            histogram.observe(0.8)
+
+        self.assertEqual(histogram.counts, [90, 0, 10, 0])
+        self.assertEqual(histogram.count, 100)
+        self.assertLessEqual(histogram.quantile(0.5), 0.1)
+        self.assertGreater(histogram.quantile(0.95), 0.5)
+        self.assertLessEqual(histogram.quantile(0.99), 1.0)
+
+    def test_overflow_bucket(self):
+        """测试超出最大桶的观测值"""
+        histogram = LatencyHistogram(buckets=(0.1, 1.0))
+        histogram.observe(5.0)
+        self.assertEqual(histogram.counts, [0, 0, 1])
+        self.assertEqual(histogram.quantile(0.99), 1.0)
+
+    def test_merge(self):
+        """测试直方图合并"""
+        a = LatencyHistogram(buckets=(0.1, 1.0))
+        b = LatencyHistogram(buckets=(0.1, 1.0))
+        a.observe(0.05)
+        b.observe(0.5)
+        a.merge(b)
+        self.assertEqual(a.count, 2)
+        self.assertEqual(a.counts, [1, 1, 0])
+
+        with self.assertRaises(ValueError):
+            a.merge(LatencyHistogram(buckets=(0.2,)))
+
+
+class HistogramRegistryTestCase(SimpleTestCase):
+    """直方图集合与多进程合并测试"""
+
+    def test_multiprocess_collect_merges_workers(self):
+        """测试合并多个worker的快照"""
+        tmpdir = self.enterContext(tempfile.TemporaryDirectory())
+        worker_a = HistogramRegistry(multiprocess_dir=tmpdir)
+        worker_b = HistogramRegistry(multiprocess_dir=tmpdir, flush_interval=3600)
+        self.addCleanup(worker_a.close)
+        self.addCleanup(worker_b.close)
+
+        worker_a.observe("/es/1.0/cabinet/usage/get", "GET", 0.2)
+        worker_a.flush()
+
+        # 模拟另一个worker进程（不同pid的快照文件）
+        with patch("os.getpid", return_value=999999):
+            worker_b.observe("/es/1.0/cabinet/usage/get", "GET", 0.3)
+            worker_b.observe(
+                "/es/1.0/cabinet/usage/get", "GET", 1.5, "RakutenServerError"
+            )
+            worker_b.flush()
+
+        merged = worker_a.collect()
+
+        ok = merged[("/es/1.0/cabinet/usage/get", "GET", "none")]
+        failed = merged[("/es/1.0/cabinet/usage/get", "GET", "RakutenServerError")]
+        self.assertEqual(ok.count, 2)
+        self.assertEqual(failed.count, 1)
+
+    def test_dead_worker_folded_into_aggregate(self):
+        """测试已退出worker的快照并入聚合文件，PID复用后计数不回退"""
+        key = ("/es/1.0/cabinet/usage/get", "GET", "none")
+        tmpdir = self.enterContext(tempfile.TemporaryDirectory())
+        scraper = HistogramRegistry(multiprocess_dir=tmpdir)
+        self.addCleanup(scraper.close)
+        with patch("os.getpid", return_value=999999):
+            dead = HistogramRegistry(multiprocess_dir=tmpdir, flush_interval=3600)
+            self.addCleanup(dead.close)
+            for _ in range(3):
+                dead.observe(*key[:2], 0.2)
+            dead.flush()
+        self.assertEqual(scraper.collect()[key].count, 3)
+
+        mark_process_dead(999999, tmpdir)
+        self.assertEqual(
+            {n for n in os.listdir(tmpdir) if n.endswith(".json")},
+            {"metrics_aggregate.json", f"metrics_{os.getpid()}.json"},
+        )
+        self.assertEqual(scraper.collect()[key].count, 3)
+
+        # 新worker复用同一PID，只记录了1次请求
+        with patch("os.getpid", return_value=999999):
+            reused = HistogramRegistry(multiprocess_dir=tmpdir, flush_interval=3600)
+            self.addCleanup(reused.close)
+            reused.observe(*key[:2], 0.2)
+            reused.flush()
+        self.assertEqual(scraper.collect()[key].count, 4)
+        # 不存在快照的PID直接忽略
+        mark_process_dead(123456, tmpdir)
+        self.assertEqual(scraper.collect()[key].count, 4)
+
+    def test_render_openmetrics(self):
+        """测试OpenMetrics文本格式"""
+        registry = HistogramRegistry(buckets=(0.1, 1.0))
+        registry.observe("/es/1.0/cabinet/folders/get", "GET", 0.05)
+        registry.observe("/es/1.0/cabinet/folders/get", "GET", 0.5)
+
+        text = render_openmetrics(registry.collect())
+
+        self.assertIn("# TYPE rakuten_api_request_duration_seconds histogram", text)
+        self.assertIn(
+            'rakuten_api_request_duration_seconds_bucket{endpoint="/es/1.0/cabinet/folders/get",'
+            'method="GET",error_type="none",le="0.1"} 1',
+            text,
+        )
+        self.assertIn('le="+Inf"} 2', text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+
+class APIMetricsHistogramTestCase(SimpleTestCase):
+    """APIMetrics直方图集成测试"""
+
+    def test_record_request_feeds_histograms(self):
+        """测试记录请求时同步更新直方图和分位数"""
+        metrics = APIMetrics()
+        for i in range(100):
+            metrics.record_request("cabinet.usage.get", "GET", 100 + i, True)
+        metrics.record_request(
+            "cabinet.usage.get", "GET", 9000, False, error_type="RakutenServerError"
+        )
+
+        percentiles = metrics.get_latency_percentiles()
+        self.assertIn("GET cabinet.usage.get", percentiles)
+        self.assertGreater(percentiles["GET cabinet.usage.get"]["p99_ms"], 100)
+
+        metrics.reset_metrics()
+        self.assertEqual(metrics.get_latency_percentiles(), {})
+
+
+class MetricsEndpointTestCase(TestCase):
+    """/metrics 端点测试"""
+
+    def test_metrics_endpoint(self):
+        """测试端点返回OpenMetrics文本"""
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], OPENMETRICS_CONTENT_TYPE)
+        self.assertTrue(response.content.decode().endswith("# EOF\n"))
+
+    def test_metrics_endpoint_token(self):
+        """测试配置令牌后的访问控制"""
+        with patch.dict("os.environ", {"PAGEMAKER_METRICS_TOKEN": "secret"}):
+            self.assertEqual(self.client.get("/metrics").status_code, 401)
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+            self.assertEqual(response.status_code, 200)
@@ -0,0 +1,92 @@
+"""
+APIMetrics 滚动窗口统计测试
+"""
+
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from pagemaker.integrations.monitoring import APIMetrics
+
+
+class RollingWindowStatsTestCase(SimpleTestCase):
+    """时间分桶滚动窗口测试"""
+
+    def setUp(self):
+        self.now = 1_700_000_000.0
+        patcher = patch(
+            "pagemaker.integrations.monitoring.time.time", side_effect=lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.metrics = APIMetrics(bucket_seconds=5)
+
+    def test_merge_across_buckets(self):
+        """测试跨时间桶合并计数、平均值和极值"""
+        self.metrics.record_request("cabinet.folders.get", "GET", 100, True)
+        self.now += 30
+        self.metrics.record_request("cabinet.folders.get", "GET", 300, True)
+        self.metrics.record_request(
+            "cabinet.folders.get", "GET", 50, False, error_type="RakutenServerError"
+        )
+
+        stats = self.metrics.get_current_stats()
+        endpoint = stats["endpoints"]["GET cabinet.folders.get"]
+
+        self.assertEqual(stats["total_requests"], 3)
+        self.assertEqual(stats["successful_requests"], 2)
+        self.assertEqual(stats["avg_response_time_ms"], 150.0)
+        self.assertEqual(endpoint["max_response_time_ms"], 300)
+        self.assertEqual(endpoint["min_response_time_ms"], 50)
+        self.assertEqual(endpoint["errors"], {"RakutenServerError": 1})
+        self.assertGreater(endpoint["p95_response_time_ms"], 0)
+
+    def test_expired_buckets_are_excluded(self):
+        """测试超出统计窗口的时间桶不参与统计"""
+        self.metrics.record_request("cabinet.usage.get", "GET", 100, True)
+        self.now += 200
+        self.metrics.record_request("cabinet.usage.get", "GET", 200, True)
+
+        self.assertEqual(self.metrics.get_current_stats()["total_requests"], 2)
+
+        self.now += 120
+        stats = self.metrics.get_current_stats()
+        self.assertEqual(stats["total_requests"], 1)
+        self.assertEqual(stats["avg_response_time_ms"], 200.0)
+
+        self.now += 600
+        stats = self.metrics.get_current_stats()
+        self.assertEqual(stats["total_requests"], 0)
+        self.assertEqual(stats["successful_requests"], 0)
+
+    def test_reused_slot_is_reset(self):
+        """测试环形缓冲区复用槽位时清空旧数据"""
+        self.metrics.record_request("cabinet.usage.get", "GET", 100, True)
+        # 恰好绕环一圈后落入同一槽位
+        self.now += self.metrics.num_buckets * self.metrics.bucket_seconds
+        self.metrics.record_request("cabinet.usage.get", "GET", 200, True)
+
+        stats = self.metrics.get_current_stats()
+        self.assertEqual(stats["total_requests"], 1)
+        self.assertEqual(stats["avg_response_time_ms"], 200.0)
+
+    def test_bucket_storage_is_bounded(self):
+        """测试桶数量固定，与历史请求量无关"""
+        for i in range(5000):
+            self.now += 0.1
+            self.metrics.record_request("cabinet.usage.get", "GET", 100, True)
+
+        self.assertEqual(len(self.metrics.buckets), 60)
+        self.assertEqual(len(self.metrics.response_times["GET cabinet.usage.get"]), 100)
+        stats = self.metrics.get_current_stats()
+        self.assertLessEqual(stats["total_requests"], 3000)
+
+    def test_export_metrics_and_reset(self):
+        """测试导出指标（不发生死锁）与重置"""
+        self.metrics.record_request("cabinet.usage.get", "GET", 100, True)
+
+        exported = self.metrics.export_metrics()
+        self.assertEqual(exported["current_stats"]["total_requests"], 1)
+
+        self.metrics.reset_metrics()
+        self.assertEqual(self.metrics.get_current_stats()["total_requests"], 0)
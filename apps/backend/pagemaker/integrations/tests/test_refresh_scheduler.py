@@ -0,0 +1,121 @@
+"""
+缓存后台刷新调度器测试
+"""
+
+import threading
+
+from django.test import SimpleTestCase
+
+from pagemaker.integrations.refresh_scheduler import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    RefreshScheduler,
+)
+
+
+class RefreshSchedulerTestCase(SimpleTestCase):
+    """刷新调度器测试"""
+
+    def _scheduler(self, **kwargs):
+        kwargs.setdefault("min_interval", 0)
+        scheduler = RefreshScheduler(**kwargs)
+        self.addCleanup(scheduler.shutdown, timeout=1)
+        return scheduler
+
+    def _block(self, scheduler, key="blocker"):
+        """占住唯一的工作线程，返回用于放行的事件"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocker():
+            started.set()
+            release.wait(5)
+
+        scheduler.submit(key, blocker)
+        started.wait(5)
+        return release
+
+    def test_deduplicates_by_key(self):
+        """测试同一个键排队或刷新中时不重复提交"""
+        scheduler = self._scheduler(max_workers=1)
+        release = self._block(scheduler)
+        calls = []
+
+        self.assertTrue(scheduler.submit("folders", lambda: calls.append(1)))
+        self.assertFalse(scheduler.submit("folders", lambda: calls.append(2)))
+        self.assertFalse(scheduler.submit("blocker", lambda: calls.append(3)))
+        self.assertEqual(scheduler.stats()["queue_depth"], 1)
+
+        release.set()
+        self.assertTrue(scheduler.wait_idle(5))
+        self.assertEqual(calls, [1])
+        self.assertEqual(scheduler.stats()["deduplicated"], 2)
+
+    def test_priority_order(self):
+        """测试按优先级执行，排队中的任务可提升优先级"""
+        scheduler = self._scheduler(max_workers=1)
+        release = self._block(scheduler)
+        order = []
+
+        scheduler.submit("images", lambda: order.append("images"), PRIORITY_LOW)
+        scheduler.submit("other", lambda: order.append("other"), PRIORITY_LOW)
+        scheduler.submit("folders", lambda: order.append("folders"), PRIORITY_LOW)
+        scheduler.submit("other", lambda: order.append("dup"), PRIORITY_HIGH)
+
+        release.set()
+        self.assertTrue(scheduler.wait_idle(5))
+        self.assertEqual(order, ["other", "images", "folders"])
+
+    def test_bounded_queue_and_min_interval(self):
+        """测试队列上限和最小刷新间隔"""
+        scheduler = self._scheduler(max_workers=1, max_queue=2, min_interval=60)
+        release = self._block(scheduler)
+
+        self.assertTrue(scheduler.submit("a", lambda: None))
+        self.assertTrue(scheduler.submit("b", lambda: None))
+        self.assertFalse(scheduler.submit("c", lambda: None))
+
+        release.set()
+        self.assertTrue(scheduler.wait_idle(5))
+        # 刚刷新过的键在最小间隔内不再刷新
+        self.assertFalse(scheduler.submit("a", lambda: None))
+
+        stats = scheduler.stats()
+        self.assertEqual(stats["rejected"], 1)
+        self.assertEqual(stats["throttled"], 1)
+        self.assertEqual(stats["completed"], 3)
+
+    def test_failures_and_latency_are_recorded(self):
+        """测试失败计数、刷新延迟和最近刷新记录"""
+        scheduler = self._scheduler(max_workers=2)
+
+        def fail():
+            raise RuntimeError("upstream down")
+
+        scheduler.submit("bad", fail)
+        scheduler.submit("good", lambda: None)
+        self.assertTrue(scheduler.wait_idle(5))
+
+        stats = scheduler.stats()
+        self.assertEqual((stats["completed"], stats["failed"]), (1, 1))
+        self.assertEqual(stats["latency_ms"]["count"], 2)
+        self.assertFalse(scheduler.last_refresh["bad"]["success"])
+        self.assertEqual(scheduler.last_refresh["bad"]["error"], "upstream down")
+        self.assertLessEqual(stats["workers"], 2)
+
+    def test_shutdown_drops_queue_and_stops_workers(self):
+        """测试关闭时丢弃排队任务、等待进行中的刷新并停止线程"""
+        scheduler = self._scheduler(max_workers=1)
+        release = self._block(scheduler)
+        calls = []
+        scheduler.submit("queued", lambda: calls.append(1))
+
+        threading.Timer(0.05, release.set).start()
+        scheduler.shutdown(timeout=5)
+
+        stats = scheduler.stats()
+        self.assertEqual(calls, [])
+        self.assertEqual(stats["cancelled"], 1)
+        self.assertEqual(stats["completed"], 1)
+        self.assertEqual(stats["workers"], 0)
+        self.assertFalse(scheduler.submit("late", lambda: None))
@@ -0,0 +1,121 @@
+"""
+重试策略引擎测试
+"""
+
+import asyncio
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from pagemaker.integrations.exceptions import (
+    RakutenConnectionError,
+    RakutenParameterError,
+    RakutenRateLimitError,
+)
+from pagemaker.integrations.retry import (
+    RetryBudget,
+    RetryEngine,
+    RetryPolicy,
+    current_retry_attempt,
+    parse_retry_after,
+)
+from pagemaker.integrations.utils import RateLimiter, map_http_status_to_exception
+
+
+def _flaky(errors, result="ok"):
+    """依次抛出 errors 中的异常，之后返回 result"""
+    remaining = list(errors)
+
+    def func():
+        if remaining:
+            raise remaining.pop(0)
+        return result
+
+    return func
+
+
+class RetryEngineTestCase(SimpleTestCase):
+    """重试引擎测试"""
+
+    def setUp(self):
+        patcher = patch("pagemaker.integrations.retry.time.sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rate_limit_honors_retry_after(self):
+        """测试403按 Retry-After 等待，并推迟共享限速器"""
+        error = map_http_status_to_exception(403, "", {"Retry-After": "3"})
+        limiter = RateLimiter()
+        engine = RetryEngine()
+
+        self.assertEqual(engine.call(_flaky([error]), rate_limiter=limiter), "ok")
+
+        self.assertGreaterEqual(self.sleep.call_args[0][0], 3)
+        self.assertGreaterEqual(limiter.reserve(), 2.5)
+
+    def test_retry_after_beyond_policy_is_not_retried(self):
+        """测试 Retry-After 超过策略上限时立即放弃"""
+        error = RakutenRateLimitError(details={"retry_after": 3600})
+        with self.assertRaises(RakutenRateLimitError):
+            RetryEngine().call(_flaky([error]))
+        self.sleep.assert_not_called()
+
+    def test_per_exception_policies(self):
+        """测试按异常类型选择策略，参数错误不重试"""
+        engine = RetryEngine(
+            {RakutenConnectionError: RetryPolicy(max_retries=1, base_delay=0.01)}
+        )
+        with self.assertRaises(RakutenConnectionError):
+            engine.call(_flaky([RakutenConnectionError()] * 2))
+        self.assertEqual(self.sleep.call_count, 1)
+
+        with self.assertRaises(RakutenParameterError):
+            engine.call(_flaky([RakutenParameterError()]))
+        self.assertEqual(self.sleep.call_count, 1)
+
+    def test_budget_limits_retry_storm(self):
+        """测试重试预算耗尽后不再重试"""
+        budget = RetryBudget(capacity=2, deposit_ratio=0, refill_per_second=0)
+        engine = RetryEngine(
+            {RakutenConnectionError: RetryPolicy(max_retries=5, base_delay=0.01)},
+            budget,
+        )
+        with self.assertRaises(RakutenConnectionError):
+            engine.call(_flaky([RakutenConnectionError()] * 5))
+
+        self.assertEqual(self.sleep.call_count, 2)
+        self.assertEqual(budget.rejected, 1)
+
+    def test_async_variant_does_not_sleep_thread(self):
+        """测试异步版本使用 asyncio.sleep 且保持重试序号"""
+        attempts = []
+
+        async def flaky():
+            attempts.append(current_retry_attempt())
+            if len(attempts) < 3:
+                raise RakutenConnectionError()
+            return "done"
+
+        engine = RetryEngine(
+            {RakutenConnectionError: RetryPolicy(max_retries=3, base_delay=0.001)}
+        )
+        result = asyncio.run(engine.call_async(flaky))
+
+        self.assertEqual(result, "done")
+        self.assertEqual(attempts, [0, 1, 2])
+        self.sleep.assert_not_called()
+
+
+class RetryAfterParsingTestCase(SimpleTestCase):
+    """Retry-After 解析测试"""
+
+    def test_seconds_and_http_date(self):
+        """测试秒数和HTTP日期两种格式"""
+        self.assertEqual(parse_retry_after("120"), 120.0)
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        self.assertAlmostEqual(
+            parse_retry_after(format_datetime(retry_at, usegmt=True)), 30, delta=2
+        )
+        self.assertIsNone(parse_retry_after("soon"))
@@ -0,0 +1,200 @@
+"""
+SFTP连接池测试
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from pagemaker.integrations.exceptions import RakutenFTPError
+from pagemaker.integrations.ftp_client import RakutenFTPClient
+from pagemaker.integrations.sftp_pool import (
+    PooledSFTPConnection,
+    SFTPConnectionPool,
+    close_all_pools,
+    get_sftp_pool,
+)
+
+
+def _fake_connection():
+    ssh_client = MagicMock()
+    ssh_client.get_transport.return_value.is_active.return_value = True
+    return PooledSFTPConnection(ssh_client, MagicMock())
+
+
+class SFTPConnectionPoolTestCase(SimpleTestCase):
+    """连接池行为测试"""
+
+    def setUp(self):
+        self.factory = MagicMock(side_effect=_fake_connection)
+
+    def test_connection_is_reused(self):
+        """测试归还的连接会被复用"""
+        pool = SFTPConnectionPool(self.factory, max_size=2)
+
+        conn, reused = pool.acquire()
+        self.assertFalse(reused)
+        pool.release(conn)
+
+        again, reused = pool.acquire()
+        self.assertTrue(reused)
+        self.assertIs(again, conn)
+        self.assertEqual(self.factory.call_count, 1)
+
+    def test_bounded_size_and_checkout_timeout(self):
+        """测试连接数上限和等待超时"""
+        pool = SFTPConnectionPool(self.factory, max_size=1, checkout_timeout=0.05)
+        conn, _ = pool.acquire()
+
+        with self.assertRaises(RakutenFTPError):
+            pool.acquire()
+
+        pool.release(conn)
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_idle_timeout_evicts_connection(self):
+        """测试空闲超时的连接被关闭"""
+        pool = SFTPConnectionPool(self.factory, idle_timeout=10)
+        conn, _ = pool.acquire()
+        pool.release(conn)
+        conn.last_used -= 60
+
+        fresh, reused = pool.acquire()
+
+        self.assertFalse(reused)
+        self.assertIsNot(fresh, conn)
+        conn.ssh_client.close.assert_called_once()
+        self.assertEqual(pool.stats()["size"], 1)
+
+    def test_sweep_and_credential_rotation(self):
+        """测试其他店铺的空闲连接被清扫，凭据变更后旧连接池被关闭"""
+        self.addCleanup(close_all_pools)
+        idle_shop = get_sftp_pool(("a.example.com", 22, "a", "d1"), self.factory)
+        conn, _ = idle_shop.acquire()
+        idle_shop.release(conn)
+        conn.last_used -= idle_shop.idle_timeout + 1
+
+        old = get_sftp_pool(("b.example.com", 22, "b", "d1"), self.factory)
+        conn.ssh_client.close.assert_called_once()
+        self.assertEqual(idle_shop.stats()["size"], 0)
+
+        rotated = get_sftp_pool(("b.example.com", 22, "b", "d2"), self.factory)
+        self.assertIsNot(rotated, old)
+        self.assertTrue(old._closed)
+        self.assertIs(get_sftp_pool(("a.example.com", 22, "a", "d1"), None), idle_shop)
+
+    def test_dead_connection_is_discarded(self):
+        """测试探活失败的连接被丢弃"""
+        pool = SFTPConnectionPool(self.factory, liveness_check_interval=0)
+        conn, _ = pool.acquire()
+        pool.release(conn)
+        conn.sftp_client.stat.side_effect = OSError("socket closed")
+
+        fresh, reused = pool.acquire()
+
+        self.assertFalse(reused)
+        self.assertIsNot(fresh, conn)
+        self.assertEqual(pool.stats()["size"], 1)
+
+    def test_error_inside_context_discards_connection(self):
+        """测试操作出现IO错误时不归还连接"""
+        pool = SFTPConnectionPool(self.factory)
+
+        with self.assertRaises(OSError):
+            with pool.connection():
+                raise OSError("broken pipe")
+
+        self.assertEqual(
+            pool.stats(), {"size": 0, "idle": 0, "in_use": 0, "max_size": 4}
+        )
+
+    def test_concurrent_checkout(self):
+        """测试并发借出不超过上限"""
+        pool = SFTPConnectionPool(self.factory, max_size=3)
+        peak = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(20):
+                with pool.connection():
+                    with lock:
+                        peak.append(pool.stats()["in_use"])
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertLessEqual(max(peak), 3)
+        self.assertLessEqual(self.factory.call_count, 3)
+
+
+class RakutenFTPClientPoolTestCase(SimpleTestCase):
+    """RakutenFTPClient 使用连接池测试"""
+
+    def setUp(self):
+        self.addCleanup(close_all_pools)
+        patcher = patch("pagemaker.integrations.ftp_client.paramiko.SSHClient")
+        self.ssh_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.ssh_class.return_value.open_sftp.return_value.listdir.return_value = [
+            "a.html"
+        ]
+
+    def _client(self, **kwargs):
+        return RakutenFTPClient(
+            host="upload.example.com",
+            username="shop",
+            password="pw",
+            test_mode="real",
+            **kwargs,
+        )
+
+    def test_handshake_reused_across_clients(self):
+        """测试多个客户端实例共享同一店铺的连接"""
+        first = self._client()
+        self.assertFalse(first.connect()["reused"])
+        first.disconnect()
+
+        second = self._client()
+        self.assertTrue(second.connect()["reused"])
+        second.disconnect()
+
+        self.assertEqual(self.ssh_class.return_value.connect.call_count, 1)
+
+    def test_list_files_borrows_connection(self):
+        """测试未显式连接时 list_files 从连接池借用连接"""
+        client = self._client()
+        self.assertEqual(client.list_files("."), ["a.html"])
+        self.assertEqual(client.list_files("."), ["a.html"])
+        self.assertEqual(self.ssh_class.return_value.connect.call_count, 1)
+
+    def test_without_pool_closes_connection(self):
+        """测试关闭连接池时每次断开都关闭连接"""
+        client = self._client(use_pool=False)
+        client.connect()
+        client.disconnect()
+        client.connect()
+        client.disconnect()
+
+        self.assertEqual(self.ssh_class.return_value.connect.call_count, 2)
+        self.assertEqual(self.ssh_class.return_value.close.call_count, 2)
+
+    def test_finalizer_only_returns_held_connection(self):
+        """测试析构时只归还持有的连接，不获取连接池也不清扫"""
+        client = self._client()
+        client.connect()
+        pool = client._connection_pool
+
+        with (
+            patch("pagemaker.integrations.ftp_client.get_sftp_pool") as get_pool,
+            patch.object(pool, "evict_idle") as evict,
+        ):
+            client.__del__()
+
+        get_pool.assert_not_called()
+        evict.assert_not_called()
+        self.assertFalse(client.connected)
+        self.assertEqual(pool.stats()["idle"], 1)
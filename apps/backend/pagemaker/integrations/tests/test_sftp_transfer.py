@@ -0,0 +1,141 @@
+"""
+SFTP批量传输测试（使用本地paramiko SFTP服务器）
+"""
+
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from pagemaker.integrations.ftp_client import RakutenFTPClient
+from pagemaker.integrations.sftp_pool import close_all_pools
+from pagemaker.integrations.sftp_transfer import (
+    SFTPBulkUploader,
+    TransferItem,
+    build_directory_manifest,
+)
+from pagemaker.integrations.tests.sftp_server import LocalSFTPServer
+
+
+class SFTPBulkUploaderTestCase(SimpleTestCase):
+    """批量上传测试"""
+
+    def setUp(self):
+        self.addCleanup(close_all_pools)
+        self.local_dir = tempfile.TemporaryDirectory()
+        self.remote_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.local_dir.cleanup)
+        self.addCleanup(self.remote_dir.cleanup)
+
+        for i in range(6):
+            sub = os.path.join(self.local_dir.name, "images" if i % 2 else "")
+            os.makedirs(sub, exist_ok=True)
+            with open(os.path.join(sub, f"file{i}.html"), "wb") as f:
+                f.write(os.urandom(40_000 + i))
+
+    def _client(self, server):
+        return RakutenFTPClient(
+            host="127.0.0.1",
+            port=server.port,
+            username="shop",
+            password="secret",
+            test_mode="real",
+        )
+
+    def _remote(self, *parts):
+        return os.path.join(self.remote_dir.name, *parts)
+
+    def test_manifest_from_directory(self):
+        """测试目录清单生成"""
+        items = build_directory_manifest(self.local_dir.name, "/html")
+        paths = [item.remote_path for item in items]
+        self.assertIn("/html/file0.html", paths)
+        self.assertIn("/html/images/file1.html", paths)
+        self.assertEqual(len(items), 6)
+
+    def test_upload_directory_and_skip_unchanged(self):
+        """测试并发上传、目录创建和跳过未变化文件"""
+        with LocalSFTPServer(self.remote_dir.name) as server:
+            client = self._client(server)
+            result = client.upload_directory(
+                self.local_dir.name, "/html", concurrency=3
+            )
+
+            self.assertTrue(result["success"])
+            self.assertEqual(result["uploaded"], 6)
+            with open(self._remote("html", "images", "file1.html"), "rb") as f:
+                with open(
+                    os.path.join(self.local_dir.name, "images", "file1.html"), "rb"
+                ) as src:
+                    self.assertEqual(f.read(), src.read())
+            self.assertFalse(
+                any(name.endswith(".part") for name in os.listdir(self._remote("html")))
+            )
+
+            # 再次上传时全部跳过；修改一个文件后只上传该文件
+            again = client.upload_directory(self.local_dir.name, "/html")
+            self.assertEqual(again["skipped"], 6)
+
+            changed = os.path.join(self.local_dir.name, "file0.html")
+            with open(changed, "ab") as f:
+                f.write(b"changed")
+            third = client.upload_directory(self.local_dir.name, "/html")
+            self.assertEqual((third["uploaded"], third["skipped"]), (1, 5))
+
+    def test_resume_after_partial_failure(self):
+        """测试部分失败后续传"""
+        items = build_directory_manifest(self.local_dir.name, "/html")
+        original_put = SFTPBulkUploader._put
+
+        def flaky_put(sftp, item):
+            if item.remote_path.endswith("file3.html"):
+                raise OSError("connection reset")
+            original_put(sftp, item)
+
+        with LocalSFTPServer(self.remote_dir.name) as server:
+            uploader = SFTPBulkUploader(self._client(server), max_attempts=2)
+            with patch.object(SFTPBulkUploader, "_put", side_effect=flaky_put):
+                result = uploader.upload(items)
+
+            self.assertFalse(result["success"])
+            self.assertEqual(result["failed"], 1)
+            self.assertEqual(
+                result["errors"][0]["remote_path"], "/html/images/file3.html"
+            )
+
+            resumed = uploader.resume()
+            self.assertTrue(resumed["success"])
+            self.assertEqual(resumed["uploaded"], 1)
+            self.assertTrue(
+                os.path.exists(self._remote("html", "images", "file3.html"))
+            )
+
+    def test_in_memory_item(self):
+        """测试上传内存中的数据"""
+        with LocalSFTPServer(self.remote_dir.name) as server:
+            result = self._client(server).upload_files(
+                [TransferItem("/page.html", data=b"<html></html>")]
+            )
+            self.assertTrue(result["success"])
+            with open(self._remote("page.html"), "rb") as f:
+                self.assertEqual(f.read(), b"<html></html>")
+
+    def test_throughput_scales_with_channels(self):
+        """测试多通道在有往返延迟时的吞吐量提升"""
+        items = build_directory_manifest(self.local_dir.name, "/html")
+
+        with LocalSFTPServer(self.remote_dir.name, write_delay=0.1) as server:
+            client = self._client(server)
+            # 预热连接池，排除握手耗时
+            SFTPBulkUploader(client, concurrency=4, skip_unchanged=False).upload(items)
+
+            single = SFTPBulkUploader(client, concurrency=1, skip_unchanged=False)
+            parallel = SFTPBulkUploader(client, concurrency=4, skip_unchanged=False)
+            single_result = single.upload(items)
+            parallel_result = parallel.upload(items)
+
+        self.assertGreater(
+            parallel_result["throughput_bytes_per_sec"],
+            single_result["throughput_bytes_per_sec"] * 1.5,
+        )
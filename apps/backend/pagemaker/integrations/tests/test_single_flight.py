@@ -0,0 +1,168 @@
+"""
+单飞请求合并测试
+"""
+
+import tempfile
+import threading
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from pagemaker.integrations.single_flight import SingleFlight
+
+
+def _shared_store(name):
+    return LocMemCache(name, {"TIMEOUT": None})
+
+
+class SingleFlightTestCase(SimpleTestCase):
+    """单飞测试"""
+
+    def setUp(self):
+        self.store = _shared_store(f"single-flight-{id(self)}")
+        self.addCleanup(self.store.clear)
+
+    def _flight(self, **kwargs):
+        kwargs.setdefault("poll_interval", 0.01)
+        return SingleFlight(store=self.store, **kwargs)
+
+    def _run_concurrently(self, count, target):
+        results = [None] * count
+        errors = [None] * count
+
+        def worker(i):
+            try:
+                results[i] = target()
+            except Exception as e:
+                errors[i] = e
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        return results, errors
+
+    def test_concurrent_callers_share_one_fetch(self):
+        """测试进程内并发调用只执行一次获取"""
+        flight = self._flight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return ["folder"]
+
+        results, errors = self._run_concurrently(
+            8, lambda: flight.do("cabinet_folders_all_1", fetch)
+        )
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [["folder"]] * 8)
+        self.assertEqual(errors, [None] * 8)
+        self.assertFalse(flight.is_running("cabinet_folders_all_1"))
+
+    def test_error_is_shared_with_waiters(self):
+        """测试获取失败时等待者收到同一个异常"""
+        flight = self._flight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            raise ValueError("upstream failed")
+
+        _results, errors = self._run_concurrently(4, lambda: flight.do("key", fetch))
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+
+    def test_waits_for_other_worker_result(self):
+        """测试其他worker持有锁时等待其结果而不重复获取"""
+        worker_a = self._flight()
+        worker_b = self._flight()
+        results_cache = {}
+
+        def slow_fetch():
+            time.sleep(0.2)
+            results_cache["key"] = "from-a"
+            return "from-a"
+
+        thread = threading.Thread(target=lambda: worker_a.do("key", slow_fetch))
+        thread.start()
+        time.sleep(0.05)
+
+        fetched_by_b = []
+        value = worker_b.do(
+            "key",
+            lambda: fetched_by_b.append(1) or "from-b",
+            load=lambda: results_cache.get("key"),
+        )
+        thread.join()
+
+        self.assertEqual(value, "from-a")
+        self.assertEqual(fetched_by_b, [])
+
+    def test_fetches_after_other_worker_gives_up(self):
+        """测试其他worker未产生结果即释放锁时自行获取"""
+        flight = self._flight(lock_timeout=1)
+        self.store.add(flight._lock_key("key"), "other-worker", timeout=0.2)
+
+        start = time.monotonic()
+        value = flight.do("key", lambda: "fetched", load=lambda: None)
+
+        self.assertEqual(value, "fetched")
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_waiter_gives_up_after_lock_timeout(self):
+        """测试执行者卡住时等待者在锁有效期后自行获取"""
+        flight = self._flight(lock_timeout=0.1)
+        release = threading.Event()
+        leader = threading.Thread(
+            target=flight.do, args=("key", lambda: release.wait(5) and "leader")
+        )
+        leader.start()
+        self.addCleanup(leader.join)
+        self.addCleanup(release.set)
+        time.sleep(0.02)
+
+        self.assertEqual(flight.do("key", lambda: "waiter"), "waiter")
+
+    def test_file_cache_lock_is_process_local(self):
+        """测试文件缓存后端（add非原子）不用于跨worker锁"""
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        file_store = FileBasedCache(directory, {"TIMEOUT": None})
+        flight = SingleFlight(store=file_store)
+
+        self.assertIsInstance(flight.store, LocMemCache)
+        self.assertIs(flight.store, flight.store)
+        self.assertEqual(flight.do("key", lambda: "value"), "value")
+        self.assertIsNone(file_store.get(flight._lock_key("key")))
+
+    def test_run_if_idle_skips_running_key(self):
+        """测试同一个键已有获取在进行时后台刷新直接跳过"""
+        flight = self._flight()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return "fresh"
+
+        thread = threading.Thread(target=lambda: flight.do("key", fetch))
+        thread.start()
+        time.sleep(0.05)
+
+        self.assertFalse(flight.run_if_idle("key", fetch))
+        # 其他worker也看到锁
+        self.assertFalse(self._flight().run_if_idle("key", fetch))
+        self.assertTrue(flight.is_running("key"))
+
+        release.set()
+        thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(flight.run_if_idle("key", lambda: "again"))
+        self.assertFalse(flight.is_running("key"))
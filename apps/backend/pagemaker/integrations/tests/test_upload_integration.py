@@ -101,10 +101,10 @@ class RCabinetClientHealthCheckTestCase(TestCase):
         self.assertIn("response_time_ms", result)
         self.assertIn("last_check", result)
 
-    @patch("pagemaker.integrations.cabinet_client.RCabinetClient.get_usage")
-    def test_health_check_failure(self, mock_get_usage):
+    @patch("pagemaker.integrations.cabinet_client.RCabinetClient._make_request")
+    def test_health_check_failure(self, mock_make_request):
         """测试健康检查失败"""
-        mock_get_usage.side_effect = RakutenAPIError("连接失败")
+        mock_make_request.side_effect = RakutenAPIError("连接失败")
 
         client = RCabinetClient(test_mode="real")
         result = client.health_check()
@@ -5,7 +5,7 @@
 import base64
 import logging
 import time
-import random
+import threading
 import xml.etree.ElementTree as ET
 from functools import wraps
 from typing import Dict, Any, Optional, Tuple
@@ -13,11 +13,15 @@ from datetime import datetime, timezone
 
 from .constants import (
     LOG_CONFIG,
-    RETRY_CONFIG,
     CABINET_RESULT_CODES,
     HTTP_STATUS_CODES,
     SYSTEM_STATUS,
 )
+from .retry import (
+    _rate_limiter_of,
+    get_retry_engine,
+    parse_retry_after,
+)
 from .exceptions import (
     RakutenXMLParseError,
     RakutenAuthError,
@@ -253,7 +257,7 @@ def _safe_float(value: str) -> Optional[float]:
 
 
 def map_http_status_to_exception(
-    status_code: int, response_text: str = ""
+    status_code: int, response_text: str = "", headers: Dict[str, str] = None
 ) -> Exception:
     """
     将HTTP状态码映射为对应的异常
@@ -261,11 +265,15 @@ def map_http_status_to_exception(
     Args:
         status_code: HTTP状态码
         response_text: 响应文本
+        headers: 响应头（带 Retry-After 时写入 details["retry_after"]）
 
     Returns:
         对应的异常实例
     """
     details = {"http_status": status_code, "response": response_text}
+    retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+    if retry_after is not None:
+        details["retry_after"] = retry_after
 
     if status_code == HTTP_STATUS_CODES["UNAUTHORIZED"]:
         return RakutenAuthError(details=details)
@@ -315,22 +323,68 @@ def map_result_code_to_exception(
 
 
 class RateLimiter:
-    """速率限制器"""
+    """速率限制器（线程安全，可由多个客户端实例共享）"""
 
     def __init__(self, max_requests_per_second: float = 1.0):
         self.max_requests_per_second = max_requests_per_second
         self.last_request_time = None
+        self._not_before = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        预约下一个请求时隙（不等待）
+
+        Returns:
+            调用方需要等待的时间（秒）
+        """
+        with self._lock:
+            now = time.time()
+            start = max(now, self._not_before)
+            if self.last_request_time is not None:
+                start = max(
+                    start, self.last_request_time + 1.0 / self.max_requests_per_second
+                )
+            self.last_request_time = start
+            return start - now
+
+    def defer(self, seconds: float):
+        """推迟所有后续请求（例如遵循上游返回的 Retry-After）"""
+        with self._lock:
+            self._not_before = max(self._not_before, time.time() + seconds)
+
+    def wait_if_needed(self) -> float:
+        """
+        如果需要，等待直到可以发送下一个请求
+
+        Returns:
+            实际等待的时间（秒）
+        """
+        sleep_time = self.reserve()
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+        return sleep_time
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str, max_requests_per_second: float = 1.0) -> RateLimiter:
+    """
+    获取进程内共享的速率限制器
 
-    def wait_if_needed(self):
-        """如果需要，等待直到可以发送下一个请求"""
-        if self.last_request_time is not None:
-            elapsed = time.time() - self.last_request_time
-            min_interval = 1.0 / self.max_requests_per_second
-            if elapsed < min_interval:
-                sleep_time = min_interval - elapsed
-                time.sleep(sleep_time)
+    乐天API按许可证限速，同一许可证的所有客户端实例应共享一个限制器。
 
-        self.last_request_time = time.time()
+    Args:
+        key: 限速维度（例如许可证的哈希）
+        max_requests_per_second: 每秒最大请求数
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = _rate_limiters[key] = RateLimiter(max_requests_per_second)
+        return limiter
 
 
 def retry_with_backoff(
@@ -340,44 +394,31 @@ def retry_with_backoff(
     backoff_factor: float = None,
 ):
     """
-    带指数退避的重试装饰器
+    带退避的重试装饰器（基于 retry.RetryEngine）
+
+    按异常类型选择重试策略，遵循 Retry-After 并受进程级重试预算限制；
+    被装饰的是方法且实例有 rate_limiter 时，Retry-After 会同时推迟该限速器。
+    异步函数请使用 retry.async_retry_with_backoff。
 
     Args:
-        max_retries: 最大重试次数
+        max_retries: 最大重试次数（覆盖默认策略）
         base_delay: 基础延迟时间（秒）
         max_delay: 最大延迟时间（秒）
         backoff_factor: 退避因子
     """
-    max_retries = max_retries or RETRY_CONFIG["MAX_RETRIES"]
-    base_delay = base_delay or RETRY_CONFIG["BASE_DELAY"]
-    max_delay = max_delay or RETRY_CONFIG["MAX_DELAY"]
-    backoff_factor = backoff_factor or RETRY_CONFIG["BACKOFF_FACTOR"]
 
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            last_exception = None
-
-            for attempt in range(max_retries + 1):
-                try:
-                    return func(*args, **kwargs)
-                except (RakutenConnectionError, RakutenServerError) as e:
-                    last_exception = e
-                    if attempt == max_retries:
-                        raise
-
-                    # 计算延迟时间
-                    delay = min(
-                        base_delay * (backoff_factor**attempt) + random.uniform(0, 1),
-                        max_delay,
-                    )
-                    time.sleep(delay)
-                except Exception as e:
-                    # 对于非网络/服务器错误，不进行重试
-                    raise
-
-            # 如果所有重试都失败，抛出最后的异常
-            raise last_exception
+            engine = get_retry_engine().with_overrides(
+                max_retries=max_retries,
+                base_delay=base_delay,
+                max_delay=max_delay,
+                backoff_factor=backoff_factor,
+            )
+            return engine.call(
+                func, *args, rate_limiter=_rate_limiter_of(args), **kwargs
+            )
 
         return wrapper
 
@@ -405,6 +446,10 @@ def log_api_call(
         duration: 请求持续时间（秒）
         error: 错误信息
     """
+    level = logging.ERROR if error else logging.INFO
+    if not logger.isEnabledFor(level):
+        return
+
     log_entry = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "endpoint": endpoint,
@@ -0,0 +1,331 @@
+"""
+请求级性能分析
+
+可选启用的中间件（PAGEMAKER_PROFILING_ENABLED=True），按请求记录：
+
+- 总耗时
+- 数据库查询次数和耗时（connection.execute_wrapper）
+- 乐天 Cabinet/SFTP 外部调用耗时（由 integrations.instrumentation 上报）
+- 缓存命中/未命中次数（所有缓存别名，包括 fallback）
+
+结果按路由聚合到进程内的统计表中；DEBUG 模式或管理员（is_staff）的请求
+同时写入 ``Server-Timing`` 响应头（不向普通用户暴露内部耗时）。
+被采样的请求会在 cProfile 下运行，超过慢请求阈值时保存分析结果，
+可通过管理员接口 ``/api/v1/profiling/`` 查询。
+"""
+
+import cProfile
+import io
+import pstats
+import random
+import time
+from collections import deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from pagemaker.integrations.metrics_export import LatencyHistogram
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "pagemaker_request_profile", default=None
+)
+
+_MISSING = object()
+
+
+class RequestProfile:
+    """单个请求的性能数据"""
+
+    __slots__ = (
+        "start",
+        "db_queries",
+        "db_ms",
+        "external_calls",
+        "external_ms",
+        "cache_hits",
+        "cache_misses",
+    )
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.external_calls = 0
+        self.external_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper 回调：统计查询次数和耗时"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_ms += (time.perf_counter() - start) * 1000
+
+    def server_timing(self, total_ms: float) -> str:
+        """生成 Server-Timing 响应头"""
+        return ", ".join(
+            [
+                f"app;dur={total_ms:.1f}",
+                f'db;dur={self.db_ms:.1f};desc="{self.db_queries} queries"',
+                f'cabinet;dur={self.external_ms:.1f};desc="{self.external_calls} calls"',
+                f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            ]
+        )
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """获取当前请求的性能数据（未启用分析时为None）"""
+    return _current_profile.get()
+
+
+def record_external_call(duration_ms: float):
+    """记录一次外部API调用耗时（由调用埋点上报）"""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.external_calls += 1
+        profile.external_ms += duration_ms
+
+
+def _instrument_cache_backend(backend):
+    """
+    包装缓存后端的 get/get_many 以统计命中率
+
+    缓存后端实例按线程创建，包装只在当前请求启用分析时计数。
+    """
+    if getattr(backend, "_pagemaker_profiled", False):
+        return
+
+    original_get = backend.get
+    original_get_many = backend.get_many
+
+    def get(key, default=None, version=None):
+        value = original_get(key, _MISSING, version=version)
+        profile = _current_profile.get()
+        if value is _MISSING:
+            if profile is not None:
+                profile.cache_misses += 1
+            return default
+        if profile is not None:
+            profile.cache_hits += 1
+        return value
+
+    def get_many(keys, version=None):
+        keys = list(keys)
+        values = original_get_many(keys, version=version)
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.cache_hits += len(values)
+            profile.cache_misses += len(keys) - len(values)
+        return values
+
+    backend.get = get
+    backend.get_many = get_many
+    backend._pagemaker_profiled = True
+
+
+class RouteStats:
+    """单个路由的聚合统计"""
+
+    __slots__ = (
+        "count",
+        "total_ms",
+        "max_ms",
+        "db_queries",
+        "db_ms",
+        "external_ms",
+        "cache_hits",
+        "cache_misses",
+        "slow_count",
+        "histogram",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.external_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.slow_count = 0
+        self.histogram = LatencyHistogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        count = self.count or 1
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / count, 2),
+            "max_ms": round(self.max_ms, 2),
+            "p95_ms": round(self.histogram.quantile(0.95) * 1000, 2),
+            "avg_db_queries": round(self.db_queries / count, 2),
+            "avg_db_ms": round(self.db_ms / count, 2),
+            "avg_cabinet_ms": round(self.external_ms / count, 2),
+            "cache_hit_rate": (
+                round(self.cache_hits / lookups * 100, 2) if lookups else None
+            ),
+            "slow_count": self.slow_count,
+        }
+
+
+class ProfilingRegistry:
+    """进程内按路由聚合的性能统计和慢请求分析结果"""
+
+    def __init__(self, max_profiles: int = 20):
+        self.lock = Lock()
+        self.routes: Dict[str, RouteStats] = {}
+        self.slow_profiles = deque(maxlen=max_profiles)
+
+    def record(self, route: str, profile: RequestProfile, total_ms: float, slow: bool):
+        with self.lock:
+            stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = RouteStats()
+            stats.count += 1
+            stats.total_ms += total_ms
+            stats.max_ms = max(stats.max_ms, total_ms)
+            stats.db_queries += profile.db_queries
+            stats.db_ms += profile.db_ms
+            stats.external_ms += profile.external_ms
+            stats.cache_hits += profile.cache_hits
+            stats.cache_misses += profile.cache_misses
+            stats.histogram.observe(total_ms / 1000.0)
+            if slow:
+                stats.slow_count += 1
+
+    def add_slow_profile(self, entry: Dict[str, Any]):
+        with self.lock:
+            self.slow_profiles.append(entry)
+
+    def snapshot(self, include_profiles: bool = False) -> Dict[str, Any]:
+        with self.lock:
+            data = {
+                "routes": {
+                    route: stats.to_dict()
+                    for route, stats in sorted(
+                        self.routes.items(),
+                        key=lambda item: item[1].total_ms,
+                        reverse=True,
+                    )
+                },
+                "slow_profile_count": len(self.slow_profiles),
+            }
+            if include_profiles:
+                data["slow_profiles"] = list(self.slow_profiles)
+            return data
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+            self.slow_profiles.clear()
+
+
+_registry = None
+
+
+def get_profiling_registry() -> ProfilingRegistry:
+    """获取全局性能统计实例"""
+    global _registry
+    if _registry is None:
+        _registry = ProfilingRegistry()
+    return _registry
+
+
+def _format_profile(profiler: cProfile.Profile, limit: int = 30) -> str:
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+def _route_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is not None and match.route:
+        route = "/" + match.route.lstrip("^")
+    else:
+        route = "<unresolved>"
+    return f"{request.method} {route}"
+
+
+class ProfilingMiddleware:
+    """
+    请求级性能分析中间件
+
+    未启用时抛出 MiddlewareNotUsed，Django 会直接移除该中间件，不产生任何开销。
+    """
+
+    def __init__(self, get_response):
+        options = getattr(settings, "PAGEMAKER_PROFILING", {})
+        if not options.get("ENABLED", False):
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.slow_request_ms = options.get("SLOW_REQUEST_MS", 500)
+        self.sample_rate = options.get("SAMPLE_RATE", 0.0)
+        self.registry = get_profiling_registry()
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+
+        profiler = None
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            profiler = cProfile.Profile()
+
+        try:
+            for alias in settings.CACHES:
+                _instrument_cache_backend(caches[alias])
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(profile))
+                if profiler is not None:
+                    try:
+                        profiler.enable()
+                    except ValueError:
+                        # 同一时刻只能有一个分析器（其他线程正在采集）
+                        profiler = None
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+        finally:
+            _current_profile.reset(token)
+
+        total_ms = (time.perf_counter() - profile.start) * 1000
+        slow = total_ms >= self.slow_request_ms
+        route = _route_name(request)
+
+        self.registry.record(route, profile, total_ms, slow)
+        if profiler is not None and slow:
+            self.registry.add_slow_profile(
+                {
+                    "route": route,
+                    "path": request.path,
+                    "timestamp": time.time(),
+                    "duration_ms": round(total_ms, 2),
+                    "db_queries": profile.db_queries,
+                    "stats": _format_profile(profiler),
+                }
+            )
+
+        if _server_timing_allowed(request):
+            response["Server-Timing"] = profile.server_timing(total_ms)
+        return response
+
+
+def _server_timing_allowed(request) -> bool:
+    """Server-Timing 只在 DEBUG 模式或管理员请求时输出"""
+    if settings.DEBUG:
+        return True
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_authenticated and user.is_staff)
@@ -0,0 +1,79 @@
+"""
+基于 orjson 的 JSON 渲染器和解析器
+
+DRF 自带的 JSONRenderer 使用标准库 json + 自定义 JSONEncoder，序列化带有大型
+content 数组的页面或上千张图片的 Cabinet 列表时CPU开销明显。orjson 直接输出
+UTF-8 字节，原生支持 UUID 和 datetime，view 中不必逐行调用 str()/isoformat()。
+
+与 JSONRenderer 的输出保持兼容：
+
+- UTC 时间以 "Z" 结尾（与 DRF 的 JSONEncoder 一致）
+- U+2028/U+2029 转义（保证输出是 JavaScript 的子集）
+- orjson 不支持的类型（Decimal、延迟翻译字符串、QuerySet 等）交给 DRF 的 JSONEncoder
+- orjson 无法处理的数据（超过64位的整数等）或要求非2空格缩进时退回 JSONRenderer
+
+未安装 orjson 时两者的行为与 DRF 自带的 JSONRenderer / JSONParser 相同。
+通过 view 的 renderer_classes / parser_classes 按接口启用。
+"""
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 为可选依赖
+    orjson = None
+
+_LINE_SEPARATOR = "\u2028".encode("utf-8")
+_PARAGRAPH_SEPARATOR = "\u2029".encode("utf-8")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """使用 orjson 的 JSON 渲染器"""
+
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        options = self.options
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None:
+            if indent != 2:
+                return super().render(data, accepted_media_type, renderer_context)
+            options |= orjson.OPT_INDENT_2
+
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if _LINE_SEPARATOR in ret or _PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(_LINE_SEPARATOR, b"\\u2028").replace(
+                _PARAGRAPH_SEPARATOR, b"\\u2029"
+            )
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """使用 orjson 的 JSON 解析器（请求体须为UTF-8）"""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("_", "-") not in (
+            "utf-8",
+            "utf8",
+        ):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
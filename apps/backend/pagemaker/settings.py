@@ -59,6 +59,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    "pagemaker.profiling.ProfilingMiddleware",  # 可选性能分析（默认关闭）
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",  # 添加多语言中间件
@@ -95,6 +96,29 @@ WSGI_APPLICATION = "pagemaker.wsgi.application"
 
 DATABASES = {"default": config.get_database_config()}
 
+# Cache
+# fallback 别名在gunicorn各worker之间共享乐天API断路器状态和降级缓存
+# （pagemaker.integrations.fallback_strategies），需使用跨进程的后端
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    # 跨worker共享状态（断路器、功能开关、锁）：键少，与数据分开避免被数据淘汰
+    "fallback": {
+        "BACKEND": config.FALLBACK_CACHE_BACKEND,
+        "LOCATION": config.FALLBACK_CACHE_LOCATION,
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+    # 跨worker共享数据（降级响应备份、渲染结果、Cabinet列表）
+    "fallback_data": {
+        "BACKEND": config.FALLBACK_DATA_CACHE_BACKEND,
+        "LOCATION": config.FALLBACK_DATA_CACHE_LOCATION,
+        "TIMEOUT": None,
+        "KEY_PREFIX": "data",
+        "OPTIONS": {"MAX_ENTRIES": config.FALLBACK_DATA_CACHE_MAX_ENTRIES},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -208,12 +232,16 @@ CORS_ALLOWED_HEADERS = [
     "authorization",
     "content-type",
     "dnt",
+    "if-none-match",
     "origin",
     "user-agent",
     "x-csrftoken",
     "x-requested-with",
 ]
 
+# 允许前端读取列表接口的ETag（保存在IndexedDB中，下次请求时用 If-None-Match 重新验证）
+CORS_EXPOSE_HEADERS = ["etag"]
+
 # Security settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -232,3 +260,10 @@ CSRF_TRUSTED_ORIGINS = [
     "http://192.168.1.26:8456",
     "http://192.168.1.26:3002",
 ]
+
+# 请求级性能分析（pagemaker.profiling.ProfilingMiddleware）
+PAGEMAKER_PROFILING = {
+    "ENABLED": config.PROFILING_ENABLED,
+    "SLOW_REQUEST_MS": config.PROFILING_SLOW_REQUEST_MS,
+    "SAMPLE_RATE": config.PROFILING_SAMPLE_RATE,
+}
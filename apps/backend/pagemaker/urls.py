@@ -23,6 +23,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from api.views import metrics
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -30,6 +31,8 @@ urlpatterns = [
     path("api/v1/", include("api.urls")),
     # Enhanced authentication endpoints
     path("api/v1/auth/", include("auth.urls")),
+    # Prometheus / OpenMetrics exporter
+    path("metrics", metrics, name="metrics"),
 ]
 
 # Serve media files during development
@@ -9,3 +9,4 @@ class PagesConfig(AppConfig):
     def ready(self):
         """应用启动时导入信号处理器"""
         import pages.activity_logger  # noqa: F401
+        import pages.image_references  # noqa: F401
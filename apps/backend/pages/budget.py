@@ -0,0 +1,197 @@
+"""
+乐天页面HTML预算分析
+
+乐天对店铺页面的HTML有字节数、图片数和可用标签的限制（见
+docs/rakutendocs/ 下的スマートフォン デザイン設定 文档），超出时要到上传才会报错。
+这里在保存时按导出结果（压缩后的片段HTML）计算：
+
+- 字节数（UTF-8，与导出文件一致；比乐天按日文编码计数略偏保守）
+- 图片数（<img> 标签数）
+- 不允许的标签
+
+统计按模块进行并按 模块JSON哈希 + PC/移动端 + 渲染器版本 缓存在进程内，
+页面修改后只重新分析变化的模块；模块HTML通过渲染缓存的模块片段层获取。
+"""
+
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from pagemaker.integrations.fallback_strategies import LRUTTLCache
+
+from .render_cache import get_render_cache, module_hash
+from .renderer import RENDERER_VERSION, PageRenderer, minify_html
+
+logger = logging.getLogger(__name__)
+
+# 各设备类型的预算（None 表示不限制）
+RAKUTEN_HTML_BUDGETS = {
+    "mobile": {
+        # スマートフォン用商品説明文
+        "max_bytes": 10240,
+        "max_images": 20,
+        "allowed_tags": frozenset(
+            ("a", "img", "table", "td", "th", "tr")
+            + ("br", "p", "font", "b", "center", "hr")
+        ),
+    },
+    "pc": {"max_bytes": None, "max_images": None, "allowed_tags": None},
+}
+
+# 进程内最多缓存的模块统计数
+LOCAL_MAX_ENTRIES = 10000
+
+# 模块统计有效期（秒）
+STATS_TTL = 24 * 3600
+
+_TAG_PATTERN = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)")
+
+
+def fragment_stats(html: str) -> Dict[str, Any]:
+    """单个模块HTML片段的统计（压缩后字节数、各标签数量、首尾是否为标签）"""
+    html = minify_html(html)
+    return {
+        "bytes": len(html.encode("utf-8")),
+        "tags": dict(Counter(tag.lower() for tag in _TAG_PATTERN.findall(html))),
+        "starts_with_tag": html.startswith("<"),
+        "ends_with_tag": html.endswith(">"),
+    }
+
+
+class HtmlBudgetAnalyzer:
+    """按模块增量计算页面HTML预算"""
+
+    def __init__(self, local_max_entries: int = None):
+        self.local = LRUTTLCache(
+            max_entries=local_max_entries or LOCAL_MAX_ENTRIES, default_ttl=STATS_TTL
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def module_stats(
+        self, content: List[Dict[str, Any]], mobile: bool
+    ) -> List[Dict[str, Any]]:
+        """各模块的统计，只为缓存中没有的模块获取HTML片段"""
+        device = "mobile" if mobile else "pc"
+        hashes = [module_hash(module) for module in content]
+        keys = [f"{RENDERER_VERSION}:{device}:{digest}" for digest in hashes]
+        stats: List[Optional[Dict[str, Any]]] = [self.local.get(key) for key in keys]
+        missing = [i for i, item in enumerate(stats) if item is None]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            fragments = get_render_cache().fragments.render(
+                PageRenderer(mobile_mode=mobile),
+                [content[i] for i in missing],
+                [hashes[i] for i in missing],
+            )
+            for i, html in zip(missing, fragments):
+                stats[i] = fragment_stats(html) if html.strip() else None
+                self.local.set(keys[i], stats[i] or {})
+        return [item or None for item in stats]
+
+    def analyze(
+        self, content: List[Dict[str, Any]], device_type: str = "pc"
+    ) -> Dict[str, Any]:
+        """
+        计算页面HTML预算
+
+        Returns:
+            {"device_type", "bytes", "max_bytes", "images", "max_images",
+             "disallowed_tags", "within_budget", "issues", "modules"}
+        """
+        mobile = device_type == "mobile"
+        budget = RAKUTEN_HTML_BUDGETS["mobile" if mobile else "pc"]
+        allowed = budget["allowed_tags"]
+        content = content or []
+
+        total_bytes = 0
+        tags = Counter()
+        modules = []
+        previous = None
+        for module, item in zip(content, self.module_stats(content, mobile)):
+            if item is None:  # 空片段不出现在导出结果中
+                continue
+            total_bytes += item["bytes"]
+            # 压缩后相邻片段之间的换行：标签与标签之间被去掉，否则保留一个空格
+            if previous is not None and not (
+                previous["ends_with_tag"] and item["starts_with_tag"]
+            ):
+                total_bytes += 1
+            previous = item
+            tags.update(item["tags"])
+
+            entry = {
+                "id": module.get("id"),
+                "type": module.get("type"),
+                "bytes": item["bytes"],
+                "images": item["tags"].get("img", 0),
+            }
+            if allowed is not None:
+                disallowed = sorted(set(item["tags"]) - allowed)
+                if disallowed:
+                    entry["disallowed_tags"] = disallowed
+            modules.append(entry)
+
+        disallowed_tags = (
+            {tag: count for tag, count in sorted(tags.items()) if tag not in allowed}
+            if allowed is not None
+            else {}
+        )
+        images = tags.get("img", 0)
+        issues = []
+        max_bytes, max_images = budget["max_bytes"], budget["max_images"]
+        if max_bytes is not None and total_bytes > max_bytes:
+            issues.append(
+                {
+                    "code": "HTML_TOO_LARGE",
+                    "message": f"HTML大小 {total_bytes} 字节，超过上限 {max_bytes} 字节",
+                }
+            )
+        if max_images is not None and images > max_images:
+            issues.append(
+                {
+                    "code": "TOO_MANY_IMAGES",
+                    "message": f"图片 {images} 张，超过上限 {max_images} 张",
+                }
+            )
+        if disallowed_tags:
+            issues.append(
+                {
+                    "code": "DISALLOWED_TAGS",
+                    "message": f"包含乐天不允许的标签: {', '.join(disallowed_tags)}",
+                }
+            )
+
+        return {
+            "device_type": device_type,
+            "bytes": total_bytes,
+            "max_bytes": max_bytes,
+            "images": images,
+            "max_images": max_images,
+            "disallowed_tags": disallowed_tags,
+            "within_budget": not issues,
+            "issues": issues,
+            "modules": modules,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "local": self.local.stats()}
+
+
+_budget_analyzer: Optional[HtmlBudgetAnalyzer] = None
+
+
+def get_budget_analyzer() -> HtmlBudgetAnalyzer:
+    """获取全局HTML预算分析器"""
+    global _budget_analyzer
+    if _budget_analyzer is None:
+        _budget_analyzer = HtmlBudgetAnalyzer()
+    return _budget_analyzer
+
+
+def analyze_page(page) -> Dict[str, Any]:
+    """按页面的 device_type 计算HTML预算"""
+    return get_budget_analyzer().analyze(page.content or [], page.device_type)
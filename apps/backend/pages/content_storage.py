@@ -0,0 +1,189 @@
+"""
+页面内容存储维护
+
+PageTemplate.content 使用 CompressedJSONField（见 pages/fields.py）。这里提供：
+
+- recompress_pages: 按当前配置分批重写已有页面的存储格式（切换压缩开关或
+  发布新字典版本之后），只更新格式发生变化的行
+- benchmark_content_storage: 对比未压缩JSON与压缩格式的存储大小、编解码耗时，
+  以及数据库读写延迟（在回滚的事务中进行，不修改数据）
+"""
+
+import logging
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from django.db import models, transaction
+from django.db.models import ExpressionWrapper, F, Value
+
+from .fields import decode_content, encode_content, is_compressed
+from .models import PageTemplate
+
+logger = logging.getLogger(__name__)
+
+# 每批读取/写入的页面数
+BATCH_SIZE = 200
+
+# 基准测试默认抽样的页面数
+BENCHMARK_SAMPLE_SIZE = 200
+
+
+def _stored(value: bytes) -> Value:
+    """已编码的存储格式（写入时不再经过字段编码）"""
+    return Value(value, output_field=models.BinaryField())
+
+
+def _raw_content(queryset) -> models.QuerySet:
+    """按主键顺序读取 (主键, 存储格式的原始字节)"""
+    return (
+        queryset.order_by("pk")
+        .annotate(
+            raw_content=ExpressionWrapper(
+                F("content"), output_field=models.BinaryField()
+            )
+        )
+        .values_list("pk", "raw_content")
+    )
+
+
+def recompress_pages(
+    queryset: models.QuerySet = None,
+    compress: Optional[bool] = None,
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, int]:
+    """
+    按当前配置重写页面内容的存储格式
+
+    Args:
+        queryset: 要处理的页面（默认全部）
+        compress: 是否压缩（默认按 PAGEMAKER_PAGE_CONTENT_COMPRESSION 配置）
+        batch_size: 每批处理的页面数
+
+    Returns:
+        {"pages", "rewritten", "compressed", "bytes_before", "bytes_after"}
+    """
+    if queryset is None:
+        queryset = PageTemplate.objects.all()
+    totals = {
+        "pages": 0,
+        "rewritten": 0,
+        "compressed": 0,
+        "bytes_before": 0,
+        "bytes_after": 0,
+    }
+
+    ids = list(queryset.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(ids), batch_size):
+        batch = PageTemplate.objects.filter(pk__in=ids[start : start + batch_size])
+        changed = []
+        for pk, raw in _raw_content(batch):
+            raw = bytes(raw)
+            data = encode_content(decode_content(raw), compress=compress)
+            totals["pages"] += 1
+            totals["compressed"] += int(is_compressed(data))
+            totals["bytes_before"] += len(raw)
+            totals["bytes_after"] += len(data)
+            if data != raw:
+                page = PageTemplate(pk=pk)
+                page.content = _stored(data)
+                changed.append(page)
+        if changed:
+            with transaction.atomic():
+                PageTemplate.objects.bulk_update(changed, ["content"])
+            totals["rewritten"] += len(changed)
+
+    logger.info(
+        f"页面内容存储格式重写完成: {totals['pages']} 个页面, "
+        f"重写 {totals['rewritten']} 个, "
+        f"{totals['bytes_before']} -> {totals['bytes_after']} 字节"
+    )
+    return totals
+
+
+def _timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def _latency(samples: List[float]) -> Dict[str, float]:
+    """每页耗时（毫秒）的均值和P95"""
+    if not samples:
+        return {"mean_ms": 0.0, "p95_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+    }
+
+
+def benchmark_content_storage(
+    queryset: models.QuerySet = None,
+    sample_size: int = BENCHMARK_SAMPLE_SIZE,
+    database: bool = True,
+) -> Dict[str, Any]:
+    """
+    对比两种存储格式
+
+    Args:
+        queryset: 抽样的页面（默认全部，取前 sample_size 个）
+        sample_size: 抽样页面数
+        database: 是否测量数据库读写延迟（在事务中写入后回滚）
+
+    Returns:
+        {"pages", "formats": {"json"|"compressed": {"bytes", "avg_bytes", "ratio",
+         "encode", "decode", "db_write", "db_read"}}}；耗时为每页的 mean_ms / p95_ms，
+        ratio 为相对未压缩JSON的大小
+    """
+    if queryset is None:
+        queryset = PageTemplate.objects.all()
+    pages = list(queryset.values_list("pk", "content")[:sample_size])
+    result: Dict[str, Any] = {"pages": len(pages), "formats": {}}
+    if not pages:
+        return result
+
+    json_bytes = None
+    for name, compress in (("json", False), ("compressed", True)):
+        encoded, encode_ms, decode_ms = [], [], []
+        for _pk, content in pages:
+            start = time.perf_counter()
+            data = encode_content(content, compress=compress)
+            encode_ms.append((time.perf_counter() - start) * 1000)
+            encoded.append(data)
+            decode_ms.append(_timed(decode_content, data))
+
+        total = sum(len(data) for data in encoded)
+        json_bytes = json_bytes or total
+        stats = {
+            "bytes": total,
+            "avg_bytes": round(total / len(pages)),
+            "ratio": round(total / json_bytes, 4),
+            "encode": _latency(encode_ms),
+            "decode": _latency(decode_ms),
+        }
+        if database:
+            stats.update(_benchmark_database(pages, encoded))
+        result["formats"][name] = stats
+
+    return result
+
+
+def _benchmark_database(pages, encoded: List[bytes]) -> Dict[str, Any]:
+    """写入并逐个读回（含解码）每个页面，结束时回滚"""
+    write_ms, read_ms = [], []
+    with transaction.atomic():
+        for (pk, _content), data in zip(pages, encoded):
+            write_ms.append(_timed(_write_raw, pk, data))
+        for pk, _content in pages:
+            read_ms.append(_timed(_read_content, pk))
+        transaction.set_rollback(True)
+    return {"db_write": _latency(write_ms), "db_read": _latency(read_ms)}
+
+
+def _write_raw(pk, data: bytes):
+    PageTemplate.objects.filter(pk=pk).update(content=_stored(data))
+
+
+def _read_content(pk):
+    return PageTemplate.objects.filter(pk=pk).values_list("content", flat=True).get()
@@ -0,0 +1,259 @@
+"""
+店铺页面批量导出
+
+把一个店铺的全部 PageTemplate（可按 device_type 过滤）渲染为HTML，流式写入ZIP或目录：
+
+- 页面按数据库游标分批读取，渲染结果逐个写出，内存中只保留进行中的少量页面
+- 渲染缓存命中的页面直接写出，未命中的交给进程池并行渲染（渲染器不访问数据库）
+- 输出路径为 ``{device_type}/{页面ID}.html``，页面改名不会产生新文件，
+  另附 ``manifest.json`` 记录页面名称和文件对应关系（上传到FTP时不生成）
+- 目录输出可直接交给 SFTP 差异同步上传到店铺FTP空间
+
+单个页面的流式导出见 iter_page_html：模块逐个渲染、按块输出，
+首字节时间和内存占用与页面大小无关。
+"""
+
+import json
+import logging
+import os
+import posixpath
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .models import PageTemplate
+from .render_cache import get_render_cache, page_render_options
+from .renderer import PageRenderer
+
+logger = logging.getLogger(__name__)
+
+# 每个渲染进程最多排队的页面数（限制进行中页面占用的内存）
+QUEUE_PER_WORKER = 4
+
+# 数据库游标每批读取的页面数
+ITERATOR_CHUNK_SIZE = 100
+
+MANIFEST_NAME = "manifest.json"
+
+# 流式导出时每次输出的最小字节数（合并过小的模块片段，减少写socket次数）
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def _render_job(job: Tuple[str, List[Dict[str, Any]], Dict[str, Any]]):
+    """进程池任务：渲染一个页面"""
+    page_id, content, options = job
+    return page_id, PageRenderer(**options).render(content)
+
+
+class ZipExportWriter:
+    """流式写入ZIP（目标可以是路径或不可seek的文件对象）"""
+
+    def __init__(self, target):
+        self.target = target
+        self._zip = zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def write(self, path: str, data: bytes):
+        self._zip.writestr(path, data)
+
+    def close(self):
+        self._zip.close()
+
+
+class DirectoryExportWriter:
+    """写入目录树"""
+
+    def __init__(self, root: str):
+        self.target = root
+        os.makedirs(root, exist_ok=True)
+
+    def write(self, path: str, data: bytes):
+        full_path = os.path.join(self.target, *path.split("/"))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "wb") as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+
+def open_writer(output: str):
+    """按输出路径选择写入器：以 .zip 结尾写ZIP，否则写目录"""
+    if output.lower().endswith(".zip"):
+        return ZipExportWriter(output)
+    return DirectoryExportWriter(output)
+
+
+def page_export_path(page) -> str:
+    return f"{page.device_type}/{page.id}.html"
+
+
+def iter_page_html(
+    page, chunk_size: int = STREAM_CHUNK_SIZE, **options
+) -> Iterator[bytes]:
+    """
+    流式渲染单个页面的HTML（UTF-8字节块）
+
+    不经过渲染缓存：缓存需要完整的HTML，流式导出的目的正是不在内存中拼出整个页面。
+    渲染选项在调用时立即校验（未知选项抛出 ValueError），渲染在迭代时进行。
+
+    Args:
+        page: PageTemplate实例
+        chunk_size: 每块的最小字节数（最后一块可能更小）
+        **options: 渲染选项，默认按页面 device_type 选择PC/移动端
+    """
+    renderer = PageRenderer(**page_render_options(page, **options))
+    content = page.content or []
+
+    def generate():
+        buffer, size = [], 0
+        for chunk in renderer.iter_render(content):
+            data = chunk.encode("utf-8")
+            buffer.append(data)
+            size += len(data)
+            if size >= chunk_size:
+                yield b"".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield b"".join(buffer)
+
+    return generate()
+
+
+def export_shop_pages(
+    shop,
+    writer,
+    device_type: Optional[str] = None,
+    workers: int = None,
+    progress: Callable[[int, int, float], None] = None,
+    upload_remote_dir: str = None,
+    **options,
+) -> Dict[str, Any]:
+    """
+    导出店铺的全部页面
+
+    Args:
+        shop: 店铺配置
+        writer: ZipExportWriter / DirectoryExportWriter（导出结束时关闭）
+        device_type: 只导出 pc 或 mobile 页面（默认全部）
+        workers: 渲染进程数（0或1时在当前进程渲染，默认CPU核数）
+        progress: 进度回调 progress(已导出, 总数, 页/秒)
+        upload_remote_dir: 导出后差异同步到店铺FTP空间的远端目录（仅支持目录输出）；
+            只删除本系统上传过、本次导出中已不存在的页面，指定 device_type 时
+            只同步该设备的子目录
+        **options: 渲染选项（默认片段HTML + 压缩，PC/移动端按页面 device_type）
+
+    Returns:
+        {"total", "exported", "cached", "bytes", "duration_ms", "pages_per_second",
+         "output", "upload"}
+    """
+    if upload_remote_dir and not isinstance(writer, DirectoryExportWriter):
+        raise ValueError("上传到FTP需要使用目录输出")
+
+    options.setdefault("minify", True)
+    start = time.perf_counter()
+    queryset = PageTemplate.objects.filter(shop=shop).order_by("created_at")
+    if device_type:
+        queryset = queryset.filter(device_type=device_type)
+    total = queryset.count()
+    pages = queryset.only("id", "name", "device_type", "content", "updated_at")
+
+    cache = get_render_cache()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    window = max(workers, 1) * QUEUE_PER_WORKER
+    # 按导出顺序排队的页面: [页面, 缓存键, HTML, 渲染任务, 是否命中缓存]
+    pending = deque()
+    manifest = []
+    summary = {"total": total, "exported": 0, "cached": 0, "bytes": 0}
+
+    def emit(page, key, html, cached):
+        if not cached:
+            cache.set(key, html)
+        data = html.encode("utf-8")
+        path = page_export_path(page)
+        writer.write(path, data)
+        manifest.append(
+            {
+                "id": str(page.id),
+                "name": page.name,
+                "device_type": page.device_type,
+                "path": path,
+                "bytes": len(data),
+                "updated_at": page.updated_at.isoformat(),
+            }
+        )
+        summary["exported"] += 1
+        summary["cached"] += int(cached)
+        summary["bytes"] += len(data)
+        if progress:
+            rate = summary["exported"] / max(time.perf_counter() - start, 1e-9)
+            progress(summary["exported"], total, rate)
+
+    def drain(limit: int):
+        """按顺序写出已完成的页面；排队超过 limit 时等待最早的页面"""
+        while pending:
+            page, key, html, future, cached = pending[0]
+            if future is not None and not future.done() and len(pending) <= limit:
+                return
+            pending.popleft()
+            if future is not None:
+                html = future.result()[1]
+            emit(page, key, html, cached)
+
+    try:
+        for page in pages.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            page_options = page_render_options(page, **options)
+            content = page.content or []
+            key = cache.make_key(content, page_options)
+            html = cache.get(key)
+
+            if html is not None:
+                pending.append((page, key, html, None, True))
+            elif executor is None:
+                html = PageRenderer(**page_options).render(content)
+                pending.append((page, key, html, None, False))
+            else:
+                future = executor.submit(_render_job, (page.id, content, page_options))
+                pending.append((page, key, None, future, False))
+            page.content = None  # 内容已渲染或交给渲染进程，不再保留
+            drain(window)
+        drain(0)
+
+        # 上传到FTP时不附带清单，避免页面名称出现在店铺空间
+        if not upload_remote_dir:
+            writer.write(
+                MANIFEST_NAME,
+                json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    summary.update(
+        duration_ms=round(elapsed * 1000, 2),
+        pages_per_second=round(summary["exported"] / max(elapsed, 1e-9), 2),
+        output=str(writer.target),
+        upload=None,
+    )
+
+    if upload_remote_dir:
+        from configurations.sftp_sync import sync_directory
+
+        # 页面按 {device_type}/{id}.html 写出：只导出一种设备时只同步该设备的
+        # 子目录，避免把另一种设备已上传的页面当作多余文件删除
+        local_dir, remote_dir = str(writer.target), upload_remote_dir
+        if device_type:
+            local_dir = os.path.join(local_dir, device_type)
+            remote_dir = posixpath.join(remote_dir, device_type)
+        summary["upload"] = sync_directory(shop, local_dir, remote_dir, delete=True)
+
+    logger.info(
+        f"店铺 {shop.id} 页面导出完成: {summary['exported']}/{total} 个页面, "
+        f"缓存命中 {summary['cached']}, {summary['pages_per_second']} 页/秒"
+    )
+    return summary
@@ -0,0 +1,178 @@
+"""
+压缩存储的JSON模型字段
+
+PageTemplate.content 是模块JSON数组，自定义HTML模块较多的长页面可达几百KB。
+以未压缩JSON存储时占用大量InnoDB缓冲池，每次读取整行都要传输完整内容。
+
+CompressedJSONField 对ORM和序列化器透明：它仍是 JSONField 的子类，读写的都是
+Python对象，DRF 和 admin 按 JSONField 处理。只有数据库列改为二进制（MySQL为LONGBLOB），
+存储格式为：
+
+- 未压缩：UTF-8 JSON文本
+- 压缩：b"\\x00" + 字典版本(1字节) + raw deflate 数据（zlib，预置字典）
+
+JSON文本不会以 \\x00 开头，读取时按首字节区分两种格式。压缩后不比原文小的内容
+（如空页面）按未压缩格式存储。是否压缩由配置 PAGEMAKER_PAGE_CONTENT_COMPRESSION 决定，
+关闭后新写入的行不再压缩，已压缩的行照常读取。
+
+预置字典由模块JSON的常见键和取值、乐天页面常用的HTML片段构成，几KB的短页面也能
+获得较好的压缩率。字典一经发布不能修改，需要调整时新增版本：数据中记录了写入时的
+字典版本，旧数据无需重写。
+
+压缩存储的列不支持JSON键查询（content__key、content__contains 等），
+这类查询会抛出 FieldError。
+"""
+
+import json
+import zlib
+from typing import Any, Optional
+
+from django.core.exceptions import FieldError
+from django.db import models
+from django.db.models import expressions
+
+from pagemaker.config import config
+
+# 压缩格式的首字节（JSON文本不会以它开头）
+COMPRESSED_MARKER = b"\x00"
+
+# 压缩级别（6 为 zlib 默认值，再高压缩率提升很小但写入明显变慢）
+COMPRESSION_LEVEL = 6
+
+# 预置字典：靠近末尾的片段在 deflate 中引用距离更短，最常见的片段放在最后
+_DICTIONARY_V1 = "".join(
+    [
+        # 自定义HTML模块常用的乐天页面片段（JSON字符串中的引号已转义）
+        '<center><font size=\\"3\\" color=\\"#000000\\"><b></b></font></center>',
+        '<table width=\\"100%\\" border=\\"0\\" cellspacing=\\"0\\" cellpadding=\\"0\\">',
+        '<tr><td align=\\"center\\" valign=\\"top\\">',
+        '<a href=\\"https://item.rakuten.co.jp/\\" target=\\"_blank\\">',
+        '<img src=\\"https://image.rakuten.co.jp/',
+        '/cabinet/\\" width=\\"100%\\" alt=\\"\\" border=\\"0\\"></a></td></tr></table>',
+        "<br>\\n<p></p>\\n",
+        # 模块配置的常见取值
+        '"separatorType":"line","lineStyle":"solid","lineColor":"#e5e7eb",'
+        '"lineThickness":1,"spaceHeight":"medium"},',
+        '"rows":[{"key":"","value":""},{"key":"","value":""}]},',
+        '"layout":"imageLeft","imageConfig":{"src":"https://image.rakuten.co.jp/',
+        '/cabinet/","alt":"","alignment":"center","width":"100%"},'
+        '"textConfig":{"content":"","alignment":"left","font":"inherit",'
+        '"fontSize":"4","color":"#000000","backgroundColor":"transparent"},'
+        '"columnRatio":"1:1"},',
+        '"level":1,"alignment":"left","color":"#000000","fontFamily":"inherit",'
+        '"fontWeight":"bold"},',
+        '"paddingTop":0,"paddingRight":0,"paddingBottom":0,"paddingLeft":0,'
+        '"marginTop":0,"marginBottom":0,',
+        '"link":{"type":"url","value":"https://item.rakuten.co.jp/"},',
+        '"size":{"type":"preset","value":"full"}},',
+        '{"id":"module-1700000000000-","type":"image","src":"https://image.rakuten.co.jp/',
+        '/cabinet/","alt":"","alignment":"center",',
+        '{"id":"module-1700000000000-","type":"custom","customHTML":"',
+        '{"id":"module-1700000000000-","type":"title","text":"',
+        '{"id":"module-1700000000000-","type":"text","content":"',
+        '","fontSize":"4","fontFamily":"inherit","alignment":"left",'
+        '"textColor":"#000000","backgroundColor":"transparent"},',
+    ]
+).encode("utf-8")
+
+# 字典版本 -> 预置字典（已发布的版本不能修改或删除）
+DICTIONARIES = {1: _DICTIONARY_V1}
+
+# 写入时使用的字典版本
+CURRENT_DICTIONARY_VERSION = 1
+
+
+def dumps_content(value: Any) -> bytes:
+    """紧凑的UTF-8 JSON（保留键顺序）"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def compress_bytes(data: bytes, version: int = CURRENT_DICTIONARY_VERSION) -> bytes:
+    """压缩JSON文本（带格式头）"""
+    compressor = zlib.compressobj(
+        COMPRESSION_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=DICTIONARIES[version]
+    )
+    return (
+        COMPRESSED_MARKER
+        + bytes([version])
+        + compressor.compress(data)
+        + compressor.flush()
+    )
+
+
+def decompress_bytes(data: bytes) -> bytes:
+    """解压 compress_bytes 的结果（未压缩的数据原样返回）"""
+    if not data.startswith(COMPRESSED_MARKER):
+        return data
+    version = data[1]
+    if version not in DICTIONARIES:
+        raise ValueError(f"未知的压缩字典版本: {version}")
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS, zdict=DICTIONARIES[version])
+    return decompressor.decompress(data[2:]) + decompressor.flush()
+
+
+def encode_content(value: Any, compress: Optional[bool] = None) -> bytes:
+    """
+    JSON值 -> 存储格式
+
+    Args:
+        value: 可JSON序列化的值
+        compress: 是否压缩（默认按 PAGEMAKER_PAGE_CONTENT_COMPRESSION 配置）
+    """
+    data = dumps_content(value)
+    if compress is None:
+        compress = config.PAGE_CONTENT_COMPRESSION
+    if compress:
+        compressed = compress_bytes(data)
+        if len(compressed) < len(data):
+            return compressed
+    return data
+
+
+def decode_content(data) -> Any:
+    """存储格式 -> JSON值（也接受迁移前JSON列返回的字符串）"""
+    if isinstance(data, str):
+        return json.loads(data)
+    return json.loads(decompress_bytes(bytes(data)).decode("utf-8"))
+
+
+def is_compressed(data) -> bool:
+    return data is not None and bytes(data[:1]) == COMPRESSED_MARKER
+
+
+class CompressedJSONField(models.JSONField):
+    """以（可选）压缩的二进制格式存储的JSON字段"""
+
+    description = "压缩存储的JSON"
+
+    def get_internal_type(self):
+        # 决定列类型：MySQL LONGBLOB / PostgreSQL bytea / SQLite BLOB
+        return "BinaryField"
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return decode_content(value)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if isinstance(value, expressions.Value) and isinstance(
+            value.output_field, models.JSONField
+        ):
+            value = value.value
+        elif hasattr(value, "as_sql"):
+            return value
+        if value is None:
+            return None
+        return connection.Database.Binary(encode_content(value))
+
+    def get_transform(self, name):
+        raise FieldError(f"压缩存储的JSON字段 {self.name} 不支持按 '{name}' 查询")
+
+    def get_lookup(self, lookup_name):
+        if lookup_name != "isnull":
+            raise FieldError(
+                f"压缩存储的JSON字段 {self.name} 不支持 '{lookup_name}' 查询"
+            )
+        return super().get_lookup(lookup_name)
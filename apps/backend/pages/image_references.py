@@ -0,0 +1,250 @@
+"""
+页面图片引用索引
+
+PageTemplate.content 中的图片URL嵌在模块JSON里，要回答"哪些页面用了这张图"
+只能加载并遍历所有页面。这里维护 PageImageReference 索引表（页面、模块、URL、
+R-Cabinet文件ID），页面保存时通过 Django 信号同步（只写入变化的行），
+页面删除时随外键级联删除。
+
+以下查询都走索引而不是扫描页面内容：
+
+- pages_using_image: 图片被哪些页面使用
+- unused_media_files: 没有被任何页面引用的已上传文件（清理候选）
+- referenced_image_urls: 页面引用的图片URL（失效链接检查）
+"""
+
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import models, transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+# 索引的URL最大长度（超出的URL不建立索引）
+MAX_URL_LENGTH = 500
+
+_IMG_SRC_RE = re.compile(r"<img\b[^>]*?\bsrc\s*=\s*[\"']([^\"']+)[\"']", re.I)
+
+
+class PageImageReference(models.Model):
+    """页面图片引用索引模型"""
+
+    page = models.ForeignKey(
+        "pages.PageTemplate",
+        on_delete=models.CASCADE,
+        related_name="image_references",
+        help_text="引用图片的页面",
+    )
+
+    module_id = models.CharField(max_length=100, help_text="引用图片的模块ID")
+
+    module_type = models.CharField(max_length=50, help_text="模块类型")
+
+    url = models.URLField(max_length=MAX_URL_LENGTH, help_text="图片URL")
+
+    rcabinet_file_id = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+        help_text="R-Cabinet文件ID（通过本系统上传的文件）",
+    )
+
+    class Meta:
+        db_table = "page_image_references"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["page", "module_id", "url"], name="unique_page_module_image"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["url"]),
+            models.Index(fields=["rcabinet_file_id"]),
+        ]
+        verbose_name = "页面图片引用"
+        verbose_name_plural = "页面图片引用"
+
+    def __str__(self):
+        return f"{self.page_id}/{self.module_id}: {self.url}"
+
+
+def extract_image_urls(content: Any) -> List[Tuple[str, str, str]]:
+    """
+    提取页面内容中的图片URL
+
+    图片模块的 src、多列图文模块的 imageConfig.src，以及自定义HTML模块中 <img> 的 src。
+    只保留 http(s) URL（忽略 data: 等内联图片）。
+
+    Returns:
+        去重后的 [(模块ID, 模块类型, URL)]
+    """
+    found: Dict[Tuple[str, str], str] = {}
+    for module in content if isinstance(content, list) else []:
+        if not isinstance(module, dict):
+            continue
+        module_type = str(module.get("type") or "")
+        urls = []
+        if module_type == "image":
+            urls.append(module.get("src"))
+        elif module_type == "multiColumn":
+            urls.append((module.get("imageConfig") or {}).get("src"))
+        elif module_type == "custom":
+            urls.extend(_IMG_SRC_RE.findall(module.get("customHTML") or ""))
+
+        module_id = str(module.get("id") or "")[:100]
+        for url in urls:
+            if not isinstance(url, str):
+                continue
+            url = url.strip()
+            if not url.lower().startswith(("http://", "https://")):
+                continue
+            if len(url) > MAX_URL_LENGTH:
+                logger.debug(f"图片URL过长，不建立索引: {url[:100]}...")
+                continue
+            found.setdefault((module_id, url), module_type[:50])
+    return [
+        (module_id, module_type, url) for (module_id, url), module_type in found.items()
+    ]
+
+
+def _file_ids_for(urls: Iterable[str]) -> Dict[str, str]:
+    """通过本系统上传的文件的 URL -> R-Cabinet文件ID"""
+    from media.models import MediaFile
+
+    urls = list(urls)
+    if not urls:
+        return {}
+    return dict(
+        MediaFile.objects.filter(rcabinet_url__in=urls)
+        .exclude(rcabinet_file_id__isnull=True)
+        .values_list("rcabinet_url", "rcabinet_file_id")
+    )
+
+
+def sync_page_references(page) -> Dict[str, int]:
+    """
+    按页面内容同步图片引用索引（只增删变化的行）
+
+    Returns:
+        {"created": 新增行数, "deleted": 删除行数}
+    """
+    wanted = {
+        (module_id, url): module_type
+        for module_id, module_type, url in extract_image_urls(page.content)
+    }
+    with transaction.atomic():
+        existing: Set[Tuple[str, str]] = set()
+        stale = []
+        for ref_id, module_id, url in PageImageReference.objects.filter(
+            page_id=page.pk
+        ).values_list("id", "module_id", "url"):
+            if (module_id, url) in wanted:
+                existing.add((module_id, url))
+            else:
+                stale.append(ref_id)
+
+        if stale:
+            PageImageReference.objects.filter(id__in=stale).delete()
+
+        new = [key for key in wanted if key not in existing]
+        file_ids = _file_ids_for({url for _module_id, url in new})
+        PageImageReference.objects.bulk_create(
+            [
+                PageImageReference(
+                    page_id=page.pk,
+                    module_id=module_id,
+                    module_type=wanted[(module_id, url)],
+                    url=url,
+                    rcabinet_file_id=file_ids.get(url),
+                )
+                for module_id, url in new
+            ]
+        )
+    return {"created": len(new), "deleted": len(stale)}
+
+
+def rebuild_references(pages: QuerySet = None, chunk_size: int = 100) -> Dict[str, int]:
+    """
+    重建图片引用索引（首次部署或索引与内容不一致时）
+
+    Args:
+        pages: 要重建的页面（默认全部）
+        chunk_size: 数据库游标每批读取的页面数
+    """
+    from .models import PageTemplate
+
+    if pages is None:
+        pages = PageTemplate.objects.all()
+    totals = {"pages": 0, "created": 0, "deleted": 0}
+    for page in pages.only("id", "content").iterator(chunk_size=chunk_size):
+        result = sync_page_references(page)
+        totals["pages"] += 1
+        totals["created"] += result["created"]
+        totals["deleted"] += result["deleted"]
+    return totals
+
+
+def pages_using_image(
+    url: str = None, rcabinet_file_id: str = None, user=None
+) -> QuerySet:
+    """
+    使用某张图片的页面
+
+    Args:
+        url: 图片URL
+        rcabinet_file_id: R-Cabinet文件ID（与 url 二选一）
+        user: 只返回该用户的页面（默认不限制）
+
+    Returns:
+        PageTemplate查询集
+    """
+    from .models import PageTemplate
+
+    if url:
+        refs = PageImageReference.objects.filter(url=url)
+    elif rcabinet_file_id:
+        refs = PageImageReference.objects.filter(rcabinet_file_id=rcabinet_file_id)
+    else:
+        raise ValueError("需要指定图片URL或R-Cabinet文件ID")
+
+    queryset = PageTemplate.objects.filter(id__in=refs.values("page_id"))
+    if user is not None:
+        queryset = queryset.filter(owner=user)
+    return queryset
+
+
+def unused_media_files(queryset: QuerySet = None) -> QuerySet:
+    """没有被任何页面引用的已上传文件"""
+    from media.models import MediaFile
+
+    if queryset is None:
+        queryset = MediaFile.objects.all()
+    return queryset.filter(upload_status="completed").exclude(
+        rcabinet_url__in=PageImageReference.objects.values("url")
+    )
+
+
+def referenced_image_urls(shop=None, page_ids: Optional[Iterable] = None) -> QuerySet:
+    """页面引用的图片URL（去重），可按店铺或页面过滤"""
+    refs = PageImageReference.objects.all()
+    if shop is not None:
+        refs = refs.filter(page__shop=shop)
+    if page_ids is not None:
+        refs = refs.filter(page_id__in=list(page_ids))
+    return refs.values_list("url", flat=True).distinct()
+
+
+# 信号处理器
+@receiver(post_save, sender="pages.PageTemplate")
+def sync_references_on_save(sender, instance, raw=False, **kwargs):
+    """页面保存后同步图片引用索引"""
+    if raw:  # loaddata 时跳过
+        return
+    try:
+        sync_page_references(instance)
+    except Exception:
+        # 页面已保存成功，索引可通过 rebuild_image_references 命令重建
+        logger.exception(f"同步页面 {instance.pk} 的图片引用索引失败")
@@ -0,0 +1,56 @@
+"""
+页面内容存储格式基准测试的管理命令
+
+    python manage.py benchmark_page_content
+    python manage.py benchmark_page_content --sample 500 --no-db --json
+"""
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from pages.content_storage import BENCHMARK_SAMPLE_SIZE, benchmark_content_storage
+
+
+class Command(BaseCommand):
+    help = "对比未压缩JSON与压缩存储的大小、编解码耗时和数据库读写延迟（不修改数据）"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=BENCHMARK_SAMPLE_SIZE,
+            help="抽样页面数",
+        )
+        parser.add_argument(
+            "--no-db",
+            action="store_true",
+            help="只测量编解码，不测量数据库读写",
+        )
+        parser.add_argument("--json", action="store_true", help="以JSON格式输出")
+
+    def handle(self, *args, **options):
+        result = benchmark_content_storage(
+            sample_size=max(1, options["sample"]), database=not options["no_db"]
+        )
+        if options["json"]:
+            self.stdout.write(json.dumps(result, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(f"抽样页面: {result['pages']}")
+        for name, stats in result["formats"].items():
+            self.stdout.write(
+                f"\n[{name}] 总计 {stats['bytes']} 字节, 平均 {stats['avg_bytes']} 字节/页, "
+                f"相对JSON {stats['ratio'] * 100:.1f}%"
+            )
+            for key, label in (
+                ("encode", "编码"),
+                ("decode", "解码"),
+                ("db_write", "数据库写入"),
+                ("db_read", "数据库读取"),
+            ):
+                if key in stats:
+                    self.stdout.write(
+                        f"  {label}: 平均 {stats[key]['mean_ms']} ms, "
+                        f"P95 {stats[key]['p95_ms']} ms"
+                    )
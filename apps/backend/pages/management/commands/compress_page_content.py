@@ -0,0 +1,56 @@
+"""
+按当前配置重写页面内容存储格式的管理命令
+
+    python manage.py compress_page_content
+    python manage.py compress_page_content --shop <店铺ID>
+    python manage.py compress_page_content --decompress
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from configurations.models import ShopConfiguration
+from pages.content_storage import BATCH_SIZE, recompress_pages
+from pages.models import PageTemplate
+
+
+class Command(BaseCommand):
+    help = "分批重写页面内容的存储格式（压缩/解压，只更新格式发生变化的行）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shop", help="只处理指定店铺的页面（默认全部）")
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument("--compress", action="store_true", help="压缩（默认按配置）")
+        group.add_argument(
+            "--decompress", action="store_true", help="改为未压缩JSON（默认按配置）"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=BATCH_SIZE, help="每批处理的页面数"
+        )
+
+    def handle(self, *args, **options):
+        pages = PageTemplate.objects.all()
+        if options["shop"]:
+            try:
+                shop = ShopConfiguration.objects.get(id=options["shop"])
+            except (ShopConfiguration.DoesNotExist, ValueError):
+                raise CommandError(f"店铺不存在: {options['shop']}")
+            pages = pages.filter(shop=shop)
+
+        compress = None
+        if options["compress"]:
+            compress = True
+        elif options["decompress"]:
+            compress = False
+
+        totals = recompress_pages(
+            pages, compress=compress, batch_size=max(1, options["batch_size"])
+        )
+        before, after = totals["bytes_before"], totals["bytes_after"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ 处理完成: {totals['pages']} 个页面, 重写 {totals['rewritten']} 个, "
+                f"压缩存储 {totals['compressed']} 个, "
+                f"{before} -> {after} 字节"
+                + (f" ({after * 100 / before:.1f}%)" if before else "")
+            )
+        )
@@ -0,0 +1,102 @@
+"""
+批量导出店铺页面HTML的管理命令
+
+    python manage.py export_shop_pages --shop <店铺ID> --output /tmp/shop-a.zip
+    python manage.py export_shop_pages --shop <店铺ID> --device mobile \
+        --output /tmp/export/shop-a --upload /html
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from configurations.models import ShopConfiguration
+from pages.export import export_shop_pages, open_writer
+
+
+class Command(BaseCommand):
+    help = "把店铺的全部页面渲染为HTML，流式写入ZIP或目录，并可上传到店铺FTP空间"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shop", required=True, help="店铺ID")
+        parser.add_argument(
+            "--output",
+            required=True,
+            help="输出路径（以 .zip 结尾写ZIP，否则写目录）",
+        )
+        parser.add_argument(
+            "--device",
+            choices=["pc", "mobile"],
+            help="只导出指定设备类型的页面（默认全部）",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="渲染进程数（默认CPU核数，1表示不使用进程池）",
+        )
+        parser.add_argument(
+            "--full-document",
+            action="store_true",
+            help="生成完整HTML文档（默认只导出页面片段）",
+        )
+        parser.add_argument(
+            "--no-minify",
+            action="store_true",
+            help="不压缩HTML",
+        )
+        parser.add_argument(
+            "--upload",
+            metavar="REMOTE_DIR",
+            help="导出后差异同步到店铺FTP空间的远端目录（需要目录输出）",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            shop = ShopConfiguration.objects.get(id=options["shop"])
+        except (ShopConfiguration.DoesNotExist, ValueError):
+            raise CommandError(f"店铺不存在: {options['shop']}")
+
+        if options["upload"] and options["output"].lower().endswith(".zip"):
+            raise CommandError("--upload 需要目录输出")
+
+        def progress(done, total, rate):
+            if done == total or done % 50 == 0:
+                percent = done * 100 / total if total else 100
+                sys.stderr.write(
+                    f"\r导出进度: {done}/{total} ({percent:.1f}%), {rate:.1f} 页/秒"
+                )
+                if done == total:
+                    sys.stderr.write("\n")
+
+        try:
+            summary = export_shop_pages(
+                shop,
+                open_writer(options["output"]),
+                device_type=options["device"],
+                workers=options["workers"],
+                progress=progress,
+                upload_remote_dir=options["upload"],
+                full_document=options["full_document"],
+                minify=not options["no_minify"],
+            )
+        except Exception as e:
+            raise CommandError(f"导出页面失败: {str(e)}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ 导出完成: {summary['exported']}/{summary['total']} 个页面 "
+                f"(缓存命中 {summary['cached']}), {summary['bytes']} 字节, "
+                f"{summary['pages_per_second']} 页/秒 -> {summary['output']}"
+            )
+        )
+
+        upload = summary["upload"]
+        if upload:
+            style = self.style.SUCCESS if upload["success"] else self.style.ERROR
+            self.stdout.write(
+                style(
+                    f"上传: {upload['uploaded']} 个更新, {upload['unchanged']} 个未变化, "
+                    f"{upload['deleted']} 个删除, {upload['failed']} 个失败"
+                )
+            )
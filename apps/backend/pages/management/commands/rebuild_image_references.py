@@ -0,0 +1,36 @@
+"""
+重建页面图片引用索引的管理命令
+
+    python manage.py rebuild_image_references
+    python manage.py rebuild_image_references --shop <店铺ID>
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from configurations.models import ShopConfiguration
+from pages.image_references import rebuild_references
+from pages.models import PageTemplate
+
+
+class Command(BaseCommand):
+    help = "按页面内容重建图片引用索引（只增删与内容不一致的行）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shop", help="只重建指定店铺的页面（默认全部）")
+
+    def handle(self, *args, **options):
+        pages = PageTemplate.objects.all()
+        if options["shop"]:
+            try:
+                shop = ShopConfiguration.objects.get(id=options["shop"])
+            except (ShopConfiguration.DoesNotExist, ValueError):
+                raise CommandError(f"店铺不存在: {options['shop']}")
+            pages = pages.filter(shop=shop)
+
+        totals = rebuild_references(pages)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ 索引重建完成: {totals['pages']} 个页面, "
+                f"新增 {totals['created']} 条, 删除 {totals['deleted']} 条"
+            )
+        )
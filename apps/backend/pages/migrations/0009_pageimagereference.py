@@ -0,0 +1,73 @@
+# Generated by Django 5.1.11 on 2026-10-19 05:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0008_pageactivity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PageImageReference",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "module_id",
+                    models.CharField(help_text="引用图片的模块ID", max_length=100),
+                ),
+                (
+                    "module_type",
+                    models.CharField(help_text="模块类型", max_length=50),
+                ),
+                ("url", models.URLField(help_text="图片URL", max_length=500)),
+                (
+                    "rcabinet_file_id",
+                    models.CharField(
+                        blank=True,
+                        help_text="R-Cabinet文件ID（通过本系统上传的文件）",
+                        max_length=100,
+                        null=True,
+                    ),
+                ),
+                (
+                    "page",
+                    models.ForeignKey(
+                        help_text="引用图片的页面",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="image_references",
+                        to="pages.pagetemplate",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "页面图片引用",
+                "verbose_name_plural": "页面图片引用",
+                "db_table": "page_image_references",
+                "indexes": [
+                    models.Index(fields=["url"], name="page_image__url_413b67_idx"),
+                    models.Index(
+                        fields=["rcabinet_file_id"],
+                        name="page_image__rcabine_739b25_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("page", "module_id", "url"),
+                        name="unique_page_module_image",
+                    )
+                ],
+            },
+        ),
+    ]
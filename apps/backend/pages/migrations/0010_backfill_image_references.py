@@ -0,0 +1,80 @@
+# 数据迁移：为现有页面建立图片引用索引
+import re
+
+from django.db import migrations
+
+# 以下为 pages.image_references 在本迁移编写时的副本：迁移不依赖之后会变化的应用代码
+MAX_URL_LENGTH = 500
+
+_IMG_SRC_RE = re.compile(r"<img\b[^>]*?\bsrc\s*=\s*[\"']([^\"']+)[\"']", re.I)
+
+
+def extract_image_urls(content):
+    """提取页面内容中的图片URL，返回去重后的 [(模块ID, 模块类型, URL)]"""
+    found = {}
+    for module in content if isinstance(content, list) else []:
+        if not isinstance(module, dict):
+            continue
+        module_type = str(module.get("type") or "")
+        urls = []
+        if module_type == "image":
+            urls.append(module.get("src"))
+        elif module_type == "multiColumn":
+            urls.append((module.get("imageConfig") or {}).get("src"))
+        elif module_type == "custom":
+            urls.extend(_IMG_SRC_RE.findall(module.get("customHTML") or ""))
+
+        module_id = str(module.get("id") or "")[:100]
+        for url in urls:
+            if not isinstance(url, str):
+                continue
+            url = url.strip()
+            if not url.lower().startswith(("http://", "https://")):
+                continue
+            if len(url) > MAX_URL_LENGTH:
+                continue
+            found.setdefault((module_id, url), module_type[:50])
+    return [
+        (module_id, module_type, url) for (module_id, url), module_type in found.items()
+    ]
+
+
+def backfill_image_references(apps, schema_editor):
+    """遍历现有页面，写入图片引用索引"""
+    PageTemplate = apps.get_model("pages", "PageTemplate")
+    PageImageReference = apps.get_model("pages", "PageImageReference")
+    MediaFile = apps.get_model("media", "MediaFile")
+
+    file_ids = dict(
+        MediaFile.objects.exclude(rcabinet_file_id__isnull=True).values_list(
+            "rcabinet_url", "rcabinet_file_id"
+        )
+    )
+    batch = []
+    for page in PageTemplate.objects.only("id", "content").iterator(chunk_size=100):
+        for module_id, module_type, url in extract_image_urls(page.content):
+            batch.append(
+                PageImageReference(
+                    page_id=page.id,
+                    module_id=module_id,
+                    module_type=module_type,
+                    url=url,
+                    rcabinet_file_id=file_ids.get(url),
+                )
+            )
+        if len(batch) >= 1000:
+            PageImageReference.objects.bulk_create(batch)
+            batch = []
+    PageImageReference.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0009_pageimagereference"),
+        ("media", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_image_references, migrations.RunPython.noop),
+    ]
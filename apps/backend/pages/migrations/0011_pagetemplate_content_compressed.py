@@ -0,0 +1,21 @@
+# Generated by Django 5.1.11 on 2026-10-19 09:00
+
+import pages.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0010_backfill_image_references"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pagetemplate",
+            name="content_compressed",
+            field=pages.fields.CompressedJSONField(
+                blank=True, help_text="压缩存储的页面内容（迁移用）", null=True
+            ),
+        ),
+    ]
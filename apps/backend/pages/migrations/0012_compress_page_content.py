@@ -0,0 +1,39 @@
+# 数据迁移：把页面内容分批转换为压缩存储
+from django.db import migrations
+
+# 每批转换的页面数（长页面单行可达几百KB，批次不宜过大）
+BATCH_SIZE = 200
+
+
+def _copy_in_batches(apps, source, target):
+    """按主键顺序分批把 source 字段复制到 target 字段（由目标字段完成编码）"""
+    PageTemplate = apps.get_model("pages", "PageTemplate")
+    ids = list(PageTemplate.objects.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        pages = list(
+            PageTemplate.objects.filter(pk__in=ids[start : start + BATCH_SIZE]).only(
+                "pk", source
+            )
+        )
+        for page in pages:
+            setattr(page, target, getattr(page, source))
+        PageTemplate.objects.bulk_update(pages, [target])
+
+
+def compress_content(apps, schema_editor):
+    _copy_in_batches(apps, "content", "content_compressed")
+
+
+def decompress_content(apps, schema_editor):
+    _copy_in_batches(apps, "content_compressed", "content")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0011_pagetemplate_content_compressed"),
+    ]
+
+    operations = [
+        migrations.RunPython(compress_content, decompress_content),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.11 on 2026-10-19 09:00
+
+import pages.fields
+import pages.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0012_compress_page_content"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="pagetemplate",
+            name="content",
+        ),
+        migrations.RenameField(
+            model_name="pagetemplate",
+            old_name="content_compressed",
+            new_name="content",
+        ),
+        migrations.AlterField(
+            model_name="pagetemplate",
+            name="content",
+            field=pages.fields.CompressedJSONField(
+                blank=True,
+                default=list,
+                help_text="存储PageModule数组的JSON字段（压缩存储）",
+                validators=[pages.models.validate_json_content],
+            ),
+        ),
+    ]
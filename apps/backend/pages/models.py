@@ -4,6 +4,8 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 import json
 
+from .fields import CompressedJSONField
+
 User = get_user_model()
 
 
@@ -33,10 +35,10 @@ class PageTemplate(models.Model):
 
     name = models.CharField(max_length=255, help_text="用户设定的页面名称")
 
-    content = models.JSONField(
+    content = CompressedJSONField(
         default=list,
         validators=[validate_json_content],
-        help_text="存储PageModule数组的JSON字段",
+        help_text="存储PageModule数组的JSON字段（压缩存储）",
         blank=True,  # 允许空数组
     )
 
@@ -0,0 +1,283 @@
+"""
+页面HTML渲染缓存
+
+两级缓存：
+
+- 页面级：渲染结果按 内容哈希 + 渲染选项 + 渲染器版本 缓存，内容未变时直接返回
+- 模块级：每个模块的HTML片段按 模块类型 + 模块JSON哈希 + PC/移动端 + 渲染器版本
+  缓存。页面修改后只重新渲染变化的模块，其余片段从缓存取出后拼接，
+  重新渲染的耗时与修改量成正比而不是与页面大小成正比
+
+两级都是进程层LRU + 跨worker共享的Django缓存（与乐天API降级缓存共用数据存储；
+模块片段的共享层默认关闭，可通过 PAGEMAKER_RENDER_FRAGMENT_SHARED_CACHE 开启）。
+
+键由内容本身决定，页面修改后自然生成新键，不需要显式失效；旧条目按有效期过期。
+渲染输出变化时递增 renderer.RENDERER_VERSION 即可让所有旧缓存失效。
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from pagemaker.config import config
+from pagemaker.integrations.fallback_strategies import (
+    LRUTTLCache,
+    get_shared_data_cache,
+)
+
+from .renderer import BRAND_NAME, DEFAULT_OPTIONS, RENDERER_VERSION, PageRenderer
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "pagemaker:render"
+
+FRAGMENT_KEY_PREFIX = "pagemaker:fragment"
+
+# 渲染缓存有效期（秒）
+RENDER_CACHE_TIMEOUT = 24 * 3600
+
+# 进程层最多缓存的页面渲染结果数
+LOCAL_MAX_ENTRIES = 256
+
+
+def module_hash(module: Dict[str, Any]) -> str:
+    """模块JSON的稳定哈希（键顺序无关）"""
+    raw = json.dumps(module, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def content_hash(
+    content: List[Dict[str, Any]], module_hashes: Optional[List[str]] = None
+) -> str:
+    """页面内容的稳定哈希（由各模块哈希组合，已计算模块哈希时可直接传入）"""
+    if module_hashes is None:
+        module_hashes = [module_hash(module) for module in content]
+    return hashlib.sha256(":".join(module_hashes).encode("ascii")).hexdigest()
+
+
+class FragmentCache:
+    """模块HTML片段缓存（进程内LRU + 可选的共享缓存）"""
+
+    def __init__(
+        self,
+        store=None,
+        shared: bool = None,
+        timeout: int = None,
+        local_max_entries: int = None,
+    ):
+        """
+        Args:
+            store: 共享层Django缓存（默认使用跨worker共享数据存储）
+            shared: 是否使用共享层（默认读取配置）
+            timeout: 有效期（秒）
+            local_max_entries: 进程层最多缓存的片段数（默认读取配置）
+        """
+        self._store = store
+        self.shared = config.RENDER_FRAGMENT_SHARED_CACHE if shared is None else shared
+        self.timeout = timeout or RENDER_CACHE_TIMEOUT
+        self.local = LRUTTLCache(
+            max_entries=local_max_entries or config.RENDER_FRAGMENT_CACHE_SIZE,
+            default_ttl=self.timeout,
+        )
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def store(self):
+        return self._store if self._store is not None else get_shared_data_cache()
+
+    def make_key(self, module: Dict[str, Any], digest: str, mobile: bool) -> str:
+        device = "mobile" if mobile else "pc"
+        return (
+            f"{FRAGMENT_KEY_PREFIX}:{RENDERER_VERSION}:{device}:"
+            f"{module.get('type')}:{digest}"
+        )
+
+    def render(
+        self,
+        renderer: PageRenderer,
+        modules: List[Dict[str, Any]],
+        module_hashes: List[str],
+    ) -> List[str]:
+        """
+        渲染各模块的HTML片段，只渲染缓存中没有的模块
+
+        Returns:
+            与 modules 一一对应的HTML片段
+        """
+        keys = [
+            self.make_key(module, digest, renderer.mobile)
+            for module, digest in zip(modules, module_hashes)
+        ]
+        fragments: List[Optional[str]] = [self.local.get(key) for key in keys]
+        missing = [i for i, fragment in enumerate(fragments) if fragment is None]
+        self.hits += len(keys) - len(missing)
+
+        if missing and self.shared:
+            try:
+                found = self.store.get_many([keys[i] for i in missing])
+            except Exception as e:
+                logger.warning(f"读取模块片段缓存失败: {e}")
+                found = {}
+            for i in missing:
+                fragment = found.get(keys[i])
+                if fragment is not None:
+                    fragments[i] = fragment
+                    self.local.set(keys[i], fragment)
+                    self.shared_hits += 1
+            missing = [i for i in missing if fragments[i] is None]
+
+        rendered = {}
+        for i in missing:
+            fragments[i] = renderer.render_module(modules[i])
+            self.local.set(keys[i], fragments[i])
+            rendered[keys[i]] = fragments[i]
+        self.misses += len(missing)
+
+        if rendered and self.shared:
+            try:
+                self.store.set_many(rendered, timeout=self.timeout)
+            except Exception as e:
+                logger.warning(f"写入模块片段缓存失败: {e}")
+        return fragments
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "local": self.local.stats(),
+        }
+
+
+class RenderCache:
+    """进程内LRU + 共享缓存的渲染结果缓存"""
+
+    def __init__(
+        self,
+        store=None,
+        timeout: int = None,
+        local_max_entries: int = None,
+        fragments: FragmentCache = None,
+    ):
+        """
+        Args:
+            store: 共享层Django缓存（默认使用跨worker共享数据存储）
+            timeout: 有效期（秒）
+            local_max_entries: 进程层最多缓存的渲染结果数
+            fragments: 模块片段缓存（默认与页面级使用同一个共享层）
+        """
+        self._store = store
+        self.timeout = timeout or RENDER_CACHE_TIMEOUT
+        self.local = LRUTTLCache(
+            max_entries=local_max_entries or LOCAL_MAX_ENTRIES,
+            default_ttl=self.timeout,
+        )
+        self.fragments = fragments or FragmentCache(store=store, timeout=timeout)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def store(self):
+        return self._store if self._store is not None else get_shared_data_cache()
+
+    def make_key(
+        self,
+        content: List[Dict[str, Any]],
+        options: Dict[str, Any],
+        module_hashes: Optional[List[str]] = None,
+    ) -> str:
+        options = {**DEFAULT_OPTIONS, **options}
+        option_key = json.dumps(options, sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(
+            f"{content_hash(content, module_hashes)}:{option_key}".encode("utf-8")
+        ).hexdigest()
+        return f"{KEY_PREFIX}:{RENDERER_VERSION}:{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        html = self.local.get(key)
+        if html is not None:
+            return html
+        try:
+            html = self.store.get(key)
+        except Exception as e:
+            logger.warning(f"读取渲染缓存失败: {e}")
+            return None
+        if html is not None:
+            self.local.set(key, html)
+        return html
+
+    def set(self, key: str, html: str):
+        self.local.set(key, html)
+        try:
+            self.store.set(key, html, timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"写入渲染缓存失败: {e}")
+
+    def render(self, content: List[Dict[str, Any]], **options) -> str:
+        """渲染页面内容，相同内容和选项直接返回缓存结果，否则只渲染变化的模块"""
+        module_hashes = [module_hash(module) for module in content]
+        key = self.make_key(content, options, module_hashes)
+        html = self.get(key)
+        if html is not None:
+            self.hits += 1
+            return html
+
+        self.misses += 1
+        renderer = PageRenderer(**options)
+        html = renderer.finish(self.fragments.render(renderer, content, module_hashes))
+        self.set(key, html)
+        return html
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "renderer_version": RENDERER_VERSION,
+            "hits": self.hits,
+            "misses": self.misses,
+            "local": self.local.stats(),
+            "fragments": self.fragments.stats(),
+        }
+
+
+_render_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> RenderCache:
+    """获取全局渲染缓存"""
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache()
+    return _render_cache
+
+
+def page_render_options(page, **options) -> Dict[str, Any]:
+    """页面的默认渲染选项：移动端页面使用乐天约束模式且不输出样式"""
+    mobile = page.device_type == "mobile"
+    defaults = {"mobile_mode": mobile, "include_styles": not mobile}
+    if options.get("full_document"):
+        defaults.update(
+            title=page.name, description=f"使用 {BRAND_NAME} 创建的页面：{page.name}"
+        )
+    return {**defaults, **options}
+
+
+def render_page(page, use_cache: bool = True, **options) -> str:
+    """
+    渲染PageTemplate为HTML
+
+    Args:
+        page: PageTemplate实例
+        use_cache: 是否使用渲染缓存
+        **options: 渲染选项（见 renderer.DEFAULT_OPTIONS），默认按 device_type 选择PC/移动端
+
+    Returns:
+        HTML字符串
+    """
+    options = page_render_options(page, **options)
+    content = page.content or []
+    if not use_cache:
+        return PageRenderer(**options).render(content)
+    return get_render_cache().render(content, **options)
@@ -0,0 +1,838 @@
+"""
+页面HTML渲染器（服务端）
+
+把 PageTemplate.content（PageModule数组）渲染为乐天店铺页面HTML，输出与前端
+apps/frontend/src/services/htmlExportService.ts 保持一致：
+
+- PC端：带内联样式的标准HTML
+- 移动端（mobile_mode）：乐天约束版本，只使用 table / font / p / br 等允许的标签
+
+修改渲染输出时需同步修改前端导出服务，并递增 RENDERER_VERSION 使渲染缓存失效。
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# 渲染器版本（渲染缓存键的一部分）
+RENDERER_VERSION = "1"
+
+BRAND_NAME = "UO-PageMaker"
+
+DEFAULT_OPTIONS = {
+    "include_styles": True,
+    "minify": False,
+    "title": f"{BRAND_NAME} 导出页面",
+    "description": f"使用 {BRAND_NAME} 创建的页面：页面",
+    "language": "zh-CN",
+    "full_document": False,  # 是否生成完整HTML文档（包含头尾）
+    "mobile_mode": False,  # 是否使用移动端模式（乐天约束）
+}
+
+# 标准HTML font size映射（与浏览器默认行为一致）
+FONT_SIZE_PX = {
+    "1": "12px",
+    "2": "16px",
+    "3": "18px",
+    "4": "24px",
+    "5": "32px",
+    "6": "48px",
+    "7": "64px",
+}
+
+IMAGE_PRESET_WIDTHS = {
+    "small": "200px",
+    "medium": "400px",
+    "large": "600px",
+    "full": "100%",
+}
+
+SPACE_HEIGHTS = {
+    "small": "20px",
+    "medium": "40px",
+    "large": "60px",
+    "extra-large": "80px",
+}
+
+EDITOR_CLASSES = ("editable-text", "editable-image", "editing-text")
+
+MOBILE_TABLE_OPEN = (
+    '<table width="100%" cellpadding="0" cellspacing="0" border="0" align="center">'
+)
+
+
+# 完整文档的导出样式（空行保留与前端相同的缩进空白）
+_CSS_RULES = [
+    f"""        /* {BRAND_NAME} 导出样式 */
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            margin: 0;
+            padding: 0;
+        }}""",
+    """        .pagemaker-content {
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+        }""",
+    """        .pm-title {
+            margin: 16px 0;
+            font-weight: 600;
+        }""",
+    """        .pm-text {
+            margin: 12px 0;
+        }""",
+    """        .pm-image {
+            margin: 16px 0;
+        }""",
+    """        .pm-separator {
+            border: none;
+            margin: 20px 0;
+        }""",
+    """        .pm-key-value {
+            margin: 16px 0;
+        }""",
+    """        .pm-multi-column {
+            margin: 16px 0;
+        }""",
+    """        .pm-image-placeholder {
+            border-radius: 4px;
+        }""",
+]
+_CSS_MEDIA_RULES = [
+    """            .pagemaker-content {
+                padding: 16px;
+            }""",
+    """            .pm-multi-column {
+                flex-direction: column !important;
+            }""",
+    """            .pm-column {
+                width: 100% !important;
+                flex: none !important;
+            }""",
+    """            .pm-kv-item {
+                flex-direction: column !important;
+            }""",
+    """            .pm-kv-key {
+                min-width: auto !important;
+                margin-right: 0 !important;
+                margin-bottom: 4px !important;
+            }""",
+]
+EXPORT_CSS = "\n        \n".join(
+    _CSS_RULES
+    + [
+        "        @media (max-width: 768px) {\n"
+        + "\n            \n".join(_CSS_MEDIA_RULES)
+        + "\n        }"
+    ]
+)
+
+
+def _js_str(value: Any) -> str:
+    """按JavaScript String()的格式把值转为字符串"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _get_str(module: Dict[str, Any], key: str, default: str = "") -> str:
+    value = module.get(key)
+    if isinstance(value, str):
+        return value
+    return _js_str(value) if value else default
+
+
+def _get_number(module: Dict[str, Any], key: str, default: float = 0) -> float:
+    value = module.get(key)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return number or default
+
+
+def _get_list(module: Dict[str, Any], key: str) -> List[Any]:
+    value = module.get(key)
+    return value if isinstance(value, list) else []
+
+
+def escape_html(text: str) -> str:
+    """HTML转义"""
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("'", "&#x27;")
+    )
+
+
+def inline_styles(styles: Dict[str, Optional[str]]) -> str:
+    """生成内联样式字符串（跳过空值）"""
+    return "; ".join(f"{prop}: {value}" for prop, value in styles.items() if value)
+
+
+def format_spacing(value: str) -> Optional[str]:
+    """格式化间距值（纯数字补px）"""
+    if not value:
+        return None
+    if re.fullmatch(r"\d+", value):
+        return f"{value}px"
+    return value
+
+
+def font_size_px(size: Any) -> str:
+    return FONT_SIZE_PX.get(_js_str(size), "18px")
+
+
+def convert_to_font_size(size: Any) -> str:
+    """转换为 font 标签的 size 属性（1-7，超出范围使用4）"""
+    if isinstance(size, (int, float)) and not isinstance(size, bool):
+        numeric = size
+    else:
+        digits = re.sub(r"[^\d]", "", _js_str(size))
+        numeric = int(digits) if digits else None
+    if numeric is not None and 1 <= numeric <= 7:
+        return _js_str(numeric)
+    return "4"
+
+
+def parse_width(width: Any, default: str) -> str:
+    """解析宽度值，纯数字视为百分比"""
+    if not width:
+        return default
+    width = _js_str(width)
+    if any(unit in width for unit in ("%", "px", "em", "rem")):
+        return width
+    match = re.match(r"\s*[-+]?(\d+\.?\d*|\.\d+)", width)
+    if match:
+        return f"{_js_str(float(match.group(0)))}%"
+    return default
+
+
+def link_href(link: Any) -> str:
+    """根据链接类型生成href"""
+    if not isinstance(link, dict) or not link.get("value"):
+        return ""
+    value = _js_str(link["value"])
+    link_type = link.get("type")
+    if link_type == "email":
+        return f"mailto:{value}"
+    if link_type == "phone":
+        return f"tel:{value}"
+    if link_type == "anchor":
+        return f"#{value}"
+    return value
+
+
+_RAKUTEN_REPLACEMENTS = [
+    (re.compile(r"<div[^>]*>", re.I), "<p>"),
+    (re.compile(r"</div>", re.I), "</p>"),
+    (re.compile(r"<span[^>]*>", re.I), ""),
+    (re.compile(r"</span>", re.I), ""),
+    (re.compile(r"<strong[^>]*>", re.I), "<b>"),
+    (re.compile(r"</strong>", re.I), "</b>"),
+    (re.compile(r"<em[^>]*>", re.I), ""),
+    (re.compile(r"</em>", re.I), ""),
+    (re.compile(r"<u[^>]*>", re.I), ""),
+    (re.compile(r"</u>", re.I), ""),
+    # 清理不允许的属性，只保留href, target, alt, src, width, height等
+    (re.compile(r'\s(class|id|style)="[^"]*"', re.I), ""),
+]
+
+
+def sanitize_html_for_rakuten(html: str) -> str:
+    """清理HTML，只保留乐天允许的标签（a, img, table, td, th, tr, br, p, font, b, center, hr）"""
+    for pattern, replacement in _RAKUTEN_REPLACEMENTS:
+        html = pattern.sub(replacement, html)
+    return html
+
+
+def _strip_editor_classes(quote: str):
+    def replace(match):
+        classes = [
+            cls
+            for cls in re.split(r"\s+", match.group(1))
+            if cls and cls not in EDITOR_CLASSES
+        ]
+        return f"class={quote}{' '.join(classes)}{quote}" if classes else ""
+
+    return replace
+
+
+def clean_editor_classes(html: str) -> str:
+    """清理编辑器添加的 contenteditable 属性和 class"""
+    if not html:
+        return ""
+    html = re.sub(r'\s+contenteditable="[^"]*"', "", html, flags=re.I)
+    html = re.sub(r"\s+contenteditable='[^']*'", "", html, flags=re.I)
+    html = re.sub(r"\s+contenteditable=\w+", "", html, flags=re.I)
+    for cls in EDITOR_CLASSES:
+        html = re.sub(rf'\s+class="{cls}"', "", html, flags=re.I)
+        html = re.sub(rf"\s+class='{cls}'", "", html, flags=re.I)
+    html = re.sub(r'class="([^"]*)"', _strip_editor_classes('"'), html, flags=re.I)
+    html = re.sub(r"class='([^']*)'", _strip_editor_classes("'"), html, flags=re.I)
+    html = re.sub(r"\s+>", ">", html)
+    return re.sub(r"\s{2,}", " ", html)
+
+
+def minify_html(html: str) -> str:
+    """简单的HTML压缩（只压缩ASCII空白，保留全角空格 U+3000）"""
+    placeholder = "___FULLWIDTH_SPACE___"
+    working = html.replace("　", placeholder)
+    working = re.sub(r"[ \t\r\n\f]+", " ", working)
+    working = re.sub(r">\s+<", "><", working)
+    working = re.sub(r"^[ \t\r\n\f]+|[ \t\r\n\f]+$", "", working)
+    return working.replace(placeholder, "　")
+
+
+class StreamingMinifier:
+    """
+    分块压缩HTML，拼接结果与对整体调用 minify_html 完全一致
+
+    末尾的空白（以及紧挨着的 ">"）要看下一块的开头才能决定如何压缩，
+    暂存到下一块再输出，其余部分立即输出。
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._started = False
+
+    def _compress(self, text: str, last: bool) -> str:
+        text = re.sub(r"[ \t\r\n\f]+", " ", text)
+        # 等价于 minify_html 中替换全角空格后的 >\s+<
+        text = re.sub(r">[^\S\u3000]+<", "><", text)
+        if last:
+            text = text.rstrip(" \t\r\n\f")
+        if not self._started:
+            text = text.lstrip(" \t\r\n\f")
+            self._started = bool(text)
+        return text
+
+    def feed(self, chunk: str) -> str:
+        text = self._pending + chunk
+        end = len(text)
+        while end and text[end - 1].isspace() and text[end - 1] != "　":
+            end -= 1
+        if end and text[end - 1] == ">":
+            end -= 1
+        self._pending = text[end:]
+        return self._compress(text[:end], last=False)
+
+    def close(self) -> str:
+        text, self._pending = self._pending, ""
+        return self._compress(text, last=True)
+
+
+class PageRenderer:
+    """PageModule数组的HTML渲染器"""
+
+    def __init__(self, **options):
+        unknown = set(options) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError(f"未知的渲染选项: {', '.join(sorted(unknown))}")
+        self.options = {**DEFAULT_OPTIONS, **options}
+        self.mobile = bool(self.options["mobile_mode"])
+
+    # ------------------------------------------------------------------
+    # 文档
+    # ------------------------------------------------------------------
+
+    def render(self, modules: Iterable[Dict[str, Any]]) -> str:
+        """渲染HTML（完整文档或仅内容部分）"""
+        return self.finish(self.render_module(module) for module in modules)
+
+    def iter_render(self, modules: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """逐块渲染HTML（每个模块渲染完立即输出），拼接结果与 render 一致"""
+        return self.iter_finish(self.render_module(module) for module in modules)
+
+    def finish(self, fragments: Iterable[str]) -> str:
+        """
+        拼接各模块的HTML片段并输出文档
+
+        片段只取决于模块本身和 mobile_mode，可以单独缓存（见 render_cache）。
+        """
+        html = "".join(self._iter_document(fragments))
+        return minify_html(html) if self.options["minify"] else html
+
+    def iter_finish(self, fragments: Iterable[str]) -> Iterator[str]:
+        """finish 的流式版本：按顺序输出文档头、各模块片段和文档尾"""
+        chunks = self._iter_document(fragments)
+        if not self.options["minify"]:
+            yield from chunks
+            return
+        minifier = StreamingMinifier()
+        for chunk in chunks:
+            chunk = minifier.feed(chunk)
+            if chunk:
+                yield chunk
+        chunk = minifier.close()
+        if chunk:
+            yield chunk
+
+    def _iter_document(self, fragments: Iterable[str]) -> Iterator[str]:
+        """未压缩的文档分块：文档头、以换行分隔的非空片段、文档尾"""
+        opts = self.options
+        full_document = opts["full_document"]
+        if full_document:
+            styles = self.css() if opts["include_styles"] else ""
+            style_block = f"<style>\n{styles}\n    </style>" if styles else ""
+            yield f"""<!DOCTYPE html>
+<html lang="{opts['language']}">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{escape_html(opts['title'])}</title>
+    <meta name="description" content="{escape_html(opts['description'])}">
+    <meta name="generator" content="{escape_html(BRAND_NAME)}">
+    {style_block}
+</head>
+<body>
+    <div class="pagemaker-content">
+"""
+
+        first = True
+        for html in fragments:
+            if not html.strip():
+                continue
+            yield html if first else "\n" + html
+            first = False
+
+        if full_document:
+            yield """
+    </div>
+</body>
+</html>"""
+
+    def render_module(self, module: Dict[str, Any]) -> str:
+        """渲染单个模块，未知类型返回空字符串"""
+        renderer = self._renderers.get(module.get("type"))
+        return renderer(self, module) if renderer else ""
+
+    # ------------------------------------------------------------------
+    # 标题 / 文本
+    # ------------------------------------------------------------------
+
+    def title(self, module: Dict[str, Any]) -> str:
+        content = _get_str(module, "text", _get_str(module, "content"))
+        alignment = _get_str(module, "alignment", "left")
+        color = _get_str(module, "color", "#000000")
+        formatted = escape_html(content).replace("\n", "<br>")
+
+        if self.mobile:
+            font_size = convert_to_font_size(_get_str(module, "fontSize", "24px"))
+            align = "left" if alignment == "justify" else alignment
+            return f"""{MOBILE_TABLE_OPEN}
+<tr>
+<td align="{align}"><font size="{font_size}" color="{color}"><b>{formatted}</b></font></td>
+</tr>
+</table>"""
+
+        level = f"h{_js_str(module['level'])}" if module.get("level") else "h2"
+        font_family = _get_str(module, "fontFamily", "inherit")
+        styles = inline_styles(
+            {
+                "text-align": alignment,
+                "color": color,
+                "font-family": font_family if font_family != "inherit" else None,
+                "font-weight": _get_str(module, "fontWeight", "bold"),
+                "margin-top": format_spacing(_get_str(module, "marginTop")),
+                "margin-bottom": format_spacing(_get_str(module, "marginBottom")),
+                "padding-top": format_spacing(_get_str(module, "paddingTop")),
+                "padding-bottom": format_spacing(_get_str(module, "paddingBottom")),
+                "padding-left": format_spacing(_get_str(module, "paddingLeft")),
+                "padding-right": format_spacing(_get_str(module, "paddingRight")),
+                "background-color": _get_str(module, "backgroundColor"),
+            }
+        )
+        return (
+            f'        <{level} class="pm-title" style="{styles}">{formatted}</{level}>'
+        )
+
+    def text(self, module: Dict[str, Any]) -> str:
+        if self.mobile:
+            # 支持两种属性结构：直接属性和textConfig属性
+            text_config = module.get("textConfig") or {}
+            content = text_config.get("content") or _get_str(module, "content")
+            alignment = text_config.get("alignment") or _get_str(
+                module, "alignment", "left"
+            )
+            color = text_config.get("color") or _get_str(module, "textColor", "#000000")
+            font_size = convert_to_font_size(
+                text_config.get("fontSize") or _get_str(module, "fontSize", "4")
+            )
+            align = "left" if alignment == "justify" else alignment
+            align_attr = f' align="{align}"' if align != "left" else ""
+            if not content or not content.strip():
+                body = "输入文本内容"
+            else:
+                body = sanitize_html_for_rakuten(content.replace("\n", "<br>"))
+            return f'<p{align_attr}><font size="{font_size}" color="{color}">{body}</font></p>'
+
+        content = _get_str(module, "content")
+        font_family = _get_str(module, "fontFamily", "inherit")
+        background = _get_str(module, "backgroundColor", "transparent")
+        styles = inline_styles(
+            {
+                "text-align": _get_str(module, "alignment", "left"),
+                "font-size": font_size_px(_get_str(module, "fontSize", "4")),
+                "font-family": font_family if font_family != "inherit" else None,
+                "line-height": "1.625",
+                "color": _get_str(module, "textColor", "#000000"),
+                "background-color": background if background != "transparent" else None,
+                "margin-top": format_spacing(_get_str(module, "marginTop")),
+                "margin-bottom": format_spacing(_get_str(module, "marginBottom")),
+                "padding-top": format_spacing(_get_str(module, "paddingTop")),
+                "padding-bottom": format_spacing(_get_str(module, "paddingBottom")),
+                "padding-left": format_spacing(_get_str(module, "paddingLeft")),
+                "padding-right": format_spacing(_get_str(module, "paddingRight")),
+            }
+        )
+        # 富文本内容不转义，只把换行转换为<br>
+        body = (content or "输入文本内容").replace("\n", "<br>")
+        return f'        <div class="pm-text" style="{styles}">{body}</div>'
+
+    # ------------------------------------------------------------------
+    # 图片 / 分隔符 / 表格
+    # ------------------------------------------------------------------
+
+    def image(self, module: Dict[str, Any]) -> str:
+        src = _get_str(module, "src")
+        alt = _get_str(module, "alt", "图片")
+        alignment = _get_str(module, "alignment", "center")
+
+        if not src:
+            if self.mobile:
+                return f'<p align="{alignment}"><font size="2" color="#666666">图片未设置</font></p>'
+            return (
+                f'        <div class="pm-image-placeholder" style="text-align: {alignment}; '
+                'padding: 20px; background-color: #f5f5f5; border: 2px dashed #ccc;">\n'
+                '            <p style="margin: 0; color: #666;">图片未设置</p>\n'
+                "        </div>"
+            )
+
+        width = "100%"
+        size = module.get("size")
+        if isinstance(size, dict):
+            if size.get("type") == "preset":
+                width = IMAGE_PRESET_WIDTHS.get(size.get("value"), "100%")
+            elif size.get("type") == "percentage":
+                width = f"{_js_str(size.get('value'))}%"
+
+        attributes = [
+            f'src="{escape_html(src)}"',
+            f'alt="{escape_html(alt)}"',
+            f'width="{width}"',
+        ]
+        if alignment != "center":
+            if self.mobile:
+                attributes.append(f'align="{alignment}"')
+            else:
+                margin = {"left": "auto 0 0", "right": "0 0 auto"}.get(
+                    alignment, "auto"
+                )
+                attributes.append(f'style="display: block; margin: 0 {margin};"')
+        img = f"<img {' '.join(attributes)}>"
+
+        link = module.get("link")
+        href = link_href(link)
+        if not href:
+            return img
+        link_attributes = [f'href="{escape_html(href)}"']
+        if not self.mobile and link.get("type") == "url":
+            link_attributes += ['target="_blank"', 'rel="noopener noreferrer"']
+        return f"<a {' '.join(link_attributes)}>{img}</a>"
+
+    def separator(self, module: Dict[str, Any]) -> str:
+        if _get_str(module, "separatorType", "line") == "space":
+            space_height = _get_str(module, "spaceHeight", "medium")
+            height = SPACE_HEIGHTS.get(space_height, "40px")
+            if self.mobile:
+                return f"""{MOBILE_TABLE_OPEN}
+<tr>
+<td height="{height}">&nbsp;</td>
+</tr>
+</table>"""
+            styles = inline_styles({"height": height, "width": "100%"})
+            return f'        <div class="pm-separator-space" style="{styles}"></div>'
+
+        color = _get_str(module, "lineColor", "#e5e7eb")
+        thickness = _js_str(_get_number(module, "lineThickness", 1))
+        line_style = _get_str(module, "lineStyle", "solid")
+
+        if self.mobile:
+            if line_style == "solid":
+                return f'<hr color="{color}" size="{thickness}">'
+            border_style = "dashed" if line_style == "dashed" else "dotted"
+            return f"""{MOBILE_TABLE_OPEN}
+<tr>
+<td style="border-top: {thickness}px {border_style} {color}; height: 0; line-height: 0; font-size: 0;">&nbsp;</td>
+</tr>
+</table>"""
+
+        styles = inline_styles(
+            {
+                "border-top": f"{thickness}px {line_style} {color}",
+                "border-bottom": "none",
+                "border-left": "none",
+                "border-right": "none",
+                "width": "100%",
+                "margin": "16px 0",
+                "height": "0",
+            }
+        )
+        return f'        <hr class="pm-separator-line" style="{styles}">'
+
+    def key_value(self, module: Dict[str, Any]) -> str:
+        # 支持新的rows属性，向后兼容items属性（PC和移动端格式相同）
+        rows = _get_list(module, "rows") or _get_list(module, "items")
+        if not rows:
+            return "<!-- 表格模块：无数据 -->"
+
+        cells = []
+        for row in rows:
+            row = row if isinstance(row, dict) else {}
+            key = escape_html(_js_str(row.get("key") or ""))
+            # value保留HTML富文本，不转义
+            value = _js_str(row.get("value") or "").replace("\n", "<br>")
+            cells.append(
+                f'<tr><td colspan="6" bgcolor="#efefef" width="20%" align="center">{key}</td>'
+                f'<td bgcolor="#FFFFFF" width="80%">{value}</td></tr>'
+            )
+        return (
+            '<table width="100%" border="0" cellspacing="2" cellpadding="8" '
+            f'bgcolor="#999999">{"".join(cells)}</table>'
+        )
+
+    # ------------------------------------------------------------------
+    # 多列图文
+    # ------------------------------------------------------------------
+
+    def multi_column(self, module: Dict[str, Any]) -> str:
+        layout = _get_str(module, "layout", "imageLeft")
+        image_config = module.get("imageConfig") or {}
+        text_config = module.get("textConfig") or {}
+
+        if not image_config.get("src") and not text_config.get("content"):
+            if self.mobile:
+                return f"""{MOBILE_TABLE_OPEN}
+<tr>
+<td align="center"><font size="2" color="#666666">多列图文模块：内容未设置</font></td>
+</tr>
+</table>"""
+            return (
+                '        <div class="pm-multi-column-placeholder" style="text-align: center; '
+                'padding: 20px; background-color: #f5f5f5; border: 2px dashed #ccc;">\n'
+                '            <p style="margin: 0; color: #666;">多列图文模块：内容未设置</p>\n'
+                "        </div>"
+            )
+
+        if self.mobile:
+            return self._multi_column_mobile(layout, image_config, text_config)
+        return self._multi_column_standard(layout, image_config, text_config)
+
+    def _mobile_image(self, image_config: Dict[str, Any]):
+        """移动端图片元素和对齐（table的left/right对齐会导致页面崩溃，只使用center）"""
+        width = parse_width(image_config.get("width"), "100%")
+        alignment = image_config.get("alignment") or "center"
+        if alignment in ("left", "right"):
+            alignment = "center"
+        img = (
+            f'<img src="{escape_html(image_config["src"])}" '
+            f'alt="{escape_html(image_config.get("alt") or "图片")}" width="{width}">'
+        )
+        href = link_href(image_config.get("link"))
+        if href:
+            img = f'<a href="{escape_html(href)}">{img}</a>'
+        return img, alignment
+
+    def _mobile_text(self, text_config: Dict[str, Any]):
+        """移动端文本单元格的属性和内容"""
+        alignment = text_config.get("alignment") or "left"
+        font_size = convert_to_font_size(text_config.get("fontSize") or "4")
+        color = text_config.get("color") or "#000000"
+        background = text_config.get("backgroundColor") or "transparent"
+        bgcolor_attr = f' bgcolor="{background}"' if background != "transparent" else ""
+        align_attr = f' align="{alignment}"' if alignment != "left" else ""
+        body = sanitize_html_for_rakuten(text_config["content"].replace("\n", "<br>"))
+        return (
+            align_attr,
+            bgcolor_attr,
+            f'<font size="{font_size}" color="{color}">{body}</font>',
+        )
+
+    def _multi_column_mobile(
+        self, layout: str, image_config: Dict[str, Any], text_config: Dict[str, Any]
+    ) -> str:
+        has_image = bool(image_config.get("src"))
+        has_text = bool(text_config.get("content"))
+
+        # 只有图片或只有文本时使用单独的table
+        if not (has_image and has_text):
+            if has_image:
+                img, alignment = self._mobile_image(image_config)
+                cell = f'<td align="{alignment}">{img}</td>'
+            else:
+                align_attr, bgcolor_attr, body = self._mobile_text(text_config)
+                cell = f"<td{align_attr}{bgcolor_attr}>{body}</td>"
+            return f"""{MOBILE_TABLE_OPEN}
+<tr>
+{cell}
+</tr>
+</table>"""
+
+        img, image_alignment = self._mobile_image(image_config)
+        align_attr, bgcolor_attr, body = self._mobile_text(text_config)
+
+        if layout in ("imageTop", "textTop"):
+            image_row = f'<tr>\n<td align="{image_alignment}">{img}</td>\n</tr>'
+            text_row = f"<tr>\n<td{align_attr}{bgcolor_attr}>{body}</td>\n</tr>"
+            first, second = (
+                (image_row, text_row) if layout == "imageTop" else (text_row, image_row)
+            )
+            return f"{MOBILE_TABLE_OPEN}\n{first}\n{second}\n</table>"
+
+        image_cell = f'<td width="49%" align="{image_alignment}">{img}</td>'
+        text_cell = f'<td{bgcolor_attr} width="49%"{align_attr}>{body}</td>'
+        first, second = (
+            (text_cell, image_cell) if layout == "textLeft" else (image_cell, text_cell)
+        )
+        return f"""<table width="100%" cellspacing="0" cellpadding="0" border="0">
+<tr align="center">
+{first}
+{second}
+</tr>
+</table>"""
+
+    def _multi_column_standard(
+        self, layout: str, image_config: Dict[str, Any], text_config: Dict[str, Any]
+    ) -> str:
+        horizontal = layout in ("imageLeft", "textLeft")
+        image_first = layout in ("imageLeft", "imageTop")
+        image_part = self._image_part(image_config, horizontal)
+        text_part = self._text_part(text_config, horizontal)
+        parts = [image_part, text_part] if image_first else [text_part, image_part]
+        parts = [part for part in parts if part.strip()]
+        if not parts:
+            return ""
+
+        direction = "row" if horizontal else "column"
+        align_items = "center" if horizontal else "stretch"
+        # 内联样式不支持媒体查询，输出带媒体查询的样式块
+        responsive_styles = f"""
+      .pm-multi-column {{
+        display: flex;
+        flex-direction: {direction};
+        gap: 16px;
+        align-items: {align_items};
+        margin: 16px 0;
+      }}
+      @media (max-width: 768px) {{
+        .pm-multi-column {{
+          flex-direction: column !important;
+        }}
+        .pm-multi-column > * {{
+          flex: none !important;
+          width: 100% !important;
+        }}
+      }}
+    """
+        joined = "\n".join(parts)
+        return f"""        <style>
+{responsive_styles}
+        </style>
+        <div class="pm-multi-column">
+{joined}
+        </div>"""
+
+    def _image_part(self, image_config: Dict[str, Any], horizontal: bool) -> str:
+        if not image_config.get("src"):
+            return ""
+        img_styles = inline_styles(
+            {
+                "width": parse_width(
+                    image_config.get("width"), "50%" if horizontal else "100%"
+                ),
+                "max-width": "100%",
+                "height": "auto",
+                "object-fit": "cover",
+            }
+        )
+        container_styles = inline_styles(
+            {
+                "flex": "1" if horizontal else "none",
+                "text-align": image_config.get("alignment") or "center",
+            }
+        )
+        img = (
+            f'<img src="{escape_html(image_config["src"])}" '
+            f'alt="{escape_html(image_config.get("alt") or "图片")}" style="{img_styles}">'
+        )
+        href = link_href(image_config.get("link"))
+        if href:
+            img = (
+                f'<a href="{escape_html(href)}" target="_blank" '
+                f'rel="noopener noreferrer">{img}</a>'
+            )
+        return f"""            <div class="pm-multi-column-image" style="{container_styles}">
+                {img}
+            </div>"""
+
+    def _text_part(self, text_config: Dict[str, Any], horizontal: bool) -> str:
+        content = text_config.get("content")
+        if not content:
+            return ""
+        font = text_config.get("font")
+        background = text_config.get("backgroundColor")
+        has_background = background != "transparent"
+        text_styles = inline_styles(
+            {
+                "font-family": font if font != "inherit" else None,
+                "font-size": font_size_px(text_config.get("fontSize") or "4"),
+                "color": text_config.get("color") or "#000000",
+                "background-color": background if has_background else None,
+                "text-align": text_config.get("alignment") or "left",
+                "line-height": "1.625",
+                "padding": "12px" if has_background else None,
+                "border-radius": "4px" if has_background else None,
+            }
+        )
+        container_styles = inline_styles({"flex": "1" if horizontal else "none"})
+        body = content.replace("\n", "<br>")
+        return f"""            <div class="pm-multi-column-text" style="{container_styles}">
+                <div style="{text_styles}">
+                    {body}
+                </div>
+            </div>"""
+
+    # ------------------------------------------------------------------
+    # 自定义HTML / 样式
+    # ------------------------------------------------------------------
+
+    def custom(self, module: Dict[str, Any]) -> str:
+        # customHTML 在编辑器拆分时已经过净化，这里只清理编辑器类名
+        return clean_editor_classes(module.get("customHTML") or "")
+
+    @staticmethod
+    def css() -> str:
+        return EXPORT_CSS
+
+    _renderers = {
+        "title": title,
+        "text": text,
+        "image": image,
+        "separator": separator,
+        "keyValue": key_value,
+        "multiColumn": multi_column,
+        "custom": custom,
+    }
+
+
+def render_modules(modules: Iterable[Dict[str, Any]], **options) -> str:
+    """渲染PageModule数组（不使用缓存）"""
+    return PageRenderer(**options).render(modules)
@@ -0,0 +1,90 @@
+"""
+乐天HTML预算分析测试
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from pages.budget import HtmlBudgetAnalyzer, fragment_stats
+from pages.models import PageTemplate
+from pages.render_cache import RenderCache
+from pages.renderer import PageRenderer
+
+
+class HtmlBudgetAnalyzerTestCase(TestCase):
+    """HTML预算分析测试"""
+
+    def setUp(self):
+        store = LocMemCache(f"budget-{id(self)}", {"TIMEOUT": None})
+        self.addCleanup(store.clear)
+        patcher = patch(
+            "pages.budget.get_render_cache", return_value=RenderCache(store=store)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.content = [
+            {"id": "t", "type": "title", "text": "标题"},
+            {"id": "x", "type": "text", "content": "说明 文字"},
+            {"id": "u", "type": "unknown"},
+            {"id": "c", "type": "custom", "customHTML": "前<div>块</div>后"},
+            *[
+                {"id": f"i{i}", "type": "image", "src": f"https://a/{i}.jpg"}
+                for i in range(21)
+            ],
+        ]
+
+    def test_bytes_match_minified_export(self):
+        """测试字节数与压缩后导出HTML一致，超出上限时给出问题"""
+        analyzer = HtmlBudgetAnalyzer()
+        for device_type in ("pc", "mobile"):
+            mobile = device_type == "mobile"
+            html = PageRenderer(mobile_mode=mobile, minify=True).render(self.content)
+            result = analyzer.analyze(self.content, device_type)
+            self.assertEqual(result["bytes"], len(html.encode("utf-8")))
+            self.assertEqual(result["images"], 21)
+            self.assertEqual(len(result["modules"]), len(self.content) - 1)
+
+        self.assertEqual(result["disallowed_tags"], {"div": 1})
+        self.assertEqual(result["modules"][2]["disallowed_tags"], ["div"])
+        self.assertEqual(
+            [issue["code"] for issue in result["issues"]],
+            ["TOO_MANY_IMAGES", "DISALLOWED_TAGS"],
+        )
+        self.assertFalse(result["within_budget"])
+        self.assertEqual(fragment_stats("<p>\n a </p>")["bytes"], len("<p> a </p>"))
+
+    def test_only_changed_modules_are_analyzed(self):
+        """测试修改一个模块后只重新分析该模块"""
+        analyzer = HtmlBudgetAnalyzer()
+        analyzer.analyze(self.content, "mobile")
+        edited = [{**self.content[0], "text": "新标题" * 2000}, *self.content[1:]]
+        result = analyzer.analyze(edited, "mobile")
+        self.assertEqual(analyzer.misses, len(self.content) + 1)
+        self.assertEqual(result["issues"][0]["code"], "HTML_TOO_LARGE")
+
+
+class PageUpdateBudgetTestCase(TestCase):
+    """保存页面时返回HTML预算"""
+
+    def test_update_response_includes_budget(self):
+        user = User.objects.create_user(username="owner", password="pass")
+        page = PageTemplate.objects.create(
+            name="页面", content=[], owner=user, device_type="mobile"
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.patch(
+            reverse("pages:page-detail", kwargs={"id": page.id}),
+            {"content": [{"id": "t", "type": "title", "text": "标题"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        budget = response.json()["data"]["budget"]
+        self.assertEqual(budget["device_type"], "mobile")
+        self.assertEqual(budget["max_bytes"], 10240)
+        self.assertTrue(budget["within_budget"])
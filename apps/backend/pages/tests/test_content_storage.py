@@ -0,0 +1,111 @@
+"""
+页面内容压缩存储测试
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.exceptions import FieldError
+from django.test import TestCase
+
+from pages.content_storage import (
+    _raw_content,
+    benchmark_content_storage,
+    recompress_pages,
+)
+from pages.fields import decode_content, encode_content, is_compressed
+from pages.models import PageTemplate
+
+
+def make_content(count):
+    return [
+        (
+            {
+                "id": f"module-17000000000{i:02d}-abc{i}",
+                "type": "custom",
+                "customHTML": f'<table width="100%"><tr><td><img src="https://image.rakuten.co.jp/shop/cabinet/a/{i}.jpg"></td></tr></table>',
+            }
+            if i % 2
+            else {
+                "id": f"module-17000000000{i:02d}-def{i}",
+                "type": "text",
+                "content": f"商品説明 {i}\n送料無料",
+                "fontSize": "4",
+                "alignment": "left",
+            }
+        )
+        for i in range(count)
+    ]
+
+
+class CompressedJSONFieldTestCase(TestCase):
+    """压缩JSON字段测试"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+
+    def raw(self, page):
+        return bytes(_raw_content(PageTemplate.objects.filter(pk=page.pk)).get()[1])
+
+    def test_round_trip_is_transparent(self):
+        """测试读写对ORM透明，长内容压缩存储，短内容和关闭压缩时存为JSON"""
+        content = make_content(40)
+        page = PageTemplate.objects.create(
+            name="长页面", content=content, owner=self.user
+        )
+        raw = self.raw(page)
+        self.assertTrue(is_compressed(raw))
+        self.assertLess(len(raw), len(encode_content(content, compress=False)) / 3)
+        self.assertEqual(PageTemplate.objects.get(pk=page.pk).content, content)
+        self.assertEqual(
+            PageTemplate.objects.filter(pk=page.pk).values_list("content", flat=True)[
+                0
+            ],
+            content,
+        )
+
+        empty = PageTemplate.objects.create(name="空页面", content=[], owner=self.user)
+        self.assertEqual(self.raw(empty), b"[]")
+        self.assertEqual(PageTemplate.objects.get(pk=empty.pk).content, [])
+
+        with patch("pagemaker.config.ConfigManager.PAGE_CONTENT_COMPRESSION", False):
+            page.content = content[:10]
+            page.save()
+        self.assertFalse(is_compressed(self.raw(page)))
+        self.assertEqual(PageTemplate.objects.get(pk=page.pk).content, content[:10])
+        # 迁移前JSON列返回的字符串也能读取
+        self.assertEqual(decode_content('[{"id": "a"}]'), [{"id": "a"}])
+
+        with self.assertRaises(FieldError):
+            list(PageTemplate.objects.filter(content__0__type="text"))
+        self.assertEqual(PageTemplate.objects.filter(content__isnull=False).count(), 2)
+
+    def test_recompress_and_benchmark(self):
+        """测试按配置分批重写存储格式，以及基准测试不修改数据"""
+        with patch("pagemaker.config.ConfigManager.PAGE_CONTENT_COMPRESSION", False):
+            pages = [
+                PageTemplate.objects.create(
+                    name=f"页面{i}", content=make_content(20 + i), owner=self.user
+                )
+                for i in range(5)
+            ]
+        before = [self.raw(page) for page in pages]
+        self.assertFalse(any(is_compressed(raw) for raw in before))
+
+        totals = recompress_pages(batch_size=2)
+        self.assertEqual((totals["pages"], totals["rewritten"]), (5, 5))
+        self.assertLess(totals["bytes_after"], totals["bytes_before"] / 3)
+        for page in pages:
+            self.assertTrue(is_compressed(self.raw(page)))
+            self.assertEqual(PageTemplate.objects.get(pk=page.pk).content, page.content)
+        self.assertEqual(recompress_pages()["rewritten"], 0)
+
+        stored = [self.raw(page) for page in pages]
+        result = benchmark_content_storage(sample_size=3)
+        self.assertEqual(result["pages"], 3)
+        json_stats = result["formats"]["json"]
+        compressed = result["formats"]["compressed"]
+        self.assertEqual(json_stats["ratio"], 1)
+        self.assertLess(compressed["ratio"], 0.5)
+        self.assertIn("mean_ms", compressed["db_read"])
+        self.assertEqual([self.raw(page) for page in pages], stored)
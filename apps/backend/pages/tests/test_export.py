@@ -0,0 +1,208 @@
+"""
+店铺页面批量导出测试
+"""
+
+import gzip
+import io
+import json
+import os
+import tempfile
+import zipfile
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from configurations.models import ShopConfiguration
+from pagemaker.integrations.ftp_client import RakutenFTPClient
+from pagemaker.integrations.sftp_pool import close_all_pools
+from pagemaker.integrations.tests.sftp_server import LocalSFTPServer
+from pages.export import (
+    DirectoryExportWriter,
+    ZipExportWriter,
+    export_shop_pages,
+    iter_page_html,
+)
+from pages.models import PageTemplate
+from pages.render_cache import RenderCache, render_page
+
+
+class ExportShopPagesTestCase(TestCase):
+    """批量导出测试"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.shop = ShopConfiguration.objects.create(
+            shop_name="测试店铺",
+            target_area="test_shop",
+            owner=self.user,
+            api_service_secret="secret",
+            api_license_key="key",
+            ftp_host="ftp.example.com",
+            ftp_user="user",
+            ftp_password="pass",
+        )
+        self.pages = [
+            PageTemplate.objects.create(
+                name=f"页面{i}",
+                content=[
+                    {"id": "t", "type": "title", "text": f"标题{i}"},
+                    {"id": "x", "type": "text", "content": "说明\n第二行"},
+                ],
+                owner=self.user,
+                shop=self.shop,
+                device_type="mobile" if i % 2 else "pc",
+            )
+            for i in range(6)
+        ]
+
+        store = LocMemCache(f"export-{id(self)}", {"TIMEOUT": None})
+        self.addCleanup(store.clear)
+        self.cache = RenderCache(store=store)
+        patcher = patch("pages.export.get_render_cache", return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_zip_export_streams_pages_and_manifest(self):
+        """测试ZIP导出内容、清单、进度回调和缓存命中"""
+        buffer = io.BytesIO()
+        calls = []
+        summary = export_shop_pages(
+            self.shop,
+            ZipExportWriter(buffer),
+            workers=1,
+            progress=lambda done, total, rate: calls.append((done, total)),
+        )
+        self.assertEqual((summary["total"], summary["exported"]), (6, 6))
+        self.assertEqual(calls[-1], (6, 6))
+        self.assertGreater(summary["pages_per_second"], 0)
+
+        with zipfile.ZipFile(buffer) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            self.assertEqual(len(manifest), 6)
+            page = self.pages[1]
+            html = archive.read(f"mobile/{page.id}.html").decode("utf-8")
+        self.assertEqual(html, render_page(page, use_cache=False, minify=True))
+        self.assertTrue(html.startswith("<table"))
+
+        again = export_shop_pages(
+            self.shop, ZipExportWriter(io.BytesIO()), device_type="pc", workers=1
+        )
+        self.assertEqual((again["exported"], again["cached"]), (3, 3))
+
+    def test_directory_export_with_process_pool(self):
+        """测试进程池渲染与当前进程渲染结果一致，并交给SFTP差异同步"""
+        with tempfile.TemporaryDirectory() as root:
+            with patch("configurations.sftp_sync.sync_directory") as sync:
+                sync.return_value = {"success": True}
+                summary = export_shop_pages(
+                    self.shop,
+                    DirectoryExportWriter(root),
+                    workers=2,
+                    upload_remote_dir="/html",
+                )
+            sync.assert_called_once_with(self.shop, root, "/html", delete=True)
+            self.assertEqual(summary["exported"], 6)
+            self.assertFalse(os.path.exists(os.path.join(root, "manifest.json")))
+
+            for page in self.pages:
+                path = os.path.join(root, page.device_type, f"{page.id}.html")
+                with open(path, encoding="utf-8") as f:
+                    self.assertEqual(
+                        f.read(), render_page(page, use_cache=False, minify=True)
+                    )
+
+        with self.assertRaises(ValueError):
+            export_shop_pages(
+                self.shop, ZipExportWriter(io.BytesIO()), upload_remote_dir="/html"
+            )
+
+    def test_device_exports_upload_to_same_remote_dir(self):
+        """测试先导出PC再导出移动端到同一远端目录时，两种设备的页面都保留"""
+        self.addCleanup(close_all_pools)
+        remote = tempfile.TemporaryDirectory()
+        self.addCleanup(remote.cleanup)
+        os.makedirs(os.path.join(remote.name, "html"))
+        with open(os.path.join(remote.name, "html", "index.html"), "wb") as f:
+            f.write(b"shop index")
+
+        with LocalSFTPServer(remote.name) as server:
+            client = RakutenFTPClient(
+                host="127.0.0.1",
+                port=server.port,
+                username="shop",
+                password="secret",
+                test_mode="real",
+            )
+            with patch.object(
+                RakutenFTPClient, "from_shop_config", return_value=client
+            ):
+                for device_type in ("pc", "mobile"):
+                    with tempfile.TemporaryDirectory() as root:
+                        summary = export_shop_pages(
+                            self.shop,
+                            DirectoryExportWriter(root),
+                            device_type=device_type,
+                            workers=1,
+                            upload_remote_dir="/html",
+                        )
+                    self.assertEqual(
+                        (summary["upload"]["uploaded"], summary["upload"]["deleted"]),
+                        (3, 0),
+                    )
+
+        for page in self.pages:
+            self.assertTrue(
+                os.path.exists(
+                    os.path.join(
+                        remote.name, "html", page.device_type, f"{page.id}.html"
+                    )
+                )
+            )
+        self.assertTrue(os.path.exists(os.path.join(remote.name, "html", "index.html")))
+
+
+class PageExportViewTestCase(TestCase):
+    """单页面流式导出测试"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.page = PageTemplate.objects.create(
+            name="大页面",
+            content=[
+                {"id": f"m{i}", "type": "text", "content": f"段落 {i} " * 50}
+                for i in range(200)
+            ],
+            owner=self.user,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("pages:page-export", kwargs={"id": self.page.id})
+
+    def test_streams_chunks_with_gzip(self):
+        """测试分块输出、按 Accept-Encoding 压缩，结果与一次性渲染一致"""
+        expected = render_page(self.page, use_cache=False, minify=True)
+        chunks = list(iter_page_html(self.page, chunk_size=1024, minify=True))
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(b"".join(chunks).decode("utf-8"), expected)
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        body = gzip.decompress(b"".join(response.streaming_content))
+        self.assertEqual(body.decode("utf-8"), expected)
+
+        response = self.client.get(self.url, {"full_document": "true", "minify": "0"})
+        self.assertFalse(response.has_header("Content-Encoding"))
+        html = b"".join(response.streaming_content).decode("utf-8")
+        self.assertEqual(
+            html, render_page(self.page, use_cache=False, full_document=True)
+        )
+
+        other = User.objects.create_user(username="other", password="pass")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
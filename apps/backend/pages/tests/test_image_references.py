@@ -0,0 +1,132 @@
+"""
+页面图片引用索引测试
+"""
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from media.models import MediaFile
+from pages.image_references import (
+    PageImageReference,
+    extract_image_urls,
+    pages_using_image,
+    rebuild_references,
+    unused_media_files,
+)
+from pages.models import PageTemplate
+
+CABINET = "https://image.rakuten.co.jp/testshop/cabinet"
+
+
+class PageImageReferenceTestCase(TestCase):
+    """图片引用索引测试"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.uploaded = MediaFile.objects.create(
+            user=self.user,
+            original_filename="a.jpg",
+            rcabinet_url=f"{CABINET}/items/a.jpg",
+            rcabinet_file_id="1001",
+            file_size=100,
+            content_type="image/jpeg",
+            upload_status="completed",
+        )
+        self.content = [
+            {"id": "i", "type": "image", "src": f"{CABINET}/items/a.jpg"},
+            {
+                "id": "m",
+                "type": "multiColumn",
+                "imageConfig": {"src": f"{CABINET}/items/b.jpg"},
+            },
+            {
+                "id": "c",
+                "type": "custom",
+                "customHTML": f'<p><img alt="x" src="{CABINET}/c.jpg"></p>',
+            },
+            {"id": "d", "type": "image", "src": "data:image/png;base64,AAAA"},
+            {"id": "t", "type": "text", "content": f'<img src="{CABINET}/t.jpg">'},
+        ]
+
+    def _refs(self, page):
+        return set(
+            PageImageReference.objects.filter(page=page).values_list(
+                "module_id", "url", "rcabinet_file_id"
+            )
+        )
+
+    def test_extract_image_urls(self):
+        """测试从图片、多列图文和自定义HTML模块提取URL"""
+        self.assertEqual(
+            extract_image_urls(self.content),
+            [
+                ("i", "image", f"{CABINET}/items/a.jpg"),
+                ("m", "multiColumn", f"{CABINET}/items/b.jpg"),
+                ("c", "custom", f"{CABINET}/c.jpg"),
+            ],
+        )
+        self.assertEqual(extract_image_urls(None), [])
+
+    def test_index_follows_page_saves(self):
+        """测试保存时同步索引、只增删变化的行，删除页面时级联删除"""
+        page = PageTemplate.objects.create(
+            name="页面", content=self.content, owner=self.user
+        )
+        self.assertEqual(
+            self._refs(page),
+            {
+                ("i", f"{CABINET}/items/a.jpg", "1001"),
+                ("m", f"{CABINET}/items/b.jpg", None),
+                ("c", f"{CABINET}/c.jpg", None),
+            },
+        )
+        kept = PageImageReference.objects.get(page=page, module_id="i")
+
+        page.content = [self.content[0], {**self.content[1], "imageConfig": {}}]
+        page.save()
+        self.assertEqual(self._refs(page), {("i", f"{CABINET}/items/a.jpg", "1001")})
+        self.assertTrue(PageImageReference.objects.filter(id=kept.id).exists())
+
+        self.assertEqual(list(pages_using_image(url=f"{CABINET}/items/a.jpg")), [page])
+        self.assertEqual(list(pages_using_image(rcabinet_file_id="1001")), [page])
+        self.assertFalse(unused_media_files().exists())
+
+        # 索引被清空后可以重建
+        PageImageReference.objects.all().delete()
+        self.assertEqual(rebuild_references()["created"], 1)
+
+        page.delete()
+        self.assertFalse(PageImageReference.objects.exists())
+        self.assertEqual(list(unused_media_files()), [self.uploaded])
+
+    def test_usage_endpoint_and_unused_filter(self):
+        """测试图片使用情况接口（编辑者只看到自己的页面）和未使用文件过滤"""
+        page = PageTemplate.objects.create(
+            name="页面", content=self.content, owner=self.user
+        )
+        other = User.objects.create_user(username="other", password="pass")
+        PageTemplate.objects.create(name="其他", content=self.content, owner=other)
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get(reverse("media:get_image_usage"), {"file_id": "1001"})
+        data = response.json()["data"]
+        self.assertEqual(data["total_count"], 1)
+        self.assertEqual(data["pages"][0]["id"], str(page.id))
+        self.assertEqual(data["pages"][0]["module_ids"], ["i"])
+        self.assertEqual(client.get(reverse("media:get_image_usage")).status_code, 400)
+
+        def unused_count():
+            response = client.get(
+                reverse("media:list_user_media_files"), {"unused": "true"}
+            )
+            return response.json()["data"]["total_count"]
+
+        self.assertEqual(unused_count(), 0)
+        page.content = []
+        page.save()
+        self.assertEqual(unused_count(), 0)  # 其他页面仍在使用
+        PageTemplate.objects.filter(owner=other).delete()
+        self.assertEqual(unused_count(), 1)
@@ -0,0 +1,249 @@
+"""
+服务端页面HTML渲染器和渲染缓存测试
+"""
+
+import random
+from unittest.mock import patch
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from pages.render_cache import (
+    FragmentCache,
+    RenderCache,
+    content_hash,
+    render_page,
+)
+from pages.renderer import (
+    PageRenderer,
+    StreamingMinifier,
+    minify_html,
+    render_modules,
+)
+
+
+class PageRendererTestCase(SimpleTestCase):
+    """渲染输出测试（与前端 htmlExportService 保持一致）"""
+
+    def test_title_pc_and_mobile(self):
+        """测试标题模块的PC和移动端输出"""
+        module = {"id": "t", "type": "title", "text": "A<b>\nB", "level": 1}
+        self.assertEqual(
+            PageRenderer().render_module(module),
+            '        <h1 class="pm-title" style="text-align: left; color: #000000; '
+            'font-weight: bold">A&lt;b&gt;<br>B</h1>',
+        )
+        self.assertEqual(
+            PageRenderer(mobile_mode=True).render_module(
+                {**module, "alignment": "justify", "fontSize": "5"}
+            ),
+            '<table width="100%" cellpadding="0" cellspacing="0" border="0" align="center">\n'
+            "<tr>\n"
+            '<td align="left"><font size="5" color="#000000"><b>A&lt;b&gt;<br>B</b></font></td>\n'
+            "</tr>\n"
+            "</table>",
+        )
+
+    def test_text_mobile_is_sanitized_for_rakuten(self):
+        """测试移动端文本只保留乐天允许的标签"""
+        module = {
+            "id": "x",
+            "type": "text",
+            "content": '<div class="a"><strong>粗体</strong><span>文字</span></div>',
+            "alignment": "center",
+        }
+        self.assertEqual(
+            PageRenderer(mobile_mode=True).render_module(module),
+            '<p align="center"><font size="4" color="#000000">'
+            "<p><b>粗体</b>文字</p></font></p>",
+        )
+        self.assertIn("font-size: 24px", PageRenderer().render_module(module))
+
+    def test_image_with_link_and_size(self):
+        """测试图片尺寸、对齐和链接"""
+        module = {
+            "id": "i",
+            "type": "image",
+            "src": "https://image.rakuten.co.jp/shop/cabinet/a.jpg",
+            "alt": "商品",
+            "alignment": "left",
+            "size": {"type": "preset", "value": "medium"},
+            "link": {"type": "url", "value": "https://example.com/?a=1&b=2"},
+        }
+        self.assertEqual(
+            PageRenderer().render_module(module),
+            '<a href="https://example.com/?a=1&amp;b=2" target="_blank" '
+            'rel="noopener noreferrer"><img src="https://image.rakuten.co.jp/shop/cabinet/a.jpg" '
+            'alt="商品" width="400px" style="display: block; margin: 0 auto 0 0;"></a>',
+        )
+        self.assertEqual(
+            PageRenderer(mobile_mode=True).render_module(module),
+            '<a href="https://example.com/?a=1&amp;b=2"><img '
+            'src="https://image.rakuten.co.jp/shop/cabinet/a.jpg" alt="商品" '
+            'width="400px" align="left"></a>',
+        )
+
+    def test_key_value_and_separator(self):
+        """测试表格模块（rows优先，兼容items）和分隔符"""
+        rows = [{"key": "<尺寸>", "value": "a\nb"}]
+        html = PageRenderer().render_module(
+            {"id": "k", "type": "keyValue", "items": rows}
+        )
+        self.assertIn('align="center">&lt;尺寸&gt;</td>', html)
+        self.assertIn('width="80%">a<br>b</td>', html)
+        self.assertEqual(
+            PageRenderer().render_module({"id": "k", "type": "keyValue", "rows": []}),
+            "<!-- 表格模块：无数据 -->",
+        )
+        self.assertEqual(
+            PageRenderer(mobile_mode=True).render_module(
+                {"id": "s", "type": "separator", "lineThickness": 2.0}
+            ),
+            '<hr color="#e5e7eb" size="2">',
+        )
+
+    def test_multi_column_mobile_layouts(self):
+        """测试多列图文移动端布局"""
+        module = {
+            "id": "m",
+            "type": "multiColumn",
+            "layout": "textLeft",
+            "imageConfig": {"src": "a.jpg", "alignment": "right", "width": "40"},
+            "textConfig": {"content": "说明", "backgroundColor": "#fff"},
+        }
+        self.assertEqual(
+            PageRenderer(mobile_mode=True).render_module(module),
+            '<table width="100%" cellspacing="0" cellpadding="0" border="0">\n'
+            '<tr align="center">\n'
+            '<td bgcolor="#fff" width="49%"><font size="4" color="#000000">说明</font></td>\n'
+            '<td width="49%" align="center"><img src="a.jpg" alt="图片" width="40%"></td>\n'
+            "</tr>\n"
+            "</table>",
+        )
+        pc = PageRenderer().render_module(module)
+        self.assertIn("flex-direction: row;", pc)
+        self.assertLess(
+            pc.index("pm-multi-column-text"), pc.index("pm-multi-column-image")
+        )
+
+    def test_custom_and_document(self):
+        """测试自定义HTML清理、未知模块、完整文档和压缩"""
+        modules = [
+            {
+                "id": "c",
+                "type": "custom",
+                "customHTML": '<p class="editable-text note" contenteditable="true">A　B</p>',
+            },
+            {"id": "u", "type": "unknown"},
+        ]
+        self.assertEqual(render_modules(modules), '<p class="note">A　B</p>')
+
+        html = render_modules(modules, full_document=True, minify=True, title="T")
+        self.assertTrue(html.startswith('<!DOCTYPE html><html lang="zh-CN"><head>'))
+        self.assertIn("<title>T</title>", html)
+        self.assertIn("A　B", html)
+        with self.assertRaises(ValueError):
+            PageRenderer(mobileMode=True)
+
+    def test_iter_render_matches_render(self):
+        """测试流式渲染的拼接结果与一次性渲染一致（含压缩跨块边界）"""
+        modules = [
+            {"id": f"m{i}", "type": "text", "content": f" 段落　{i}\n"}
+            for i in range(5)
+        ] + [{"id": "u", "type": "unknown"}]
+        for full_document in (False, True):
+            for minify in (False, True):
+                renderer = PageRenderer(full_document=full_document, minify=minify)
+                chunks = list(renderer.iter_render(modules))
+                self.assertGreater(len(chunks), 1)
+                self.assertEqual("".join(chunks), renderer.render(modules))
+
+        rnd = random.Random(0)
+        alphabet = ["<", ">", "a", " ", "\n", "\t", "　", "\xa0", "<p>"]
+        for _ in range(2000):
+            text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 20)))
+            cuts = sorted(rnd.randint(0, len(text)) for _ in range(3))
+            parts = [text[i:j] for i, j in zip([0, *cuts], [*cuts, len(text)])]
+            minifier = StreamingMinifier()
+            streamed = "".join(minifier.feed(part) for part in parts)
+            self.assertEqual(streamed + minifier.close(), minify_html(text), text)
+
+
+class RenderCacheTestCase(SimpleTestCase):
+    """渲染缓存测试"""
+
+    def setUp(self):
+        self.store = LocMemCache(f"render-{id(self)}", {"TIMEOUT": None})
+        self.addCleanup(self.store.clear)
+        self.content = [{"id": "t", "type": "title", "text": "标题"}]
+
+    def test_hits_by_content_hash_and_options(self):
+        """测试相同内容命中缓存，内容或选项变化时重新渲染"""
+        cache = RenderCache(store=self.store)
+        with patch.object(
+            PageRenderer, "render_module", autospec=True, return_value="<h2>"
+        ) as render:
+            cache.render(self.content)
+            cache.render([dict(reversed(list(self.content[0].items())))])
+            cache.render(self.content, mobile_mode=True)
+            cache.render([{**self.content[0], "text": "新标题"}])
+            # 其他worker从共享层读取
+            RenderCache(store=self.store).render(self.content)
+        self.assertEqual(render.call_count, 3)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        self.assertEqual(
+            content_hash(self.content),
+            content_hash([dict(reversed(list(self.content[0].items())))]),
+        )
+
+    def test_only_changed_modules_are_rendered(self):
+        """测试编辑一个模块后只重新渲染该模块，其他worker复用共享层片段"""
+        content = [
+            {"id": f"m{i}", "type": "text", "content": f"段落 {i}"} for i in range(50)
+        ]
+        edited = [*content[:10], {**content[10], "content": "修改"}, *content[11:]]
+
+        def worker():
+            fragments = FragmentCache(store=self.store, shared=True)
+            return RenderCache(store=self.store, fragments=fragments)
+
+        cache = worker()
+        with patch.object(
+            PageRenderer,
+            "render_module",
+            autospec=True,
+            side_effect=PageRenderer.render_module,
+        ) as render_module:
+            html = cache.render(content, full_document=True)
+            self.assertEqual(render_module.call_count, 50)
+
+            edited_html = cache.render(edited, full_document=True)
+            self.assertEqual(render_module.call_count, 51)
+
+            other = worker()
+            # 片段与文档选项无关，不同选项的渲染也能复用
+            edited_again = {**edited[20], "content": "再次修改"}
+            other.render([*edited[:20], edited_again, *edited[21:]])
+            self.assertEqual(render_module.call_count, 52)
+            self.assertEqual(other.fragments.stats()["shared_hits"], 49)
+
+        self.assertEqual(html, PageRenderer(full_document=True).render(content))
+        self.assertEqual(edited_html, PageRenderer(full_document=True).render(edited))
+        self.assertIn("修改", edited_html)
+
+    def test_render_page_follows_device_type(self):
+        """测试 render_page 按 device_type 选择PC/移动端"""
+
+        class Page:
+            name = "页面"
+            content = [{"id": "t", "type": "title", "text": "标题"}]
+
+        page = Page()
+        page.device_type = "mobile"
+        with patch(
+            "pages.render_cache.get_render_cache",
+            return_value=RenderCache(store=self.store),
+        ):
+            self.assertTrue(render_page(page).startswith("<table"))
+            page.device_type = "pc"
+            self.assertIn('class="pm-title"', render_page(page))
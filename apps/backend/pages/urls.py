@@ -3,7 +3,7 @@ Pages app URL configuration
 """
 
 from django.urls import path
-from .views import PageListCreateView, PageDetailView
+from .views import PageListCreateView, PageDetailView, PageRenderView, PageExportView
 
 app_name = "pages"
 
@@ -11,4 +11,6 @@ urlpatterns = [
     # PageTemplate CRUD API端点
     path("", PageListCreateView.as_view(), name="page-list-create"),
     path("<uuid:id>/", PageDetailView.as_view(), name="page-detail"),
+    path("<uuid:id>/html/", PageRenderView.as_view(), name="page-html"),
+    path("<uuid:id>/export/", PageExportView.as_view(), name="page-export"),
 ]
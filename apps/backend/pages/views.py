@@ -1,8 +1,14 @@
+import logging
+import re
+
 from django.shortcuts import render
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.http import Http404
+from rest_framework.parsers import FormParser, MultiPartParser
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
 from django.core.exceptions import ValidationError as DjangoValidationError
 
 from .models import PageTemplate
@@ -14,6 +20,12 @@ from .serializers import (
 )
 from .permissions import IsOwnerOrAdmin, PageTemplatePermissionMixin, get_user_role
 from .repositories import PageTemplateRepository
+from .render_cache import render_page
+from .export import iter_page_html
+from .budget import analyze_page
+from pagemaker.renderers import ORJSONParser, ORJSONRenderer
+
+logger = logging.getLogger(__name__)
 
 
 class PageListCreateView(generics.ListCreateAPIView):
@@ -26,6 +38,8 @@ class PageListCreateView(generics.ListCreateAPIView):
 
     serializer_class = PageTemplateSerializer
     permission_classes = [IsAuthenticated]
+    renderer_classes = [ORJSONRenderer]
+    parser_classes = [ORJSONParser, FormParser, MultiPartParser]
 
     def get_queryset(self):
         """根据用户权限返回查询集"""
@@ -72,15 +86,15 @@ class PageListCreateView(generics.ListCreateAPIView):
             pages_data = []
             for page in pages_queryset:
                 page_data = {
-                    "id": str(page.id),
+                    "id": page.id,
                     "name": page.name,
-                    "shop_id": str(page.shop.id) if page.shop else None,
+                    "shop_id": page.shop_id,
                     "shop_name": page.shop.shop_name if page.shop else None,
                     "device_type": page.device_type,
-                    "owner_id": str(page.owner.id),
+                    "owner_id": str(page.owner_id),
                     "owner_username": page.owner.username,
-                    "created_at": page.created_at.isoformat(),
-                    "updated_at": page.updated_at.isoformat(),
+                    "created_at": page.created_at,
+                    "updated_at": page.updated_at,
                     "module_count": page.module_count,
                 }
                 pages_data.append(page_data)
@@ -143,15 +157,15 @@ class PageListCreateView(generics.ListCreateAPIView):
 
             # 返回创建的页面数据
             response_data = {
-                "id": str(page.id),
+                "id": page.id,
                 "name": page.name,
                 "content": page.content,
-                "shop_id": str(page.shop.id) if page.shop else None,
+                "shop_id": page.shop_id,
                 "shop_name": page.shop.shop_name if page.shop else None,
                 "device_type": page.device_type,
-                "owner_id": str(page.owner.id),
-                "created_at": page.created_at.isoformat(),
-                "updated_at": page.updated_at.isoformat(),
+                "owner_id": str(page.owner_id),
+                "created_at": page.created_at,
+                "updated_at": page.updated_at,
                 "module_count": page.module_count,
             }
 
@@ -195,6 +209,8 @@ class PageDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     serializer_class = PageTemplateSerializer
     permission_classes = [IsAuthenticated]
+    renderer_classes = [ORJSONRenderer]
+    parser_classes = [ORJSONParser, FormParser, MultiPartParser]
     lookup_field = "id"
 
     def get_object(self):
@@ -213,15 +229,15 @@ class PageDetailView(generics.RetrieveUpdateDestroyAPIView):
             page = self.get_object()
 
             response_data = {
-                "id": str(page.id),
+                "id": page.id,
                 "name": page.name,
                 "content": page.content,
-                "shop_id": str(page.shop.id) if page.shop else None,
+                "shop_id": page.shop_id,
                 "shop_name": page.shop.shop_name if page.shop else None,
                 "device_type": page.device_type,
-                "owner_id": str(page.owner.id),
-                "created_at": page.created_at.isoformat(),
-                "updated_at": page.updated_at.isoformat(),
+                "owner_id": str(page.owner_id),
+                "created_at": page.created_at,
+                "updated_at": page.updated_at,
                 "module_count": page.module_count,
             }
 
@@ -287,18 +303,25 @@ class PageDetailView(generics.RetrieveUpdateDestroyAPIView):
 
             # 返回更新后的页面数据
             response_data = {
-                "id": str(updated_page.id),
+                "id": updated_page.id,
                 "name": updated_page.name,
                 "content": updated_page.content,
-                "shop_id": str(updated_page.shop.id) if updated_page.shop else None,
+                "shop_id": updated_page.shop_id,
                 "shop_name": updated_page.shop.shop_name if updated_page.shop else None,
                 "device_type": updated_page.device_type,
-                "owner_id": str(updated_page.owner.id),
-                "created_at": updated_page.created_at.isoformat(),
-                "updated_at": updated_page.updated_at.isoformat(),
+                "owner_id": str(updated_page.owner_id),
+                "created_at": updated_page.created_at,
+                "updated_at": updated_page.updated_at,
                 "module_count": updated_page.module_count,
+                "budget": None,
             }
 
+            # 乐天HTML预算（按模块增量计算），分析失败不影响保存结果
+            try:
+                response_data["budget"] = analyze_page(updated_page)
+            except Exception as e:
+                logger.warning(f"页面 {updated_page.id} HTML预算分析失败: {e}")
+
             return Response({"success": True, "data": response_data})
 
         except DjangoValidationError as e:
@@ -358,6 +381,117 @@ class PageDetailView(generics.RetrieveUpdateDestroyAPIView):
             )
 
 
+class PageRenderView(generics.GenericAPIView):
+    """
+    页面HTML渲染视图（服务端渲染，结果按内容哈希缓存）
+
+    GET /api/v1/pages/{id}/html/?full_document=true&minify=true
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """渲染页面HTML"""
+        page = PageTemplateRepository.get_page_by_id(kwargs.get("id"), request.user)
+        if not page:
+            return Response(
+                {
+                    "success": False,
+                    "error": {
+                        "code": "NOT_FOUND",
+                        "message": "页面不存在或您没有访问权限",
+                    },
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        truthy = {"1", "true", "True"}
+        try:
+            html = render_page(
+                page,
+                full_document=request.query_params.get("full_document") in truthy,
+                minify=request.query_params.get("minify") in truthy,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "success": False,
+                    "error": {"code": "RENDER_ERROR", "message": str(e)},
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return Response(
+            {
+                "success": True,
+                "data": {
+                    "id": str(page.id),
+                    "device_type": page.device_type,
+                    "html": html,
+                    "length": len(html),
+                },
+            }
+        )
+
+
+class PageExportView(generics.GenericAPIView):
+    """
+    页面HTML流式导出视图（大页面逐模块渲染输出，不在内存中拼出整个页面）
+
+    GET /api/v1/pages/{id}/export/?full_document=true&minify=false
+
+    默认输出压缩后的片段HTML（与批量导出一致）；客户端支持时边渲染边gzip压缩。
+    """
+
+    permission_classes = [IsAuthenticated]
+    accepts_gzip = re.compile(r"\bgzip\b")
+
+    def get(self, request, *args, **kwargs):
+        """流式导出页面HTML"""
+        page = PageTemplateRepository.get_page_by_id(kwargs.get("id"), request.user)
+        if not page:
+            return Response(
+                {
+                    "success": False,
+                    "error": {
+                        "code": "NOT_FOUND",
+                        "message": "页面不存在或您没有访问权限",
+                    },
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        truthy = {"1", "true", "True"}
+        params = request.query_params
+        try:
+            chunks = iter_page_html(
+                page,
+                full_document=params.get("full_document") in truthy,
+                minify=params.get("minify", "true") in truthy,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "success": False,
+                    "error": {"code": "RENDER_ERROR", "message": str(e)},
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        gzip = self.accepts_gzip.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        response = StreamingHttpResponse(
+            compress_sequence(chunks) if gzip else chunks,
+            content_type="text/html; charset=utf-8",
+        )
+        if gzip:
+            response["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ("Accept-Encoding",))
+        response["Content-Disposition"] = f'attachment; filename="{page.id}.html"'
+        # 关闭反向代理缓冲，渲染出的块立即发给客户端
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
 # 为了向后兼容，保留原有的类名
 PageTemplateListCreateView = PageListCreateView
 PageTemplateDetailView = PageDetailView
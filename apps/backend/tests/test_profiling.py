@@ -0,0 +1,114 @@
+"""
+请求级性能分析中间件测试
+"""
+
+from django.contrib.auth.models import User
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache, caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from pagemaker.profiling import (
+    ProfilingMiddleware,
+    get_profiling_registry,
+    record_external_call,
+)
+
+
+def _view(request):
+    User.objects.count()
+    User.objects.exists()
+    cache.get("profiling-test-key")
+    caches["fallback"].set("profiling-test-key", 1)
+    caches["fallback"].get("profiling-test-key")
+    record_external_call(12.5)
+    return HttpResponse("ok")
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        "fallback": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "profiling-test",
+        },
+    }
+)
+class ProfilingMiddlewareTestCase(TestCase):
+    """性能分析中间件测试"""
+
+    def setUp(self):
+        self.registry = get_profiling_registry()
+        self.registry.reset()
+        self.addCleanup(self.registry.reset)
+        self.factory = RequestFactory()
+
+    def _middleware(self, **options):
+        with override_settings(PAGEMAKER_PROFILING={"ENABLED": True, **options}):
+            return ProfilingMiddleware(_view)
+
+    def test_disabled_by_default(self):
+        """测试默认不启用"""
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(_view)
+
+    def test_records_request_profile(self):
+        """测试记录查询、外部调用、所有缓存别名并向管理员输出Server-Timing"""
+        middleware = self._middleware()
+        request = self.factory.get("/api/v1/pages/")
+        request.user = User(username="staff", is_staff=True)
+        response = middleware(request)
+
+        timing = response["Server-Timing"]
+        self.assertIn("app;dur=", timing)
+        self.assertIn('desc="2 queries"', timing)
+        self.assertIn('cabinet;dur=12.5;desc="1 calls"', timing)
+        self.assertIn('cache;desc="1 hits, 1 misses"', timing)
+
+        route = self.registry.snapshot()["routes"]["GET <unresolved>"]
+        self.assertEqual(route["count"], 1)
+        self.assertEqual(route["avg_db_queries"], 2)
+        self.assertEqual(route["cache_hit_rate"], 50)
+
+        # 普通用户的响应不带Server-Timing（仍计入统计）
+        request = self.factory.get("/api/v1/pages/")
+        request.user = AnonymousUser()
+        self.assertNotIn("Server-Timing", middleware(request))
+        self.assertEqual(
+            self.registry.snapshot()["routes"]["GET <unresolved>"]["count"], 2
+        )
+
+    def test_slow_request_profile_captured(self):
+        """测试采样的慢请求保存cProfile结果"""
+        middleware = self._middleware(SAMPLE_RATE=1.0, SLOW_REQUEST_MS=0)
+        middleware(self.factory.get("/api/v1/pages/"))
+
+        snapshot = self.registry.snapshot(include_profiles=True)
+        self.assertEqual(snapshot["slow_profile_count"], 1)
+        self.assertIn("function calls", snapshot["slow_profiles"][0]["stats"])
+
+
+class ProfilingEndpointTestCase(TestCase):
+    """性能分析查询接口测试"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser("admin", "a@example.com", "pw")
+        self.editor = User.objects.create_user("editor", "e@example.com", "pw")
+
+    def test_admin_only(self):
+        """测试只有管理员可以访问"""
+        self.client.force_authenticate(self.editor)
+        response = self.client.get("/api/v1/profiling/")
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get("/api/v1/profiling/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["success"])
+        self.assertIn("routes", response.data["data"])
+
+        response = self.client.delete("/api/v1/profiling/")
+        self.assertEqual(response.status_code, 200)
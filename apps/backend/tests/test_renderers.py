@@ -0,0 +1,87 @@
+"""
+orjson 渲染器/解析器测试
+"""
+
+import io
+import json
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from pagemaker.renderers import ORJSONParser, ORJSONRenderer
+from pages.models import PageTemplate
+
+
+class ORJSONRendererTestCase(SimpleTestCase):
+    """渲染结果与DRF自带JSONRenderer兼容"""
+
+    def test_matches_drf_renderer(self):
+        """测试UUID、时间、Decimal、U+2028 和超大整数的输出"""
+        data = {
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "at": datetime(2026, 10, 19, 9, 30, tzinfo=dt_timezone.utc),
+            "price": Decimal("12.50"),
+            "text": "行1\u2028行2 日本語",
+            "items": [{"a": 1}, None, True],
+        }
+        fast = ORJSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data)))
+        self.assertIn(b'"2026-10-19T09:30:00Z"', fast)
+        self.assertIn(b"\\u2028", fast)
+        self.assertIn("日本語".encode("utf-8"), fast)
+
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+        big = {"n": 2**70}
+        self.assertEqual(ORJSONRenderer().render(big), JSONRenderer().render(big))
+        self.assertIn(
+            b'\n  "n"',
+            ORJSONRenderer().render({"n": 1}, "application/json; indent=2"),
+        )
+
+    def test_parser(self):
+        """测试解析和错误处理"""
+        body = json.dumps({"content": [{"id": "m1", "type": "text"}]}).encode()
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body)),
+            {"content": [{"id": "m1", "type": "text"}]},
+        )
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"a": NaN}'))
+
+
+class ORJSONEndpointTestCase(TestCase):
+    """页面接口使用orjson渲染器后响应格式不变"""
+
+    def test_page_endpoints(self):
+        user = User.objects.create_user(username="owner", password="pass")
+        page = PageTemplate.objects.create(
+            name="页面", content=[{"id": "m1", "type": "text"}], owner=user
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        body = json.loads(client.get(reverse("pages:page-list-create")).content)
+        row = body["data"]["pages"][0]
+        self.assertEqual(row["id"], str(page.id))
+        self.assertEqual(row["owner_id"], str(user.id))
+        self.assertIsNone(row["shop_id"])
+        self.assertTrue(row["updated_at"].endswith("Z"))
+
+        url = reverse("pages:page-detail", kwargs={"id": page.id})
+        response = client.patch(
+            url,
+            data=json.dumps({"content": [{"id": "m2", "type": "text"}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            json.loads(client.get(url).content)["data"]["content"],
+            [{"id": "m2", "type": "text"}],
+        )